@@ -170,6 +170,8 @@ struct ServerTimings {
 
 #[derive(Deserialize)]
 struct ServerMessage {
+    #[serde(rename = "type")]
+    msg_type: Option<String>,
     status: Option<String>,
     text: Option<String>,
     is_partial: Option<bool>,
@@ -1261,6 +1263,19 @@ fn spawn_backend_worker(
                                                     timings.reason.unwrap_or_else(|| "-".to_string()),
                                                 );
                                             }
+                                        } else if msg.msg_type.as_deref() == Some("final_progress") {
+                                            let utterance_id = msg.utterance_id.unwrap_or(0);
+                                            let normalized = msg.text.as_deref().unwrap_or("").trim();
+                                            if !normalized.is_empty()
+                                                && pending_flush_utterance_id() == Some(utterance_id)
+                                            {
+                                                verbose_log!(
+                                                    "[vox-dictation] final_progress utterance_id={} chars={}",
+                                                    utterance_id,
+                                                    normalized.chars().count()
+                                                );
+                                                dispatch_subtitle_update(normalized.to_string(), false);
+                                            }
                                         } else if let Some(text) = msg.text {
                                             if msg.is_partial.unwrap_or(false) {
                                                 let utterance_id = msg.utterance_id.unwrap_or(0);
@@ -1409,8 +1424,15 @@ fn spawn_backend_worker(
                                 write.send(Message::Binary(encode_audio(samples).into())).await
                             }
                             BackendCommand::Flush { utterance_id } => {
-                                let payload =
-                                    format!("{{\"action\":\"flush\",\"utterance_id\":{}}}", utterance_id);
+                                // 字幕开着时请求 final_progress，LLM 润色中途就能在字幕里看到整理后的文本。
+                                let payload = if SHOW_SUBTITLE_OVERLAY.load(Ordering::SeqCst) {
+                                    format!(
+                                        "{{\"action\":\"flush\",\"utterance_id\":{},\"final_progress\":true}}",
+                                        utterance_id
+                                    )
+                                } else {
+                                    format!("{{\"action\":\"flush\",\"utterance_id\":{}}}", utterance_id)
+                                };
                                 write.send(Message::Text(payload.into())).await
                             }
                             BackendCommand::Reset => {
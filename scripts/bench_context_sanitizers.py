@@ -0,0 +1,208 @@
+"""Benchmark the dictation context sanitizers on large terminal and page text.
+
+Compares the tail-first ``_sanitize_terminal_context`` / ``_sanitize_page_context``
+against the previous whole-buffer implementations (kept here as the reference)
+on ~1 MB inputs and checks that both produce identical output.
+
+    uv run python scripts/bench_context_sanitizers.py --size 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import timeit
+
+from vox_cli.services.dictation_context_service import _sanitize_page_context, _sanitize_terminal_context
+
+_LEGACY_TERMINAL_NOISE_PREFIXES = ('last login:', '❯', '$ ', '# ', '›', '•', '└', '│')
+_LEGACY_TERMINAL_NOISE_PATTERNS = (
+    re.compile(r'^[\s\-─-╿]+$'),
+    re.compile(r'^\w[\w./-]*\s+·\s+.+$'),
+    re.compile(r'^(read|explored|recommending|improve documentation)\b', re.IGNORECASE),
+)
+_LEGACY_PAGE_NOISE_PATTERNS = (
+    re.compile(r'^\[(?:session-server|vox-dictation|dictation)\]'),
+    re.compile(r'^\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b'),
+    re.compile(r'^\{"ts":\s*"'),
+    re.compile(r'^\w+Error[:\s]'),
+    re.compile(r'^\s*warnings?\.warn\('),
+)
+
+_TERMINAL_LINES = [
+    '❯ uv run pytest -q',
+    '....................................................... [100%]',
+    '我们先把上下文采集的耗时降下来，再看 LLM 的首包时间。',
+    'src/vox_cli/services/dictation_context_service.py | 42 +++++-----',
+    'codex · main · 3 files changed',
+    '───────────────────────────────',
+    'assistant: the sanitizer now walks the buffer from the tail.',
+    'Read src/vox_cli/services/realtime_asr_service.py',
+    '好的，那就先这样。',
+    '好的，那就先这样。',
+    '   ',
+    'user: can you also benchmark it on a 1 MB scrollback?',
+]
+_PAGE_LINES = [
+    '用户：帮我看一下这个接口为什么一直超时，日志里全是 502。',
+    '[session-server] dictation_context | utterance_id=2 | state="ready"',
+    '12:04:33 GET /api/state 200',
+    '助手：先确认网关的超时配置，再看上游服务有没有在 30 秒内返回。',
+    'http://127.0.0.1:8765/ui',
+    'a | b | c | d | e | f | g | h | this is a table row that looks like noise',
+    'ValueError: invalid literal for int()',
+    '',
+    'x',
+    '上一轮对话',
+    '上一轮对话',
+    'The quick brown fox jumps over the lazy dog.\r',
+]
+
+
+def _legacy_clean(value: str | None) -> str | None:
+    if value is None:
+        return None
+    cleaned = value.replace('\r\n', '\n').replace('\r', '\n').strip()
+    if not cleaned or cleaned == 'missing value':
+        return None
+    return cleaned
+
+
+def _legacy_truncate_tail(value: str | None, max_chars: int) -> str | None:
+    cleaned = _legacy_clean(value)
+    if cleaned is None:
+        return None
+    if max_chars <= 0 or len(cleaned) <= max_chars:
+        return cleaned
+    return cleaned[-max_chars:]
+
+
+def _legacy_terminal_noise(line: str) -> bool:
+    line_key = line.casefold()
+    if any(line_key.startswith(prefix) for prefix in _LEGACY_TERMINAL_NOISE_PREFIXES):
+        return True
+    if any(pattern.match(line) for pattern in _LEGACY_TERMINAL_NOISE_PATTERNS):
+        return True
+    if '/' in line and not any('㐀' <= char <= '鿿' for char in line) and len(line) > 32:
+        return True
+    return False
+
+
+def _legacy_page_noise(line: str) -> bool:
+    line_key = line.casefold()
+    if any(pattern.match(line) for pattern in _LEGACY_PAGE_NOISE_PATTERNS):
+        return True
+    if line_key.startswith('http://127.0.0.1:') or line_key.startswith('https://127.0.0.1:'):
+        return True
+    if line.count('|') >= 4 and len(line) > 40:
+        return True
+    return False
+
+
+def _legacy_dedupe(lines: list[str]) -> list[str]:
+    deduped: list[str] = []
+    for line in lines:
+        if deduped and deduped[-1] == line:
+            continue
+        deduped.append(line)
+    return deduped
+
+
+def _legacy_select(lines: list[str], max_chars: int) -> list[str]:
+    selected: list[str] = []
+    budget = max_chars
+    for line in lines:
+        line_cost = len(line) + (1 if selected else 0)
+        if selected and line_cost > budget and len(selected) >= 2:
+            break
+        selected.append(line)
+        budget -= line_cost
+        if budget <= 0:
+            break
+    return selected
+
+
+def _legacy_sanitize_terminal(value: str | None, max_chars: int) -> str | None:
+    cleaned = _legacy_clean(value)
+    if cleaned is None:
+        return None
+    lines = [re.sub(r'\s+', ' ', line).strip() for line in cleaned.split('\n')]
+    useful = [line for line in lines if line and not _legacy_terminal_noise(line)]
+    if not useful:
+        return None
+    selected = _legacy_select(list(reversed(_legacy_dedupe(useful)[-8:])), max_chars)
+    return _legacy_truncate_tail('\n'.join(reversed(selected)).strip(), max_chars)
+
+
+def _legacy_sanitize_page(value: str | None, max_chars: int, *, prefer_tail: bool = False) -> str | None:
+    cleaned = _legacy_clean(value)
+    if cleaned is None:
+        return None
+    lines = [re.sub(r'\s+', ' ', line).strip() for line in cleaned.split('\n')]
+    useful = [line for line in lines if line and len(line) >= 2 and not _legacy_page_noise(line)]
+    if not useful:
+        return None
+    deduped = _legacy_dedupe(useful)
+    if prefer_tail:
+        candidates = deduped[-10:]
+    else:
+        candidates = []
+        for line in [*deduped[:6], *(deduped[-8:] if len(deduped) > 6 else [])]:
+            if line not in candidates:
+                candidates.append(line)
+    return _legacy_truncate_tail('\n'.join(_legacy_select(candidates, max_chars)).strip(), max_chars)
+
+
+def _build_text(lines: list[str], size: int, rng: random.Random) -> str:
+    parts: list[str] = []
+    total = 0
+    while total < size:
+        line = rng.choice(lines)
+        separator = rng.choice(('\n', '\n', '\n', '\r\n', '\n\n'))
+        parts.append(line + separator)
+        total += len(line) + len(separator)
+    return ''.join(parts)[:size]
+
+
+def _per_call_ms(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1_000_000)
+    parser.add_argument('--max-chars', type=int, default=1200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    terminal_text = _build_text(_TERMINAL_LINES, args.size, rng)
+    page_text = _build_text(_PAGE_LINES, args.size, rng)
+    cases = (
+        (
+            'terminal',
+            lambda: _legacy_sanitize_terminal(terminal_text, args.max_chars),
+            lambda: _sanitize_terminal_context(terminal_text, args.max_chars),
+        ),
+        (
+            'page',
+            lambda: _legacy_sanitize_page(page_text, args.max_chars),
+            lambda: _sanitize_page_context(page_text, args.max_chars),
+        ),
+        (
+            'page (chat tail)',
+            lambda: _legacy_sanitize_page(page_text, args.max_chars, prefer_tail=True),
+            lambda: _sanitize_page_context(page_text, args.max_chars, prefer_tail=True),
+        ),
+    )
+    for name, legacy, current in cases:
+        if legacy() != current():
+            raise RuntimeError(f'{name} output differs at {args.size} chars')
+        before = _per_call_ms(legacy, 3)
+        after = _per_call_ms(current, 50)
+        print(f'{name:>16} {args.size:>8} chars: {before:8.2f}ms -> {after:8.3f}ms ({before / after:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Micro-benchmark the dictation transform rules at 100, 1k and 10k chars.
+
+Compares the table/regex-driven ``fullwidth_to_halfwidth`` / ``auto_insert_spaces``
+against the previous per-character loops (kept here as the reference) and
+checks that both produce identical output.
+
+    uv run python scripts/bench_dictation_transforms.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from vox_cli.services.dictation_postprocess_service import auto_insert_spaces, fullwidth_to_halfwidth
+
+_SAMPLE = '我们在ColdX CLI里面讨论一下，今天下午３点的release计划（v2.5），还有《API》超时问题。好的😀'
+
+
+def _legacy_is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (
+        0x2E80 <= code <= 0x2EFF
+        or 0x2F00 <= code <= 0x2FDF
+        or 0x3040 <= code <= 0x309F
+        or 0x30A0 <= code <= 0x30FF
+        or 0x3100 <= code <= 0x312F
+        or 0x3200 <= code <= 0x32FF
+        or 0x3400 <= code <= 0x4DBF
+        or 0x4E00 <= code <= 0x9FFF
+        or 0xF900 <= code <= 0xFAFF
+    )
+
+
+def _legacy_classify(char: str) -> str:
+    if 'A' <= char <= 'Z' or 'a' <= char <= 'z':
+        return 'latin'
+    if '0' <= char <= '9':
+        return 'digit'
+    if char in '([<':
+        return 'open'
+    if char in ')]>':
+        return 'close'
+    if char in ',.!?:;':
+        return 'delimiter'
+    if char == ' ':
+        return 'space'
+    if _legacy_is_cjk(char):
+        return 'cjk'
+    return 'other'
+
+
+_LEGACY_CJK_PAIRS = {('cjk', 'latin'), ('latin', 'cjk'), ('cjk', 'digit'), ('digit', 'cjk')}
+_LEGACY_PUNCT_PAIRS = {
+    ('delimiter', 'cjk'),
+    ('delimiter', 'latin'),
+    ('delimiter', 'digit'),
+    ('delimiter', 'other'),
+    ('close', 'cjk'),
+    ('close', 'latin'),
+    ('close', 'digit'),
+    ('close', 'other'),
+    ('cjk', 'open'),
+    ('latin', 'open'),
+    ('digit', 'open'),
+    ('other', 'open'),
+}
+
+
+def _legacy_fullwidth_to_halfwidth(text: str) -> str:
+    output: list[str] = []
+    for char in text:
+        code = ord(char)
+        if 0xFF01 <= code <= 0xFF5E:
+            output.append(chr(code - 0xFEE0))
+        elif char == '\u3000':
+            output.append(' ')
+        elif char == '。':
+            output.append('.')
+        elif char == '、':
+            output.append(',')
+        elif char == '【':
+            output.append('[')
+        elif char == '】':
+            output.append(']')
+        elif char in {'「', '」', '\u201C', '\u201D'}:
+            output.append('"')
+        elif char in {'《', '》'}:
+            output.append('<' if char == '《' else '>')
+        elif char in {'\u2018', '\u2019'}:
+            output.append("'")
+        else:
+            output.append(char)
+    return ''.join(output)
+
+
+def _legacy_auto_insert_spaces(text: str, punct: bool, cjk: bool) -> str:
+    chars = list(text)
+    output: list[str] = []
+    for index, char in enumerate(chars):
+        kind = _legacy_classify(char)
+        if index > 0:
+            prev = chars[index - 1]
+            prev_kind = _legacy_classify(prev)
+            if prev_kind != 'space' and kind != 'space':
+                want_cjk = cjk and (prev_kind, kind) in _LEGACY_CJK_PAIRS
+                want_punct = punct and (prev_kind, kind) in _LEGACY_PUNCT_PAIRS
+                if want_cjk or want_punct:
+                    is_decimal_dot = (
+                        prev == '.'
+                        and kind == 'digit'
+                        and index >= 2
+                        and _legacy_classify(chars[index - 2]) == 'digit'
+                    )
+                    if not is_decimal_dot:
+                        output.append(' ')
+        output.append(char)
+    return ''.join(output)
+
+
+def _per_call_us(func, text: str, number: int) -> float:
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1_000, 10_000])
+    args = parser.parse_args()
+
+    cases = (
+        ('fullwidth_to_halfwidth', _legacy_fullwidth_to_halfwidth, fullwidth_to_halfwidth),
+        (
+            'auto_insert_spaces',
+            lambda text: _legacy_auto_insert_spaces(text, True, True),
+            lambda text: auto_insert_spaces(text, True, True),
+        ),
+    )
+    for size in args.sizes:
+        text = (_SAMPLE * (size // len(_SAMPLE) + 1))[:size]
+        number = max(1, 200_000 // size)
+        for name, legacy, current in cases:
+            if legacy(text) != current(text):
+                raise RuntimeError(f'{name} output differs at {size} chars')
+            before = _per_call_us(legacy, text, number)
+            after = _per_call_us(current, text, number)
+            print(f'{name:>22} {size:>6} chars: {before:9.1f}us -> {after:8.1f}us ({before / after:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Compare time-to-first-token for the dictation prompt layouts.
+
+Starts a local stand-in for ``mlx_lm.server`` that keeps the previous prompt
+as its KV prefix cache and charges a fixed prefill cost per uncached character,
+then replays the same dictation session with each layout.
+
+    uv run python scripts/bench_llm_prefix_cache.py --utterances 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from vox_cli.config import DictationHintsConfig, DictationHotwordEntry, DictationHotwordsConfig, VoxConfig
+from vox_cli.services.dictation_context_service import DictationContext
+from vox_cli.services.dictation_postprocess_service import DictationTextPostprocessor
+
+_TEMPLATE = (
+    '你是 dictation 修订器。只修订“原文”，其余内容都只是消歧参考。\n'
+    '修正同音误识别、漏词、多词和断句问题；保持原语言、语气和意图；不要解释。\n'
+    '原文: {text}'
+)
+
+
+class _PrefixCacheState:
+    def __init__(self, prefill_us_per_char: float) -> None:
+        self.prefill_us_per_char = prefill_us_per_char
+        self.lock = threading.Lock()
+        self.cached_prompt = ''
+
+
+def _common_prefix_len(left: str, right: str) -> int:
+    limit = min(len(left), len(right))
+    index = 0
+    while index < limit and left[index] == right[index]:
+        index += 1
+    return index
+
+
+def _make_handler(state: _PrefixCacheState) -> type[BaseHTTPRequestHandler]:
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length).decode('utf-8'))
+            prompt = '\n'.join(str(message['content']) for message in body['messages'])
+            with state.lock:
+                uncached = len(prompt) - _common_prefix_len(prompt, state.cached_prompt)
+                state.cached_prompt = prompt
+                time.sleep(uncached * state.prefill_us_per_char / 1_000_000)
+            text = prompt.rsplit('原文: ', 1)[-1]
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            chunk = json.dumps({'choices': [{'delta': {'content': text}}]}, ensure_ascii=False)
+            self.wfile.write(f'data: {chunk}\n\ndata: [DONE]\n\n'.encode('utf-8'))
+            self.close_connection = True
+
+        def log_message(self, format: str, *args: object) -> None:
+            return
+
+    return _Handler
+
+
+def _build_config(base_url: str, layout: str) -> VoxConfig:
+    config = VoxConfig()
+    llm = config.dictation.llm
+    llm.enabled = True
+    llm.provider = 'local-mlx'
+    llm.base_url = base_url
+    llm.model = 'stand-in'
+    llm.api_key_env = ''
+    llm.stream = True
+    llm.user_prompt_template = _TEMPLATE
+    config.dictation.hints = DictationHintsConfig(enabled=True, items=['说话人前后鼻音不分，优先纠正 an/ang、en/eng。'])
+    config.dictation.hotwords = DictationHotwordsConfig(
+        enabled=True,
+        entries=[DictationHotwordEntry(value=f'术语{index}', aliases=[f'树语{index}']) for index in range(40)],
+    )
+    config.dictation.cache.enabled = False
+    config.dictation.prompt.layout = layout
+    return config
+
+
+def _run_session(base_url: str, layout: str, utterances: int) -> list[int]:
+    postprocessor = DictationTextPostprocessor(_build_config(base_url, layout))
+    first_token_ms: list[int] = []
+    for index in range(utterances):
+        context = DictationContext(
+            source='ghostty',
+            app_name='Ghostty',
+            window_title=f'session {index % 3}',
+            context_text=f'第 {index} 屏终端输出：' + '构建日志 ' * 60,
+        )
+        result = postprocessor.process(f'第 {index} 句口述内容需要修订', language='Chinese', context=context)
+        if result.metadata.get('llm_error'):
+            raise RuntimeError(result.metadata['llm_error'])
+        first_token_ms.append(int(result.metadata.get('llm_first_token_ms') or result.metadata['llm_ms']))
+    return first_token_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--utterances', type=int, default=20)
+    parser.add_argument('--prefill-us-per-char', type=float, default=400.0)
+    args = parser.parse_args()
+
+    state = _PrefixCacheState(args.prefill_us_per_char)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/v1'
+    try:
+        for layout in ('legacy', 'stable_prefix'):
+            state.cached_prompt = ''
+            samples = _run_session(base_url, layout, args.utterances)[1:]
+            print(
+                f'{layout:>13}: ttft p50={statistics.median(samples):.0f}ms '
+                f'avg={statistics.fmean(samples):.0f}ms max={max(samples)}ms (n={len(samples)})'
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Measure the per-partial local preview cost on long dictation input.
+
+Replays a growing partial transcript (one step per ``--step`` characters, up to
+``--chars``) through these paths:
+
+- ``process+emit``: ``process(allow_llm=False)`` with an emitter attached, which
+  builds every stage diff and the full metadata dict (the old preview cost).
+- ``process``: the same call without an emitter; diffs are now skipped.
+- ``preview``: the text-only fast path.
+- ``preview+memo``: the fast path with the stable prefix (here: the previous
+  partial) memoized, as used by the realtime partial preview.
+
+    uv run python scripts/bench_partial_preview.py --chars 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import Callable
+
+from vox_cli.config import DictationHotwordEntry, VoxConfig
+from vox_cli.services.dictation_postprocess_service import DictationTextPostprocessor, PreviewMemo
+
+_SENTENCE = '我们在 ColdX CLI 里面讨论一下，今天下午的 release 计划，还有 open ai 接口的超时问题。'
+
+
+def _build_postprocessor() -> DictationTextPostprocessor:
+    config = VoxConfig()
+    transforms = config.dictation.transforms
+    transforms.fullwidth_to_halfwidth = True
+    transforms.space_around_punct = True
+    transforms.space_between_cjk = True
+    config.dictation.hotwords.enabled = True
+    config.dictation.hotwords.entries = [
+        DictationHotwordEntry(value='Codex', aliases=['ColdX']),
+        DictationHotwordEntry(value='OpenAI', aliases=['open ai']),
+    ]
+    return DictationTextPostprocessor(config)
+
+
+def _partials(chars: int, step: int) -> list[str]:
+    text = (_SENTENCE * (chars // len(_SENTENCE) + 1))[:chars]
+    return [text[:end] for end in range(step, chars + 1, step)]
+
+
+def _measure_us(run: Callable[[str, str, PreviewMemo], object], partials: list[str], rounds: int) -> list[float]:
+    samples: list[float] = []
+    for _ in range(rounds):
+        memo = PreviewMemo()
+        previous = ''
+        for partial in partials:
+            started_at = time.perf_counter()
+            run(partial, previous, memo)
+            samples.append((time.perf_counter() - started_at) * 1_000_000)
+            previous = partial
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chars', type=int, default=500)
+    parser.add_argument('--step', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    postprocessor = _build_postprocessor()
+    partials = _partials(args.chars, args.step)
+    paths: dict[str, Callable[[str, str, PreviewMemo], object]] = {
+        'process+emit': lambda text, stable, memo: postprocessor.process(
+            text, allow_llm=False, emit=lambda stage, fields: None
+        ),
+        'process': lambda text, stable, memo: postprocessor.process(text, allow_llm=False),
+        'preview': lambda text, stable, memo: postprocessor.preview(text),
+        'preview+memo': lambda text, stable, memo: postprocessor.preview(text, memo=memo, stable_prefix=stable),
+    }
+    baseline: float | None = None
+    for name, run in paths.items():
+        samples = _measure_us(run, partials, args.rounds)
+        tail = sorted(samples)[int(len(samples) * 0.95) - 1]
+        average = statistics.fmean(samples)
+        baseline = baseline or average
+        print(
+            f'{name:>12}: avg={average:.0f}us p50={statistics.median(samples):.0f}us '
+            f'p95={tail:.0f}us speedup={baseline / average:.1f}x (n={len(samples)})'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import math
 from pathlib import Path
 
 from .models import ModelSpec
 from .types import CacheStatus
 
 WEIGHT_SUFFIXES = ('.safetensors', '.bin', '.npz')
+# 权重之外还有激活、KV cache 和音频 codec 的缓冲，按权重体积放大估算常驻内存。
+RESIDENT_OVERHEAD_RATIO = 1.3
 
 
 def get_repo_cache_dir(hf_cache_dir: Path, repo_id: str) -> Path:
@@ -67,3 +70,20 @@ def inspect_cache(model: ModelSpec, hf_cache_dir: Path, deep: bool = True) -> Ca
 
 def inspect_cache_quick(model: ModelSpec, hf_cache_dir: Path) -> CacheStatus:
     return inspect_cache(model, hf_cache_dir, deep=False)
+
+
+def snapshot_weights_bytes(snapshot_dir: Path) -> int:
+    if not snapshot_dir.exists():
+        return 0
+    return sum(
+        p.stat().st_size
+        for p in snapshot_dir.rglob('*')
+        if p.is_file() and p.name.endswith(WEIGHT_SUFFIXES)
+    )
+
+
+def estimate_resident_mb(model: ModelSpec, snapshot_dir: Path | None = None) -> int:
+    weights_mb = float(model.weights_mb)
+    if snapshot_dir is not None and (weights_bytes := snapshot_weights_bytes(snapshot_dir)):
+        weights_mb = weights_bytes / (1024 ** 2)
+    return int(math.ceil(weights_mb * RESIDENT_OVERHEAD_RATIO))
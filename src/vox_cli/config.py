@@ -5,6 +5,7 @@ import os
 import platform
 import subprocess
 from typing import Literal
+import warnings
 
 from pydantic import BaseModel, Field
 
@@ -21,7 +22,7 @@ class RuntimeConfig(BaseModel):
     home_dir: str = '~/.vox'
     wait_for_lock: bool = True
     lock_wait_timeout_sec: int = 1800
-    tts_small_base_max_parallel: int = 2
+    memory_budget_gb: float | None = None
     dictation_log_max_bytes: int = 5 * 1024 * 1024
     dictation_log_backups: int = 3
 
@@ -282,7 +283,14 @@ def default_dictation_llm_profiles() -> dict[str, DictationLLMConfig]:
 class DictationContextConfig(BaseModel):
     enabled: bool = False
     max_chars: int = 1200
+    max_tokens: int = 800
     capture_budget_ms: int = 1200
+    persistent_helper: bool = False
+    cache_ttl_ms: int = 3000
+    page_extractor: Literal['walker', 'clone'] = 'walker'
+    watch_enabled: bool = False
+    watch_interval_ms: int = 500
+    watch_max_age_ms: int = 1500
 
 
 class DictationHotwordEntry(BaseModel):
@@ -302,6 +310,49 @@ class DictationHintsConfig(BaseModel):
     items: list[str] = Field(default_factory=list)
 
 
+class DictationIncrementalConfig(BaseModel):
+    enabled: bool = False
+    flush_grace_ms: int = 250
+    finish_ratio: float = 0.8
+
+
+class DictationPromptConfig(BaseModel):
+    layout: Literal['stable_prefix', 'legacy'] = 'stable_prefix'
+    cache_key_header: str | None = None
+
+
+class DictationHedgeConfig(BaseModel):
+    enabled: bool = False
+    secondary_profile: str = ''
+    delay_ms: int = 600
+
+
+class DictationCircuitConfig(BaseModel):
+    enabled: bool = False
+    failure_threshold: int = 3
+    cooldown_sec: float = 30.0
+    adaptive_timeout: bool = False
+    timeout_factor: float = 2.0
+    min_timeout_sec: float = 1.0
+    min_samples: int = 8
+
+
+class DictationGateConfig(BaseModel):
+    enabled: bool = False
+    max_units: int = 4
+    skip_numeric: bool = True
+    reuse_last_output: bool = True
+    filler_words: list[str] = Field(
+        default_factory=lambda: ['嗯', '呃', '额', '啊', '哦', '那个', '就是说', 'um', 'uh', 'er', 'hmm']
+    )
+
+
+class DictationCacheConfig(BaseModel):
+    enabled: bool = False
+    max_entries: int = 256
+    persist: bool = False
+
+
 class DictationConfig(BaseModel):
     transforms: DictationTransformConfig = DictationTransformConfig()
     llm_active_profile: str = DEFAULT_DICTATION_LLM_ACTIVE_PROFILE
@@ -310,6 +361,12 @@ class DictationConfig(BaseModel):
     context: DictationContextConfig = DictationContextConfig()
     hotwords: DictationHotwordsConfig = DictationHotwordsConfig()
     hints: DictationHintsConfig = DictationHintsConfig()
+    incremental: DictationIncrementalConfig = DictationIncrementalConfig()
+    cache: DictationCacheConfig = DictationCacheConfig()
+    prompt: DictationPromptConfig = DictationPromptConfig()
+    hedge: DictationHedgeConfig = DictationHedgeConfig()
+    circuit: DictationCircuitConfig = DictationCircuitConfig()
+    gate: DictationGateConfig = DictationGateConfig()
 
 
 def resolve_active_dictation_llm_config(dictation: DictationConfig) -> DictationLLMConfig:
@@ -324,6 +381,20 @@ def resolve_active_dictation_llm_config(dictation: DictationConfig) -> Dictation
     return dictation.llm_profiles[active_profile].model_copy(deep=True)
 
 
+def resolve_dictation_hedge_profile(dictation: DictationConfig) -> tuple[str, DictationLLMConfig] | None:
+    if not dictation.hedge.enabled:
+        return None
+    active_profile = dictation.llm_active_profile
+    candidates = [dictation.hedge.secondary_profile.strip()] if dictation.hedge.secondary_profile.strip() else [
+        name for name in dictation.llm_profiles if name != active_profile
+    ]
+    for name in candidates:
+        profile = dictation.llm_profiles.get(name)
+        if name != active_profile and profile is not None and profile.base_url and profile.model:
+            return name, profile.model_copy(deep=True)
+    return None
+
+
 def sync_active_dictation_llm_config(config: VoxConfig) -> None:
     config.dictation.llm = resolve_active_dictation_llm_config(config.dictation)
 
@@ -446,6 +517,12 @@ def load_config() -> VoxConfig:
     cfg_path = get_config_path(defaults)
 
     data = _load_toml(cfg_path)
+    if 'tts_small_base_max_parallel' in (data.get('runtime') or {}):
+        warnings.warn(
+            'runtime.tts_small_base_max_parallel is no longer used; ASR and TTS share runtime.memory_budget_gb '
+            '(default: 75% of physical memory)',
+            stacklevel=2,
+        )
     merged = VoxConfig(**data) if data else defaults
     sync_active_dictation_llm_config(merged)
 
@@ -471,6 +548,9 @@ def load_config() -> VoxConfig:
     if (threshold := os.getenv('VOX_ASR_MEMORY_THRESHOLD_GB')):
         merged.asr.memory_threshold_gb = int(threshold)
 
+    if (memory_budget := os.getenv('VOX_RUNTIME_MEMORY_BUDGET_GB')):
+        merged.runtime.memory_budget_gb = float(memory_budget)
+
     if (tts_default := os.getenv('VOX_TTS_DEFAULT_MODEL')):
         merged.tts.default_model = tts_default
 
@@ -531,9 +611,30 @@ def load_config() -> VoxConfig:
     if (max_chars := os.getenv('VOX_DICTATION_CONTEXT_MAX_CHARS')):
         merged.dictation.context.max_chars = max(0, int(max_chars))
 
+    if (context_max_tokens := os.getenv('VOX_DICTATION_CONTEXT_MAX_TOKENS')):
+        merged.dictation.context.max_tokens = max(0, int(context_max_tokens))
+
     if (capture_budget_ms := os.getenv('VOX_DICTATION_CONTEXT_CAPTURE_BUDGET_MS')):
         merged.dictation.context.capture_budget_ms = max(0, int(capture_budget_ms))
 
+    if (raw := os.getenv('VOX_DICTATION_CONTEXT_PERSISTENT_HELPER')):
+        merged.dictation.context.persistent_helper = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (cache_ttl_ms := os.getenv('VOX_DICTATION_CONTEXT_CACHE_TTL_MS')):
+        merged.dictation.context.cache_ttl_ms = max(0, int(cache_ttl_ms))
+
+    if (page_extractor := os.getenv('VOX_DICTATION_CONTEXT_PAGE_EXTRACTOR')) in {'walker', 'clone'}:
+        merged.dictation.context.page_extractor = page_extractor
+
+    if (raw := os.getenv('VOX_DICTATION_CONTEXT_WATCH_ENABLED')):
+        merged.dictation.context.watch_enabled = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (watch_interval_ms := os.getenv('VOX_DICTATION_CONTEXT_WATCH_INTERVAL_MS')):
+        merged.dictation.context.watch_interval_ms = max(50, int(watch_interval_ms))
+
+    if (watch_max_age_ms := os.getenv('VOX_DICTATION_CONTEXT_WATCH_MAX_AGE_MS')):
+        merged.dictation.context.watch_max_age_ms = max(0, int(watch_max_age_ms))
+
     if (raw := os.getenv('VOX_DICTATION_HOTWORDS_ENABLED')):
         merged.dictation.hotwords.enabled = raw.lower() in {'1', 'true', 'yes', 'on'}
 
@@ -546,6 +647,42 @@ def load_config() -> VoxConfig:
     if (raw := os.getenv('VOX_DICTATION_HINTS_ENABLED')):
         merged.dictation.hints.enabled = raw.lower() in {'1', 'true', 'yes', 'on'}
 
+    if (raw := os.getenv('VOX_DICTATION_INCREMENTAL_ENABLED')):
+        merged.dictation.incremental.enabled = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (flush_grace_ms := os.getenv('VOX_DICTATION_INCREMENTAL_FLUSH_GRACE_MS')):
+        merged.dictation.incremental.flush_grace_ms = max(0, int(flush_grace_ms))
+
+    if (raw := os.getenv('VOX_DICTATION_CACHE_ENABLED')):
+        merged.dictation.cache.enabled = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (raw := os.getenv('VOX_DICTATION_CACHE_PERSIST')):
+        merged.dictation.cache.persist = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (raw := os.getenv('VOX_DICTATION_HEDGE_ENABLED')):
+        merged.dictation.hedge.enabled = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (secondary_profile := os.getenv('VOX_DICTATION_HEDGE_SECONDARY_PROFILE')):
+        merged.dictation.hedge.secondary_profile = secondary_profile
+
+    if (hedge_delay_ms := os.getenv('VOX_DICTATION_HEDGE_DELAY_MS')):
+        merged.dictation.hedge.delay_ms = max(0, int(hedge_delay_ms))
+
+    if (raw := os.getenv('VOX_DICTATION_CIRCUIT_ENABLED')):
+        merged.dictation.circuit.enabled = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (raw := os.getenv('VOX_DICTATION_ADAPTIVE_TIMEOUT')):
+        merged.dictation.circuit.adaptive_timeout = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (raw := os.getenv('VOX_DICTATION_GATE_ENABLED')):
+        merged.dictation.gate.enabled = raw.lower() in {'1', 'true', 'yes', 'on'}
+
+    if (gate_max_units := os.getenv('VOX_DICTATION_GATE_MAX_UNITS')):
+        merged.dictation.gate.max_units = max(0, int(gate_max_units))
+
+    if (layout := os.getenv('VOX_DICTATION_PROMPT_LAYOUT')) in {'stable_prefix', 'legacy'}:
+        merged.dictation.prompt.layout = layout
+
     if (raw := os.getenv('VOX_DICTATION_FULLWIDTH_TO_HALFWIDTH')):
         merged.dictation.transforms.fullwidth_to_halfwidth = raw.lower() in {'1', 'true', 'yes', 'on'}
 
@@ -581,6 +718,14 @@ def get_total_memory_gb() -> float | None:
         return None
 
 
+def get_memory_budget_mb(config: VoxConfig) -> int:
+    if config.runtime.memory_budget_gb:
+        return max(1, int(config.runtime.memory_budget_gb * 1024))
+    # 自动预算拿四分之三物理内存给推理，16GB 机器上 1.7B ASR 和 TTS 才能同时常驻；取不到内存时按 16GB 算。
+    total_gb = get_total_memory_gb() or 16.0
+    return int(total_gb * 1024 * 0.75)
+
+
 def resolve_asr_model_id(config: VoxConfig, model_override: str | None = None) -> str:
     if model_override and model_override != 'auto':
         return model_override
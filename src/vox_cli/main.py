@@ -7,6 +7,7 @@ import sys
 import tempfile
 import uuid
 from dataclasses import dataclass
+from enum import Enum
 from pathlib import Path
 
 import typer
@@ -44,8 +45,9 @@ from .db import (
     tracked_task,
 )
 from .models import MODEL_REGISTRY
-from .runtime import RuntimeExecutionOptions
-from .services.asr_service import stream_to_ndjson, stream_transcribe_file, transcribe_file
+from .runtime import RuntimeExecutionOptions, RuntimePriority
+from .services.asr_service import stream_to_ndjson, stream_transcribe_file, transcribe_file, transcribe_files
+from .services.dictation_batch_service import run_dictation_batch_postprocess
 from .services.dictation_context_service import capture_dictation_context
 from .services.dictation_service import build_dictation_agent_digest, launch_dictation
 from .services.realtime_asr_service import run_realtime_session_server
@@ -66,6 +68,19 @@ class AppState:
     db_path: Path
 
 
+class PriorityOption(str, Enum):
+    interactive = 'interactive'
+    normal = 'normal'
+    batch = 'batch'
+
+
+_PRIORITY_LEVELS: dict[PriorityOption, RuntimePriority] = {
+    PriorityOption.interactive: 'interactive',
+    PriorityOption.normal: 'normal',
+    PriorityOption.batch: 'batch',
+}
+
+
 def _build_runtime_options(
     state: AppState,
     *,
@@ -74,6 +89,7 @@ def _build_runtime_options(
     wait_timeout: int | None,
     task_id: str | None = None,
     command_summary: str | None = None,
+    priority: PriorityOption = PriorityOption.normal,
 ) -> RuntimeExecutionOptions:
     wait_enabled = state.config.runtime.wait_for_lock if wait_for_lock is None else wait_for_lock
     timeout_sec = wait_timeout if wait_timeout is not None else state.config.runtime.lock_wait_timeout_sec
@@ -84,6 +100,7 @@ def _build_runtime_options(
         task_type=task_type,
         command_summary=command_summary or ' '.join(sys.argv),
         log=lambda message: err_console.print(message),
+        priority=_PRIORITY_LEVELS[priority],
     )
 
 
@@ -424,6 +441,41 @@ def dictation_digest_cmd(
         console.print(payload)
 
 
+@dictation_app.command('postprocess')
+def dictation_postprocess_cmd(
+    ctx: typer.Context,
+    input_path: Path = typer.Option(..., '--input', exists=True, dir_okay=False, readable=True),
+    out_path: Path = typer.Option(..., '--out', dir_okay=False),
+    concurrency: int = typer.Option(4, '--concurrency', min=1),
+    lang: str | None = typer.Option(None, '--lang'),
+    llm: bool = typer.Option(True, '--llm/--no-llm'),
+    profile: str | None = typer.Option(None, '--profile'),
+    preset: str | None = typer.Option(None, '--preset'),
+    llm_timeout_sec: float | None = typer.Option(None, '--llm-timeout-sec', min=0.1),
+    as_json: bool = typer.Option(True, '--json/--pretty'),
+) -> None:
+    state: AppState = ctx.obj
+    try:
+        payload = run_dictation_batch_postprocess(
+            state.config,
+            input_path,
+            out_path,
+            concurrency=concurrency,
+            language=lang,
+            use_llm=llm,
+            llm_profile=profile,
+            prompt_preset=preset,
+            llm_timeout_sec=llm_timeout_sec,
+        )
+    except Exception as e:
+        _fail(str(e))
+
+    if as_json:
+        _print_json(payload)
+    else:
+        console.print(payload)
+
+
 @vmic_app.command('path')
 def vmic_path_cmd(
     rebuild_native: bool = typer.Option(False, '--rebuild-native'),
@@ -787,6 +839,7 @@ def asr_session_server_cmd(
                     wait_for_lock=wait,
                     wait_timeout=wait_timeout,
                     command_summary=f'asr session-server --model {resolved_model}',
+                    priority=PriorityOption.interactive,
                 )
                 run_realtime_session_server(
                     config=state.config,
@@ -808,16 +861,22 @@ def asr_session_server_cmd(
 @asr_app.command('transcribe')
 def asr_transcribe_cmd(
     ctx: typer.Context,
-    audio: Path = typer.Option(..., '--audio'),
+    audio: list[Path] = typer.Option(..., '--audio', help='Audio file; repeat for several files'),
     lang: str = typer.Option('auto', '--lang'),
     model: str = typer.Option('auto', '--model'),
+    priority: PriorityOption = typer.Option(
+        PriorityOption.normal,
+        '--priority',
+        help='batch yields to queued higher-priority jobs between files',
+    ),
     wait: bool | None = typer.Option(None, '--wait/--no-wait'),
     wait_timeout: int | None = typer.Option(None, '--wait-timeout', min=1),
     as_json: bool = typer.Option(False, '--json'),
 ) -> None:
     state: AppState = ctx.obj
-    if not audio.exists():
-        _fail(f'Audio file not found: {audio}')
+    for path in audio:
+        if not path.exists():
+            _fail(f'Audio file not found: {path}')
 
     model_arg = None if model == 'auto' else model
     resolved_model = resolve_asr_model_id(state.config, model_arg)
@@ -827,7 +886,7 @@ def asr_transcribe_cmd(
             conn,
             'asr_transcribe',
             resolved_model,
-            {'audio': str(audio), 'lang': lang},
+            {'audio': str(audio[0]) if len(audio) == 1 else [str(path) for path in audio], 'lang': lang},
         ) as task:
             try:
                 runtime_options = _build_runtime_options(
@@ -837,15 +896,25 @@ def asr_transcribe_cmd(
                     wait_for_lock=wait,
                     wait_timeout=wait_timeout,
                     command_summary=f'asr transcribe --model {resolved_model}',
+                    priority=priority,
                 )
-                result = transcribe_file(
+                results = transcribe_files(
                     state.config,
                     audio,
                     resolved_model,
                     lang,
                     runtime_options=runtime_options,
                 )
-                complete_task(conn, task.id, result)
+                result = results[0] if len(results) == 1 else {'results': results}
+                failed = [item for item in results if item.get('error')]
+                if failed:
+                    fail_task(
+                        conn,
+                        task.id,
+                        f'{len(failed)}/{len(results)} files failed; first: {failed[0]["audio"]}: {failed[0]["error"]}',
+                    )
+                else:
+                    complete_task(conn, task.id, result)
             except Exception as e:
                 fail_task(conn, task.id, str(e))
                 _fail(str(e))
@@ -854,7 +923,13 @@ def asr_transcribe_cmd(
     if as_json:
         _print_json(payload)
     else:
-        console.print(payload['text'])
+        for item in results:
+            if item.get('error'):
+                console.print(f"[yellow]Failed {item['audio']}[/yellow]: {item['error']}")
+            else:
+                console.print(item['text'])
+    if failed:
+        raise typer.Exit(code=1)
 
 
 def _capture_microphone_to_file(path: Path, seconds: int) -> None:
@@ -1132,6 +1207,11 @@ def pipeline_run_cmd(
     lang: str = typer.Option('auto', '--lang'),
     asr_model: str = typer.Option('auto', '--asr-model'),
     tts_model: str | None = typer.Option(None, '--tts-model'),
+    priority: PriorityOption = typer.Option(
+        PriorityOption.normal,
+        '--priority',
+        help='queue order for the ASR and TTS steps; the budget is released between them, not mid-step',
+    ),
     wait: bool | None = typer.Option(None, '--wait/--no-wait'),
     wait_timeout: int | None = typer.Option(None, '--wait-timeout', min=1),
     as_json: bool = typer.Option(False, '--json'),
@@ -1167,6 +1247,7 @@ def pipeline_run_cmd(
                     wait_for_lock=wait,
                     wait_timeout=wait_timeout,
                     command_summary=f'pipeline run --asr-model {resolved_asr_model} --tts-model {resolved_tts_model}',
+                    priority=priority,
                 )
                 asr_result = transcribe_file(
                     state.config,
@@ -12,6 +12,8 @@ class ModelSpec:
     repo_id: str
     kind: ModelKind
     quantization: str | None = None
+    # 权重文件的大致体积，本地还没有 snapshot 时用来估算常驻内存。
+    weights_mb: int = 2048
 
 
 MODEL_REGISTRY: dict[str, ModelSpec] = {
@@ -19,66 +21,77 @@ MODEL_REGISTRY: dict[str, ModelSpec] = {
         model_id='qwen-tts-1.7b',
         repo_id='mlx-community/Qwen3-TTS-12Hz-1.7B-Base-bf16',
         kind='tts',
+        weights_mb=4300,
     ),
     'qwen-tts-1.7b-base-8bit': ModelSpec(
         model_id='qwen-tts-1.7b-base-8bit',
         repo_id='mlx-community/Qwen3-TTS-12Hz-1.7B-Base-8bit',
         kind='tts',
         quantization='8bit',
+        weights_mb=2500,
     ),
     'qwen-tts-1.7b-customvoice-8bit': ModelSpec(
         model_id='qwen-tts-1.7b-customvoice-8bit',
         repo_id='mlx-community/Qwen3-TTS-12Hz-1.7B-CustomVoice-8bit',
         kind='tts',
         quantization='8bit',
+        weights_mb=2500,
     ),
     'qwen-tts-1.7b-voicedesign-8bit': ModelSpec(
         model_id='qwen-tts-1.7b-voicedesign-8bit',
         repo_id='mlx-community/Qwen3-TTS-12Hz-1.7B-VoiceDesign-8bit',
         kind='tts',
         quantization='8bit',
+        weights_mb=2500,
     ),
     'qwen-tts-0.6b-base-8bit': ModelSpec(
         model_id='qwen-tts-0.6b-base-8bit',
         repo_id='mlx-community/Qwen3-TTS-12Hz-0.6B-Base-8bit',
         kind='tts',
         quantization='8bit',
+        weights_mb=1300,
     ),
     'qwen-tts-0.6b-customvoice-8bit': ModelSpec(
         model_id='qwen-tts-0.6b-customvoice-8bit',
         repo_id='mlx-community/Qwen3-TTS-12Hz-0.6B-CustomVoice-8bit',
         kind='tts',
         quantization='8bit',
+        weights_mb=1300,
     ),
     'qwen-tts-0.6b-voicedesign-8bit': ModelSpec(
         model_id='qwen-tts-0.6b-voicedesign-8bit',
         repo_id='mlx-community/Qwen3-TTS-12Hz-0.6B-VoiceDesign-8bit',
         kind='tts',
         quantization='8bit',
+        weights_mb=1300,
     ),
     'qwen-asr-1.7b-8bit': ModelSpec(
         model_id='qwen-asr-1.7b-8bit',
         repo_id='mlx-community/Qwen3-ASR-1.7B-8bit',
         kind='asr',
         quantization='8bit',
+        weights_mb=2300,
     ),
     'qwen-asr-1.7b-4bit': ModelSpec(
         model_id='qwen-asr-1.7b-4bit',
         repo_id='mlx-community/Qwen3-ASR-1.7B-4bit',
         kind='asr',
         quantization='4bit',
+        weights_mb=1400,
     ),
     'qwen-asr-0.6b-8bit': ModelSpec(
         model_id='qwen-asr-0.6b-8bit',
         repo_id='mlx-community/Qwen3-ASR-0.6B-8bit',
         kind='asr',
         quantization='8bit',
+        weights_mb=1000,
     ),
     'qwen-asr-0.6b-4bit': ModelSpec(
         model_id='qwen-asr-0.6b-4bit',
         repo_id='mlx-community/Qwen3-ASR-0.6B-4bit',
         kind='asr',
         quantization='4bit',
+        weights_mb=700,
     ),
 }
 
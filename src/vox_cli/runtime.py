@@ -4,17 +4,24 @@ from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable, Iterator
+from typing import Callable, Iterator, Literal
+import errno
 import fcntl
 import hashlib
+import itertools
 import json
+import math
 import os
+import select
 import time
 
-from .config import VoxConfig, get_locks_dir
+from .config import VoxConfig, get_locks_dir, get_memory_budget_mb
 
 
 LockLogger = Callable[[str], None]
+RuntimePriority = Literal['interactive', 'normal', 'batch']
+
+_PRIORITY_RANK: dict[str, int] = {'interactive': 0, 'normal': 1, 'batch': 2}
 
 
 @dataclass(frozen=True)
@@ -25,6 +32,7 @@ class RuntimeExecutionOptions:
     task_type: str | None = None
     command_summary: str | None = None
     log: LockLogger | None = None
+    priority: RuntimePriority = 'normal'
 
 
 @dataclass(frozen=True)
@@ -35,6 +43,7 @@ class RuntimeLockState:
     task_type: str | None = None
     command_summary: str | None = None
     started_at: str | None = None
+    priority: str | None = None
     metadata: dict[str, str] = field(default_factory=dict)
 
 
@@ -55,11 +64,12 @@ class RuntimeLockHandle:
     resource: str
     path: Path
     file_obj: object
+    notify_release: bool = field(default=True, repr=False)
 
 
 DEFAULT_WAIT_TIMEOUT_SEC = 1800
+MEMORY_UNIT_MB = 512
 _WAIT_LOG_INTERVAL_SEC = 5.0
-_LOCK_POLL_INTERVAL_SEC = 0.5
 
 
 def _utc_now() -> str:
@@ -102,6 +112,7 @@ def _read_lock_state(lock_path: Path, resource: str) -> RuntimeLockState:
         task_type=payload.get('task_type'),
         command_summary=payload.get('command_summary'),
         started_at=payload.get('started_at'),
+        priority=payload.get('priority'),
         metadata=metadata if isinstance(metadata, dict) else {},
     )
 
@@ -120,6 +131,7 @@ def _write_lock_state(
         'task_type': options.task_type,
         'command_summary': options.command_summary,
         'started_at': _utc_now(),
+        'priority': options.priority,
         'metadata': _stringify_metadata(metadata),
     }
     file_obj.seek(0)
@@ -142,11 +154,13 @@ def format_lock_state(state: RuntimeLockState) -> str:
         parts.append(f'task={state.task_type}')
     if state.task_id:
         parts.append(f'id={state.task_id}')
+    if state.priority:
+        parts.append(f'priority={state.priority}')
     if state.pid:
         parts.append(f'pid={state.pid}')
     if state.started_at:
         parts.append(f'started={state.started_at}')
-    for key in ('model_id', 'profile', 'audio', 'out'):
+    for key in ('model_id', 'memory_mb', 'queue_position', 'profile', 'audio', 'out'):
         value = state.metadata.get(key)
         if value:
             parts.append(f'{key}={value}')
@@ -198,84 +212,377 @@ def probe_runtime_lock(config: VoxConfig, resource: str) -> tuple[bool, RuntimeL
         file_obj.close()
 
 
+_WAKE_IDS = itertools.count(1)
+
+
+# 等待方各自在 locks/wake 下挂一个 FIFO，释放锁或离开队列的一方往所有 FIFO 里写一个字节；持有者崩溃时靠 _wait_slice 兜底重查。
+class _LockReleaseWatcher:
+    def __init__(self, locks_dir: Path) -> None:
+        self.wake_dir = locks_dir / 'wake'
+        self._path: Path | None = None
+        self._read_fd: int | None = None
+        self._write_fd: int | None = None
+
+    def arm(self) -> bool:
+        # 第一次等待时才建 FIFO；返回 True 时调用方要先再试一次，覆盖建好之前刚好发生的释放。
+        if self._path is not None:
+            return False
+        self.wake_dir.mkdir(parents=True, exist_ok=True)
+        path = self.wake_dir / f'{os.getpid()}-{next(_WAKE_IDS)}.fifo'
+        self._path = path
+        try:
+            os.mkfifo(path, 0o600)
+            self._read_fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            # 自己也留一个写端，没人写的时候 select 不会因为 EOF 一直返回可读。
+            self._write_fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            self.close()
+            self._path = path
+        return True
+
+    def wait(self, timeout_sec: float) -> bool:
+        timeout_sec = max(0.0, timeout_sec)
+        if self._read_fd is None:
+            time.sleep(timeout_sec)
+            return False
+        ready, _, _ = select.select([self._read_fd], [], [], timeout_sec)
+        if not ready:
+            return False
+        try:
+            while os.read(self._read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        for fd in (self._read_fd, self._write_fd):
+            if fd is not None:
+                os.close(fd)
+        self._read_fd = self._write_fd = None
+        if self._path is not None:
+            self._path.unlink(missing_ok=True)
+            self._path = None
+
+
+def _notify_lock_waiters(locks_dir: Path) -> None:
+    try:
+        entries = list((locks_dir / 'wake').iterdir())
+    except FileNotFoundError:
+        return
+    for path in entries:
+        if path.suffix != '.fifo':
+            continue
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        except FileNotFoundError:
+            continue
+        except OSError as error:
+            owner = path.stem.split('-', 1)[0]
+            if error.errno == errno.ENXIO and owner.isdigit() and not _pid_alive(int(owner)):
+                path.unlink(missing_ok=True)
+            continue
+        try:
+            os.write(fd, b'\0')
+        except BlockingIOError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _wait_slice(waited: float, last_logged: float, options: RuntimeExecutionOptions) -> float:
+    slice_sec = min(options.wait_timeout_sec - waited, _WAIT_LOG_INTERVAL_SEC)
+    if options.log:
+        slice_sec = min(slice_sec, last_logged + _WAIT_LOG_INTERVAL_SEC - waited)
+    return max(0.0, slice_sec)
+
+
+def _ticket_abandoned(path: Path) -> bool:
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except FileNotFoundError:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return True
+    finally:
+        os.close(fd)
+
+
+class _LockWaitQueue:
+    def __init__(self, config: VoxConfig, resources: list[str]) -> None:
+        key = '|'.join(sorted(resources))
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+        self.locks_dir = get_locks_dir(config)
+        self.locks_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.locks_dir / f'queue-{digest}.json'
+        self._mutex_path = self.locks_dir / f'queue-{digest}.lock'
+        self._digest = digest
+        self._held: dict[int, int] = {}
+
+    def ticket_path(self, ticket: int) -> Path:
+        return self.locks_dir / f'queue-{self._digest}-{ticket}.lock'
+
+    @contextmanager
+    def _locked(self) -> Iterator[dict]:
+        # 互斥用单独的锁文件；状态文件整体替换，读到的永远是完整的一份，没变化时不写。
+        with self._mutex_path.open('a+', encoding='utf-8') as mutex:
+            fcntl.flock(mutex.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    raw = self.path.read_text(encoding='utf-8').strip()
+                except FileNotFoundError:
+                    raw = ''
+                try:
+                    state = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    state = {}
+                if not isinstance(state, dict):
+                    state = {}
+                before = json.dumps(state, ensure_ascii=False, sort_keys=True)
+                waiters = state.get('waiters') if isinstance(state.get('waiters'), list) else []
+                live: list[dict] = []
+                for waiter in waiters:
+                    if not isinstance(waiter, dict) or not isinstance(waiter.get('ticket'), int):
+                        continue
+                    ticket_path = self.ticket_path(waiter['ticket'])
+                    if waiter['ticket'] not in self._held and _ticket_abandoned(ticket_path):
+                        ticket_path.unlink(missing_ok=True)
+                        continue
+                    live.append(waiter)
+                state['waiters'] = live
+                state['next_ticket'] = int(state.get('next_ticket') or 0)
+                yield state
+                if json.dumps(state, ensure_ascii=False, sort_keys=True) != before:
+                    tmp_path = self.path.with_name(f'{self.path.name}.tmp')
+                    tmp_path.write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+                    os.replace(tmp_path, self.path)
+            finally:
+                fcntl.flock(mutex.fileno(), fcntl.LOCK_UN)
+
+    def enqueue(self, *, need: int, options: RuntimeExecutionOptions) -> int:
+        with self._locked() as state:
+            ticket = state['next_ticket'] + 1
+            state['next_ticket'] = ticket
+            fd = os.open(self.ticket_path(ticket), os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._held[ticket] = fd
+            state['waiters'].append(
+                {
+                    'ticket': ticket,
+                    'pid': os.getpid(),
+                    'need': need,
+                    'priority': options.priority,
+                    'task_id': options.task_id,
+                    'task_type': options.task_type,
+                    'enqueued_at': _utc_now(),
+                }
+            )
+        return ticket
+
+    def waiters(self) -> list[dict]:
+        with self._locked() as state:
+            waiters = list(state['waiters'])
+        return sorted(waiters, key=lambda waiter: (_PRIORITY_RANK.get(waiter.get('priority'), 1), waiter['ticket']))
+
+    def position(self, ticket: int) -> tuple[int, int] | None:
+        tickets = [waiter['ticket'] for waiter in self.waiters()]
+        if ticket not in tickets:
+            return None
+        return tickets.index(ticket), len(tickets)
+
+    def remove(self, ticket: int) -> None:
+        with self._locked() as state:
+            state['waiters'] = [waiter for waiter in state['waiters'] if waiter['ticket'] != ticket]
+            self.ticket_path(ticket).unlink(missing_ok=True)
+            fd = self._held.pop(ticket, None)
+            if fd is not None:
+                os.close(fd)
+        _notify_lock_waiters(self.locks_dir)
+
+
+def _try_lock_count(
+    config: VoxConfig,
+    resources: list[str],
+    need: int,
+    options: RuntimeExecutionOptions,
+    metadata: dict[str, object] | None,
+) -> tuple[ExitStack, list[RuntimeLockHandle]] | None:
+    stack = ExitStack()
+    handles: list[RuntimeLockHandle] = []
+    try:
+        for index, resource in enumerate(resources):
+            if len(resources) - index < need - len(handles):
+                break
+            try:
+                handles.append(
+                    stack.enter_context(acquire_runtime_lock(config, resource, options=options, metadata=metadata))
+                )
+            except RuntimeLockBusyError:
+                continue
+            if len(handles) == need:
+                return stack, handles
+    except BaseException:
+        stack.close()
+        raise
+    # 凑不齐时拿到的单元原本就是空闲的，放回去不用叫醒别人，否则队首自己会被自己反复唤醒。
+    for handle in handles:
+        handle.notify_release = False
+    stack.close()
+    return None
+
+
+def _describe_holders(config: VoxConfig, resources: list[str]) -> str:
+    states = [(resource, _read_lock_state(_lock_path(config, resource), resource)) for resource in resources]
+    if len(resources) <= 4:
+        return '; '.join(f'{resource} -> {format_lock_state(state)}' for resource, state in states)
+    counts: dict[str, int] = {}
+    for _, state in states:
+        if state.pid is None:
+            continue
+        holder = format_lock_state(replace(state, started_at=None))
+        counts[holder] = counts.get(holder, 0) + 1
+    return '; '.join(f'{holder} x{count}' for holder, count in counts.items()) or 'releasing'
+
+
 @contextmanager
-def acquire_runtime_lock_pool(
+def _acquire_queued(
     config: VoxConfig,
     resources: list[str],
     *,
     options: RuntimeExecutionOptions,
-    metadata: dict[str, object] | None = None,
-    display_resource: str | None = None,
-) -> Iterator[RuntimeLockHandle]:
-    if not resources:
-        raise ValueError('resources must not be empty')
-    if len(resources) == 1:
-        with acquire_runtime_lock(config, resources[0], options=options, metadata=metadata) as handle:
-            yield handle
-        return
-
+    metadata: dict[str, object] | None,
+    pool_name: str,
+    need: int,
+) -> Iterator[list[RuntimeLockHandle]]:
     started = time.monotonic()
     last_logged = -_WAIT_LOG_INTERVAL_SEC
-    pool_name = display_resource or resources[0]
     attempt_options = replace(options, wait_for_lock=False, log=None)
-
-    while True:
-        states: list[tuple[str, RuntimeLockState]] = []
-        for resource in resources:
-            manager = acquire_runtime_lock(config, resource, options=attempt_options, metadata=metadata)
-            try:
-                handle = manager.__enter__()
-            except RuntimeLockBusyError:
-                state = _read_lock_state(_lock_path(config, resource), resource)
-                states.append((resource, state))
+    queue = _LockWaitQueue(config, resources)
+    watcher = _LockReleaseWatcher(queue.locks_dir)
+    ticket = queue.enqueue(need=need, options=options)
+    acquired = None
+    joined_position: int | None = None
+    try:
+        while True:
+            current = queue.position(ticket)
+            if current is None:
+                queue.remove(ticket)
+                ticket = queue.enqueue(need=need, options=options)
                 continue
-            except Exception:
-                manager.__exit__(None, None, None)
-                raise
-
-            try:
-                waited = time.monotonic() - started
-                if options.log and waited >= 1.0:
-                    options.log(f'[green]Acquired {pool_name}[/green] via {resource} after {waited:.1f}s wait')
-                yield handle
-                return
-            finally:
-                manager.__exit__(None, None, None)
+            position, queued = current
+            if joined_position is None:
+                joined_position = position + 1
+                metadata = {**(metadata or {}), 'queue_position': f'{joined_position}/{queued}'}
+            if position == 0:
+                acquired = _try_lock_count(config, resources, need, attempt_options, metadata)
+                if acquired is not None:
+                    break
+
+            waited = time.monotonic() - started
+            if not options.wait_for_lock or waited >= options.wait_timeout_sec or (
+                options.log and waited - last_logged >= _WAIT_LOG_INTERVAL_SEC
+            ):
+                detail = _describe_holders(config, resources)
+                queue_detail = f'queue position {position + 1}/{queued}'
+                if not options.wait_for_lock:
+                    raise RuntimeLockBusyError(f'Lock pool is busy {pool_name} ({queue_detail}). Holders: {detail}')
+                if waited >= options.wait_timeout_sec:
+                    raise RuntimeLockTimeoutError(
+                        f'Timed out waiting for lock pool {pool_name} after {waited:.1f}s ({queue_detail}). '
+                        f'Holders: {detail}'
+                    )
+                options.log(f'[yellow]Waiting for {pool_name}[/yellow] ({waited:.1f}s, {queue_detail}). Holders: {detail}')
+                last_logged = waited
+            if watcher.arm():
+                continue
+            watcher.wait(_wait_slice(waited, last_logged, options))
+    finally:
+        watcher.close()
+        queue.remove(ticket)
 
+    stack, value = acquired
+    with stack:
         waited = time.monotonic() - started
-        if not options.wait_for_lock:
-            detail = '; '.join(f'{resource} -> {format_lock_state(state)}' for resource, state in states) or 'all slots busy'
-            raise RuntimeLockBusyError(f'Lock pool is busy {pool_name}. Holders: {detail}')
-        if waited >= options.wait_timeout_sec:
-            detail = '; '.join(f'{resource} -> {format_lock_state(state)}' for resource, state in states) or 'all slots busy'
-            raise RuntimeLockTimeoutError(
-                f'Timed out waiting for lock pool {pool_name} after {waited:.1f}s. Holders: {detail}'
-            )
-        if options.log and waited - last_logged >= _WAIT_LOG_INTERVAL_SEC:
-            detail = '; '.join(f'{resource} -> {format_lock_state(state)}' for resource, state in states) or 'all slots busy'
-            options.log(f'[yellow]Waiting for {pool_name}[/yellow] ({waited:.1f}s). Holders: {detail}')
-            last_logged = waited
-        time.sleep(_LOCK_POLL_INTERVAL_SEC)
+        if options.log and waited >= 1.0:
+            options.log(f'[green]Acquired {pool_name}[/green] after {waited:.1f}s wait')
+        yield value
+
+
+def _memory_budget_resources(config: VoxConfig, cost_mb: int) -> tuple[int, list[str]]:
+    need, total_units = memory_units_for(cost_mb, get_memory_budget_mb(config))
+    return need, [f'memory_unit:{unit}' for unit in range(total_units)]
+
+
+def memory_budget_contended(config: VoxConfig, options: RuntimeExecutionOptions) -> bool:
+    _, resources = _memory_budget_resources(config, 0)
+    rank = _PRIORITY_RANK[options.priority]
+    return any(
+        _PRIORITY_RANK.get(waiter.get('priority'), 1) < rank
+        for waiter in _LockWaitQueue(config, resources).waiters()
+    )
+
+
+def probe_memory_budget(
+    config: VoxConfig,
+    cost_mb: int,
+    *,
+    priority: RuntimePriority = 'normal',
+) -> tuple[bool, str, int]:
+    need, resources = _memory_budget_resources(config, cost_mb)
+    held = 0
+    for resource in resources:
+        state = _read_lock_state(_lock_path(config, resource), resource)
+        if state.pid is not None and _pid_alive(state.pid):
+            held += 1
+    rank = _PRIORITY_RANK[priority]
+    ahead = sum(
+        1
+        for waiter in _LockWaitQueue(config, resources).waiters()
+        if _PRIORITY_RANK.get(waiter.get('priority'), 1) <= rank
+    )
+    return len(resources) - held >= need, _describe_holders(config, resources), ahead + 1
+
+
+def memory_units_for(cost_mb: int, budget_mb: int) -> tuple[int, int]:
+    total_units = max(1, budget_mb // MEMORY_UNIT_MB)
+    need = min(total_units, max(1, math.ceil(cost_mb / MEMORY_UNIT_MB)))
+    return need, total_units
 
 
 @contextmanager
-def acquire_runtime_locks(
+def acquire_memory_budget(
     config: VoxConfig,
-    resources: list[str],
+    cost_mb: int,
     *,
     options: RuntimeExecutionOptions,
     metadata: dict[str, object] | None = None,
+    display_resource: str = 'memory_budget',
 ) -> Iterator[list[RuntimeLockHandle]]:
-    if not resources:
-        raise ValueError('resources must not be empty')
-    ordered_resources = list(dict.fromkeys(resources))
-    with ExitStack() as stack:
-        handles: list[RuntimeLockHandle] = []
-        for resource in ordered_resources:
-            handle = stack.enter_context(
-                acquire_runtime_lock(config, resource, options=options, metadata=metadata)
-            )
-            handles.append(handle)
+    need, resources = _memory_budget_resources(config, cost_mb)
+    total_units = len(resources)
+    with _acquire_queued(
+        config,
+        resources,
+        options=options,
+        metadata={**(metadata or {}), 'memory_mb': cost_mb},
+        pool_name=f'{display_resource} ({need}/{total_units} x {MEMORY_UNIT_MB}MB)',
+        need=need,
+    ) as handles:
         yield handles
 
 
@@ -295,6 +602,8 @@ def acquire_runtime_lock(
 
     started = time.monotonic()
     last_logged = -_WAIT_LOG_INTERVAL_SEC
+    watcher = _LockReleaseWatcher(locks_dir)
+    handle: RuntimeLockHandle | None = None
 
     try:
         while True:
@@ -324,14 +633,19 @@ def acquire_runtime_lock(
                         f'({waited:.1f}s). Holder: {format_lock_state(state)}'
                     )
                     last_logged = waited
-                time.sleep(_LOCK_POLL_INTERVAL_SEC)
+                if watcher.arm():
+                    continue
+                watcher.wait(_wait_slice(waited, last_logged, options))
 
+        watcher.close()
         _write_lock_state(file_obj, resource=resource, options=options, metadata=metadata)
         waited = time.monotonic() - started
         if options.log and waited >= 1.0:
             options.log(f'[green]Acquired {resource}[/green] after {waited:.1f}s wait')
-        yield RuntimeLockHandle(resource=resource, path=lock_path, file_obj=file_obj)
+        handle = RuntimeLockHandle(resource=resource, path=lock_path, file_obj=file_obj)
+        yield handle
     finally:
+        watcher.close()
         if locked:
             try:
                 _clear_lock_state(file_obj)
@@ -342,3 +656,5 @@ def acquire_runtime_lock(
             except Exception:
                 pass
         file_obj.close()
+        if locked and (handle is None or handle.notify_release):
+            _notify_lock_waiters(locks_dir)
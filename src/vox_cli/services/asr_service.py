@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from contextlib import ExitStack
 from pathlib import Path
+import gc
 import json
 
+from ..cache import estimate_resident_mb
 from ..config import VoxConfig
-from ..runtime import RuntimeExecutionOptions, acquire_runtime_lock
+from ..models import ModelSpec
+from ..runtime import RuntimeExecutionOptions, RuntimeLockError, acquire_memory_budget, memory_budget_contended
 from ..services.model_service import ensure_model_downloaded, resolve_model
 
 
@@ -41,6 +45,44 @@ def _build_runtime_options(config: VoxConfig, runtime_options: RuntimeExecutionO
     )
 
 
+def _transcribe_with_model(model, audio_path: Path, language: str | None) -> tuple[str, list[dict] | None]:
+    decode_options: dict[str, object] = {}
+    mapped_language = _map_language(language)
+    if mapped_language:
+        decode_options['language'] = mapped_language
+
+    result = model.generate(str(audio_path), **decode_options)
+    text = _extract_text(result)
+
+    segments = None
+    if hasattr(result, 'segments'):
+        raw_segments = getattr(result, 'segments')
+        try:
+            segments = [
+                {
+                    'start': float(seg['start']),
+                    'end': float(seg['end']),
+                    'text': str(seg['text']).strip(),
+                }
+                for seg in raw_segments
+            ]
+        except Exception:
+            segments = None
+    return text, segments
+
+
+def _release_mlx_memory() -> None:
+    # 模型对象删掉后 MLX 还会留着显存缓存，让出预算前一并清掉，免得新旧两份同时占着内存。
+    gc.collect()
+    try:
+        import mlx.core as mx
+    except Exception:
+        return
+    clear_cache = getattr(mx, 'clear_cache', None) or getattr(getattr(mx, 'metal', None), 'clear_cache', None)
+    if clear_cache is not None:
+        clear_cache()
+
+
 def transcribe_file(
     config: VoxConfig,
     audio_path: Path,
@@ -48,6 +90,41 @@ def transcribe_file(
     language: str | None,
     runtime_options: RuntimeExecutionOptions | None = None,
 ) -> dict:
+    result = transcribe_files(config, [audio_path], model_id, language, runtime_options=runtime_options)[0]
+    if result.get('error'):
+        raise RuntimeError(result['error'])
+    return result
+
+
+def _result_entry(
+    spec: ModelSpec,
+    ensure_result: dict,
+    audio_path: Path,
+    *,
+    text: str = '',
+    segments: list[dict] | None = None,
+    error: str | None = None,
+) -> dict:
+    entry = {
+        'audio': str(audio_path),
+        'text': text,
+        'segments': segments,
+        'model_id': spec.model_id,
+        'repo_id': spec.repo_id,
+        'endpoint': ensure_result['endpoint'],
+    }
+    if error is not None:
+        entry['error'] = error
+    return entry
+
+
+def transcribe_files(
+    config: VoxConfig,
+    audio_paths: list[Path],
+    model_id: str | None,
+    language: str | None,
+    runtime_options: RuntimeExecutionOptions | None = None,
+) -> list[dict]:
     spec = resolve_model(config, model_id, kind='asr')
     ensure_result = ensure_model_downloaded(
         config,
@@ -57,46 +134,54 @@ def transcribe_file(
     )
     options = _build_runtime_options(config, runtime_options)
     model_path = Path(str(ensure_result['snapshot_path']))
-
-    with acquire_runtime_lock(
-        config,
-        'asr_infer',
-        options=options,
-        metadata={'model_id': spec.model_id, 'audio': str(audio_path)},
-    ):
-        from mlx_audio.stt import load
-
-        model = load(model_path)
-        decode_options: dict[str, object] = {}
-        mapped_language = _map_language(language)
-        if mapped_language:
-            decode_options['language'] = mapped_language
-
-        result = model.generate(str(audio_path), **decode_options)
-        text = _extract_text(result)
-
-        segments = None
-        if hasattr(result, 'segments'):
-            raw_segments = getattr(result, 'segments')
-            try:
-                segments = [
-                    {
-                        'start': float(seg['start']),
-                        'end': float(seg['end']),
-                        'text': str(seg['text']).strip(),
-                    }
-                    for seg in raw_segments
-                ]
-            except Exception:
-                segments = None
-
-        return {
-            'text': text,
-            'segments': segments,
-            'model_id': spec.model_id,
-            'repo_id': spec.repo_id,
-            'endpoint': ensure_result['endpoint'],
-        }
+    from mlx_audio.stt import load
+
+    results: list[dict] = []
+    pending = list(audio_paths)
+    while pending:
+        budget = ExitStack()
+        try:
+            budget.enter_context(
+                acquire_memory_budget(
+                    config,
+                    estimate_resident_mb(spec, model_path),
+                    options=options,
+                    metadata={'model_id': spec.model_id, 'audio': str(pending[0])},
+                    display_resource='asr_infer',
+                )
+            )
+        except RuntimeLockError as error:
+            if not results:
+                raise
+            if options.log:
+                options.log(
+                    f'[yellow]Stopped asr_infer[/yellow] after yielding '
+                    f'({len(results)}/{len(audio_paths)} files done): {error}'
+                )
+            results.extend(_result_entry(spec, ensure_result, audio_path, error=str(error)) for audio_path in pending)
+            break
+        with budget:
+            model = load(model_path)
+            while pending:
+                audio_path = pending.pop(0)
+                try:
+                    text, segments = _transcribe_with_model(model, audio_path, language)
+                except Exception as error:
+                    if options.log:
+                        options.log(f'[yellow]Failed to transcribe {audio_path}[/yellow]: {error}')
+                    results.append(_result_entry(spec, ensure_result, audio_path, error=str(error)))
+                    continue
+                results.append(_result_entry(spec, ensure_result, audio_path, text=text, segments=segments))
+                if pending and options.priority == 'batch' and memory_budget_contended(config, options):
+                    if options.log:
+                        options.log(
+                            f'[yellow]Yielding asr_infer[/yellow] to higher-priority work '
+                            f'({len(results)}/{len(audio_paths)} files done)'
+                        )
+                    break
+            del model
+            _release_mlx_memory()
+    return results
 
 
 def stream_transcribe_file(
@@ -116,11 +201,12 @@ def stream_transcribe_file(
     options = _build_runtime_options(config, runtime_options)
     model_path = Path(str(ensure_result['snapshot_path']))
 
-    with acquire_runtime_lock(
+    with acquire_memory_budget(
         config,
-        'asr_infer',
+        estimate_resident_mb(spec, model_path),
         options=options,
         metadata={'model_id': spec.model_id, 'audio': str(audio_path)},
+        display_resource='asr_infer',
     ):
         from mlx_audio.stt import load
 
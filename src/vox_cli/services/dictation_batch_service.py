@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from ..config import VoxConfig, get_dictation_prompt_presets, sync_active_dictation_llm_config
+from .dictation_postprocess_service import DictationTextPostprocessor
+from .dictation_service import _metric_summary
+
+
+@dataclass
+class BatchPostprocessItem:
+    index: int
+    text: str
+    language: str | None = None
+    item_id: Any = None
+
+
+def _read_batch_items(path: Path, default_language: str | None) -> Iterator[BatchPostprocessItem]:
+    index = 0
+    with path.open('r', encoding='utf-8') as handle:
+        for line_no, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except ValueError as error:
+                raise RuntimeError(f'{path}:{line_no}: invalid JSON ({error})') from error
+            if isinstance(payload, str):
+                payload = {'text': payload}
+            if not isinstance(payload, dict) or not isinstance(payload.get('text'), str):
+                raise RuntimeError(f'{path}:{line_no}: expected a JSON string or an object with a "text" field')
+            yield BatchPostprocessItem(
+                index=index,
+                text=payload['text'],
+                language=payload.get('language') or default_language,
+                item_id=payload.get('id'),
+            )
+            index += 1
+
+
+def _batch_config(
+    config: VoxConfig,
+    *,
+    use_llm: bool,
+    llm_profile: str | None,
+    prompt_preset: str | None,
+    llm_timeout_sec: float | None,
+) -> VoxConfig:
+    effective = config.model_copy(deep=True)
+    if llm_profile:
+        if llm_profile not in effective.dictation.llm_profiles:
+            raise RuntimeError(f'Unknown dictation LLM profile: {llm_profile}')
+        effective.dictation.llm_active_profile = llm_profile
+        sync_active_dictation_llm_config(effective)
+    if prompt_preset:
+        if prompt_preset not in get_dictation_prompt_presets():
+            raise RuntimeError(f'Unknown dictation prompt preset: {prompt_preset}')
+        # 评估 preset 时去掉自定义 prompt，否则 preset 不会生效。
+        effective.dictation.llm.prompt_preset = prompt_preset
+        effective.dictation.llm.system_prompt = ''
+        effective.dictation.llm.user_prompt_template = ''
+    if llm_timeout_sec is not None:
+        effective.dictation.llm.timeout_sec = max(0.1, float(llm_timeout_sec))
+    if not use_llm:
+        effective.dictation.llm.enabled = False
+    # 熔断是为交互听写省等待的；批量评估里一段时间的失败会让后续条目整批跳过 LLM，结果不可比。
+    effective.dictation.circuit.enabled = False
+    return effective
+
+
+def run_dictation_batch_postprocess(
+    config: VoxConfig,
+    input_path: Path,
+    output_path: Path,
+    *,
+    concurrency: int = 4,
+    language: str | None = None,
+    use_llm: bool = True,
+    llm_profile: str | None = None,
+    prompt_preset: str | None = None,
+    llm_timeout_sec: float | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> dict[str, Any]:
+    effective = _batch_config(
+        config,
+        use_llm=use_llm,
+        llm_profile=llm_profile,
+        prompt_preset=prompt_preset,
+        llm_timeout_sec=llm_timeout_sec,
+    )
+    postprocessor = DictationTextPostprocessor(effective)
+    workers = max(1, int(concurrency))
+
+    def run_item(item: BatchPostprocessItem) -> tuple[dict[str, Any], int]:
+        started_at = time.perf_counter()
+        result = postprocessor.process(item.text, language=item.language)
+        elapsed_ms = int((time.perf_counter() - started_at) * 1000)
+        record: dict[str, Any] = {'index': item.index}
+        if item.item_id is not None:
+            record['id'] = item.item_id
+        record.update(
+            {
+                'raw_text': item.text,
+                'text': result.text,
+                'changed': bool(result.metadata.get('changed')),
+                'llm_used': bool(result.metadata.get('llm_used')),
+                'llm_ms': int(result.metadata.get('llm_ms', 0)),
+                'postprocess_ms': elapsed_ms,
+            }
+        )
+        if result.metadata.get('llm_error'):
+            record['llm_error'] = str(result.metadata['llm_error'])
+        if result.metadata.get('llm_skipped_reason'):
+            record['llm_skipped_reason'] = str(result.metadata['llm_skipped_reason'])
+        return record, elapsed_ms
+
+    items = 0
+    changed = 0
+    llm_used = 0
+    llm_errors = 0
+    llm_skipped = 0
+    latencies_ms: list[int] = []
+    llm_latencies_ms: list[int] = []
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vox-batch') as executor, output_path.open(
+        'w', encoding='utf-8'
+    ) as handle:
+        pending: deque[Future[tuple[dict[str, Any], int]]] = deque()
+
+        def drain(limit: int) -> None:
+            nonlocal items, changed, llm_used, llm_errors, llm_skipped
+            while len(pending) > limit:
+                record, elapsed_ms = pending.popleft().result()
+                handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+                items += 1
+                changed += int(record['changed'])
+                latencies_ms.append(elapsed_ms)
+                if record['llm_used']:
+                    llm_used += 1
+                    llm_latencies_ms.append(record['llm_ms'])
+                if 'llm_error' in record:
+                    llm_errors += 1
+                if 'llm_skipped_reason' in record:
+                    llm_skipped += 1
+                if on_progress is not None:
+                    on_progress(items)
+
+        for item in _read_batch_items(input_path, language):
+            pending.append(executor.submit(run_item, item))
+            drain(workers * 2)
+        drain(0)
+    wall_ms = int((time.perf_counter() - started_at) * 1000)
+
+    summary: dict[str, Any] = {
+        'input': str(input_path),
+        'output': str(output_path),
+        'items': items,
+        'concurrency': workers,
+        'llm_enabled': bool(effective.dictation.llm.enabled),
+        'llm_profile': effective.dictation.llm_active_profile if effective.dictation.llm.enabled else None,
+        'prompt_preset': effective.dictation.llm.prompt_preset if effective.dictation.llm.enabled else None,
+        'changed': changed,
+        'llm_used': llm_used,
+        'llm_errors': llm_errors,
+        'llm_skipped': llm_skipped,
+        'wall_ms': wall_ms,
+        'items_per_sec': round(items / (wall_ms / 1000), 2) if wall_ms > 0 else float(items),
+    }
+    if (latency := _metric_summary(latencies_ms)) is not None:
+        summary['latency_ms'] = latency
+    if (llm_latency := _metric_summary(llm_latencies_ms)) is not None:
+        summary['llm_ms'] = llm_latency
+    return summary
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import queue
 import re
 import subprocess
+import threading
 import time
-from dataclasses import asdict, dataclass
-from typing import Any
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable, Iterator
 
 from ..config import VoxConfig
 
@@ -28,17 +34,176 @@ _TERMINAL_NOISE_PREFIXES = (
     '└',
     '│',
 )
-_TERMINAL_NOISE_PATTERNS = (
-    re.compile(r'^[\s\-\u2500-\u257f]+$'),
-    re.compile(r'^\w[\w./-]*\s+·\s+.+$'),
-    re.compile(r'^(read|explored|recommending|improve documentation)\b', re.IGNORECASE),
+_TERMINAL_NOISE_RE = re.compile(
+    r'[\s\-\u2500-\u257f]+$'
+    r'|\w[\w./-]*\s+·\s+.+$'
+    r'|(?i:read|explored|recommending|improve documentation)\b'
 )
-_PAGE_NOISE_PATTERNS = (
-    re.compile(r'^\[(?:session-server|vox-dictation|dictation)\]'),
-    re.compile(r'^\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b'),
-    re.compile(r'^\{"ts":\s*"'),
-    re.compile(r'^\w+Error[:\s]'),
-    re.compile(r'^\s*warnings?\.warn\('),
+_PAGE_NOISE_RE = re.compile(
+    r'\[(?:session-server|vox-dictation|dictation)\]'
+    r'|\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b'
+    r'|\{"ts":\s*"'
+    r'|\w+Error[:\s]'
+    r'|\s*warnings?\.warn\('
+)
+_LOCAL_URL_PREFIXES = ('http://127.0.0.1:', 'https://127.0.0.1:')
+_WHITESPACE_RE = re.compile(r'\s+')
+_CJK_RE = re.compile(r'[\u3400-\u9fff]')
+_TERMINAL_CONTEXT_LINES = 8
+_PAGE_CONTEXT_HEAD_LINES = 6
+_PAGE_CONTEXT_TAIL_LINES = 8
+_PAGE_CONTEXT_CHAT_LINES = 10
+_TOKEN_UNIT_RE = re.compile(r'[A-Za-z]+|[0-9]+|\S')
+_CONTEXT_BUDGET_FIELDS = ('selected_text', 'focus_text', 'context_text')
+_CONTEXT_DEDUP_MIN_CHARS = 8
+_CONTEXT_ELISION = ' … '
+_AX_SNAPSHOT_SCRIPT = [
+    '(() => {',
+    "  const read = (getter) => { try { const value = getter(); return value == null ? '' : String(value); } catch (error) { return ''; } };",
+    "  const frontmost = Application('System Events').applicationProcesses.whose({ frontmost: true })[0];",
+    '  const element = (name) => { try { return frontmost.attributes.byName(name).value(); } catch (error) { return null; } };',
+    "  const attribute = (target, name) => (target ? read(() => target.attributes.byName(name).value()) : '');",
+    "  const focusedWindow = element('AXFocusedWindow');",
+    "  const focusedElement = element('AXFocusedUIElement');",
+    '  return JSON.stringify({',
+    '    app: read(() => frontmost.name()),',
+    "    window_title: attribute(focusedWindow, 'AXTitle'),",
+    "    document: attribute(focusedWindow, 'AXDocument'),",
+    "    role: attribute(focusedElement, 'AXRole'),",
+    "    title: attribute(focusedElement, 'AXTitle'),",
+    "    selected_text: attribute(focusedElement, 'AXSelectedText'),",
+    "    value: attribute(focusedElement, 'AXValue'),",
+    '  });',
+    '})()',
+]
+_HELPER_SCRIPT = [
+    "ObjC.import('Foundation');",
+    'function run() {',
+    '  const input = $.NSFileHandle.fileHandleWithStandardInput;',
+    '  const output = $.NSFileHandle.fileHandleWithStandardOutput;',
+    "  const reply = (payload) => output.writeData($(JSON.stringify(payload) + '\\n').dataUsingEncoding($.NSUTF8StringEncoding));",
+    '  const execute = (request) => {',
+    "    if (request.language === 'JavaScript') return eval(request.source);",
+    '    const error = Ref();',
+    '    const descriptor = $.NSAppleScript.alloc.initWithSource(request.source).executeAndReturnError(error);',
+    '    if (descriptor.isNil()) throw new Error(JSON.stringify(ObjC.deepUnwrap(error[0])));',
+    "    return descriptor.stringValue.isNil() ? '' : descriptor.stringValue.js;",
+    '  };',
+    "  let buffer = '';",
+    '  while (true) {',
+    '    const data = input.availableData;',
+    "    if (data.length === 0) return '';",
+    '    buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;',
+    '    let index;',
+    "    while ((index = buffer.indexOf('\\n')) >= 0) {",
+    '      const line = buffer.slice(0, index);',
+    '      buffer = buffer.slice(index + 1);',
+    '      if (!line.trim()) continue;',
+    '      let request = {};',
+    '      try {',
+    '        request = JSON.parse(line);',
+    "        const result = request.ping ? 'pong' : execute(request);",
+    "        reply({ id: request.id, ok: true, result: result == null ? '' : String(result) });",
+    '      } catch (error) {',
+    '        reply({ id: request.id, ok: false, error: String(error) });',
+    '      }',
+    '    }',
+    '  }',
+    '}',
+]
+_HELPER_TIMEOUT_SEC = 2.0
+_CHROMIUM_CLONE_SCRIPT = (
+    "(function(){"
+    "const active=document.activeElement;"
+    "const selection=(window.getSelection&&window.getSelection().toString())||'';"
+    "const ignoredSelector='[data-dictation-ignore=\"true\"]';"
+    "const isEditable=!!active&&(active.isContentEditable||"
+    "(active.tagName==='TEXTAREA')||"
+    "(active.tagName==='INPUT'&&/^(?:text|search|email|url|tel|number|password)?$/i.test(active.type||'text')));"
+    "const activeValue=active&&typeof active.value==='string'?active.value:"
+    "(active&&typeof active.innerText==='string'?active.innerText:'');"
+    "let nearbyNode=active;"
+    "let nearbyText='';"
+    "while(nearbyNode&&nearbyNode!==document.body){"
+    "if(nearbyNode.matches&&nearbyNode.matches(ignoredSelector)){nearbyNode=nearbyNode.parentElement;continue;}"
+    "const candidate=typeof nearbyNode.innerText==='string'?nearbyNode.innerText:'';"
+    "if(candidate.trim().length>=120){nearbyText=candidate;break;}"
+    "nearbyNode=nearbyNode.parentElement;"
+    "}"
+    "const bodyClone=document.body?document.body.cloneNode(true):null;"
+    "if(bodyClone){bodyClone.querySelectorAll(ignoredSelector).forEach((node)=>node.remove());}"
+    "const mainNode=bodyClone&&bodyClone.querySelector('main, article, [role=\"main\"], [data-dictation-main=\"true\"]');"
+    "const mainText=mainNode&&typeof mainNode.innerText==='string'?mainNode.innerText:'';"
+    "const bodyText=bodyClone&&bodyClone.innerText?bodyClone.innerText:'';"
+    "return JSON.stringify({"
+    "title:document.title||'',"
+    "selection:selection,"
+    "isEditable:isEditable,"
+    "activeTag:active&&active.tagName?active.tagName:'',"
+    "activeValue:activeValue,"
+    "nearbyText:nearbyText.slice(-4000),"
+    "mainText:mainText.slice(-4000),"
+    "bodyText:bodyText.slice(-4000)"
+    "});"
+    "})()"
+)
+_CHROMIUM_WALKER_SCRIPT = (
+    "(function(){"
+    "const limit=__LIMIT__;"
+    "const active=document.activeElement;"
+    "const selection=(window.getSelection&&window.getSelection().toString())||'';"
+    "const ignoredSelector='[data-dictation-ignore=\"true\"],script,style,noscript,template,svg,[hidden]';"
+    "const blockTags=/^(?:ADDRESS|ARTICLE|ASIDE|BLOCKQUOTE|BR|DD|DIV|DL|DT|FIGCAPTION|FIGURE|FOOTER|FORM|H[1-6]|HEADER|HR|LI|MAIN|NAV|OL|P|PRE|SECTION|TABLE|TR|UL)$/;"
+    "const styles=new WeakMap();"
+    "const styleOf=(element)=>{"
+    "let style=styles.get(element);"
+    "if(!style){const computed=getComputedStyle(element);style={display:computed.display,visibility:computed.visibility};styles.set(element,style);}"
+    "return style;"
+    "};"
+    "const acceptNode=(node)=>{"
+    "if(node.nodeType===3){const parent=node.parentElement;return parent&&styleOf(parent).visibility!=='visible'?NodeFilter.FILTER_SKIP:NodeFilter.FILTER_ACCEPT;}"
+    "if(node.matches(ignoredSelector)||styleOf(node).display==='none')return NodeFilter.FILTER_REJECT;"
+    "return NodeFilter.FILTER_ACCEPT;"
+    "};"
+    "const collect=(root)=>{"
+    "if(!root)return '';"
+    "const walker=document.createTreeWalker(root,NodeFilter.SHOW_ELEMENT|NodeFilter.SHOW_TEXT,{acceptNode:acceptNode});"
+    "while(walker.lastChild()){}"
+    "const parts=[];"
+    "let size=0;"
+    "let node=walker.currentNode;"
+    "while(node&&node!==root&&size<limit){"
+    "if(node.nodeType===3){const text=(node.nodeValue||'').replace(/\\s+/g,' ');if(text.trim()){parts.push(text);size+=text.length;}}"
+    "else if(blockTags.test(node.tagName)){parts.push('\\n');}"
+    "node=walker.previousNode();"
+    "}"
+    "return parts.reverse().join('').replace(/ *\\n\\s*/g,'\\n').trim().slice(-limit);"
+    "};"
+    "const isEditable=!!active&&(active.isContentEditable||"
+    "(active.tagName==='TEXTAREA')||"
+    "(active.tagName==='INPUT'&&/^(?:text|search|email|url|tel|number|password)?$/i.test(active.type||'text')));"
+    "const activeValue=active&&typeof active.value==='string'?active.value:collect(active);"
+    "let nearbyNode=active;"
+    "let nearbyText='';"
+    "while(nearbyNode&&nearbyNode!==document.body){"
+    "if(nearbyNode.matches&&nearbyNode.matches(ignoredSelector)){nearbyNode=nearbyNode.parentElement;continue;}"
+    "const candidate=collect(nearbyNode);"
+    "if(candidate.length>=120){nearbyText=candidate;break;}"
+    "nearbyNode=nearbyNode.parentElement;"
+    "}"
+    "const mainNode=Array.from(document.querySelectorAll('main, article, [role=\"main\"], [data-dictation-main=\"true\"]'))"
+    ".find((node)=>!node.closest('[data-dictation-ignore=\"true\"]'));"
+    "return JSON.stringify({"
+    "title:document.title||'',"
+    "selection:selection,"
+    "isEditable:isEditable,"
+    "activeTag:active&&active.tagName?active.tagName:'',"
+    "activeValue:activeValue,"
+    "nearbyText:nearbyText,"
+    "mainText:collect(mainNode),"
+    "bodyText:collect(document.body)"
+    "});"
+    "})()"
 )
 
 
@@ -64,31 +229,316 @@ class DictationContextSnapshot:
     context: DictationContext | None
     capture_ms: int
     error: str | None = None
+    helper: bool | None = None
+    cache_hit: bool | None = None
+    age_ms: int | None = None
+
+
+@dataclass
+class _AXSnapshot:
+    app_name: str
+    window_title: str | None = None
+    document_url: str | None = None
+    element_role: str | None = None
+    element_title: str | None = None
+    selected_text: str | None = None
+    element_value: str | None = None
+
+
+class OsascriptRunner:
+    helper_active = False
+
+    def run(self, lines: list[str], *, language: str | None = None) -> str:
+        command = ['osascript']
+        if language:
+            command.extend(['-l', language])
+        for line in lines:
+            command.extend(['-e', line])
+
+        result = subprocess.run(
+            command,
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            detail = result.stderr.strip() or result.stdout.strip() or f'exit code {result.returncode}'
+            raise RuntimeError(detail)
+        return result.stdout.strip()
+
+    def close(self) -> None:
+        pass
+
+
+class _HelperUnavailable(RuntimeError):
+    pass
+
+
+class PersistentOsascriptRunner(OsascriptRunner):
+    def __init__(
+        self,
+        *,
+        timeout_sec: float = _HELPER_TIMEOUT_SEC,
+        command: list[str] | None = None,
+    ) -> None:
+        if command is None:
+            command = ['osascript', '-l', 'JavaScript']
+            for line in _HELPER_SCRIPT:
+                command.extend(['-e', line])
+        self.command = list(command)
+        self.timeout_sec = max(0.05, float(timeout_sec))
+        self.starts = 0
+        self._process: subprocess.Popen[str] | None = None
+        self._replies: queue.Queue[str | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._closed = False
+
+    @property
+    def helper_active(self) -> bool:
+        process = self._process
+        return process is not None and process.poll() is None
+
+    def run(self, lines: list[str], *, language: str | None = None) -> str:
+        try:
+            return self._request({'language': language or 'AppleScript', 'source': '\n'.join(lines)})
+        except _HelperUnavailable:
+            return super().run(lines, language=language)
+
+    def healthy(self) -> bool:
+        try:
+            return self._request({'ping': True}) == 'pong'
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._stop()
+
+    def _request(self, payload: dict[str, Any]) -> str:
+        with self._lock:
+            if self._closed:
+                raise _HelperUnavailable('helper closed')
+            for _ in range(2):
+                process, replies = self._ensure_started()
+                self._next_id += 1
+                request_id = self._next_id
+                try:
+                    assert process.stdin is not None
+                    process.stdin.write(json.dumps({'id': request_id, **payload}) + '\n')
+                    process.stdin.flush()
+                except (OSError, ValueError):
+                    self._stop()
+                    continue
+                reply = self._await_reply(replies, request_id)
+                if reply is None:
+                    self._stop()
+                    continue
+                if not reply.get('ok'):
+                    raise RuntimeError(str(reply.get('error') or 'accessibility helper error'))
+                return str(reply.get('result') or '').strip()
+            raise _HelperUnavailable('accessibility helper exited')
+
+    def _ensure_started(self) -> tuple[subprocess.Popen[str], queue.Queue[str | None]]:
+        if self._process is not None and self._process.poll() is None:
+            return self._process, self._replies
+        self._stop()
+        try:
+            process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+                bufsize=1,
+            )
+        except OSError as error:
+            raise _HelperUnavailable(str(error)) from error
+        replies: queue.Queue[str | None] = queue.Queue()
+        threading.Thread(
+            target=self._pump_replies,
+            args=(process, replies),
+            name='vox-ax-helper',
+            daemon=True,
+        ).start()
+        self._process, self._replies = process, replies
+        self.starts += 1
+        return process, replies
+
+    @staticmethod
+    def _pump_replies(process: subprocess.Popen[str], replies: queue.Queue[str | None]) -> None:
+        assert process.stdout is not None
+        for line in process.stdout:
+            replies.put(line)
+        replies.put(None)
+
+    def _await_reply(self, replies: queue.Queue[str | None], request_id: int) -> dict[str, Any] | None:
+        deadline = time.monotonic() + self.timeout_sec
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                line = replies.get(timeout=remaining)
+            except queue.Empty:
+                self._stop()
+                raise RuntimeError(f'accessibility helper timed out after {int(self.timeout_sec * 1000)}ms') from None
+            if line is None:
+                return None
+            try:
+                reply = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(reply, dict) and reply.get('id') == request_id:
+                return reply
+
+    def _stop(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        with suppress(OSError, ValueError):
+            if process.stdin is not None:
+                process.stdin.close()
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+_OSASCRIPT_RUNNER: OsascriptRunner = OsascriptRunner()
+
+
+class DictationContextCache:
+    def __init__(self, *, max_entries: int = 8) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, ...], tuple[float, float, DictationContext]] = OrderedDict()
+
+    def get(self, key: tuple[str, ...]) -> DictationContext | None:
+        entry = self.get_with_age(key)
+        return entry[0] if entry is not None else None
+
+    def get_with_age(self, key: tuple[str, ...]) -> tuple[DictationContext, int] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, stored_at, context = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return context, int((now - stored_at) * 1000)
+
+    def put(self, key: tuple[str, ...], context: DictationContext, *, ttl_sec: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._entries[key] = (now + ttl_sec, now, context)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_CONTEXT_CACHE = DictationContextCache()
+
+
+@contextmanager
+def use_osascript_runner(runner: OsascriptRunner) -> Iterator[OsascriptRunner]:
+    global _OSASCRIPT_RUNNER
+    previous = _OSASCRIPT_RUNNER
+    _OSASCRIPT_RUNNER = runner
+    try:
+        yield runner
+    finally:
+        _OSASCRIPT_RUNNER = previous
+        runner.close()
+
+
+@dataclass
+class DictationContextBudget:
+    max_tokens: int
+    tokens: int
+    kept_chars: int
+    dropped_chars: int
+    deduped_chars: int
 
 
 def capture_dictation_context(config: VoxConfig, *, force: bool = False) -> DictationContext | None:
+    context, _, _ = _capture_dictation_context(config, force=force)
+    return context
+
+
+def _capture_dictation_context(
+    config: VoxConfig,
+    *,
+    force: bool = False,
+    snapshot: _AXSnapshot | None = None,
+) -> tuple[DictationContext | None, bool | None, int | None]:
+    # 返回 (context, cache_hit, 页面正文的年龄)；年龄只在命中缓存时有值。
     if not force and not config.dictation.context.enabled:
-        return None
+        return None, None, None
 
     max_chars = max(0, int(config.dictation.context.max_chars))
     if max_chars <= 0:
-        return None
+        return None, None, None
 
-    app_name = _frontmost_app_name()
-    if not app_name:
-        return None
+    if snapshot is None:
+        snapshot = _read_ax_snapshot()
+    if snapshot is None:
+        return None, None, None
 
+    app_name = snapshot.app_name
     app_key = app_name.casefold()
     if app_key == 'ghostty':
-        return _capture_ghostty_context(app_name, max_chars)
+        return _capture_ghostty_context(app_name, max_chars, snapshot=snapshot), None, None
     if app_key in _CHROMIUM_APPS:
+        ttl_sec = max(0, int(config.dictation.context.cache_ttl_ms)) / 1000
+        cache_key = (
+            app_key,
+            snapshot.window_title or '',
+            snapshot.document_url or '',
+            snapshot.element_role or '',
+            snapshot.element_title or '',
+            str(max_chars),
+        )
+        if ttl_sec > 0 and (cached := _CONTEXT_CACHE.get_with_age(cache_key)) is not None:
+            cached_context, cached_age_ms = cached
+            return _refresh_cached_context(cached_context, snapshot, max_chars), True, cached_age_ms
         try:
-            context = _capture_chromium_context(app_name, max_chars)
+            context = _capture_chromium_context(
+                app_name,
+                max_chars,
+                extractor=config.dictation.context.page_extractor,
+            )
             if context is not None:
-                return context
+                if ttl_sec > 0:
+                    _CONTEXT_CACHE.put(cache_key, context, ttl_sec=ttl_sec)
+                return context, (False if ttl_sec > 0 else None), None
         except Exception:
             pass
-    return _capture_generic_ax_context(app_name, max_chars)
+    return _capture_generic_ax_context(app_name, max_chars, snapshot=snapshot), None, None
+
+
+def _refresh_cached_context(
+    cached: DictationContext,
+    snapshot: _AXSnapshot,
+    max_chars: int,
+) -> DictationContext:
+    selected_text = _truncate_tail(snapshot.selected_text, max_chars)
+    focus_text = _truncate_tail(snapshot.element_value, max_chars)
+    if focus_text == selected_text:
+        focus_text = None
+    return replace(cached, selected_text=selected_text, focus_text=focus_text)
 
 
 def capture_dictation_context_snapshot(
@@ -97,52 +547,264 @@ def capture_dictation_context_snapshot(
     force: bool = False,
 ) -> DictationContextSnapshot:
     started_at = time.perf_counter()
+    runner = _OSASCRIPT_RUNNER
     try:
-        context = capture_dictation_context(config, force=force)
+        context, cache_hit, age_ms = _capture_dictation_context(config, force=force)
         return DictationContextSnapshot(
             context=context,
             capture_ms=int((time.perf_counter() - started_at) * 1000),
+            helper=_helper_state(runner),
+            cache_hit=cache_hit,
+            age_ms=age_ms,
         )
     except Exception as error:
         return DictationContextSnapshot(
             context=None,
             capture_ms=int((time.perf_counter() - started_at) * 1000),
             error=str(error),
+            helper=_helper_state(runner),
         )
 
 
-def _run_osascript(lines: list[str], *, language: str | None = None) -> str:
-    command = ['osascript']
-    if language:
-        command.extend(['-l', language])
-    for line in lines:
-        command.extend(['-e', line])
+def refresh_dictation_context_snapshot(
+    config: VoxConfig,
+    watched: DictationContextSnapshot,
+) -> DictationContextSnapshot:
+    started_at = time.perf_counter()
+    runner = _OSASCRIPT_RUNNER
+    try:
+        snapshot = _read_ax_snapshot()
+        if snapshot is None:
+            return DictationContextSnapshot(
+                context=None,
+                capture_ms=int((time.perf_counter() - started_at) * 1000),
+                helper=_helper_state(runner),
+            )
+        watched_context = watched.context
+        if watched_context is not None and _same_watched_page(watched_context, snapshot):
+            max_chars = max(0, int(config.dictation.context.max_chars))
+            return replace(
+                watched,
+                context=_refresh_cached_context(watched_context, snapshot, max_chars),
+                capture_ms=int((time.perf_counter() - started_at) * 1000),
+                helper=_helper_state(runner),
+            )
+        context, cache_hit, age_ms = _capture_dictation_context(config, snapshot=snapshot)
+        return DictationContextSnapshot(
+            context=context,
+            capture_ms=int((time.perf_counter() - started_at) * 1000),
+            helper=_helper_state(runner),
+            cache_hit=cache_hit,
+            age_ms=age_ms,
+        )
+    except Exception as error:
+        return DictationContextSnapshot(
+            context=None,
+            capture_ms=int((time.perf_counter() - started_at) * 1000),
+            error=str(error),
+            helper=_helper_state(runner),
+        )
 
-    result = subprocess.run(
-        command,
-        check=False,
-        capture_output=True,
-        text=True,
+
+def _same_watched_page(context: DictationContext, snapshot: _AXSnapshot) -> bool:
+    if context.source != 'chromium' or snapshot.app_name != context.app_name:
+        return False
+    if snapshot.window_title and snapshot.window_title != context.window_title:
+        return False
+    return not snapshot.document_url or snapshot.document_url == context.page_url
+
+
+class DictationContextWatcher:
+    def __init__(
+        self,
+        capture: Callable[[], DictationContextSnapshot],
+        *,
+        interval_ms: int = 500,
+        max_age_ms: int = 1500,
+        on_focus_change: Callable[[DictationContextSnapshot], None] | None = None,
+    ) -> None:
+        self.capture = capture
+        self.interval_sec = max(0.01, int(interval_ms) / 1000)
+        self.max_age_sec = max(0, int(max_age_ms)) / 1000
+        self.on_focus_change = on_focus_change
+        self.polls = 0
+        self._snapshot: DictationContextSnapshot | None = None
+        self._captured_at = 0.0
+        self._focus_key: tuple[str | None, ...] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    def latest(self) -> DictationContextSnapshot | None:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.error or snapshot.context is None:
+            return None
+        age_sec = time.monotonic() - self._captured_at
+        if age_sec > self.max_age_sec:
+            return None
+        return replace(snapshot, age_ms=int(age_sec * 1000) + (snapshot.age_ms or 0))
+
+    async def _run(self) -> None:
+        while True:
+            started_at = time.monotonic()
+            snapshot = await asyncio.to_thread(self.capture)
+            self.polls += 1
+            # 以开始采集的时间算新鲜度，采集期间发生的变化不会被当成“新的”。
+            self._snapshot, self._captured_at = snapshot, started_at
+            context = snapshot.context
+            focus_key = (context.app_name, context.window_title, context.page_url) if context else None
+            if focus_key != self._focus_key:
+                self._focus_key = focus_key
+                if self.on_focus_change is not None and context is not None:
+                    self.on_focus_change(snapshot)
+            await asyncio.sleep(max(0.0, self.interval_sec - (time.monotonic() - started_at)))
+
+
+def _helper_state(runner: OsascriptRunner) -> bool | None:
+    if not isinstance(runner, PersistentOsascriptRunner):
+        return None
+    return runner.helper_active
+
+
+def estimate_context_tokens(text: str | None) -> int:
+    if not text:
+        return 0
+    return sum(_token_unit_cost(match.group()) for match in _TOKEN_UNIT_RE.finditer(text))
+
+
+def fit_dictation_context(
+    context: DictationContext,
+    max_tokens: int,
+) -> tuple[DictationContext, DictationContextBudget]:
+    originals = {name: _clean_optional_text(getattr(context, name)) for name in _CONTEXT_BUDGET_FIELDS}
+    original_chars = sum(len(text) for text in originals.values() if text)
+    deduped: dict[str, tuple[str, int]] = {}
+    deduped_chars = 0
+    covered: list[str] = []
+    for name in _CONTEXT_BUDGET_FIELDS:
+        text = originals[name]
+        if not text:
+            continue
+        anchor = len(text)
+        for higher in sorted(covered, key=len, reverse=True):
+            if text in higher:
+                text = None
+                break
+            if len(higher) >= _CONTEXT_DEDUP_MIN_CHARS and higher in text:
+                text, anchor = _elide_overlap(text, higher)
+                break
+        deduped_chars += max(0, len(originals[name]) - len(text or ''))
+        if text:
+            deduped[name] = (text, anchor)
+            covered.append(originals[name])
+
+    budget = max(0, int(max_tokens))
+    remaining = budget
+    fitted: dict[str, str | None] = {}
+    tokens = 0
+    for name in _CONTEXT_BUDGET_FIELDS:
+        if name not in deduped:
+            fitted[name] = None
+            continue
+        text, anchor = deduped[name]
+        text, cost = _fit_token_window(text, remaining if budget > 0 else None, anchor)
+        fitted[name] = text or None
+        tokens += cost
+        remaining -= cost
+
+    kept_chars = sum(len(text) for text in fitted.values() if text)
+    return replace(context, **fitted), DictationContextBudget(
+        max_tokens=budget,
+        tokens=tokens,
+        kept_chars=kept_chars,
+        dropped_chars=max(0, original_chars - kept_chars),
+        deduped_chars=deduped_chars,
     )
-    if result.returncode != 0:
-        detail = result.stderr.strip() or result.stdout.strip() or f'exit code {result.returncode}'
-        raise RuntimeError(detail)
-    return result.stdout.strip()
 
 
-def _frontmost_app_name() -> str | None:
-    output = _run_osascript(
-        [
-            'tell application "System Events"',
-            'return name of first application process whose frontmost is true',
-            'end tell',
-        ]
+def _token_unit_cost(unit: str) -> int:
+    if unit[0].isascii() and unit[0].isalpha():
+        return (len(unit) + 3) // 4
+    if unit[0].isdigit():
+        return (len(unit) + 2) // 3
+    return 1
+
+
+def _elide_overlap(text: str, covered: str) -> tuple[str | None, int]:
+    before, _, after = text.rpartition(covered)
+    before, after = before.rstrip(), after.lstrip()
+    if before and after:
+        return f'{before}{_CONTEXT_ELISION}{after}', len(before) + 1
+    if before:
+        return before, len(before)
+    return after or None, 0
+
+
+def _fit_token_window(text: str, budget: int | None, anchor: int) -> tuple[str, int]:
+    units = [(match.start(), match.end(), _token_unit_cost(match.group())) for match in _TOKEN_UNIT_RE.finditer(text)]
+    total = sum(cost for _, _, cost in units)
+    if budget is None or total <= budget:
+        return text, total
+    lo = hi = bisect_left([start for start, _, _ in units], anchor)
+    used = 0
+    while True:
+        grew = False
+        if lo > 0 and used + units[lo - 1][2] <= budget:
+            lo -= 1
+            used += units[lo][2]
+            grew = True
+        if hi < len(units) and used + units[hi][2] <= budget:
+            used += units[hi][2]
+            hi += 1
+            grew = True
+        if not grew:
+            break
+    if lo == hi:
+        return '', 0
+    return text[units[lo][0] : units[hi - 1][1]], used
+
+
+def _run_osascript(lines: list[str], *, language: str | None = None) -> str:
+    return _OSASCRIPT_RUNNER.run(lines, language=language)
+
+
+def _read_ax_snapshot() -> _AXSnapshot | None:
+    output = _run_osascript(_AX_SNAPSHOT_SCRIPT, language='JavaScript')
+    try:
+        payload = json.loads(output or '{}')
+    except json.JSONDecodeError as error:
+        raise RuntimeError(f'invalid accessibility snapshot: {output[:200]}') from error
+    app_name = _clean_optional_text(str(payload.get('app') or ''))
+    if not app_name:
+        return None
+    return _AXSnapshot(
+        app_name=app_name,
+        window_title=_clean_optional_text(str(payload.get('window_title') or '')),
+        document_url=_clean_optional_text(str(payload.get('document') or '')),
+        element_role=_clean_optional_text(str(payload.get('role') or '')),
+        element_title=_clean_optional_text(str(payload.get('title') or '')),
+        selected_text=_clean_optional_text(str(payload.get('selected_text') or '')),
+        element_value=_clean_optional_text(str(payload.get('value') or '')),
     )
-    return _clean_optional_text(output)
 
 
-def _capture_ghostty_context(app_name: str, max_chars: int) -> DictationContext | None:
-    context = _capture_generic_ax_context(app_name, max_chars, source='ghostty')
+def _capture_ghostty_context(
+    app_name: str,
+    max_chars: int,
+    *,
+    snapshot: _AXSnapshot | None = None,
+) -> DictationContext | None:
+    context = _capture_generic_ax_context(app_name, max_chars, source='ghostty', snapshot=snapshot)
     if context is None:
         return None
     context.context_text = _sanitize_terminal_context(context.context_text, max_chars)
@@ -158,13 +820,17 @@ def _capture_generic_ax_context(
     max_chars: int,
     *,
     source: str = 'ax',
+    snapshot: _AXSnapshot | None = None,
 ) -> DictationContext | None:
-    window_title = _read_window_title(app_name)
-    element_role = _clean_optional_text(_read_focused_attribute(app_name, 'AXRole'))
-    element_title = _clean_optional_text(_read_focused_attribute(app_name, 'AXTitle'))
-    selected_text = _clean_optional_text(_read_focused_attribute(app_name, 'AXSelectedText'))
-    element_value = _clean_optional_text(_read_focused_attribute(app_name, 'AXValue'))
-    focus_text = _truncate_tail(element_value, max_chars)
+    if snapshot is None:
+        snapshot = _read_ax_snapshot()
+        if snapshot is None:
+            return None
+    window_title = snapshot.window_title
+    element_role = snapshot.element_role
+    element_title = snapshot.element_title
+    selected_text = snapshot.selected_text
+    focus_text = _truncate_tail(snapshot.element_value, max_chars)
     context_text = focus_text
 
     context = DictationContext(
@@ -186,62 +852,30 @@ def _capture_generic_ax_context(
     return context if context.to_dict() else None
 
 
-def _capture_chromium_context(app_name: str, max_chars: int) -> DictationContext | None:
-    tab_output = _run_osascript(
+def _capture_chromium_context(
+    app_name: str,
+    max_chars: int,
+    *,
+    extractor: str = 'walker',
+) -> DictationContext | None:
+    if extractor == 'clone':
+        js = _CHROMIUM_CLONE_SCRIPT
+    else:
+        js = _CHROMIUM_WALKER_SCRIPT.replace('__LIMIT__', str(min(4000, max(400, max_chars * 2))))
+    # 标签页标题、URL 和页面 JSON 一次读完；JSON.stringify 的结果不含换行，固定在最后一行。
+    output = _run_osascript(
         [
             f'tell application "{_escape_applescript_string(app_name)}"',
             'set t to active tab of front window',
-            'return (title of t) & linefeed & (URL of t)',
+            'set pageJson to execute t javascript "' + _escape_applescript_string(js) + '"',
+            'return (title of t) & linefeed & (URL of t) & linefeed & pageJson',
             'end tell',
         ]
     )
-    tab_lines = tab_output.splitlines()
+    tab_lines, _, dom_output = output.rpartition('\n')
+    tab_lines = tab_lines.splitlines()
     window_title = _clean_optional_text(tab_lines[0] if tab_lines else '')
     page_url = _clean_optional_text('\n'.join(tab_lines[1:]) if len(tab_lines) > 1 else '')
-
-    js = (
-        "(function(){"
-        "const active=document.activeElement;"
-        "const selection=(window.getSelection&&window.getSelection().toString())||'';"
-        "const ignoredSelector='[data-dictation-ignore=\"true\"]';"
-        "const isEditable=!!active&&(active.isContentEditable||"
-        "(active.tagName==='TEXTAREA')||"
-        "(active.tagName==='INPUT'&&/^(?:text|search|email|url|tel|number|password)?$/i.test(active.type||'text')));"
-        "const activeValue=active&&typeof active.value==='string'?active.value:"
-        "(active&&typeof active.innerText==='string'?active.innerText:'');"
-        "let nearbyNode=active;"
-        "let nearbyText='';"
-        "while(nearbyNode&&nearbyNode!==document.body){"
-        "if(nearbyNode.matches&&nearbyNode.matches(ignoredSelector)){nearbyNode=nearbyNode.parentElement;continue;}"
-        "const candidate=typeof nearbyNode.innerText==='string'?nearbyNode.innerText:'';"
-        "if(candidate.trim().length>=120){nearbyText=candidate;break;}"
-        "nearbyNode=nearbyNode.parentElement;"
-        "}"
-        "const bodyClone=document.body?document.body.cloneNode(true):null;"
-        "if(bodyClone){bodyClone.querySelectorAll(ignoredSelector).forEach((node)=>node.remove());}"
-        "const mainNode=bodyClone&&bodyClone.querySelector('main, article, [role=\"main\"], [data-dictation-main=\"true\"]');"
-        "const mainText=mainNode&&typeof mainNode.innerText==='string'?mainNode.innerText:'';"
-        "const bodyText=bodyClone&&bodyClone.innerText?bodyClone.innerText:'';"
-        "return JSON.stringify({"
-        "title:document.title||'',"
-        "selection:selection,"
-        "isEditable:isEditable,"
-        "activeTag:active&&active.tagName?active.tagName:'',"
-        "activeValue:activeValue,"
-        "nearbyText:nearbyText.slice(-4000),"
-        "mainText:mainText.slice(-4000),"
-        "bodyText:bodyText.slice(-4000)"
-        "});"
-        "})()"
-    )
-    dom_output = _run_osascript(
-        [
-            f'tell application "{_escape_applescript_string(app_name)}"',
-            'set t to active tab of front window',
-            f'return execute t javascript "{_escape_applescript_string(js)}"',
-            'end tell',
-        ]
-    )
     payload = json.loads(dom_output or '{}')
     selected_text = _clean_optional_text(str(payload.get('selection') or ''))
     is_editable = bool(payload.get('isEditable'))
@@ -285,42 +919,6 @@ def _capture_chromium_context(app_name: str, max_chars: int) -> DictationContext
     return context if context.to_dict() else None
 
 
-def _read_window_title(app_name: str) -> str | None:
-    return _clean_optional_text(
-        _run_osascript(
-            [
-                'tell application "System Events"',
-                f'tell application process "{_escape_applescript_string(app_name)}"',
-                'try',
-                'set focusedWindow to value of attribute "AXFocusedWindow"',
-                'return value of attribute "AXTitle" of focusedWindow',
-                'on error',
-                'return ""',
-                'end try',
-                'end tell',
-                'end tell',
-            ]
-        )
-    )
-
-
-def _read_focused_attribute(app_name: str, attribute: str) -> str:
-    return _run_osascript(
-        [
-            'tell application "System Events"',
-            f'tell application process "{_escape_applescript_string(app_name)}"',
-            'try',
-            'set focusedElement to value of attribute "AXFocusedUIElement"',
-            f'return value of attribute "{_escape_applescript_string(attribute)}" of focusedElement',
-            'on error',
-            'return ""',
-            'end try',
-            'end tell',
-            'end tell',
-        ]
-    )
-
-
 def _clean_optional_text(value: str | None) -> str | None:
     if value is None:
         return None
@@ -410,33 +1008,21 @@ def _detect_browser_surface(
 
 
 def _sanitize_terminal_context(value: str | None, max_chars: int) -> str | None:
-    cleaned = _clean_optional_text(value)
-    if cleaned is None:
-        return None
-
-    lines = [_normalize_terminal_line(line) for line in cleaned.split('\n')]
-    useful_lines = [line for line in lines if line and not _looks_like_terminal_noise(line)]
-    if not useful_lines:
+    if not value or _is_missing_value(value):
         return None
 
-    candidate_lines = useful_lines
-
-    deduped_lines: list[str] = []
-    for line in candidate_lines:
-        if deduped_lines and deduped_lines[-1] == line:
-            continue
-        deduped_lines.append(line)
-
     selected: list[str] = []
     budget = max_chars
-    for line in reversed(deduped_lines[-8:]):
+    for line in _unique_lines(_iter_lines_reversed(value), _normalize_terminal_line, _looks_like_terminal_noise):
         line_cost = len(line) + (1 if selected else 0)
         if selected and line_cost > budget and len(selected) >= 2:
             break
         selected.append(line)
         budget -= line_cost
-        if budget <= 0:
+        if budget <= 0 or len(selected) >= _TERMINAL_CONTEXT_LINES:
             break
+    if not selected:
+        return None
 
     result = '\n'.join(reversed(selected)).strip()
     return _truncate_tail(result, max_chars)
@@ -469,30 +1055,32 @@ def _select_browser_context_text(
 
 
 def _sanitize_page_context(value: str | None, max_chars: int, *, prefer_tail: bool = False) -> str | None:
-    cleaned = _clean_optional_text(value)
-    if cleaned is None:
-        return None
-
-    lines = [re.sub(r'\s+', ' ', line).strip() for line in cleaned.split('\n')]
-    useful_lines = [line for line in lines if line and len(line) >= 2 and not _looks_like_page_noise(line)]
-    if not useful_lines:
+    if not value or _is_missing_value(value):
         return None
 
-    deduped_lines: list[str] = []
-    for line in useful_lines:
-        if deduped_lines and deduped_lines[-1] == line:
-            continue
-        deduped_lines.append(line)
-
     if prefer_tail:
-        candidate_lines = deduped_lines[-10:]
+        tail_lines = _take(
+            _unique_lines(_iter_lines_reversed(value), _normalize_page_line, _looks_like_page_noise),
+            _PAGE_CONTEXT_CHAT_LINES,
+        )
+        candidate_lines = tail_lines[::-1]
     else:
-        head_lines = deduped_lines[:6]
-        tail_lines = deduped_lines[-8:] if len(deduped_lines) > 6 else []
+        head_lines = _take(
+            _unique_lines(_iter_lines(value), _normalize_page_line, _looks_like_page_noise),
+            _PAGE_CONTEXT_HEAD_LINES + 1,
+        )
+        tail_lines: list[str] = []
+        if len(head_lines) > _PAGE_CONTEXT_HEAD_LINES:
+            tail_lines = _take(
+                _unique_lines(_iter_lines_reversed(value), _normalize_page_line, _looks_like_page_noise),
+                _PAGE_CONTEXT_TAIL_LINES,
+            )
         candidate_lines = []
-        for line in [*head_lines, *tail_lines]:
+        for line in [*head_lines[:_PAGE_CONTEXT_HEAD_LINES], *reversed(tail_lines)]:
             if line not in candidate_lines:
                 candidate_lines.append(line)
+    if not candidate_lines:
+        return None
 
     selected: list[str] = []
     budget = max_chars
@@ -509,35 +1097,83 @@ def _sanitize_page_context(value: str | None, max_chars: int, *, prefer_tail: bo
     return _truncate_tail(result, max_chars)
 
 
+def _is_missing_value(value: str) -> bool:
+    return len(value) < 32 and value.strip() == 'missing value'
+
+
+def _iter_lines(value: str) -> Iterator[str]:
+    start = 0
+    while start <= len(value):
+        end = value.find('\n', start)
+        if end < 0:
+            end = len(value)
+        yield from value[start:end].split('\r')
+        start = end + 1
+
+
+def _iter_lines_reversed(value: str) -> Iterator[str]:
+    end = len(value)
+    while end >= 0:
+        start = value.rfind('\n', 0, end) + 1
+        yield from reversed(value[start:end].split('\r'))
+        end = start - 1
+
+
+def _unique_lines(
+    lines: Iterator[str],
+    normalize: Callable[[str], str],
+    is_noise: Callable[[str], bool],
+) -> Iterator[str]:
+    previous: str | None = None
+    for raw_line in lines:
+        line = normalize(raw_line)
+        if not line or is_noise(line) or line == previous:
+            continue
+        previous = line
+        yield line
+
+
+def _take(lines: Iterator[str], count: int) -> list[str]:
+    taken: list[str] = []
+    for line in lines:
+        taken.append(line)
+        if len(taken) >= count:
+            break
+    return taken
+
+
+def _normalize_page_line(line: str) -> str:
+    return _WHITESPACE_RE.sub(' ', line).strip()
+
+
 def _looks_like_page_noise(line: str) -> bool:
-    line_key = line.casefold()
-    if any(pattern.match(line) for pattern in _PAGE_NOISE_PATTERNS):
+    if len(line) < 2:
+        return True
+    if _PAGE_NOISE_RE.match(line):
         return True
-    if line_key.startswith('http://127.0.0.1:') or line_key.startswith('https://127.0.0.1:'):
+    if line[:24].casefold().startswith(_LOCAL_URL_PREFIXES):
         return True
-    if line.count('|') >= 4 and len(line) > 40:
+    if len(line) > 40 and line.count('|') >= 4:
         return True
     return False
 
 
 def _normalize_terminal_line(line: str) -> str:
-    collapsed = re.sub(r'\s+', ' ', line).strip()
-    return collapsed
+    return _WHITESPACE_RE.sub(' ', line).strip()
 
 
 def _looks_like_terminal_noise(line: str) -> bool:
-    line_key = line.casefold()
-    if any(line_key.startswith(prefix) for prefix in _TERMINAL_NOISE_PREFIXES):
+    if line[:16].casefold().startswith(_TERMINAL_NOISE_PREFIXES):
         return True
-    if any(pattern.match(line) for pattern in _TERMINAL_NOISE_PATTERNS):
+    if _TERMINAL_NOISE_RE.match(line):
         return True
-    if '/' in line and not _contains_cjk(line) and len(line) > 32:
+    if len(line) > 32 and '/' in line and not _contains_cjk(line):
         return True
     return False
 
 
 def _contains_cjk(value: str) -> bool:
-    return any('\u3400' <= char <= '\u9fff' for char in value)
+    return _CJK_RE.search(value) is not None
 
 
 def _escape_applescript_string(value: str) -> str:
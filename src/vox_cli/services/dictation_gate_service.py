@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+
+from ..config import DictationGateConfig, DictationHotwordsConfig
+
+GATE_SKIP_EMPTY = 'no_content'
+GATE_SKIP_REPEAT = 'matches_last_output'
+GATE_SKIP_NUMERIC = 'numeric'
+GATE_SKIP_SHORT = 'short'
+
+_UNIT_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?|\d+|[^\W\d_A-Za-z]", re.UNICODE)
+_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_CJK_RE = re.compile(r'[㐀-鿿豈-﫿]')
+
+
+def _significant(text: str) -> str:
+    return ''.join(ch for ch in text.lower() if unicodedata.category(ch)[0] not in 'PZSC')
+
+
+def _char_ngrams(value: str, size: int) -> frozenset[str]:
+    return frozenset(value[index : index + size] for index in range(len(value) - size + 1))
+
+
+class DictationLLMGate:
+    def __init__(self, config: DictationGateConfig, hotwords: DictationHotwordsConfig) -> None:
+        self.max_units = max(0, int(config.max_units))
+        self.skip_numeric = config.skip_numeric
+        self.reuse_last_output = config.reuse_last_output
+        fillers = [item.strip().lower() for item in config.filler_words if item.strip()]
+        self._word_fillers = frozenset(item for item in fillers if _WORD_RE.fullmatch(item))
+        self._phrase_fillers = tuple(item for item in fillers if item not in self._word_fillers)
+        self._hotwords: list[tuple[str, frozenset[str]]] = []
+        if hotwords.enabled:
+            for entry in hotwords.entries:
+                value = _significant(entry.value)
+                size = 2 if _CJK_RE.search(value) else 3
+                if len(value) > size:
+                    self._hotwords.append((value, _char_ngrams(value, size)))
+        self._lock = threading.Lock()
+        self._last_output: tuple[object, str, str] | None = None
+
+    def remember(self, output: str, *, scope: object | None) -> None:
+        if not self.reuse_last_output or scope is None:
+            return
+        key = _significant(output)
+        if key:
+            with self._lock:
+                self._last_output = (scope, output, key)
+
+    def evaluate(self, text: str, *, scope: object | None = None) -> tuple[str | None, str | None]:
+        key = _significant(text)
+        if not key:
+            return GATE_SKIP_EMPTY, None
+        with self._lock:
+            last = self._last_output
+        if scope is not None and last is not None and last[0] == scope and last[2] == key:
+            return GATE_SKIP_REPEAT, last[1]
+        if self._has_filler(text) or self._has_hotword_near_miss(key):
+            return None, None
+        if self.skip_numeric and key.isdigit():
+            return GATE_SKIP_NUMERIC, None
+        if len(_UNIT_RE.findall(text)) <= self.max_units:
+            return GATE_SKIP_SHORT, None
+        return None, None
+
+    def _has_filler(self, text: str) -> bool:
+        lowered = text.lower()
+        if any(item in lowered for item in self._phrase_fillers):
+            return True
+        return bool(self._word_fillers) and any(word in self._word_fillers for word in _WORD_RE.findall(lowered))
+
+    def _has_hotword_near_miss(self, key: str) -> bool:
+        # 只出现热词的一部分（例如把 “Kubernetes” 识别成 “Cubernetes”）时多半是误识别，交给 LLM 处理。
+        for value, grams in self._hotwords:
+            if value in key:
+                continue
+            size = len(next(iter(grams)))
+            if any(key[index : index + size] in grams for index in range(len(key) - size + 1)):
+                return True
+        return False
@@ -3,11 +3,15 @@ from __future__ import annotations
 import difflib
 import json
 import os
+import queue
 import re
+import string
+import threading
 import time
 import urllib.error
 import urllib.request
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from typing import Any, Callable
 from urllib.parse import urlparse
 
@@ -15,11 +19,18 @@ from ..config import (
     DictationHintsConfig,
     DictationHotwordsConfig,
     DictationLLMConfig,
+    DictationPromptConfig,
     DictationTransformConfig,
     VoxConfig,
+    get_cache_dir,
+    resolve_dictation_hedge_profile,
     resolve_dictation_llm_prompts,
 )
-from .dictation_context_service import DictationContext
+from .dictation_context_service import DictationContext, fit_dictation_context
+from .llm_cache_service import LLMResultCache, fingerprint
+from .dictation_gate_service import DictationLLMGate
+from .llm_circuit_service import LLMCircuitBreaker
+from .llm_http_service import LLMCallCancelledError, LLMCancelToken, LLMConnectionPool
 
 
 @dataclass
@@ -31,6 +42,13 @@ class DictationPostprocessResult:
 PostprocessEventEmitter = Callable[[str, dict[str, Any]], None]
 
 
+@dataclass
+class PreviewMemo:
+    raw_text: str = ''
+    stage_tail: str = ''
+    text: str = ''
+
+
 @dataclass
 class HotwordReplacement:
     alias: str
@@ -45,52 +63,36 @@ class LLMCallResult:
     stream_used: bool
     stream_chunks: int
     first_token_ms: int | None
-
-
-def _is_cjk(char: str) -> bool:
-    code = ord(char)
-    return (
-        0x2E80 <= code <= 0x2EFF
-        or 0x2F00 <= code <= 0x2FDF
-        or 0x3040 <= code <= 0x309F
-        or 0x30A0 <= code <= 0x30FF
-        or 0x3100 <= code <= 0x312F
-        or 0x3200 <= code <= 0x32FF
-        or 0x3400 <= code <= 0x4DBF
-        or 0x4E00 <= code <= 0x9FFF
-        or 0xF900 <= code <= 0xFAFF
-    )
-
-
-def _classify(char: str) -> str:
-    if 'A' <= char <= 'Z' or 'a' <= char <= 'z':
-        return 'latin'
-    if '0' <= char <= '9':
-        return 'digit'
-    if char in '([<':
-        return 'open'
-    if char in ')]>':
-        return 'close'
-    if char in ',.!?:;':
-        return 'delimiter'
-    if char == ' ':
-        return 'space'
-    if _is_cjk(char):
-        return 'cjk'
-    return 'other'
-
-
-def _is_cjk_boundary(left: str, right: str) -> bool:
-    return (left, right) in {
+    connect_ms: int | None = None
+    ttfb_ms: int | None = None
+    connection_reused: bool | None = None
+    profile: str | None = None
+    hedged: bool | None = None
+    elapsed_ms: int | None = None
+
+
+_CJK_RANGES = (
+    (0x2E80, 0x2EFF),
+    (0x2F00, 0x2FDF),
+    (0x3040, 0x309F),
+    (0x30A0, 0x30FF),
+    (0x3100, 0x312F),
+    (0x3200, 0x32FF),
+    (0x3400, 0x4DBF),
+    (0x4E00, 0x9FFF),
+    (0xF900, 0xFAFF),
+)
+_CHAR_CLASSES = ('other', 'latin', 'digit', 'open', 'close', 'delimiter', 'space', 'cjk')
+_CJK_BOUNDARY_PAIRS = frozenset(
+    {
         ('cjk', 'latin'),
         ('latin', 'cjk'),
         ('cjk', 'digit'),
         ('digit', 'cjk'),
     }
-
-
-def _is_punct_space(left: str, right: str) -> bool:
-    return (left, right) in {
+)
+_PUNCT_SPACE_PAIRS = frozenset(
+    {
         ('delimiter', 'cjk'),
         ('delimiter', 'latin'),
         ('delimiter', 'digit'),
@@ -104,60 +106,96 @@ def _is_punct_space(left: str, right: str) -> bool:
         ('digit', 'open'),
         ('other', 'open'),
     }
+)
+_FULLWIDTH_MAP = {
+    **{chr(code): chr(code - 0xFEE0) for code in range(0xFF01, 0xFF5F)},
+    '\u3000': ' ',
+    '。': '.',
+    '、': ',',
+    '【': '[',
+    '】': ']',
+    '「': '"',
+    '」': '"',
+    '\u201C': '"',
+    '\u201D': '"',
+    '《': '<',
+    '》': '>',
+    '\u2018': "'",
+    '\u2019': "'",
+}
+_FULLWIDTH_RE = re.compile(f'[\uff01-\uff5e{"".join(re.escape(char) for char in _FULLWIDTH_MAP if not 0xFF01 <= ord(char) <= 0xFF5E)}]')
+
+
+def _build_bmp_class_table() -> bytes:
+    table = bytearray(0x10000)
+    for start, stop in _CJK_RANGES:
+        table[start : stop + 1] = bytes([_CHAR_CLASSES.index('cjk')]) * (stop - start + 1)
+    for kind, chars in (
+        ('latin', string.ascii_letters),
+        ('digit', string.digits),
+        ('open', '([<'),
+        ('close', ')]>'),
+        ('delimiter', ',.!?:;'),
+        ('space', ' '),
+    ):
+        for char in chars:
+            table[ord(char)] = _CHAR_CLASSES.index(kind)
+    return bytes(table)
+
+
+_BMP_CLASS_TABLE = _build_bmp_class_table()
+
+
+@lru_cache(maxsize=len(_CHAR_CLASSES))
+def _class_ranges(kind: str) -> str:
+    parts: list[str] = []
+    for run in re.finditer(re.escape(bytes([_CHAR_CLASSES.index(kind)])) + b'+', _BMP_CLASS_TABLE):
+        first, last = chr(run.start()), chr(run.end() - 1)
+        parts.append(re.escape(first) if first == last else f'{re.escape(first)}-{re.escape(last)}')
+    if kind == 'other':
+        parts.append('\U00010000-\U0010ffff')
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=4)
+def _space_boundary_re(punct: bool, cjk: bool) -> re.Pattern[str] | None:
+    pairs = (_PUNCT_SPACE_PAIRS if punct else frozenset()) | (_CJK_BOUNDARY_PAIRS if cjk else frozenset())
+    alternatives: list[str] = []
+    for left in _CHAR_CLASSES:
+        rights = [right for right in _CHAR_CLASSES if (left, right) in pairs]
+        if not rights:
+            continue
+        if left == 'delimiter' and 'digit' in rights:
+            rights.remove('digit')
+            alternatives.append(f'(?<![0-9]\\.)(?<=[{_class_ranges(left)}])(?=[0-9])')
+        if rights:
+            right_ranges = ''.join(_class_ranges(right) for right in rights)
+            alternatives.append(f'(?<=[{_class_ranges(left)}])(?=[{right_ranges}])')
+    return re.compile('|'.join(alternatives)) if alternatives else None
 
 
 def fullwidth_to_halfwidth(text: str) -> str:
-    output: list[str] = []
-    for char in text:
-        code = ord(char)
-        if 0xFF01 <= code <= 0xFF5E:
-            output.append(chr(code - 0xFEE0))
-        elif char == '\u3000':
-            output.append(' ')
-        elif char == '。':
-            output.append('.')
-        elif char == '、':
-            output.append(',')
-        elif char == '【':
-            output.append('[')
-        elif char == '】':
-            output.append(']')
-        elif char in {'「', '」', '\u201C', '\u201D'}:
-            output.append('"')
-        elif char in {'《', '》'}:
-            output.append('<' if char == '《' else '>')
-        elif char in {'\u2018', '\u2019'}:
-            output.append("'")
-        else:
-            output.append(char)
-    return ''.join(output)
+    return _FULLWIDTH_RE.sub(lambda match: _FULLWIDTH_MAP[match[0]], text)
 
 
 def auto_insert_spaces(text: str, punct: bool, cjk: bool) -> str:
-    chars = list(text)
-    output: list[str] = []
-
-    for index, char in enumerate(chars):
-        kind = _classify(char)
-        if index > 0:
-            prev = chars[index - 1]
-            prev_kind = _classify(prev)
-            if prev_kind != 'space' and kind != 'space':
-                want_cjk = cjk and _is_cjk_boundary(prev_kind, kind)
-                want_punct = punct and _is_punct_space(prev_kind, kind)
-                if want_cjk or want_punct:
-                    is_decimal_dot = (
-                        prev == '.'
-                        and prev_kind == 'delimiter'
-                        and kind == 'digit'
-                        and index >= 2
-                        and _classify(chars[index - 2]) == 'digit'
-                    )
-                    if not is_decimal_dot:
-                        output.append(' ')
-        output.append(char)
+    pattern = _space_boundary_re(punct, cjk)
+    return pattern.sub(' ', text) if pattern is not None else text
+
 
-    return ''.join(output)
+def _auto_insert_spaces_after(context: str, text: str, punct: bool, cjk: bool) -> str:
+    pattern = _space_boundary_re(punct, cjk)
+    if pattern is None or not text:
+        return text
+    joined = f'{context}{text}'
+    parts: list[str] = []
+    last = len(context)
+    for match in pattern.finditer(joined, len(context)):
+        parts.append(joined[last : match.start()])
+        parts.append(' ')
+        last = match.start()
+    parts.append(joined[last:])
+    return ''.join(parts)
 
 
 def strip_trailing_punctuation(text: str) -> str:
@@ -270,9 +308,13 @@ def _extract_chat_message_content(payload: dict[str, Any]) -> str:
 
 _DIFF_TOKEN_RE = re.compile(r'[A-Za-z0-9_]+|\s+|.', re.UNICODE)
 _LLM_STREAM_LOG_INTERVAL_MS = 250
+_LLM_PROGRESS_INTERVAL_MS = 50
 _LLM_STREAM_PREVIEW_CHARS = 160
 _LOCAL_LLM_HOSTS = {'127.0.0.1', '0.0.0.0', 'localhost', '::1'}
 _THINK_BLOCK_RE = re.compile(r'<think>[\s\S]*?</think>\s*', re.IGNORECASE)
+_OPEN_THINK_BLOCK_RE = re.compile(r'<think>[\s\S]*$', re.IGNORECASE)
+_LLM_CONNECTION_POOL = LLMConnectionPool()
+_STABLE_PROMPT_FIELDS = frozenset({'hints_block', 'hotwords_block'})
 
 
 def build_text_diff(before: str, after: str) -> str:
@@ -358,6 +400,14 @@ def _response_content_type(response: Any) -> str:
     return ''
 
 
+def _response_connection_timings(response: Any) -> dict[str, Any]:
+    return {
+        'connect_ms': getattr(response, 'connect_ms', None),
+        'ttfb_ms': getattr(response, 'ttfb_ms', None),
+        'connection_reused': getattr(response, 'reused', None),
+    }
+
+
 def _preview_stream_text(text: str, *, max_chars: int = _LLM_STREAM_PREVIEW_CHARS) -> str:
     stripped = text.strip()
     if len(stripped) <= max_chars:
@@ -394,6 +444,39 @@ def _normalize_llm_output(text: str) -> str:
     return _strip_prompt_echo_wrappers(_strip_think_blocks(text))
 
 
+def _visible_stream_text(text: str) -> str:
+    visible = _OPEN_THINK_BLOCK_RE.sub('', _THINK_BLOCK_RE.sub('', text)).strip()
+    for prefix in ('<<<', '[[['):
+        if visible.startswith(prefix):
+            visible = visible[len(prefix) :].lstrip()
+    return visible
+
+
+@lru_cache(maxsize=32)
+def _split_stable_prompt_template(template: str, hints_block: str, hotwords_block: str) -> tuple[str, str]:
+    lines = template.splitlines(keepends=True)
+    split_at = len(lines)
+    for index, line in enumerate(lines):
+        try:
+            fields = {name for _, name, _, _ in string.Formatter().parse(line) if name is not None}
+        except ValueError:
+            fields = {''}
+        if fields - _STABLE_PROMPT_FIELDS:
+            split_at = index
+            break
+    head = ''.join(lines[:split_at])
+    try:
+        rendered_head = head.format(hints_block=hints_block, hotwords_block=hotwords_block)
+    except Exception as error:
+        raise RuntimeError(f'invalid dictation.llm.user_prompt_template: {error}') from error
+    return rendered_head, ''.join(lines[split_at:])
+
+
+@lru_cache(maxsize=32)
+def _prompt_prefix_cache_key(system_prompt: str, stable_prefix: str) -> str:
+    return fingerprint(system_prompt, stable_prefix)[:16]
+
+
 def _llm_uses_local_endpoint(config: DictationLLMConfig) -> bool:
     provider = config.provider.strip().lower()
     if provider == 'local-mlx':
@@ -411,8 +494,62 @@ class DictationTextPostprocessor:
     def __init__(self, config: VoxConfig) -> None:
         self.transforms = config.dictation.transforms
         self.llm = config.dictation.llm
+        self.llm_profile = config.dictation.llm_active_profile
+        self.hedge_delay_ms = max(0, int(config.dictation.hedge.delay_ms))
+        self.hedge_profile: str | None = None
+        self.hedge_llm: DictationLLMConfig | None = None
+        if self.llm.enabled and (hedge := resolve_dictation_hedge_profile(config.dictation)) is not None:
+            self.hedge_profile, self.hedge_llm = hedge
+        self.circuit_config = config.dictation.circuit
+        self.adaptive_timeout = self.circuit_config.adaptive_timeout
+        # 熔断状态和延迟样本按 profile 分开记，对冲到备用 profile 的耗时不会拉偏主 profile 的超时。
+        self.circuits: dict[str, LLMCircuitBreaker] = {}
+        self.circuit: LLMCircuitBreaker | None = None
+        if self.circuit_config.enabled:
+            self.circuit = self._circuit_for(self.llm_profile)
         self.hotwords = config.dictation.hotwords
         self.hints = config.dictation.hints
+        self.context_max_tokens = max(0, int(config.dictation.context.max_tokens))
+        self._transforms_enabled = has_dictation_transforms(self.transforms)
+        self._rewrite_hotwords = should_rewrite_hotword_aliases(self.hotwords)
+        self._hotwords_enabled = has_dictation_hotwords(self.hotwords)
+        self._hotword_entries = len([entry for entry in self.hotwords.entries if entry.value.strip()])
+        self._hints_enabled = has_dictation_hints(self.hints)
+        self._hint_count = len([item for item in self.hints.items if item.strip()])
+        self._alias_prefixes: frozenset[str] = frozenset()
+        self._alias_max_chars = 0
+        if self._rewrite_hotwords:
+            aliases = [alias if self.hotwords.case_sensitive else alias.lower() for alias, _ in _iter_hotword_pairs(self.hotwords)]
+            self._alias_prefixes = frozenset(alias[:size] for alias in aliases for size in range(1, len(alias)))
+            self._alias_max_chars = max((len(alias) for alias in aliases), default=0)
+        self.gate: DictationLLMGate | None = None
+        if config.dictation.gate.enabled:
+            self.gate = DictationLLMGate(config.dictation.gate, self.hotwords)
+        self.prompt: DictationPromptConfig = config.dictation.prompt
+        cache_config = config.dictation.cache
+        self.cache: LLMResultCache | None = None
+        if cache_config.enabled:
+            self.cache = LLMResultCache(
+                max_entries=cache_config.max_entries,
+                path=get_cache_dir(config) / 'dictation-llm-cache.json' if cache_config.persist else None,
+            )
+
+    def _circuit_for(self, profile: str) -> LLMCircuitBreaker:
+        breaker = self.circuits.get(profile)
+        if breaker is None:
+            breaker = self.circuits[profile] = LLMCircuitBreaker(
+                failure_threshold=self.circuit_config.failure_threshold,
+                cooldown_sec=self.circuit_config.cooldown_sec,
+                min_samples=self.circuit_config.min_samples,
+                timeout_factor=self.circuit_config.timeout_factor,
+                min_timeout_sec=self.circuit_config.min_timeout_sec,
+            )
+        return breaker
+
+    def _adaptive_timeout_sec(self, profile: str, llm: DictationLLMConfig, input_chars: int) -> float:
+        if self.circuit is None or not self.adaptive_timeout:
+            return llm.timeout_sec
+        return self._circuit_for(profile).effective_timeout(llm.timeout_sec, input_chars=input_chars)
 
     @property
     def enabled(self) -> bool:
@@ -422,6 +559,62 @@ class DictationTextPostprocessor:
             or should_rewrite_hotword_aliases(self.hotwords)
         )
 
+    def preview(self, text: str, *, memo: PreviewMemo | None = None, stable_prefix: str = '') -> str:
+        result = text.strip()
+        if not result:
+            return ''
+        if memo is None:
+            if self._rewrite_hotwords:
+                result, _ = apply_hotword_aliases(result, self.hotwords)
+            if self._transforms_enabled:
+                result = apply_dictation_transforms(result, self.transforms)
+            return result
+
+        if not result.startswith(memo.raw_text):
+            memo.raw_text = memo.stage_tail = memo.text = ''
+        leading = len(text) - len(text.lstrip())
+        cut = max(0, min(len(result), len(stable_prefix) - leading)) if text.startswith(stable_prefix) else 0
+        while cut > len(memo.raw_text) and not self._is_preview_cut_safe(result, cut):
+            cut -= 1
+        if cut > len(memo.raw_text):
+            memo.stage_tail, memo.text = self._preview_extend(memo, result[len(memo.raw_text) : cut])
+            memo.raw_text = result[:cut]
+        _, output = self._preview_extend(memo, result[len(memo.raw_text) :])
+        if self.transforms.strip_trailing_punctuation:
+            output = strip_trailing_punctuation(output)
+        return output
+
+    def _is_preview_cut_safe(self, text: str, cut: int) -> bool:
+        if not self._alias_prefixes:
+            return True
+        window = text[max(0, cut - self._alias_max_chars + 1) : cut]
+        if not self.hotwords.case_sensitive:
+            window = window.lower()
+        return not any(window[index:] in self._alias_prefixes for index in range(len(window)))
+
+    def _preview_extend(self, memo: PreviewMemo, chunk: str, *, hotwords: bool = True) -> tuple[str, str]:
+        if hotwords and self._rewrite_hotwords:
+            chunk, _ = apply_hotword_aliases(chunk, self.hotwords)
+        if self.transforms.fullwidth_to_halfwidth:
+            chunk = fullwidth_to_halfwidth(chunk)
+        stage_tail = f'{memo.stage_tail}{chunk}'[-2:]
+        if self.transforms.space_around_punct or self.transforms.space_between_cjk:
+            chunk = _auto_insert_spaces_after(
+                memo.stage_tail,
+                chunk,
+                punct=self.transforms.space_around_punct,
+                cjk=self.transforms.space_between_cjk,
+            )
+        return stage_tail, f'{memo.text}{chunk}'
+
+    def _stream_progress(self, text: str, memo: PreviewMemo) -> str:
+        if not text.startswith(memo.raw_text):
+            memo.raw_text = memo.stage_tail = memo.text = ''
+        if len(text) > len(memo.raw_text):
+            memo.stage_tail, memo.text = self._preview_extend(memo, text[len(memo.raw_text) :], hotwords=False)
+            memo.raw_text = text
+        return memo.text
+
     def process(
         self,
         text: str,
@@ -430,6 +623,12 @@ class DictationTextPostprocessor:
         context: DictationContext | None = None,
         emit: PostprocessEventEmitter | None = None,
         allow_llm: bool = True,
+        cancel: LLMCancelToken | None = None,
+        prefix_text: str | None = None,
+        on_progress: Callable[[str], None] | None = None,
+        progress_prefix: str = '',
+        speculative: bool = False,
+        utterance_id: int | None = None,
     ) -> DictationPostprocessResult:
         started_at = time.perf_counter()
         original = text.strip()
@@ -443,7 +642,7 @@ class DictationTextPostprocessor:
                 stage,
                 {
                     't_rel_ms': int((time.perf_counter() - started_at) * 1000),
-                    **fields,
+                    **{key: value() if callable(value) else value for key, value in fields.items()},
                 },
             )
 
@@ -468,11 +667,11 @@ class DictationTextPostprocessor:
             'context_chars': len(context.context_text or '') if context else 0,
             'context_selected_chars': len(context.selected_text or '') if context else 0,
             'context_focus_chars': len(context.focus_text or '') if context else 0,
-            'hotwords_enabled': has_dictation_hotwords(self.hotwords),
-            'hotword_entries': len([entry for entry in self.hotwords.entries if entry.value.strip()]),
+            'hotwords_enabled': self._hotwords_enabled,
+            'hotword_entries': self._hotword_entries,
             'hotword_matches': 0,
-            'hints_enabled': has_dictation_hints(self.hints),
-            'hint_count': len([item for item in self.hints.items if item.strip()]),
+            'hints_enabled': self._hints_enabled,
+            'hint_count': self._hint_count,
             'llm_guard_fallback': False,
             'llm_guard_reason': None,
         }
@@ -480,7 +679,7 @@ class DictationTextPostprocessor:
         hotword_input = original
         hotword_started_at = time.perf_counter()
         hotword_replacements: list[HotwordReplacement] = []
-        if should_rewrite_hotword_aliases(self.hotwords):
+        if self._rewrite_hotwords:
             result, hotword_replacements = apply_hotword_aliases(result, self.hotwords)
             metadata['hotword_matches'] = sum(item.count for item in hotword_replacements)
             metadata['hotword_replacements'] = [
@@ -494,89 +693,215 @@ class DictationTextPostprocessor:
                 changed=metadata['hotwords_changed'],
                 stage_ms=metadata['hotwords_ms'],
                 matches=metadata['hotword_matches'],
-                replacements=summarize_hotword_replacements(hotword_replacements),
+                replacements=lambda: summarize_hotword_replacements(hotword_replacements),
                 text=result,
                 chars=len(result),
-                diff=build_text_diff(hotword_input, result),
+                diff=lambda: build_text_diff(hotword_input, result),
             )
         else:
             metadata['hotwords_changed'] = False
 
         if llm_enabled:
             llm_input = result
+            if context is not None:
+                context, context_budget = fit_dictation_context(context, self.context_max_tokens)
+                metadata['context_budget_tokens'] = context_budget.max_tokens
+                metadata['context_tokens'] = context_budget.tokens
+                metadata['context_dropped_chars'] = context_budget.dropped_chars
+                metadata['context_deduped_chars'] = context_budget.deduped_chars
             metadata['llm_timeout_sec'] = self.llm.timeout_sec
             metadata['llm_input_text'] = llm_input
             metadata['llm_input_chars'] = len(llm_input)
+            if prefix_text:
+                metadata['llm_prefix_chars'] = len(prefix_text)
             llm_started_at = time.perf_counter()
-            emit_stage(
-                'llm_start',
-                provider=self.llm.provider,
-                model=self.llm.model or '-',
-                timeout_sec=self.llm.timeout_sec,
-                stream_requested=bool(self.llm.stream),
-                input_chars=len(llm_input),
-                context_chars=int(metadata['context_chars']),
-                context_selected_chars=int(metadata['context_selected_chars']),
-                context_focus_chars=int(metadata['context_focus_chars']),
-                context_source=metadata['context_source'],
-                context_surface=metadata['context_surface'],
-                hotword_entries=int(metadata['hotword_entries']),
-                hotword_matches=int(metadata['hotword_matches']),
-                hint_count=int(metadata['hint_count']),
-                text=llm_input,
+            gate_reason: str | None = None
+            gate_output: str | None = None
+            gate = self.gate if not prefix_text else None
+            if gate is not None:
+                gate_reason, gate_output = gate.evaluate(llm_input, scope=utterance_id)
+                metadata['llm_gate_checked'] = True
+            cache_key = (
+                self._llm_cache_key(llm_input, language=language, context=context, prefix_text=prefix_text)
+                if self.cache is not None and gate_reason is None
+                else None
             )
-            try:
-                llm_result = self._call_llm(
-                    llm_input,
-                    language=language,
-                    context=context,
-                    emit=lambda stage, fields: emit_stage(stage, **fields),
+            cached_output = self.cache.get(cache_key) if self.cache is not None and cache_key is not None else None
+            if cache_key is not None:
+                metadata['llm_cache_hit'] = cached_output is not None
+            circuit_allowed = True
+            if gate_reason is None and cached_output is None and self.circuit is not None:
+                circuit_allowed, metadata['llm_circuit_state'] = self.circuit.acquire()
+                metadata['llm_timeout_sec'] = self._adaptive_timeout_sec(self.llm_profile, self.llm, len(llm_input))
+            if gate_reason is None:
+                emit_stage(
+                    'llm_start',
+                    provider=self.llm.provider,
+                    model=self.llm.model or '-',
+                    timeout_sec=metadata['llm_timeout_sec'],
+                    stream_requested=bool(self.llm.stream),
+                    input_chars=len(llm_input),
+                    context_chars=int(metadata['context_chars']),
+                    context_selected_chars=int(metadata['context_selected_chars']),
+                    context_focus_chars=int(metadata['context_focus_chars']),
+                    context_tokens=metadata.get('context_tokens'),
+                    context_dropped_chars=metadata.get('context_dropped_chars'),
+                    context_source=metadata['context_source'],
+                    context_surface=metadata['context_surface'],
+                    hotword_entries=int(metadata['hotword_entries']),
+                    hotword_matches=int(metadata['hotword_matches']),
+                    hint_count=int(metadata['hint_count']),
+                    text=llm_input,
                 )
-                llm_output = _normalize_llm_output(llm_result.text)
+            if gate_reason is not None:
+                metadata['llm_ms'] = 0
+                metadata['llm_skipped_reason'] = gate_reason
+                metadata['llm_output_text'] = ''
+                metadata['llm_output_chars'] = 0
+                if gate_output is not None:
+                    result = gate_output
+                emit_stage(
+                    'llm_skipped',
+                    provider=self.llm.provider,
+                    model=self.llm.model or '-',
+                    reason=gate_reason,
+                    text=result,
+                    chars=len(result),
+                )
+            elif cached_output is not None:
                 llm_elapsed_ms = int((time.perf_counter() - llm_started_at) * 1000)
                 metadata['llm_used'] = True
                 metadata['llm_ms'] = llm_elapsed_ms
-                metadata['llm_stream_requested'] = llm_result.stream_requested
-                metadata['llm_stream_used'] = llm_result.stream_used
-                metadata['llm_stream_chunks'] = llm_result.stream_chunks
-                metadata['llm_first_token_ms'] = llm_result.first_token_ms
-                metadata['llm_output_text'] = llm_output
-                metadata['llm_output_chars'] = len(llm_output)
+                metadata['llm_output_text'] = cached_output
+                metadata['llm_output_chars'] = len(cached_output)
                 emit_stage(
                     'llm_done',
                     provider=self.llm.provider,
                     model=self.llm.model or '-',
                     timeout_sec=self.llm.timeout_sec,
                     stage_ms=llm_elapsed_ms,
-                    stream_requested=bool(metadata['llm_stream_requested']),
-                    stream_used=bool(metadata['llm_stream_used']),
-                    stream_chunks=int(metadata['llm_stream_chunks']),
-                    first_token_ms=metadata.get('llm_first_token_ms'),
-                    text=llm_output,
-                    chars=len(llm_output),
-                    diff=build_text_diff(llm_input, llm_output),
+                    cache_hit=True,
+                    text=cached_output,
+                    chars=len(cached_output),
+                    diff=lambda: build_text_diff(llm_input, cached_output),
                 )
-                if llm_output:
-                    result = llm_output
-            except Exception as error:
-                metadata['llm_ms'] = int((time.perf_counter() - llm_started_at) * 1000)
-                metadata['llm_error'] = str(error)
+                result = cached_output
+                if gate is not None:
+                    gate.remember(cached_output, scope=utterance_id)
+            elif not circuit_allowed:
+                metadata['llm_ms'] = 0
+                metadata['llm_circuit_skipped'] = True
+                metadata['llm_skipped_reason'] = 'circuit_open'
                 metadata['llm_output_text'] = ''
                 metadata['llm_output_chars'] = 0
                 emit_stage(
-                    'llm_error',
+                    'llm_skipped',
                     provider=self.llm.provider,
                     model=self.llm.model or '-',
-                    timeout_sec=self.llm.timeout_sec,
-                    stream_requested=bool(metadata['llm_stream_requested']),
-                    stream_used=bool(metadata['llm_stream_used']),
-                    stage_ms=metadata['llm_ms'],
-                    error=str(error),
+                    timeout_sec=metadata['llm_timeout_sec'],
+                    reason='circuit_open',
                 )
+            else:
+                call_llm = self._call_llm_hedged if self.hedge_llm is not None else self._call_llm
+                progress_memo = PreviewMemo()
+
+                def forward_llm_stage(stage: str, fields: dict[str, Any]) -> None:
+                    if stage != 'llm_delta':
+                        emit_stage(stage, **fields)
+                    elif on_progress is not None and (visible := _visible_stream_text(fields['text'])):
+                        on_progress(self._stream_progress(f'{progress_prefix}{visible}', progress_memo))
+
+                try:
+                    llm_result = call_llm(
+                        llm_input,
+                        language=language,
+                        context=context,
+                        emit=forward_llm_stage,
+                        cancel=cancel,
+                        prefix_text=prefix_text,
+                        timeout_sec=metadata['llm_timeout_sec'],
+                    )
+                    llm_output = _normalize_llm_output(llm_result.text)
+                    llm_elapsed_ms = int((time.perf_counter() - llm_started_at) * 1000)
+                    if self.circuit is not None:
+                        # 录音中的预跑（speculative）会被抢占、输入也只是半句，不计入延迟样本。
+                        if llm_result.profile in (None, self.llm_profile):
+                            self.circuit.record_success(
+                                None if speculative else llm_elapsed_ms,
+                                input_chars=len(llm_input),
+                            )
+                        else:
+                            self.circuit.release()
+                            self._circuit_for(llm_result.profile).record_success(
+                                None if speculative else llm_result.elapsed_ms,
+                                input_chars=len(llm_input),
+                            )
+                    metadata['llm_used'] = True
+                    metadata['llm_ms'] = llm_elapsed_ms
+                    metadata['llm_stream_requested'] = llm_result.stream_requested
+                    metadata['llm_stream_used'] = llm_result.stream_used
+                    metadata['llm_stream_chunks'] = llm_result.stream_chunks
+                    metadata['llm_first_token_ms'] = llm_result.first_token_ms
+                    metadata['llm_connect_ms'] = llm_result.connect_ms
+                    metadata['llm_ttfb_ms'] = llm_result.ttfb_ms
+                    metadata['llm_connection_reused'] = llm_result.connection_reused
+                    if llm_result.hedged is not None:
+                        metadata['llm_hedged'] = llm_result.hedged
+                        metadata['llm_hedge_winner'] = llm_result.profile
+                        if llm_result.profile == self.hedge_profile and self.hedge_llm is not None:
+                            metadata['provider'] = self.hedge_llm.provider
+                            metadata['model'] = self.hedge_llm.model
+                    metadata['llm_output_text'] = llm_output
+                    metadata['llm_output_chars'] = len(llm_output)
+                    emit_stage(
+                        'llm_done',
+                        provider=metadata['provider'],
+                        model=metadata['model'] or '-',
+                        timeout_sec=metadata['llm_timeout_sec'],
+                        stage_ms=llm_elapsed_ms,
+                        hedged=metadata.get('llm_hedged'),
+                        hedge_winner=metadata.get('llm_hedge_winner'),
+                        stream_requested=bool(metadata['llm_stream_requested']),
+                        stream_used=bool(metadata['llm_stream_used']),
+                        stream_chunks=int(metadata['llm_stream_chunks']),
+                        first_token_ms=metadata.get('llm_first_token_ms'),
+                        connect_ms=metadata.get('llm_connect_ms'),
+                        ttfb_ms=metadata.get('llm_ttfb_ms'),
+                        text=llm_output,
+                        chars=len(llm_output),
+                        diff=lambda: build_text_diff(llm_input, llm_output),
+                    )
+                    if llm_output:
+                        result = llm_output
+                        if self.cache is not None and cache_key is not None:
+                            self.cache.put(cache_key, llm_output)
+                        if gate is not None:
+                            gate.remember(llm_output, scope=utterance_id)
+                except Exception as error:
+                    metadata['llm_ms'] = int((time.perf_counter() - llm_started_at) * 1000)
+                    metadata['llm_error'] = str(error)
+                    metadata['llm_cancelled'] = bool(cancel is not None and cancel.cancelled)
+                    if self.circuit is not None:
+                        if metadata['llm_cancelled']:
+                            self.circuit.release()
+                        else:
+                            self.circuit.record_failure()
+                    metadata['llm_output_text'] = ''
+                    metadata['llm_output_chars'] = 0
+                    emit_stage(
+                        'llm_error',
+                        provider=self.llm.provider,
+                        model=self.llm.model or '-',
+                        timeout_sec=metadata['llm_timeout_sec'],
+                        stream_requested=bool(metadata['llm_stream_requested']),
+                        stream_used=bool(metadata['llm_stream_used']),
+                        stage_ms=metadata['llm_ms'],
+                        error=str(error),
+                    )
 
         rules_input = result
         rules_started_at = time.perf_counter()
-        if has_dictation_transforms(self.transforms):
+        if self._transforms_enabled:
             result = apply_dictation_transforms(result, self.transforms)
             metadata['rules_changed'] = result != rules_input
         else:
@@ -592,7 +917,7 @@ class DictationTextPostprocessor:
             stage_ms=metadata['rules_ms'],
             text=result,
             chars=len(result),
-            diff=build_text_diff(rules_input, result),
+            diff=lambda: build_text_diff(rules_input, result),
         )
 
         metadata['changed'] = result != original
@@ -607,7 +932,7 @@ class DictationTextPostprocessor:
             postprocess_ms=metadata['postprocess_ms'],
             text=result,
             chars=len(result),
-            diff=build_text_diff(original, result),
+            diff=lambda: build_text_diff(original, result),
         )
         return DictationPostprocessResult(text=result, metadata=metadata)
 
@@ -618,8 +943,13 @@ class DictationTextPostprocessor:
         language: str | None = None,
         context: DictationContext | None = None,
         emit: PostprocessEventEmitter | None = None,
+        cancel: LLMCancelToken | None = None,
+        prefix_text: str | None = None,
+        llm: DictationLLMConfig | None = None,
+        timeout_sec: float | None = None,
     ) -> LLMCallResult:
-        llm = self.llm
+        llm = llm or self.llm
+        timeout = timeout_sec if timeout_sec is not None else llm.timeout_sec
         system_prompt, user_prompt = resolve_dictation_llm_prompts(llm)
         if not llm.base_url:
             raise RuntimeError('dictation.llm.base_url is not configured')
@@ -632,11 +962,12 @@ class DictationTextPostprocessor:
             if not api_key and not _llm_uses_local_endpoint(llm):
                 raise RuntimeError(f'{llm.api_key_env} is not set')
 
-        rendered_user_prompt = self._render_user_prompt(
+        rendered_user_prompt, stable_prefix = self._render_user_prompt_parts(
             text,
             language=language,
             context=context,
             template=user_prompt,
+            prefix_text=prefix_text,
         )
         payload: dict[str, Any] = {
             'model': llm.model,
@@ -657,6 +988,8 @@ class DictationTextPostprocessor:
         }
         if api_key:
             headers.setdefault('Authorization', f'Bearer {api_key}')
+        if self.prompt.cache_key_header:
+            headers.setdefault(self.prompt.cache_key_header, _prompt_prefix_cache_key(system_prompt, stable_prefix))
 
         endpoint = llm.base_url.rstrip('/')
         if not endpoint.endswith('/chat/completions'):
@@ -668,21 +1001,42 @@ class DictationTextPostprocessor:
             headers=headers,
             method='POST',
         )
+        if cancel is not None:
+            cancel.raise_if_cancelled()
         request_started_at = time.perf_counter()
         try:
-            with urllib.request.urlopen(request, timeout=llm.timeout_sec) as response:
-                if llm.stream:
-                    return self._read_llm_stream_response(
-                        response,
-                        request_started_at=request_started_at,
-                        emit=emit,
-                    )
-                body = response.read().decode('utf-8')
+            with _LLM_CONNECTION_POOL.urlopen(request, timeout=timeout) as response:
+                connection_timings = _response_connection_timings(response)
+                if cancel is not None:
+                    cancel.attach(response)
+                try:
+                    if llm.stream:
+                        stream_result = self._read_llm_stream_response(
+                            response,
+                            request_started_at=request_started_at,
+                            emit=emit,
+                            cancel=cancel,
+                        )
+                        if cancel is not None:
+                            cancel.raise_if_cancelled()
+                        return replace(stream_result, **connection_timings)
+                    body = response.read().decode('utf-8')
+                finally:
+                    if cancel is not None:
+                        cancel.detach()
+            if cancel is not None:
+                cancel.raise_if_cancelled()
         except urllib.error.HTTPError as error:
             detail = error.read().decode('utf-8', errors='ignore')
             raise RuntimeError(f'LLM API {error.code}: {detail or error.reason}') from error
         except urllib.error.URLError as error:
+            if cancel is not None and cancel.cancelled:
+                raise LLMCallCancelledError('LLM request cancelled') from error
             raise RuntimeError(f'LLM request failed: {error.reason}') from error
+        except OSError as error:
+            if cancel is not None and cancel.cancelled:
+                raise LLMCallCancelledError('LLM request cancelled') from error
+            raise
 
         try:
             payload_json = json.loads(body)
@@ -696,14 +1050,113 @@ class DictationTextPostprocessor:
             stream_used=False,
             stream_chunks=0,
             first_token_ms=None,
+            **connection_timings,
         )
 
+    def _call_llm_hedged(
+        self,
+        text: str,
+        *,
+        language: str | None = None,
+        context: DictationContext | None = None,
+        emit: PostprocessEventEmitter | None = None,
+        cancel: LLMCancelToken | None = None,
+        prefix_text: str | None = None,
+        timeout_sec: float | None = None,
+    ) -> LLMCallResult:
+        assert self.hedge_llm is not None and self.hedge_profile is not None
+        outcomes: queue.Queue[tuple[str, LLMCallResult | None, Exception | None]] = queue.Queue()
+        first_token = threading.Event()
+        lock = threading.Lock()
+        tokens: dict[str, LLMCancelToken] = {}
+        streaming: list[str] = []
+
+        def cancel_all(*, keep: str | None = None) -> None:
+            with lock:
+                losers = [token for profile, token in tokens.items() if profile != keep]
+            for token in losers:
+                token.cancel()
+
+        def launch(profile: str, llm: DictationLLMConfig, timeout: float | None = None) -> None:
+            token = LLMCancelToken()
+            with lock:
+                tokens[profile] = token
+            launched_at = time.perf_counter()
+
+            def forward(stage: str, fields: dict[str, Any]) -> None:
+                with lock:
+                    if stage == 'llm_stream' and profile not in streaming:
+                        streaming.append(profile)
+                        first_token.set()
+                    is_leader = bool(streaming) and streaming[0] == profile
+                if emit is not None and is_leader:
+                    emit(stage, fields)
+
+            def run() -> None:
+                try:
+                    result = self._call_llm(
+                        text,
+                        language=language,
+                        context=context,
+                        emit=forward,
+                        cancel=token,
+                        prefix_text=prefix_text,
+                        llm=llm,
+                        timeout_sec=timeout,
+                    )
+                except Exception as error:
+                    with lock:
+                        if profile in streaming:
+                            streaming.remove(profile)
+                    outcomes.put((profile, None, error))
+                else:
+                    outcomes.put((profile, replace(result, elapsed_ms=int((time.perf_counter() - launched_at) * 1000)), None))
+
+            threading.Thread(target=run, name=f'vox-llm-{profile}', daemon=True).start()
+
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+            cancel.add_callback(cancel_all)
+        hedge_timeout = self._adaptive_timeout_sec(self.hedge_profile, self.hedge_llm, len(text))
+        launch(self.llm_profile, self.llm, timeout_sec)
+        pending = 1
+        hedged = False
+        try:
+            outcome = outcomes.get(timeout=self.hedge_delay_ms / 1000)
+        except queue.Empty:
+            if not first_token.is_set() and not (cancel is not None and cancel.cancelled):
+                launch(self.hedge_profile, self.hedge_llm, hedge_timeout)
+                pending += 1
+                hedged = True
+            outcome = outcomes.get()
+
+        errors: list[Exception] = []
+        while True:
+            pending -= 1
+            profile, result, error = outcome
+            if result is not None:
+                cancel_all(keep=profile)
+                return replace(result, profile=profile, hedged=hedged)
+            assert error is not None
+            errors.append(error)
+            if not hedged and not (cancel is not None and cancel.cancelled):
+                launch(self.hedge_profile, self.hedge_llm, hedge_timeout)
+                pending += 1
+                hedged = True
+            if pending == 0:
+                break
+            outcome = outcomes.get()
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        raise errors[0]
+
     def _read_llm_stream_response(
         self,
         response: Any,
         *,
         request_started_at: float,
         emit: PostprocessEventEmitter | None = None,
+        cancel: LLMCancelToken | None = None,
     ) -> LLMCallResult:
         content_type = _response_content_type(response)
         if content_type != 'text/event-stream':
@@ -728,6 +1181,7 @@ class DictationTextPostprocessor:
         last_emit_at = stream_started_at
         last_emit_chars = 0
         emitted_any = False
+        last_delta_at = 0.0
 
         def emit_progress(*, force: bool = False) -> None:
             nonlocal last_emit_at, last_emit_chars, emitted_any
@@ -756,6 +1210,8 @@ class DictationTextPostprocessor:
             last_emit_chars = len(current_text)
 
         while True:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
             raw_line = response.readline()
             if not raw_line:
                 break
@@ -780,6 +1236,10 @@ class DictationTextPostprocessor:
                 if first_token_ms is None:
                     first_token_ms = int((time.perf_counter() - request_started_at) * 1000)
                 emit_progress()
+                now = time.perf_counter()
+                if emit is not None and (now - last_delta_at) * 1000 >= _LLM_PROGRESS_INTERVAL_MS:
+                    emit('llm_delta', {'text': ''.join(collected)})
+                    last_delta_at = now
                 continue
 
             if line.startswith(':'):
@@ -814,6 +1274,36 @@ class DictationTextPostprocessor:
             first_token_ms=first_token_ms,
         )
 
+    def _llm_cache_key(
+        self,
+        text: str,
+        *,
+        language: str | None = None,
+        context: DictationContext | None = None,
+        prefix_text: str | None = None,
+    ) -> str:
+        llm = self.llm
+        system_prompt, user_prompt = resolve_dictation_llm_prompts(llm)
+        context_fingerprint = (
+            [
+                context.source,
+                context.app_name,
+                context.surface,
+                context.element_role,
+                urlparse(context.page_url).netloc if context.page_url else None,
+            ]
+            if context is not None
+            else None
+        )
+        return fingerprint(
+            ' '.join(text.split()),
+            language or 'auto',
+            [llm.provider, llm.base_url, llm.model, llm.temperature, llm.max_tokens, system_prompt, user_prompt],
+            [self.hotwords.model_dump(mode='json'), self.hints.model_dump(mode='json')],
+            context_fingerprint,
+            prefix_text or '',
+        )
+
     def _render_user_prompt(
         self,
         text: str,
@@ -821,11 +1311,47 @@ class DictationTextPostprocessor:
         language: str | None = None,
         context: DictationContext | None = None,
         template: str | None = None,
+        prefix_text: str | None = None,
     ) -> str:
+        rendered, _ = self._render_user_prompt_parts(
+            text,
+            language=language,
+            context=context,
+            template=template,
+            prefix_text=prefix_text,
+        )
+        return rendered
+
+    def _render_user_prompt_parts(
+        self,
+        text: str,
+        *,
+        language: str | None = None,
+        context: DictationContext | None = None,
+        template: str | None = None,
+        prefix_text: str | None = None,
+    ) -> tuple[str, str]:
         template = template or '{text}'
         hints_block = self._build_hints_block()
         hotwords_block = self._build_hotwords_block()
         context_block = self._build_context_block(context)
+        prefix_block = self._build_prefix_block(prefix_text)
+        stable_blocks: list[str] = []
+        if hints_block and '{hints_block}' not in template:
+            stable_blocks.append(hints_block)
+        if hotwords_block and '{hotwords_block}' not in template:
+            stable_blocks.append(hotwords_block)
+        volatile_blocks: list[str] = []
+        if context_block and '{context_block}' not in template:
+            volatile_blocks.append(context_block)
+        if prefix_block and '{prefix_block}' not in template:
+            volatile_blocks.append(prefix_block)
+
+        if self.prompt.layout == 'stable_prefix':
+            # 模板里只依赖提示词/热词的前半段每次都一样，缓存渲染结果；上下文和原文一律排在它后面。
+            head, template = _split_stable_prompt_template(template, hints_block, hotwords_block)
+        else:
+            head = ''
         try:
             rendered = template.format(
                 text=text,
@@ -833,6 +1359,7 @@ class DictationTextPostprocessor:
                 hints_block=hints_block,
                 hotwords_block=hotwords_block,
                 context_block=context_block,
+                prefix_block=prefix_block,
                 context_app=context.app_name if context else '',
                 context_window=context.window_title if context else '',
                 context_surface=context.surface if context else '',
@@ -841,16 +1368,15 @@ class DictationTextPostprocessor:
             )
         except Exception as error:
             raise RuntimeError(f'invalid dictation.llm.user_prompt_template: {error}') from error
-        prefix_blocks: list[str] = []
-        if hints_block and '{hints_block}' not in template:
-            prefix_blocks.append(hints_block)
-        if hotwords_block and '{hotwords_block}' not in template:
-            prefix_blocks.append(hotwords_block)
-        if context_block and '{context_block}' not in template:
-            prefix_blocks.append(context_block)
-        if prefix_blocks:
-            return '\n\n'.join([*prefix_blocks, rendered])
-        return rendered
+
+        if volatile_blocks:
+            body = '\n\n'.join(part for part in [head.rstrip('\n'), *volatile_blocks, rendered] if part)
+        else:
+            body = head + rendered
+        stable_prefix = '\n\n'.join(part for part in [*stable_blocks, head] if part)
+        if stable_blocks:
+            return '\n\n'.join([*stable_blocks, body]), stable_prefix
+        return body, stable_prefix
 
     def _build_hints_block(self) -> str:
         if not has_dictation_hints(self.hints):
@@ -877,6 +1403,20 @@ class DictationTextPostprocessor:
                 lines.append(f'- {value}')
         return '\n'.join(lines)
 
+    def _build_prefix_block(self, prefix_text: str | None) -> str:
+        if not prefix_text:
+            return ''
+        return '\n'.join(
+            [
+                '本句已定稿的前文（只读）:',
+                '<<<',
+                prefix_text,
+                '>>>',
+                '- 前文已经整理好并输出过，只用于衔接语气、标点和指代',
+                '- 只输出下面这段新内容的整理结果，不要重复或改写前文',
+            ]
+        )
+
     def _build_context_block(self, context: DictationContext | None) -> str:
         if context is None:
             return ''
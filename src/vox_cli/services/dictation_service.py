@@ -22,7 +22,8 @@ import uuid
 import websockets
 
 from ..config import VoxConfig, get_cache_dir, get_home_dir, resolve_dictation_model_id
-from ..runtime import format_lock_state, probe_runtime_lock
+from ..cache import estimate_resident_mb
+from ..runtime import format_lock_state, probe_memory_budget, probe_runtime_lock
 from .model_service import ensure_model_downloaded, resolve_model
 
 
@@ -197,6 +198,7 @@ _ANSI_RESET = '\033[0m'
 _TOKEN_RE = re.compile(r'[^\s=]+=(?:"(?:\\.|[^"])*"|[^\s]+)|[^\s]+')
 _DIFF_MARKER_RE = re.compile(r'(\[-.*?-\]|\[\+.*?\+\])')
 _DEFAULT_VERBOSE_PARTIAL_INTERVAL_MS = 250
+_DICTATION_BUDGET_WAIT_SEC = 120
 _CLEAR_LINE = '\r\033[2K'
 
 
@@ -223,6 +225,7 @@ class _UtteranceRenderState:
     asr_infer_ms: int = 0
     asr_total_ms: int = 0
     context_capture_ms: int = 0
+    context_helper: bool | None = None
     context_wait_ms: int = 0
     context_overlap_ms: int = 0
     context_status: str = '-'
@@ -230,9 +233,19 @@ class _UtteranceRenderState:
     context_source: str = '-'
     context_surface: str = '-'
     context_chars: int = 0
+    context_tokens: int | None = None
+    context_dropped_chars: int | None = None
     llm_used: bool = False
     llm_ms: int = 0
     llm_first_token_ms: int = 0
+    llm_connect_ms: int = 0
+    llm_ttfb_ms: int = 0
+    llm_cache_hit: bool | None = None
+    llm_hedged: bool | None = None
+    llm_hedge_winner: str | None = None
+    llm_circuit_state: str | None = None
+    llm_gate_checked: bool | None = None
+    llm_skipped_reason: str | None = None
     llm_stream_used: bool = False
     llm_stream_chunks: int = 0
     llm_stream_ms: int = 0
@@ -255,6 +268,8 @@ class _UtteranceRenderState:
     partial_stable_advance_count: int = 0
     partial_jobs_started: int = 0
     partial_jobs_completed: int = 0
+    partial_jobs_cancelled: int = 0
+    partial_cancelled_wasted_ms: int = 0
     partial_reused_chars: int = 0
     partial_stable_chars: int = 0
     partial_sent_count: int = 0
@@ -420,6 +435,7 @@ def _compact_payload(*, event: str, fields: dict[str, object]) -> dict[str, obje
             'cp': _compact_bool(fields.get('custom_prompt_enabled')),
             'ce': _compact_bool(fields.get('context_enabled')),
             'cc': fields.get('context_max_chars'),
+            'ct': fields.get('context_max_tokens'),
             'he': _compact_bool(fields.get('hotwords_enabled')),
             'hn': fields.get('hotword_entries'),
             'hr': _compact_bool(fields.get('rewrite_aliases')),
@@ -445,6 +461,7 @@ def _compact_payload(*, event: str, fields: dict[str, object]) -> dict[str, obje
             'cap': fields.get('capture_ms'),
             'fl': fields.get('flush_roundtrip_ms'),
             'ctxc': fields.get('context_capture_ms'),
+            'ctxh': _compact_bool(fields.get('context_helper')),
             'ctxw': fields.get('context_wait_ms'),
             'ctxo': fields.get('context_overlap_ms'),
             'ctxs': fields.get('context_status'),
@@ -452,11 +469,22 @@ def _compact_payload(*, event: str, fields: dict[str, object]) -> dict[str, obje
             'src': fields.get('context_source'),
             'srf': fields.get('context_surface'),
             'ctxr': fields.get('context_chars'),
+            'ctxt': fields.get('context_tokens'),
+            'ctxd': fields.get('context_dropped_chars'),
             'asr': fields.get('asr_infer_ms'),
             'asrt': fields.get('asr_total_ms'),
             'lu': _compact_bool(fields.get('llm_used')),
             'ls': _compact_bool(fields.get('llm_stream_used')),
             'ft': fields.get('llm_first_token_ms'),
+            'lcn': fields.get('llm_connect_ms'),
+            'ltb': fields.get('llm_ttfb_ms'),
+            'lch': _compact_bool(fields.get('llm_cache_hit')),
+            'lhg': _compact_bool(fields.get('llm_hedged')),
+            'lhw': fields.get('llm_hedge_winner'),
+            'lcs': fields.get('llm_circuit_state'),
+            'lt': fields.get('llm_timeout_sec') if fields.get('llm_circuit_state') else None,
+            'lg': _compact_bool(fields.get('llm_gate_checked')),
+            'lsr': fields.get('llm_skipped_reason'),
             'llm': fields.get('llm_ms'),
             'lst': fields.get('llm_stream_ms'),
             'lsch': fields.get('llm_stream_chunks'),
@@ -470,6 +498,8 @@ def _compact_payload(*, event: str, fields: dict[str, object]) -> dict[str, obje
             'psa': fields.get('partial_stable_advance_count'),
             'pjs': fields.get('partial_jobs_started'),
             'pjc': fields.get('partial_jobs_completed'),
+            'pjx': fields.get('partial_jobs_cancelled'),
+            'pxw': fields.get('partial_cancelled_wasted_ms'),
             'prc': fields.get('partial_reused_chars'),
             'psc': fields.get('partial_stable_chars'),
             'psn': fields.get('partial_sent_count'),
@@ -608,6 +638,7 @@ class _DictationLogFormatter:
         'llm_stream': ('LLM', '1;35', '流式润色'),
         'llm_done': ('LLM', '1;35', '润色完成'),
         'llm_error': ('LLM', '1;31', '润色失败'),
+        'llm_skipped': ('LLM', '1;33', '跳过润色'),
         'final_ready': ('DONE', '1;32', '最终输出'),
     }
     _TEXT_LABELS = {
@@ -617,6 +648,7 @@ class _DictationLogFormatter:
         'llm_start': 'LLM输入',
         'llm_stream': '流式',
         'llm_done': 'LLM输出',
+        'llm_skipped': '跳过LLM',
         'final_ready': '最终',
     }
     _BUDGET_TITLES = {
@@ -897,6 +929,8 @@ class _DictationLogFormatter:
             ]
             if fields.get('context_max_chars'):
                 parts.append(f'ctx {fields["context_max_chars"]}字')
+            if fields.get('context_max_tokens'):
+                parts.append(f'ctx budget {fields["context_max_tokens"]}tok')
             if fields.get('hotword_entries'):
                 parts.append(f'hotwords {fields["hotword_entries"]}')
             if fields.get('hint_count'):
@@ -945,6 +979,7 @@ class _DictationLogFormatter:
                             'custom_prompt_enabled': self._truthy(fields.get('custom_prompt_enabled')),
                             'context_enabled': self._truthy(fields.get('context_enabled')),
                             'context_max_chars': _as_int(fields.get('context_max_chars')),
+                            'context_max_tokens': _as_int(fields.get('context_max_tokens')),
                             'hotwords_enabled': self._truthy(fields.get('hotwords_enabled')),
                             'hotword_entries': _as_int(fields.get('hotword_entries')),
                             'rewrite_aliases': self._truthy(fields.get('rewrite_aliases')),
@@ -999,6 +1034,8 @@ class _DictationLogFormatter:
                 self._live_pipeline.llm_first_token_ms = state.llm_first_token_ms
                 self._live_pipeline.llm_stream_chunks = state.llm_stream_chunks
                 return _FormatResult()
+            if stage == 'llm_skipped':
+                self._live_pipeline.llm_started_at = None
             if stage == 'llm_done':
                 self._live_pipeline.llm_started_at = None
                 self._live_pipeline.llm_ms = _as_int(fields.get('stage_ms'))
@@ -1034,12 +1071,22 @@ class _DictationLogFormatter:
                 parts.append(f'chunks {fields["stream_chunks"]}')
             if 'first_token_ms' in fields:
                 parts.append(f'first {fields["first_token_ms"]}ms')
+            if 'connect_ms' in fields:
+                parts.append(f'connect {fields["connect_ms"]}ms')
+            if 'ttfb_ms' in fields:
+                parts.append(f'ttfb {fields["ttfb_ms"]}ms')
+            if self._truthy(fields.get('cache_hit')):
+                parts.append('cache hit')
             if 'context_chars' in fields and fields['context_chars'] != '0':
                 parts.append(f'context {fields["context_chars"]}字')
             if 'context_selected_chars' in fields and fields['context_selected_chars'] != '0':
                 parts.append(f'selected {fields["context_selected_chars"]}字')
             if 'context_focus_chars' in fields and fields['context_focus_chars'] != '0':
                 parts.append(f'focus {fields["context_focus_chars"]}字')
+            if 'context_tokens' in fields and fields['context_tokens'] != '0':
+                parts.append(f'ctx ~{fields["context_tokens"]}tok')
+            if 'context_dropped_chars' in fields and fields['context_dropped_chars'] != '0':
+                parts.append(f'dropped {fields["context_dropped_chars"]}字')
             if 'matches' in fields and fields['matches'] != '0':
                 parts.append(f'matches {fields["matches"]}')
             if 'hotword_entries' in fields and fields['hotword_entries'] != '0':
@@ -1092,6 +1139,8 @@ class _DictationLogFormatter:
             utterance_state = self._state(utterance)
             utterance_state.context_status = context_state
             utterance_state.context_capture_ms = _as_int(fields.get('capture_ms'))
+            if 'helper' in fields:
+                utterance_state.context_helper = self._truthy(fields.get('helper'))
             utterance_state.context_chars = _as_int(fields.get('context_chars'))
             if fields.get('source'):
                 utterance_state.context_source = fields['source']
@@ -1102,6 +1151,8 @@ class _DictationLogFormatter:
             parts = [title]
             if 'capture_ms' in fields:
                 parts.append(f'{fields["capture_ms"]}ms')
+            if self._truthy(fields.get('cache_hit')):
+                parts.append('page cached')
             if 'selected_chars' in fields and fields['selected_chars'] != '0':
                 parts.append(f'selected {fields["selected_chars"]}字')
             if 'focus_chars' in fields and fields['focus_chars'] != '0':
@@ -1133,6 +1184,8 @@ class _DictationLogFormatter:
         if payload.startswith('dictation_context_prefetch '):
             fields, _ = _parse_tokens(payload[len('dictation_context_prefetch ') :])
             utterance = fields.get('utterance_id', '?')
+            if 'helper' in fields:
+                self._state(utterance).context_helper = self._truthy(fields.get('helper'))
             if self._live_enabled:
                 return _FormatResult()
             parts = ['预采集就绪']
@@ -1192,6 +1245,7 @@ class _DictationLogFormatter:
             utterance = fields.get('utterance_id')
             state = self._state(utterance)
             pipeline_state = fields.get('state', '-')
+            label = f"PRE #{utterance or '?'}"
             if pipeline_state == 'preview':
                 state.partial_preview_count += 1
                 state.partial_reused_chars = max(state.partial_reused_chars, _as_int(fields.get('reused_chars')))
@@ -1212,7 +1266,7 @@ class _DictationLogFormatter:
                         parts.append(f'ctx {"yes" if self._truthy(fields.get("context_ready")) else "no"}')
                     return _FormatResult(
                         lines=[
-                            f'{self._stamp()} {self._badge(f"PRE #{utterance or '?'}", "1;35")} {" | ".join(parts)}'
+                            f'{self._stamp()} {self._badge(label, "1;35")} {" | ".join(parts)}'
                         ]
                     )
             elif pipeline_state == 'job_completed':
@@ -1228,7 +1282,33 @@ class _DictationLogFormatter:
                         parts.append(f'changed {"yes" if self._truthy(fields.get("changed")) else "no"}')
                     return _FormatResult(
                         lines=[
-                            f'{self._stamp()} {self._badge(f"PRE #{utterance or '?'}", "1;35")} {" | ".join(parts)}'
+                            f'{self._stamp()} {self._badge(label, "1;35")} {" | ".join(parts)}'
+                        ]
+                    )
+            elif pipeline_state == 'job_cancelled':
+                state.partial_jobs_cancelled += 1
+                state.partial_cancelled_wasted_ms += _as_int(fields.get('wasted_ms'))
+                if not self._live_enabled:
+                    parts = ['预跑取消']
+                    if fields.get('reason'):
+                        parts.append(str(fields['reason']))
+                    if 'wasted_ms' in fields:
+                        parts.append(f'wasted {fields["wasted_ms"]}ms')
+                    return _FormatResult(
+                        lines=[
+                            f'{self._stamp()} {self._badge(label, "1;33")} {" | ".join(parts)}'
+                        ]
+                    )
+            elif pipeline_state == 'job_awaited':
+                if not self._live_enabled:
+                    parts = ['预跑收尾']
+                    if 'waited_ms' in fields:
+                        parts.append(f'waited {fields["waited_ms"]}ms')
+                    if 'stable_chars' in fields:
+                        parts.append(f'stable {fields["stable_chars"]}字')
+                    return _FormatResult(
+                        lines=[
+                            f'{self._stamp()} {self._badge(label, "1;35")} {" | ".join(parts)}'
                         ]
                     )
             elif pipeline_state == 'job_failed':
@@ -1238,7 +1318,7 @@ class _DictationLogFormatter:
                         parts.append(str(fields['error']))
                     return _FormatResult(
                         lines=[
-                            f'{self._stamp()} {self._badge(f"PRE #{utterance or '?'}", "1;31")} {" | ".join(parts)}'
+                            f'{self._stamp()} {self._badge(label, "1;31")} {" | ".join(parts)}'
                         ]
                     )
             elif pipeline_state == 'flush':
@@ -1251,7 +1331,7 @@ class _DictationLogFormatter:
                         parts.append(f'stable {fields["stable_chars"]}字')
                     return _FormatResult(
                         lines=[
-                            f'{self._stamp()} {self._badge(f"PRE #{utterance or '?'}", "1;35")} {" | ".join(parts)}'
+                            f'{self._stamp()} {self._badge(label, "1;35")} {" | ".join(parts)}'
                         ]
                     )
             return _FormatResult()
@@ -1314,6 +1394,19 @@ class _DictationLogFormatter:
             state.llm_stream_used = self._truthy(fields.get('stream_used'))
             state.llm_stream_chunks = _as_int(fields.get('stream_chunks'))
             state.llm_first_token_ms = _as_int(fields.get('first_token_ms'))
+            state.llm_connect_ms = _as_int(fields.get('connect_ms'))
+            state.llm_ttfb_ms = _as_int(fields.get('ttfb_ms'))
+            if 'cache_hit' in fields:
+                state.llm_cache_hit = self._truthy(fields.get('cache_hit'))
+            if 'hedged' in fields:
+                state.llm_hedged = self._truthy(fields.get('hedged'))
+                state.llm_hedge_winner = fields.get('hedge_winner')
+            if fields.get('circuit'):
+                state.llm_circuit_state = fields['circuit']
+            if 'gate' in fields:
+                state.llm_gate_checked = self._truthy(fields.get('gate'))
+            if fields.get('skip_reason'):
+                state.llm_skipped_reason = fields['skip_reason']
             state.llm_timeout_sec = _as_float(fields.get('timeout_sec'))
             state.postprocess_ms = _as_int(fields.get('postprocess_ms'))
             state.raw_chars = _as_int(fields.get('raw_chars'))
@@ -1326,6 +1419,9 @@ class _DictationLogFormatter:
                 state.context_source = fields['context_source']
             if fields.get('context_chars'):
                 state.context_chars = _as_int(fields.get('context_chars'))
+            if 'context_tokens' in fields:
+                state.context_tokens = _as_int(fields.get('context_tokens'))
+                state.context_dropped_chars = _as_int(fields.get('context_dropped'))
             self._live_pipeline.llm_ms = state.llm_ms
             self._live_pipeline.llm_started_at = None
             if state.llm_used:
@@ -1346,10 +1442,25 @@ class _DictationLogFormatter:
                 parts.append(f'chunks {fields["stream_chunks"]}')
             if 'first_token_ms' in fields:
                 parts.append(f'first {fields["first_token_ms"]}ms')
+            if 'connect_ms' in fields and 'ttfb_ms' in fields:
+                parts.append(f'net {fields["connect_ms"]}+{fields["ttfb_ms"]}ms')
+            if self._truthy(fields.get('cache_hit')):
+                parts.append('cache hit')
+            if self._truthy(fields.get('hedged')):
+                parts.append(f'hedge -> {fields.get("hedge_winner") or "?"}')
+            if fields.get('circuit') and fields['circuit'] != 'closed':
+                parts.append(f'circuit {fields["circuit"]}')
+            if fields.get('skip_reason'):
+                parts.append(f'skip {fields["skip_reason"]}')
             if 'raw_chars' in fields and 'final_chars' in fields:
                 parts.append(f'{fields["raw_chars"]}->{fields["final_chars"]}字')
             if 'context_chars' in fields and fields['context_chars'] != '0':
                 parts.append(f'context {fields["context_chars"]}字')
+            if 'context_tokens' in fields:
+                budget = f'/{fields["context_budget"]}' if fields.get('context_budget') not in (None, '0') else ''
+                parts.append(f'ctx ~{fields["context_tokens"]}{budget}tok')
+                if fields.get('context_dropped') not in (None, '0'):
+                    parts.append(f'dropped {fields["context_dropped"]}字')
             lines = [
                 f'{self._stamp()} {self._badge("POST", "1;32")} {" | ".join(parts)}'
             ]
@@ -1572,6 +1683,8 @@ class _DictationLogFormatter:
             llm_tail = f'llm stream {state.llm_stream_ms}ms / {max(1, state.llm_stream_chunks)} chunks'
         elif state.llm_used:
             llm_tail = f'llm {state.llm_ms}ms'
+        elif state.llm_skipped_reason:
+            llm_tail = f'llm skipped ({state.llm_skipped_reason})'
         else:
             llm_tail = 'llm skipped'
         head_parts = [
@@ -1688,6 +1801,7 @@ class _DictationLogFormatter:
             'capture_ms': state.capture_ms,
             'flush_roundtrip_ms': state.flush_roundtrip_ms,
             'context_capture_ms': state.context_capture_ms,
+            'context_helper': state.context_helper,
             'context_wait_ms': state.context_wait_ms,
             'context_overlap_ms': state.context_overlap_ms,
             'context_status': state.context_status,
@@ -1695,11 +1809,22 @@ class _DictationLogFormatter:
             'context_source': None if state.context_source == '-' else state.context_source,
             'context_surface': None if state.context_surface == '-' else state.context_surface,
             'context_chars': state.context_chars,
+            'context_tokens': state.context_tokens,
+            'context_dropped_chars': state.context_dropped_chars,
             'asr_infer_ms': state.asr_infer_ms,
             'asr_total_ms': state.asr_total_ms,
             'llm_used': state.llm_used,
             'llm_stream_used': state.llm_stream_used,
             'llm_first_token_ms': state.llm_first_token_ms,
+            'llm_connect_ms': state.llm_connect_ms,
+            'llm_ttfb_ms': state.llm_ttfb_ms,
+            'llm_cache_hit': state.llm_cache_hit,
+            'llm_hedged': state.llm_hedged,
+            'llm_hedge_winner': state.llm_hedge_winner,
+            'llm_circuit_state': state.llm_circuit_state,
+            'llm_gate_checked': state.llm_gate_checked,
+            'llm_skipped_reason': state.llm_skipped_reason,
+            'llm_timeout_sec': state.llm_timeout_sec,
             'llm_ms': state.llm_ms,
             'llm_stream_ms': state.llm_stream_ms,
             'llm_stream_chunks': state.llm_stream_chunks,
@@ -1713,6 +1838,8 @@ class _DictationLogFormatter:
             'partial_stable_advance_count': state.partial_stable_advance_count,
             'partial_jobs_started': state.partial_jobs_started,
             'partial_jobs_completed': state.partial_jobs_completed,
+            'partial_jobs_cancelled': state.partial_jobs_cancelled,
+            'partial_cancelled_wasted_ms': state.partial_cancelled_wasted_ms,
             'partial_reused_chars': state.partial_reused_chars,
             'partial_stable_chars': state.partial_stable_chars,
             'partial_sent_count': state.partial_sent_count,
@@ -1926,7 +2053,7 @@ def _build_dictation_runtime_busy_message(state, *, requested_model: str) -> str
 
 
 def _ensure_asr_runtime_available_for_dictation(config: VoxConfig, *, requested_model: str) -> None:
-    busy, state = probe_runtime_lock(config, 'asr_infer')
+    busy, state = probe_runtime_lock(config, 'asr_session_server')
     if not busy:
         return
     raise RuntimeError(_build_dictation_runtime_busy_message(state, requested_model=requested_model))
@@ -2044,6 +2171,16 @@ def _int_field(payload: dict[str, object], key: str) -> int:
         return 0
 
 
+def _float_field(payload: dict[str, object], key: str) -> float:
+    value = payload.get(key)
+    if value in (None, ''):
+        return 0.0
+    try:
+        return float(value)
+    except Exception:
+        return 0.0
+
+
 def _bool_field(payload: dict[str, object], key: str) -> bool:
     value = payload.get(key)
     if isinstance(value, bool):
@@ -2136,6 +2273,8 @@ def _expand_agent_config(payload: dict[str, object]) -> dict[str, object]:
         'hints_enabled': _bool_field(payload, 'ie'),
         'hint_count': _int_field(payload, 'in'),
     }
+    if 'ct' in payload:
+        expanded['context_max_tokens'] = _int_field(payload, 'ct')
     if 'dp' in payload:
         expanded['prompt_preset'] = payload.get('dp')
     if 'cp' in payload:
@@ -2144,7 +2283,7 @@ def _expand_agent_config(payload: dict[str, object]) -> dict[str, object]:
 
 
 def _expand_agent_utterance(payload: dict[str, object]) -> dict[str, object]:
-    return {
+    expanded = {
         'utterance_id': _int_field(payload, 'u'),
         'audio_ms': _int_field(payload, 'aud'),
         'capture_ms': _int_field(payload, 'cap'),
@@ -2183,6 +2322,29 @@ def _expand_agent_utterance(payload: dict[str, object]) -> dict[str, object]:
         'guard_fallback': _bool_field(payload, 'gf'),
         'guard_reason': payload.get('gr'),
     }
+    if 'lcn' in payload:
+        expanded['llm_connect_ms'] = _int_field(payload, 'lcn')
+    if 'ltb' in payload:
+        expanded['llm_ttfb_ms'] = _int_field(payload, 'ltb')
+    if 'lch' in payload:
+        expanded['llm_cache_hit'] = _bool_field(payload, 'lch')
+    if 'lhg' in payload:
+        expanded['llm_hedged'] = _bool_field(payload, 'lhg')
+        expanded['llm_hedge_winner'] = payload.get('lhw')
+    if 'lcs' in payload:
+        expanded['llm_circuit_state'] = payload.get('lcs')
+        expanded['llm_timeout_sec'] = _float_field(payload, 'lt')
+    if 'lsr' in payload:
+        expanded['llm_skipped_reason'] = payload.get('lsr')
+    if 'ctxh' in payload:
+        expanded['context_helper'] = _bool_field(payload, 'ctxh')
+    if 'ctxt' in payload:
+        expanded['context_tokens'] = _int_field(payload, 'ctxt')
+        expanded['context_dropped_chars'] = _int_field(payload, 'ctxd')
+    if 'pjx' in payload:
+        expanded['partial_jobs_cancelled'] = _int_field(payload, 'pjx')
+        expanded['partial_cancelled_wasted_ms'] = _int_field(payload, 'pxw')
+    return expanded
 
 
 def _expand_agent_error(payload: dict[str, object]) -> dict[str, object]:
@@ -2210,6 +2372,111 @@ def _metric_stat(metrics: dict[str, dict[str, int]], metric: str, stat: str) ->
     return int(metrics.get(metric, {}).get(stat, 0) or 0)
 
 
+def _build_commit_summary(utterance_events: list[dict[str, object]]) -> dict[str, object]:
+    modes: dict[str, int] = {}
+    flush_ms_reuse: list[int] = []
+    flush_ms_full: list[int] = []
+    for event in utterance_events:
+        mode = event.get('cm')
+        if not mode:
+            continue
+        mode = str(mode)
+        modes[mode] = modes.get(mode, 0) + 1
+        if 'fl' in event:
+            (flush_ms_reuse if mode.startswith('reuse_') else flush_ms_full).append(_int_field(event, 'fl'))
+    total = sum(modes.values())
+    reused = sum(count for mode, count in modes.items() if mode.startswith('reuse_'))
+    summary: dict[str, object] = {
+        'instrumented': total > 0,
+        'modes': dict(sorted(modes.items())),
+        'reuse_rate': int(round((reused / total) * 100)) if total else 0,
+    }
+    if (reuse_summary := _metric_summary(flush_ms_reuse)) is not None:
+        summary['flush_ms_reuse'] = reuse_summary
+    if (full_summary := _metric_summary(flush_ms_full)) is not None:
+        summary['flush_ms_full'] = full_summary
+    return summary
+
+
+def _build_llm_cache_summary(utterance_events: list[dict[str, object]]) -> dict[str, object]:
+    lookups = [event for event in utterance_events if 'lch' in event]
+    hits = sum(1 for event in lookups if _bool_field(event, 'lch'))
+    hit_llm_ms = [_int_field(event, 'llm') for event in lookups if _bool_field(event, 'lch')]
+    miss_llm_ms = [_int_field(event, 'llm') for event in lookups if not _bool_field(event, 'lch')]
+    summary: dict[str, object] = {
+        'instrumented': bool(lookups),
+        'lookups': len(lookups),
+        'hits': hits,
+        'hit_rate': int(round((hits / len(lookups)) * 100)) if lookups else 0,
+    }
+    if (hit_summary := _metric_summary(hit_llm_ms)) is not None:
+        summary['llm_ms_hit'] = hit_summary
+    if (miss_summary := _metric_summary(miss_llm_ms)) is not None:
+        summary['llm_ms_miss'] = miss_summary
+    return summary
+
+
+def _build_llm_hedge_summary(utterance_events: list[dict[str, object]]) -> dict[str, object]:
+    calls = [event for event in utterance_events if 'lhg' in event]
+    hedged = [event for event in calls if _bool_field(event, 'lhg')]
+    wins: dict[str, int] = {}
+    for event in hedged:
+        winner = str(event.get('lhw') or '-')
+        wins[winner] = wins.get(winner, 0) + 1
+    return {
+        'instrumented': bool(calls),
+        'calls': len(calls),
+        'hedged': len(hedged),
+        'hedge_rate': int(round((len(hedged) / len(calls)) * 100)) if calls else 0,
+        'wins': dict(sorted(wins.items())),
+        'win_rates': {
+            winner: int(round((count / len(hedged)) * 100))
+            for winner, count in sorted(wins.items())
+        },
+    }
+
+
+def _build_llm_circuit_summary(utterance_events: list[dict[str, object]]) -> dict[str, object]:
+    tracked = [event for event in utterance_events if event.get('lcs')]
+    states: dict[str, int] = {}
+    for event in tracked:
+        circuit_state = str(event['lcs'])
+        states[circuit_state] = states.get(circuit_state, 0) + 1
+    timeouts_ms = [int(_float_field(event, 'lt') * 1000) for event in tracked if 'lt' in event]
+    summary: dict[str, object] = {
+        'instrumented': bool(tracked),
+        'states': dict(sorted(states.items())),
+        'skipped': sum(1 for event in tracked if event['lcs'] == 'open'),
+        'last_state': str(tracked[-1]['lcs']) if tracked else None,
+    }
+    if (timeout_summary := _metric_summary(timeouts_ms)) is not None:
+        summary['timeout_ms'] = timeout_summary
+    return summary
+
+
+def _build_llm_gate_summary(utterance_events: list[dict[str, object]]) -> dict[str, object]:
+    checked = [event for event in utterance_events if _bool_field(event, 'lg')]
+    reasons: dict[str, int] = {}
+    for event in checked:
+        if event.get('lsr'):
+            reason = str(event['lsr'])
+            reasons[reason] = reasons.get(reason, 0) + 1
+    skipped = [event for event in checked if event.get('lsr') and event['lsr'] != 'circuit_open']
+    passed = [event for event in checked if _bool_field(event, 'lu')]
+    summary: dict[str, object] = {
+        'instrumented': bool(checked),
+        'checked': len(checked),
+        'skipped': len(skipped),
+        'skip_rate': int(round((len(skipped) / len(checked)) * 100)) if checked else 0,
+        'reasons': dict(sorted(reasons.items())),
+    }
+    if (skipped_summary := _metric_summary([_int_field(event, 'fl') for event in skipped])) is not None:
+        summary['flush_ms_skipped'] = skipped_summary
+    if (passed_summary := _metric_summary([_int_field(event, 'fl') for event in passed])) is not None:
+        summary['flush_ms_llm'] = passed_summary
+    return summary
+
+
 def _build_partial_pipeline_summary(utterance_events: list[dict[str, object]]) -> dict[str, object]:
     analyzed = len(utterance_events)
     instrumented = any(
@@ -2239,7 +2506,7 @@ def _build_partial_pipeline_summary(utterance_events: list[dict[str, object]]) -
     skip_rate = int(round((skipped_total / attempted_total) * 100)) if attempted_total else 0
     reused_nonzero = [value for value in reused_chars_values if value > 0]
 
-    return {
+    summary: dict[str, object] = {
         'instrumented': instrumented,
         'active': active_utterances > 0,
         'analyzed_utterances': analyzed,
@@ -2259,6 +2526,10 @@ def _build_partial_pipeline_summary(utterance_events: list[dict[str, object]]) -
         'reused_chars_max': max(reused_chars_values) if reused_chars_values else 0,
         'stable_chars_max': max(stable_chars_values) if stable_chars_values else 0,
     }
+    if any('pjx' in event for event in utterance_events):
+        summary['jobs_cancelled_total'] = sum(_int_field(event, 'pjx') for event in utterance_events)
+        summary['cancelled_wasted_ms_total'] = sum(_int_field(event, 'pxw') for event in utterance_events)
+    return summary
 
 
 def _build_digest_diagnosis(
@@ -2374,7 +2645,7 @@ def _build_digest_diagnosis(
         next_actions.append('先做一次关闭 LLM 的对照测试，确认尾延迟是否主要来自润色')
         next_actions.append('优先换更快的 LLM 或 provider，再复测首包时间')
         if context_enabled:
-            next_actions.append('把 context_max_chars 下调后复测，确认 prompt 长度是否影响首包')
+            next_actions.append('把 context max_tokens 下调后复测，确认 prompt 长度是否影响首包')
     elif 'context_wait_blocking' in signals:
         next_actions.append('先降低 context_max_chars，必要时临时关闭 context 复测')
     elif 'llm_stream_tail_slow' in signals:
@@ -2448,10 +2719,14 @@ def build_dictation_agent_digest(
         ('capture_ms', 'cap', True, None),
         ('flush_ms', 'fl', True, None),
         ('context_capture_ms', 'ctxc', True, None),
+        ('context_capture_helper_ms', 'ctxc', False, lambda event: _bool_field(event, 'ctxh')),
+        ('context_capture_oneshot_ms', 'ctxc', False, lambda event: not _bool_field(event, 'ctxh')),
         ('context_wait_ms', 'ctxw', True, None),
         ('asr_ms', 'asr', True, None),
         ('asr_total_ms', 'asrt', True, None),
         ('llm_first_token_ms', 'ft', False, lambda event: _bool_field(event, 'lu')),
+        ('llm_connect_ms', 'lcn', True, lambda event: _bool_field(event, 'lu')),
+        ('llm_ttfb_ms', 'ltb', False, lambda event: _bool_field(event, 'lu')),
         ('llm_ms', 'llm', False, lambda event: _bool_field(event, 'lu')),
         ('llm_stream_tail_ms', 'lst', False, lambda event: _bool_field(event, 'ls')),
         ('type_ms', 'ty', True, None),
@@ -2463,6 +2738,8 @@ def build_dictation_agent_digest(
         ('partial_stable_advance_count', 'psa', True, None),
         ('partial_jobs_started', 'pjs', True, None),
         ('partial_jobs_completed', 'pjc', True, None),
+        ('partial_jobs_cancelled', 'pjx', True, None),
+        ('partial_cancelled_wasted_ms', 'pxw', True, None),
         ('partial_reused_chars', 'prc', True, None),
         ('partial_stable_chars', 'psc', True, None),
         ('partial_sent_count', 'psn', True, None),
@@ -2543,6 +2820,11 @@ def build_dictation_agent_digest(
         'config': digest_config,
         'metrics': metrics,
         'partial_pipeline': partial_pipeline,
+        'commit': _build_commit_summary(utterance_events),
+        'llm_cache': _build_llm_cache_summary(utterance_events),
+        'llm_hedge': _build_llm_hedge_summary(utterance_events),
+        'llm_circuit': _build_llm_circuit_summary(utterance_events),
+        'llm_gate': _build_llm_gate_summary(utterance_events),
         'bottlenecks': bottlenecks,
         'trends': trends,
         'diagnosis': _build_digest_diagnosis(
@@ -2589,7 +2871,7 @@ def launch_dictation(
         verbose=verbose,
         type_partial=type_partial,
         subtitle_overlay=subtitle_overlay,
-        background_partial_streaming=False,
+        background_partial_streaming=bool(config.dictation.llm.enabled and config.dictation.incremental.enabled),
     )
     ensure_dictation_dirs(config)
     port = port or pick_free_port(host)
@@ -2599,6 +2881,26 @@ def launch_dictation(
     _prepare_dictation_log(agent_log_path, config)
     ensure_model_downloaded(config, spec, allow_download=True)
     session_id = uuid.uuid4().hex[:8]
+    budget_fits, budget_holders, budget_position = probe_memory_budget(
+        config,
+        estimate_resident_mb(spec),
+        priority='interactive',
+    )
+    if not budget_fits:
+        sys.stderr.write(
+            f'Memory budget busy; waiting for {budget_holders}, position {budget_position} '
+            f'(up to {_DICTATION_BUDGET_WAIT_SEC}s)\n'
+        )
+        sys.stderr.flush()
+        _write_dual_log_event(
+            log_path,
+            agent_path=agent_log_path,
+            event='launch.budget_wait',
+            session_id=session_id,
+            holders=budget_holders,
+            position=budget_position,
+            wait_timeout_sec=_DICTATION_BUDGET_WAIT_SEC,
+        )
     helper_version = _helper_version(binary)
     helper_mtime = _helper_mtime(binary)
 
@@ -2618,6 +2920,9 @@ def launch_dictation(
         '--model',
         resolved_model,
         '--dictation-postprocess',
+        '--wait',
+        '--wait-timeout',
+        str(_DICTATION_BUDGET_WAIT_SEC),
     ]
     if llm_timeout_sec is not None:
         server_cmd.extend(['--dictation-llm-timeout-sec', str(llm_timeout_sec)])
@@ -2707,7 +3012,12 @@ def launch_dictation(
             server_cmd=server_cmd,
         )
         try:
-            wait_for_session_server(host, port, server_proc=server_proc)
+            wait_for_session_server(
+                host,
+                port,
+                timeout=60.0 + (0 if budget_fits else _DICTATION_BUDGET_WAIT_SEC),
+                server_proc=server_proc,
+            )
         except Exception as error:
             _write_dual_log_event(
                 log_path,
@@ -6,7 +6,7 @@ import json
 from pathlib import Path
 import socket
 import time
-from typing import Any
+from typing import Any, Literal
 from urllib.parse import parse_qs, urlparse
 import webbrowser
 
@@ -83,7 +83,14 @@ def _default_ui_llm_profiles() -> dict[str, DictationUiLlmProfilePayload]:
 class DictationUiContextPayload(BaseModel):
     enabled: bool = False
     max_chars: int = 1200
+    max_tokens: int = 800
     capture_budget_ms: int = 1200
+    persistent_helper: bool = False
+    cache_ttl_ms: int = 3000
+    page_extractor: Literal['walker', 'clone'] = 'walker'
+    watch_enabled: bool = False
+    watch_interval_ms: int = 500
+    watch_max_age_ms: int = 1500
 
 
 class DictationUiHotwordsPayload(BaseModel):
@@ -173,7 +180,14 @@ def build_dictation_ui_state(config: VoxConfig) -> dict[str, Any]:
         context=DictationUiContextPayload(
             enabled=live.dictation.context.enabled,
             max_chars=live.dictation.context.max_chars,
+            max_tokens=live.dictation.context.max_tokens,
             capture_budget_ms=live.dictation.context.capture_budget_ms,
+            persistent_helper=live.dictation.context.persistent_helper,
+            cache_ttl_ms=live.dictation.context.cache_ttl_ms,
+            page_extractor=live.dictation.context.page_extractor,
+            watch_enabled=live.dictation.context.watch_enabled,
+            watch_interval_ms=live.dictation.context.watch_interval_ms,
+            watch_max_age_ms=live.dictation.context.watch_max_age_ms,
         ),
         hotwords=DictationUiHotwordsPayload(
             enabled=live.dictation.hotwords.enabled,
@@ -322,7 +336,14 @@ def render_dictation_ui_sections(
             '[dictation.context]',
             f'enabled = {_toml_bool(state.context.enabled)}',
             f'max_chars = {max(0, int(state.context.max_chars))}',
+            f'max_tokens = {max(0, int(state.context.max_tokens))}',
             f'capture_budget_ms = {max(0, int(state.context.capture_budget_ms))}',
+            f'persistent_helper = {_toml_bool(state.context.persistent_helper)}',
+            f'cache_ttl_ms = {max(0, int(state.context.cache_ttl_ms))}',
+            f'page_extractor = {_toml_string(state.context.page_extractor)}',
+            f'watch_enabled = {_toml_bool(state.context.watch_enabled)}',
+            f'watch_interval_ms = {max(50, int(state.context.watch_interval_ms))}',
+            f'watch_max_age_ms = {max(0, int(state.context.watch_max_age_ms))}',
             '',
             '[dictation.hotwords]',
             f'enabled = {_toml_bool(state.hotwords.enabled)}',
@@ -1784,10 +1805,42 @@ _DICTATION_UI_HTML = r"""<!doctype html>
                   </div>
                 </div>
               </div>
+              <div class="setting-row">
+                <div class="setting-copy">
+                  <strong>常驻抓取进程</strong>
+                  <p>省掉每次启动 osascript</p>
+                </div>
+                <div class="setting-control">
+                  <div class="toggle-row">
+                    <label class="switch"><input type="checkbox" id="contextPersistentHelper" />启用</label>
+                  </div>
+                </div>
+              </div>
+              <div class="setting-row">
+                <div class="setting-copy">
+                  <strong>后台盯焦点</strong>
+                  <p>按住说话时直接用最近一次快照</p>
+                </div>
+                <div class="setting-control">
+                  <div class="toggle-row">
+                    <label class="switch"><input type="checkbox" id="contextWatchEnabled" />启用</label>
+                  </div>
+                  <div class="row-grid">
+                    <div class="field">
+                      <label for="contextWatchIntervalMs">轮询毫秒</label>
+                      <input id="contextWatchIntervalMs" type="number" min="50" step="100" />
+                    </div>
+                    <div class="field">
+                      <label for="contextWatchMaxAgeMs">快照有效毫秒</label>
+                      <input id="contextWatchMaxAgeMs" type="number" min="0" step="100" />
+                    </div>
+                  </div>
+                </div>
+              </div>
               <div class="setting-row">
                 <div class="setting-copy">
                   <strong>预算</strong>
-                  <p>字符与时间</p>
+                  <p>字符、token 与时间</p>
                 </div>
                 <div class="setting-control">
                   <div class="row-grid">
@@ -1795,10 +1848,18 @@ _DICTATION_UI_HTML = r"""<!doctype html>
                       <label for="contextMaxChars">最大字数</label>
                       <input id="contextMaxChars" type="number" min="0" step="50" />
                     </div>
+                    <div class="field">
+                      <label for="contextMaxTokens">token 预算</label>
+                      <input id="contextMaxTokens" type="number" min="0" step="50" />
+                    </div>
                     <div class="field">
                       <label for="contextCaptureBudgetMs">预算毫秒</label>
                       <input id="contextCaptureBudgetMs" type="number" min="0" step="50" />
                     </div>
+                    <div class="field">
+                      <label for="contextCacheTtlMs">页面缓存毫秒</label>
+                      <input id="contextCacheTtlMs" type="number" min="0" step="500" />
+                    </div>
                   </div>
                 </div>
               </div>
@@ -2137,7 +2198,14 @@ _DICTATION_UI_HTML = r"""<!doctype html>
         context: {
           enabled: false,
           max_chars: 1200,
+          max_tokens: 800,
           capture_budget_ms: 1200,
+          persistent_helper: false,
+          cache_ttl_ms: 3000,
+          page_extractor: 'walker',
+          watch_enabled: false,
+          watch_interval_ms: 500,
+          watch_max_age_ms: 1500,
         },
         hotwords: {
           enabled: false,
@@ -2288,7 +2356,14 @@ _DICTATION_UI_HTML = r"""<!doctype html>
       nextState.context = {
         enabled: $('contextEnabled').checked,
         max_chars: readNumber('contextMaxChars', 1200),
+        max_tokens: readNumber('contextMaxTokens', 800),
         capture_budget_ms: readNumber('contextCaptureBudgetMs', 1200),
+        persistent_helper: $('contextPersistentHelper').checked,
+        cache_ttl_ms: readNumber('contextCacheTtlMs', 3000),
+        page_extractor: (nextState.context && nextState.context.page_extractor) || 'walker',
+        watch_enabled: $('contextWatchEnabled').checked,
+        watch_interval_ms: readNumber('contextWatchIntervalMs', 500),
+        watch_max_age_ms: readNumber('contextWatchMaxAgeMs', 1500),
       };
       nextState.hotwords = {
         enabled: $('hotwordsEnabled').checked,
@@ -2354,7 +2429,13 @@ _DICTATION_UI_HTML = r"""<!doctype html>
 
       $('contextEnabled').checked = !!current.context.enabled;
       $('contextMaxChars').value = current.context.max_chars ?? 1200;
+      $('contextMaxTokens').value = current.context.max_tokens ?? 800;
       $('contextCaptureBudgetMs').value = current.context.capture_budget_ms ?? 1200;
+      $('contextPersistentHelper').checked = !!current.context.persistent_helper;
+      $('contextCacheTtlMs').value = current.context.cache_ttl_ms ?? 3000;
+      $('contextWatchEnabled').checked = !!current.context.watch_enabled;
+      $('contextWatchIntervalMs').value = current.context.watch_interval_ms ?? 500;
+      $('contextWatchMaxAgeMs').value = current.context.watch_max_age_ms ?? 1500;
 
       $('hotwordsEnabled').checked = !!current.hotwords.enabled;
       $('rewriteAliases').checked = !!current.hotwords.rewrite_aliases;
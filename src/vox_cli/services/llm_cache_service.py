@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+_CACHE_FILE_VERSION = 1
+_DEFAULT_FLUSH_DELAY_SEC = 2.0
+
+
+# 写盘做了合并延迟，进程正常退出时补写一次；每个路径只记最新的实例，旧实例的快照不会在退出时盖掉新内容。
+_PERSISTENT_CACHES: weakref.WeakValueDictionary[Path, LLMResultCache] = weakref.WeakValueDictionary()
+
+
+def _flush_persistent_caches() -> None:
+    for cache in list(_PERSISTENT_CACHES.values()):
+        cache.flush()
+
+
+atexit.register(_flush_persistent_caches)
+
+
+def fingerprint(*parts: Any) -> str:
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResultCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        path: Path | None = None,
+        flush_delay_sec: float = _DEFAULT_FLUSH_DELAY_SEC,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.path = path
+        self.flush_delay_sec = max(0.0, float(flush_delay_sec))
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._loaded = path is None
+        self._dirty = False
+        self._flush_timer: threading.Timer | None = None
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            _PERSISTENT_CACHES[path] = self
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load_locked()
+            return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            self._load_locked()
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._load_locked()
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path is None:
+                return
+            self._dirty = True
+            if self.flush_delay_sec <= 0:
+                self._flush_locked()
+            elif self._flush_timer is None:
+                # 连续写入只在延迟结束后整体落盘一次，避免每条结果都重写整个 JSON 文件。
+                self._flush_timer = threading.Timer(self.flush_delay_sec, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._dirty = False
+            self._cancel_timer_locked()
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+    def _flush_locked(self) -> None:
+        self._cancel_timer_locked()
+        if not self._dirty or self.path is None:
+            return
+        self._dirty = False
+        self._save_locked()
+
+    def _cancel_timer_locked(self) -> None:
+        timer = self._flush_timer
+        self._flush_timer = None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+
+    def _load_locked(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if not isinstance(payload, dict) or payload.get('version') != _CACHE_FILE_VERSION:
+            return
+        for item in payload.get('entries', [])[-self.max_entries :]:
+            if isinstance(item, list) and len(item) == 2 and all(isinstance(value, str) for value in item):
+                self._entries[item[0]] = item[1]
+
+    def _save_locked(self) -> None:
+        assert self.path is not None
+        entries = list(self._entries.items())
+        tmp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(
+                json.dumps({'version': _CACHE_FILE_VERSION, 'entries': entries}, ensure_ascii=False),
+                encoding='utf-8',
+            )
+            os.replace(tmp_path, self.path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class LLMCircuitBreaker:
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 3,
+        cooldown_sec: float = 30.0,
+        window: int = 50,
+        min_samples: int = 8,
+        timeout_factor: float = 2.0,
+        min_timeout_sec: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_sec = max(0.0, float(cooldown_sec))
+        self.min_samples = max(1, int(min_samples))
+        self.timeout_factor = max(1.0, float(timeout_factor))
+        self.min_timeout_sec = max(0.1, float(min_timeout_sec))
+        self._clock = clock
+        self._lock = threading.Lock()
+        # 每个样本记 (耗时, 输入字数)，自适应超时按输入长度缩放。
+        self._samples: deque[tuple[int, int]] = deque(maxlen=max(1, int(window)))
+        self._state = CIRCUIT_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    @property
+    def consecutive_failures(self) -> int:
+        with self._lock:
+            return self._consecutive_failures
+
+    def acquire(self) -> tuple[bool, str]:
+        with self._lock:
+            if self._state == CIRCUIT_OPEN and self._clock() - self._opened_at >= self.cooldown_sec:
+                self._state = CIRCUIT_HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == CIRCUIT_OPEN:
+                return False, self._state
+            if self._state == CIRCUIT_HALF_OPEN:
+                if self._probe_in_flight:
+                    return False, self._state
+                self._probe_in_flight = True
+            return True, self._state
+
+    def release(self) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self, latency_ms: int | None, *, input_chars: int = 0) -> None:
+        with self._lock:
+            if latency_ms is not None:
+                self._samples.append((max(0, int(latency_ms)), max(0, int(input_chars))))
+            self._state = CIRCUIT_CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if self._state == CIRCUIT_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = CIRCUIT_OPEN
+                self._opened_at = self._clock()
+
+    def effective_timeout(self, configured_sec: float, *, input_chars: int = 0) -> float:
+        with self._lock:
+            samples = list(self._samples)
+        if len(samples) < self.min_samples:
+            return configured_sec
+        latencies = sorted(latency for latency, _ in samples)
+        p95_ms = latencies[min(len(latencies) - 1, math.ceil(len(latencies) * 0.95) - 1)]
+        sample_chars = sorted(chars for _, chars in samples)
+        typical_chars = sample_chars[len(sample_chars) // 2]
+        scale = max(1.0, input_chars / typical_chars) if typical_chars > 0 else 1.0
+        adaptive_sec = p95_ms * self.timeout_factor * scale / 1000
+        return round(min(configured_sec, max(self.min_timeout_sec, adaptive_sec)), 2)
@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import http.client
+import io
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+_DEFAULT_IDLE_TIMEOUT_SEC = 30.0
+_DEFAULT_MAX_IDLE_PER_HOST = 4
+_DRAIN_TIMEOUT_SEC = 0.2
+_RECONNECT_ERRORS = (
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    http.client.RemoteDisconnected,
+)
+
+_PoolKey = tuple[str, str, int]
+
+
+def _elapsed_ms(started_at: float) -> int:
+    return int((time.perf_counter() - started_at) * 1000)
+
+
+class LLMCallCancelledError(RuntimeError):
+    pass
+
+
+class LLMCancelToken:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._response: Any = None
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def attach(self, response: Any) -> None:
+        with self._lock:
+            self._response = response
+            cancelled = self._cancelled
+        if cancelled:
+            _abort_response(response)
+            raise LLMCallCancelledError('LLM request cancelled')
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def detach(self) -> None:
+        with self._lock:
+            self._response = None
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            response = self._response
+            callbacks = list(self._callbacks)
+            self._callbacks.clear()
+        if response is not None:
+            _abort_response(response)
+        for callback in callbacks:
+            callback()
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled:
+            raise LLMCallCancelledError('LLM request cancelled')
+
+
+def _proxy_applies(scheme: str, host: str) -> bool:
+    # 配置了代理且未被 NO_PROXY 排除时交回 urllib 处理代理，连接池只直连目标主机。
+    if not urllib.request.getproxies().get(scheme):
+        return False
+    return not urllib.request.proxy_bypass(host)
+
+
+def _abort_response(response: Any) -> None:
+    abort = getattr(response, 'abort', None)
+    if callable(abort):
+        abort()
+
+
+class _TimedOpenMixin:
+    connect_ms = 0
+    ttfb_ms = 0
+    sock: socket.socket | None = None
+
+    def do_open(self, http_class, req, **http_conn_args):
+        def connection_factory(host, **kwargs):
+            connection = http_class(host, **kwargs)
+            connect = connection.connect
+
+            def timed_connect() -> None:
+                connect_started_at = time.perf_counter()
+                connect()
+                self.connect_ms = _elapsed_ms(connect_started_at)
+                self.sock = connection.sock
+
+            connection.connect = timed_connect
+            return connection
+
+        started_at = time.perf_counter()
+        self.connect_ms = 0
+        response = super().do_open(connection_factory, req, **http_conn_args)
+        self.ttfb_ms = max(0, _elapsed_ms(started_at) - self.connect_ms)
+        return response
+
+
+class _TimedHTTPHandler(_TimedOpenMixin, urllib.request.HTTPHandler):
+    pass
+
+
+class _TimedHTTPSHandler(_TimedOpenMixin, urllib.request.HTTPSHandler):
+    pass
+
+
+class ProxiedHTTPResponse:
+    def __init__(self, response: Any, sock: socket.socket | None, *, connect_ms: int, ttfb_ms: int) -> None:
+        self._response = response
+        self._sock = sock
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.connect_ms = connect_ms
+        self.ttfb_ms = ttfb_ms
+        self.reused = False
+
+    def read(self, amt: int | None = None) -> bytes:
+        return self._response.read(amt)
+
+    def readline(self) -> bytes:
+        return self._response.readline()
+
+    def getheader(self, name: str, default: Any = None) -> Any:
+        return self._response.getheader(name, default)
+
+    def abort(self) -> None:
+        if self._sock is None:
+            return
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self._response.close()
+
+    def __enter__(self) -> ProxiedHTTPResponse:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def _open_via_proxy(request: urllib.request.Request, timeout: float) -> ProxiedHTTPResponse:
+    http_handler = _TimedHTTPHandler()
+    https_handler = _TimedHTTPSHandler()
+    response = urllib.request.build_opener(http_handler, https_handler).open(request, timeout=timeout)
+    handler = https_handler if https_handler.sock is not None else http_handler
+    return ProxiedHTTPResponse(response, handler.sock, connect_ms=handler.connect_ms, ttfb_ms=handler.ttfb_ms)
+
+
+@dataclass
+class _IdleConnection:
+    connection: http.client.HTTPConnection
+    released_at: float
+
+
+class PooledHTTPResponse:
+    def __init__(
+        self,
+        pool: LLMConnectionPool,
+        key: _PoolKey,
+        connection: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+        sock: socket.socket | None,
+        *,
+        connect_ms: int,
+        ttfb_ms: int,
+        reused: bool,
+    ) -> None:
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self._sock = sock
+        self._closed = False
+        self._aborted = False
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.msg
+        self.connect_ms = connect_ms
+        self.ttfb_ms = ttfb_ms
+        self.reused = reused
+
+    def read(self, amt: int | None = None) -> bytes:
+        return self._response.read(amt)
+
+    def readline(self) -> bytes:
+        return self._response.readline()
+
+    def getheader(self, name: str, default: Any = None) -> Any:
+        return self._response.getheader(name, default)
+
+    def abort(self) -> None:
+        self._aborted = True
+        if self._sock is None:
+            return
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self, *, reusable: bool = True) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if reusable and not self._aborted and not self._response.will_close and self._drain():
+            self._response.close()
+            self._pool._release(self._key, self._connection)
+            return
+        self._response.close()
+        self._connection.close()
+
+    def _drain(self) -> bool:
+        if self._response.isclosed():
+            return True
+        sock = self._connection.sock
+        if sock is None:
+            return False
+        previous_timeout = sock.gettimeout()
+        try:
+            sock.settimeout(_DRAIN_TIMEOUT_SEC)
+            self._response.read()
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            try:
+                sock.settimeout(previous_timeout)
+            except OSError:
+                pass
+        return self._response.isclosed()
+
+    def __enter__(self) -> PooledHTTPResponse:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close(reusable=exc_type is None)
+        return False
+
+
+class LLMConnectionPool:
+    def __init__(
+        self,
+        *,
+        idle_timeout_sec: float = _DEFAULT_IDLE_TIMEOUT_SEC,
+        max_idle_per_host: int = _DEFAULT_MAX_IDLE_PER_HOST,
+    ) -> None:
+        self.idle_timeout_sec = idle_timeout_sec
+        self.max_idle_per_host = max(1, max_idle_per_host)
+        self._lock = threading.Lock()
+        self._idle: dict[_PoolKey, list[_IdleConnection]] = {}
+        self._ssl_context: ssl.SSLContext | None = None
+
+    def urlopen(self, request: urllib.request.Request, timeout: float) -> Any:
+        parts = urlsplit(request.full_url)
+        scheme = parts.scheme.lower()
+        if scheme not in {'http', 'https'} or not parts.hostname:
+            raise urllib.error.URLError(f'unsupported LLM endpoint: {request.full_url}')
+        if _proxy_applies(scheme, parts.hostname):
+            return _open_via_proxy(request, timeout)
+        key: _PoolKey = (scheme, parts.hostname, parts.port or (443 if scheme == 'https' else 80))
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        headers = dict(request.header_items())
+        method = request.get_method()
+
+        for attempt in range(2):
+            connection, reused = self._checkout(key, timeout)
+            connect_ms = 0
+            try:
+                if connection.sock is None:
+                    connect_started_at = time.perf_counter()
+                    connection.connect()
+                    connect_ms = _elapsed_ms(connect_started_at)
+                sock = connection.sock
+                sent_at = time.perf_counter()
+                connection.request(method, path, body=request.data, headers=headers)
+                response = connection.getresponse()
+            except _RECONNECT_ERRORS as error:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise urllib.error.URLError(error) from error
+            except (OSError, http.client.HTTPException) as error:
+                connection.close()
+                raise urllib.error.URLError(error) from error
+
+            pooled = PooledHTTPResponse(
+                self,
+                key,
+                connection,
+                response,
+                sock,
+                connect_ms=connect_ms,
+                ttfb_ms=_elapsed_ms(sent_at),
+                reused=reused,
+            )
+            if response.status >= 400:
+                try:
+                    body = pooled.read()
+                finally:
+                    pooled.close()
+                raise urllib.error.HTTPError(
+                    request.full_url,
+                    response.status,
+                    response.reason,
+                    response.msg,
+                    io.BytesIO(body),
+                )
+            return pooled
+        raise urllib.error.URLError('LLM connection retry exhausted')
+
+    def idle_count(self, base_url: str | None = None) -> int:
+        with self._lock:
+            if base_url is None:
+                return sum(len(items) for items in self._idle.values())
+            parts = urlsplit(base_url)
+            scheme = parts.scheme.lower()
+            key = (scheme, parts.hostname or '', parts.port or (443 if scheme == 'https' else 80))
+            return len(self._idle.get(key, []))
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [item for items in self._idle.values() for item in items]
+            self._idle.clear()
+        for item in idle:
+            item.connection.close()
+
+    def _checkout(self, key: _PoolKey, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        expired: list[http.client.HTTPConnection] = []
+        connection: http.client.HTTPConnection | None = None
+        with self._lock:
+            now = time.monotonic()
+            for pool_key in list(self._idle):
+                fresh = []
+                for item in self._idle[pool_key]:
+                    if now - item.released_at > self.idle_timeout_sec:
+                        expired.append(item.connection)
+                    else:
+                        fresh.append(item)
+                if fresh:
+                    self._idle[pool_key] = fresh
+                else:
+                    del self._idle[pool_key]
+            idle = self._idle.get(key)
+            if idle:
+                connection = idle.pop().connection
+                if not idle:
+                    del self._idle[key]
+        for stale in expired:
+            stale.close()
+
+        if connection is not None and connection.sock is not None:
+            connection.timeout = timeout
+            connection.sock.settimeout(timeout)
+            return connection, True
+        return self._new_connection(key, timeout), False
+
+    def _new_connection(self, key: _PoolKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _release(self, key: _PoolKey, connection: http.client.HTTPConnection) -> None:
+        if connection.sock is None:
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(_IdleConnection(connection=connection, released_at=time.monotonic()))
+                return
+        connection.close()
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import asyncio
-from contextlib import suppress
+from contextlib import ExitStack, suppress
 import json
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Callable
 
@@ -12,22 +12,31 @@ import numpy as np
 import websockets
 from websockets.server import WebSocketServerProtocol
 
-from ..config import VoxConfig, resolve_dictation_prompt_selection
-from ..runtime import RuntimeExecutionOptions, acquire_runtime_lock
+from ..cache import estimate_resident_mb
+from ..config import DictationHotwordsConfig, VoxConfig, resolve_dictation_prompt_selection
+from ..runtime import RuntimeExecutionOptions, acquire_memory_budget, acquire_runtime_lock
 from .asr_service import _extract_text, _map_language
 from .dictation_postprocess_service import (
     DictationPostprocessResult,
     DictationTextPostprocessor,
+    PreviewMemo,
     apply_dictation_transforms,
+    apply_hotword_aliases,
     build_dictation_postprocessor,
     has_dictation_hints,
     has_dictation_hotwords,
     has_dictation_transforms,
+    should_rewrite_hotword_aliases,
 )
+from .llm_http_service import LLMCancelToken
 from .dictation_context_service import (
     DictationContext,
     DictationContextSnapshot,
+    DictationContextWatcher,
+    PersistentOsascriptRunner,
     capture_dictation_context_snapshot,
+    refresh_dictation_context_snapshot,
+    use_osascript_runner,
 )
 from .model_service import ensure_model_downloaded, resolve_model
 
@@ -38,6 +47,7 @@ PARTIAL_STABLE_MIN_CHARS = 8
 PARTIAL_STABLE_MIN_ADVANCE_CHARS = 4
 STABLE_BREAK_CHARS = frozenset(' \t\r\n,.;:!?)]}>，。；：！？、》】）』」')
 TRIVIAL_COMMIT_SUFFIX_CHARS = frozenset(' \t\r\n,.;:!?)]}>，。；：！？、》】）』」…')
+SENTENCE_FINAL_CHARS = '。！？.!?…'
 
 
 @dataclass
@@ -67,8 +77,13 @@ class IncrementalDictationState:
     queued_raw_text: str | None = None
     queued_language: str | None = None
     task: asyncio.Task[tuple[int, str, DictationPostprocessResult]] | None = None
+    task_cancel: LLMCancelToken | None = None
+    task_started_at: float = 0.0
+    task_utterance_id: int | None = None
+    task_progress_chars: int = 0
     context_snapshot: DictationContextSnapshot | None = None
     completed_candidate: IncrementalPostprocessCandidate | None = None
+    preview_memo: PreviewMemo = field(default_factory=PreviewMemo)
 
 
 @dataclass
@@ -254,6 +269,47 @@ async def _send_transcript(
     )
 
 
+async def _apply_dictation_postprocess_with_progress(
+    websocket: WebSocketServerProtocol,
+    transcript: RealtimeTranscript,
+    postprocessor: DictationTextPostprocessor,
+    **kwargs: Any,
+) -> RealtimeTranscript:
+    loop = asyncio.get_running_loop()
+    updates: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def forward_progress() -> None:
+        last_text = ''
+        while True:
+            pending = [await updates.get()]
+            while not updates.empty():
+                pending.append(updates.get_nowait())
+            if None in pending:
+                return
+            text = pending[-1]
+            if text and text != last_text:
+                await websocket.send(
+                    json.dumps(
+                        {'type': 'final_progress', 'utterance_id': transcript.utterance_id, 'text': text},
+                        ensure_ascii=False,
+                    )
+                )
+                last_text = text
+
+    sender = asyncio.create_task(forward_progress())
+    try:
+        return await asyncio.to_thread(
+            _apply_dictation_postprocess,
+            transcript,
+            postprocessor,
+            on_progress=lambda text: loop.call_soon_threadsafe(updates.put_nowait, text),
+            **kwargs,
+        )
+    finally:
+        updates.put_nowait(None)
+        await sender
+
+
 def _format_log_value(value: Any) -> str:
     if isinstance(value, bool):
         return 'true' if value else 'false'
@@ -307,6 +363,7 @@ def _log_dictation_config(config: VoxConfig) -> None:
         custom_prompt_enabled=custom_prompt_enabled if llm.enabled else None,
         context_enabled=context.enabled,
         context_max_chars=context.max_chars if context.enabled else None,
+        context_max_tokens=context.max_tokens if context.enabled else None,
         context_capture_budget_ms=context.capture_budget_ms if context.enabled else None,
         hotwords_enabled=hotwords.enabled,
         hotword_entries=hotword_count if hotwords.enabled else None,
@@ -314,7 +371,7 @@ def _log_dictation_config(config: VoxConfig) -> None:
         case_sensitive=hotwords.case_sensitive if hotwords.enabled else None,
         hints_enabled=hints.enabled,
         hint_count=hint_count if hints.enabled else None,
-        incremental_llm=False if llm.enabled else None,
+        incremental_llm=config.dictation.incremental.enabled if llm.enabled else None,
     )
     if has_dictation_hotwords(hotwords):
         _log_session('dictation_config_hotwords', text=_summarize_hotword_entries(config))
@@ -340,6 +397,9 @@ def _log_dictation_context(
         role=context.element_role if context else None,
         url=context.page_url if context else None,
         capture_ms=snapshot.capture_ms if snapshot else None,
+        helper=snapshot.helper if snapshot else None,
+        cache_hit=snapshot.cache_hit if snapshot else None,
+        age_ms=snapshot.age_ms if snapshot else None,
         selected_chars=len(context.selected_text or '') if context else 0,
         focus_chars=len(context.focus_text or '') if context else 0,
         context_chars=len(context.context_text or '') if context else 0,
@@ -394,6 +454,9 @@ def _log_context_prefetch(
         role=context.element_role if context else None,
         url=context.page_url if context else None,
         capture_ms=snapshot.capture_ms,
+        helper=snapshot.helper,
+        cache_hit=snapshot.cache_hit,
+        age_ms=snapshot.age_ms,
         context_chars=len(context.context_text or '') if context else 0,
         selected_chars=len(context.selected_text or '') if context else 0,
         focus_chars=len(context.focus_text or '') if context else 0,
@@ -401,6 +464,18 @@ def _log_context_prefetch(
     )
 
 
+def _log_context_watch(snapshot: DictationContextSnapshot) -> None:
+    context = snapshot.context
+    _log_session(
+        'dictation_context_watch',
+        state='focus',
+        app=context.app_name if context else None,
+        window=context.window_title if context else None,
+        url=context.page_url if context else None,
+        capture_ms=snapshot.capture_ms,
+    )
+
+
 def _longest_common_prefix(left: str, right: str) -> str:
     limit = min(len(left), len(right))
     index = 0
@@ -469,32 +544,30 @@ def _apply_local_partial_preview(
     stable_raw_text: str = '',
     completed_raw_text: str = '',
     completed_text: str = '',
-    context_snapshot: DictationContextSnapshot | None = None,
+    memo: PreviewMemo | None = None,
 ) -> RealtimeTranscript:
     if postprocessor is None or not transcript.text.strip():
         return transcript
 
     base_text = transcript.text
+    stable_text = stable_raw_text if base_text.startswith(stable_raw_text) else ''
     if completed_raw_text and completed_text and base_text.startswith(completed_raw_text):
         base_text = f'{completed_text}{base_text[len(completed_raw_text):]}'
-    elif stable_raw_text and base_text.startswith(stable_raw_text):
-        base_text = f'{stable_raw_text}{base_text[len(stable_raw_text):]}'
+        stable_text = (
+            f'{completed_text}{stable_text[len(completed_raw_text):]}'
+            if stable_text.startswith(completed_raw_text)
+            else completed_text
+        )
 
-    context = context_snapshot.context if context_snapshot else None
-    preview = postprocessor.process(
-        base_text,
-        language=transcript.language,
-        context=context,
-        allow_llm=False,
-    )
+    preview_started_at = time.perf_counter()
+    preview_text = postprocessor.preview(base_text, memo=memo, stable_prefix=stable_text)
     timings = dict(transcript.timings or {})
-    preview_ms = int(preview.metadata.get('postprocess_ms', 0))
-    timings['preview_postprocess_ms'] = preview_ms
-    timings['preview_changed'] = bool(preview.metadata.get('changed'))
+    timings['preview_postprocess_ms'] = int((time.perf_counter() - preview_started_at) * 1000)
+    timings['preview_changed'] = preview_text != base_text.strip()
     if completed_raw_text and completed_text:
         timings['preview_completed_chars'] = len(completed_text)
     return RealtimeTranscript(
-        text=preview.text,
+        text=preview_text,
         is_partial=True,
         language=transcript.language,
         segments=transcript.segments,
@@ -526,17 +599,86 @@ def _build_trivial_suffix_reuse_result(
     suffix: str,
 ) -> DictationPostprocessResult:
     metadata = dict(candidate.result.metadata)
-    rules_input = str(
+    rules_input = _candidate_rules_input(candidate)
+    merged_rules_input = f'{rules_input}{suffix}'
+    if has_dictation_transforms(postprocessor.transforms):
+        merged_text = apply_dictation_transforms(merged_rules_input, postprocessor.transforms)
+    else:
+        merged_text = merged_rules_input.strip()
+    metadata['rules_input_text'] = merged_rules_input
+    metadata['rules_input_chars'] = len(merged_rules_input)
+    metadata['rules_text'] = merged_text
+    metadata['rules_chars'] = len(merged_text)
+    metadata['rules_changed'] = merged_text != merged_rules_input
+    metadata['final_text'] = merged_text
+    metadata['final_chars'] = len(merged_text)
+    metadata['changed'] = True
+    return DictationPostprocessResult(text=merged_text, metadata=metadata)
+
+
+def _candidate_rules_input(candidate: IncrementalPostprocessCandidate) -> str:
+    metadata = candidate.result.metadata
+    return str(
         metadata.get('rules_input_text')
         or metadata.get('llm_output_text')
         or metadata.get('final_text')
         or candidate.result.text
     )
-    merged_rules_input = f'{rules_input}{suffix}'
+
+
+def _apply_hotwords_across_cut(text: str, cut: int, hotwords: DictationHotwordsConfig) -> tuple[str, int]:
+    # 前缀和尾巴各自做过热词替换，但跨在切点上的别名两边都看不到；只在切点附近的窗口里再替换一次。
+    if not should_rewrite_hotword_aliases(hotwords):
+        return text, 0
+    span = max((len(alias.strip()) for entry in hotwords.entries for alias in entry.aliases), default=0)
+    if span < 2:
+        return text, 0
+    start = max(0, cut - span + 1)
+    end = min(len(text), cut + span - 1)
+    window, replacements = apply_hotword_aliases(text[start:end], hotwords)
+    if not replacements:
+        return text, 0
+    return f'{text[:start]}{window}{text[end:]}', sum(item.count for item in replacements)
+
+
+def _build_suffix_reuse_result(
+    postprocessor: DictationTextPostprocessor,
+    candidate: IncrementalPostprocessCandidate,
+    suffix: str,
+    *,
+    language: str | None = None,
+    context: DictationContext | None = None,
+    emit: Callable[[str, dict[str, Any]], None] | None = None,
+    on_progress: Callable[[str], None] | None = None,
+) -> DictationPostprocessResult:
+    prefix_rules_input = _candidate_rules_input(candidate)
+    if not candidate.raw_text.rstrip().endswith(tuple(SENTENCE_FINAL_CHARS)):
+        # 预跑时 LLM 以为句子已结束，常在前缀末尾补句号；原文在这里并没有断句，拼接前去掉。
+        prefix_rules_input = prefix_rules_input.rstrip().rstrip(SENTENCE_FINAL_CHARS)
+    separator = ' ' if suffix[:1].isspace() and not prefix_rules_input[-1:].isspace() else ''
+    suffix_result = postprocessor.process(
+        suffix,
+        language=language,
+        context=context,
+        emit=emit,
+        prefix_text=prefix_rules_input,
+        on_progress=on_progress,
+        progress_prefix=f'{prefix_rules_input}{separator}',
+    )
+    metadata = dict(suffix_result.metadata)
+    suffix_rules_input = str(metadata.get('rules_input_text') or suffix_result.text)
+    merged_rules_input, join_matches = _apply_hotwords_across_cut(
+        f'{prefix_rules_input}{separator}{suffix_rules_input}',
+        len(prefix_rules_input) + len(separator),
+        postprocessor.hotwords,
+    )
+    if join_matches:
+        metadata['hotword_matches'] = int(metadata.get('hotword_matches', 0)) + join_matches
     if has_dictation_transforms(postprocessor.transforms):
         merged_text = apply_dictation_transforms(merged_rules_input, postprocessor.transforms)
     else:
         merged_text = merged_rules_input.strip()
+    metadata['suffix_chars'] = len(suffix.strip())
     metadata['rules_input_text'] = merged_rules_input
     metadata['rules_input_chars'] = len(merged_rules_input)
     metadata['rules_text'] = merged_text
@@ -552,7 +694,7 @@ def _select_final_commit_reuse(
     transcript: RealtimeTranscript,
     postprocessor: DictationTextPostprocessor | None,
     state: IncrementalDictationState,
-) -> tuple[str, DictationPostprocessResult, DictationContextSnapshot | None, int] | None:
+) -> tuple[str, DictationPostprocessResult | None, DictationContextSnapshot | None, int] | None:
     candidate = state.completed_candidate
     if candidate is None or postprocessor is None:
         return None
@@ -572,6 +714,8 @@ def _select_final_commit_reuse(
             candidate.context_snapshot,
             len(candidate.raw_text),
         )
+    if postprocessor.llm.enabled and candidate.result.metadata.get('llm_used'):
+        return ('reuse_suffix', None, candidate.context_snapshot, len(candidate.raw_text))
     return None
 
 
@@ -583,6 +727,8 @@ def _apply_dictation_postprocess(
     reused_result: DictationPostprocessResult | None = None,
     commit_mode: str = 'full_final',
     commit_reused_chars: int = 0,
+    suffix_candidate: IncrementalPostprocessCandidate | None = None,
+    on_progress: Callable[[str], None] | None = None,
 ) -> RealtimeTranscript:
     if postprocessor is None or transcript.is_partial:
         return transcript
@@ -616,6 +762,16 @@ def _apply_dictation_postprocess(
             stage_fields.append(('stream_chunks', int(fields['stream_chunks'])))
         if 'first_token_ms' in fields and fields['first_token_ms'] is not None:
             stage_fields.append(('first_token_ms', int(fields['first_token_ms'])))
+        if 'connect_ms' in fields and fields['connect_ms'] is not None:
+            stage_fields.append(('connect_ms', int(fields['connect_ms'])))
+        if 'ttfb_ms' in fields and fields['ttfb_ms'] is not None:
+            stage_fields.append(('ttfb_ms', int(fields['ttfb_ms'])))
+        if 'cache_hit' in fields:
+            stage_fields.append(('cache_hit', bool(fields['cache_hit'])))
+        if fields.get('hedged') is not None:
+            stage_fields.append(('hedged', bool(fields['hedged'])))
+        if fields.get('hedge_winner'):
+            stage_fields.append(('hedge_winner', str(fields['hedge_winner'])))
         if 'provider' in fields:
             stage_fields.append(('provider', fields['provider']))
         if 'model' in fields:
@@ -630,6 +786,10 @@ def _apply_dictation_postprocess(
             stage_fields.append(('context_selected_chars', int(fields['context_selected_chars'])))
         if 'context_focus_chars' in fields:
             stage_fields.append(('context_focus_chars', int(fields['context_focus_chars'])))
+        if fields.get('context_tokens') is not None:
+            stage_fields.append(('context_tokens', int(fields['context_tokens'])))
+        if fields.get('context_dropped_chars') is not None:
+            stage_fields.append(('context_dropped_chars', int(fields['context_dropped_chars'])))
         if 'context_source' in fields:
             stage_fields.append(('context_source', fields['context_source']))
         if 'context_surface' in fields:
@@ -691,12 +851,26 @@ def _apply_dictation_postprocess(
     else:
         _log_dictation_context(utterance_id, snapshot=context_snapshot, context=context, state='ready')
 
-    if reused_result is None:
+    if reused_result is None and suffix_candidate is not None:
+        result = _build_suffix_reuse_result(
+            postprocessor,
+            suffix_candidate,
+            transcript.text.strip()[len(suffix_candidate.raw_text) :],
+            language=transcript.language,
+            context=context,
+            emit=emit_stage,
+            on_progress=on_progress,
+        )
+        result.metadata['original_text'] = transcript.text
+        result.metadata['original_chars'] = len(transcript.text)
+    elif reused_result is None:
         result = postprocessor.process(
             transcript.text,
             language=transcript.language,
             context=context,
             emit=emit_stage,
+            on_progress=on_progress,
+            utterance_id=transcript.utterance_id,
         )
     else:
         result = reused_result
@@ -722,6 +896,19 @@ def _apply_dictation_postprocess(
         timings['llm_stream_chunks'] = int(result.metadata['llm_stream_chunks'])
     if result.metadata.get('llm_first_token_ms') is not None:
         timings['llm_first_token_ms'] = int(result.metadata['llm_first_token_ms'])
+    if result.metadata.get('llm_connect_ms') is not None:
+        timings['llm_connect_ms'] = int(result.metadata['llm_connect_ms'])
+    if result.metadata.get('llm_ttfb_ms') is not None:
+        timings['llm_ttfb_ms'] = int(result.metadata['llm_ttfb_ms'])
+    if 'llm_cache_hit' in result.metadata:
+        timings['llm_cache_hit'] = bool(result.metadata['llm_cache_hit'])
+    if result.metadata.get('llm_circuit_state'):
+        timings['llm_circuit_state'] = str(result.metadata['llm_circuit_state'])
+    if result.metadata.get('llm_skipped_reason'):
+        timings['llm_skipped_reason'] = str(result.metadata['llm_skipped_reason'])
+    if 'llm_hedged' in result.metadata:
+        timings['llm_hedged'] = bool(result.metadata['llm_hedged'])
+        timings['llm_hedge_winner'] = str(result.metadata.get('llm_hedge_winner') or '')
     if 'rules_changed' in result.metadata:
         timings['rules_changed'] = bool(result.metadata['rules_changed'])
     if result.metadata.get('provider'):
@@ -774,6 +961,14 @@ def _apply_dictation_postprocess(
         stream_used=bool(result.metadata.get('llm_stream_used')),
         stream_chunks=int(result.metadata.get('llm_stream_chunks', 0)),
         first_token_ms=result.metadata.get('llm_first_token_ms'),
+        connect_ms=result.metadata.get('llm_connect_ms'),
+        ttfb_ms=result.metadata.get('llm_ttfb_ms'),
+        cache_hit=result.metadata.get('llm_cache_hit'),
+        hedged=result.metadata.get('llm_hedged'),
+        hedge_winner=result.metadata.get('llm_hedge_winner'),
+        circuit=result.metadata.get('llm_circuit_state'),
+        gate=result.metadata.get('llm_gate_checked'),
+        skip_reason=result.metadata.get('llm_skipped_reason'),
         provider=result.metadata.get('provider', '-'),
         model=result.metadata.get('model', '-'),
         raw_chars=int(result.metadata.get('original_chars', 0)),
@@ -781,6 +976,9 @@ def _apply_dictation_postprocess(
         context_source=context.source if context else None,
         context_surface=context.surface if context else None,
         context_chars=len(context.context_text or '') if context else 0,
+        context_tokens=result.metadata.get('context_tokens'),
+        context_budget=result.metadata.get('context_budget_tokens'),
+        context_dropped=result.metadata.get('context_dropped_chars'),
         hotword_matches=int(result.metadata.get('hotword_matches', 0)),
         hint_count=int(result.metadata.get('hint_count', 0)),
         commit_mode=commit_mode,
@@ -824,19 +1022,27 @@ async def serve_realtime_session(
     model_path = Path(str(ensure_result['snapshot_path']))
     postprocessor = build_dictation_postprocessor(effective_config) if apply_dictation_postprocess else None
 
+    session_metadata: dict[str, object] = {
+        'task_type': 'asr_session_server',
+        'model_id': spec.model_id,
+        'out': f'{host}:{port}',
+    }
     with acquire_runtime_lock(
         effective_config,
-        'asr_infer',
+        'asr_session_server',
         options=options,
-        metadata={
-            'task_type': 'asr_session_server',
-            'model_id': spec.model_id,
-            'out': f'{host}:{port}',
-        },
+        metadata=session_metadata,
+    ), acquire_memory_budget(
+        effective_config,
+        estimate_resident_mb(spec, model_path),
+        options=options,
+        metadata=session_metadata,
+        display_resource='asr_infer',
     ):
         from mlx_audio.stt import load
 
         model = load(model_path)
+        context_watcher: DictationContextWatcher | None = None
 
         async def handler(websocket: WebSocketServerProtocol) -> None:
             session = RealtimeASRSession(model=model, language=language, sample_rate=sample_rate)
@@ -849,11 +1055,74 @@ async def serve_realtime_session(
             pending_context: PendingContextCapture | None = None
             logged_dictation_config = False
             incremental_enabled = postprocessor is not None
-            # 录音期间只保留本地 deterministic preview，避免增量 LLM 任务把后续 flush 挤住。
-            incremental_llm_enabled = False
+            incremental_config = effective_config.dictation.incremental
+            incremental_llm_enabled = bool(
+                postprocessor is not None
+                and effective_config.dictation.llm.enabled
+                and incremental_config.enabled
+            )
             incremental_state = IncrementalDictationState()
 
-            def reset_incremental_state(*, clear_context: bool = True) -> None:
+            def cancel_incremental_task(*, reason: str) -> None:
+                task = incremental_state.task
+                cancel = incremental_state.task_cancel
+                incremental_state.task = None
+                incremental_state.task_cancel = None
+                if task is None:
+                    return
+                if not task.done():
+                    if cancel is not None:
+                        cancel.cancel()
+                    _log_partial_pipeline(
+                        incremental_state.task_utterance_id,
+                        state='job_cancelled',
+                        reason=reason,
+                        stable_chars=len(incremental_state.submitted_raw_text),
+                        wasted_ms=int((time.monotonic() - incremental_state.task_started_at) * 1000),
+                    )
+                task.cancel()
+
+            async def settle_incremental_task(utterance_id: int | None) -> str:
+                incremental_state.queued_raw_text = None
+                incremental_state.queued_language = None
+                task = incremental_state.task
+                if task is None or task.done():
+                    return 'idle'
+                submitted_chars = len(incremental_state.submitted_raw_text)
+                grace_ms = max(0, int(incremental_config.flush_grace_ms))
+                nearly_done = (
+                    submitted_chars > 0
+                    and incremental_state.task_progress_chars >= submitted_chars * incremental_config.finish_ratio
+                )
+                if grace_ms > 0 and nearly_done:
+                    wait_started_at = time.monotonic()
+                    try:
+                        await asyncio.wait_for(asyncio.shield(task), timeout=grace_ms / 1000)
+                    except asyncio.TimeoutError:
+                        pass
+                    except Exception as error:
+                        _log_partial_pipeline(
+                            utterance_id,
+                            state='job_await_failed',
+                            stable_chars=submitted_chars,
+                            error=str(error),
+                        )
+                        return 'failed'
+                    if task.done():
+                        # 让 on_done 先把候选结果落到 incremental_state，再做 commit 复用判断。
+                        await asyncio.sleep(0)
+                        _log_partial_pipeline(
+                            utterance_id,
+                            state='job_awaited',
+                            stable_chars=submitted_chars,
+                            waited_ms=int((time.monotonic() - wait_started_at) * 1000),
+                        )
+                        return 'awaited'
+                cancel_incremental_task(reason='preempt')
+                return 'preempted'
+
+            def reset_incremental_state(*, clear_context: bool = True, reason: str = 'reset') -> None:
+                cancel_incremental_task(reason=reason)
                 incremental_state.epoch += 1
                 incremental_state.last_partial_text = ''
                 incremental_state.stable_raw_text = ''
@@ -863,12 +1132,9 @@ async def serve_realtime_session(
                 incremental_state.completed_candidate = None
                 incremental_state.queued_raw_text = None
                 incremental_state.queued_language = None
-                task = incremental_state.task
-                incremental_state.task = None
+                incremental_state.preview_memo = PreviewMemo()
                 if clear_context:
                     incremental_state.context_snapshot = None
-                if task is not None:
-                    task.cancel()
 
             async def cancel_pending_context() -> None:
                 nonlocal pending_context
@@ -960,6 +1226,8 @@ async def serve_realtime_session(
                 context = incremental_state.context_snapshot.context if incremental_state.context_snapshot else None
                 context_snapshot = incremental_state.context_snapshot
                 incremental_state.submitted_raw_text = target_raw_text
+                incremental_state.task_progress_chars = 0
+                cancel = LLMCancelToken()
                 _log_partial_pipeline(
                     utterance_id,
                     state='job_started',
@@ -968,21 +1236,33 @@ async def serve_realtime_session(
                     context_ready=context is not None,
                 )
 
+                def track_progress(stage: str, fields: dict[str, Any]) -> None:
+                    if stage == 'llm_stream' and epoch == incremental_state.epoch:
+                        incremental_state.task_progress_chars = int(fields.get('chars', 0))
+
                 async def runner() -> tuple[int, str, DictationPostprocessResult]:
                     result = await asyncio.to_thread(
                         postprocessor.process,
                         target_raw_text,
                         language=language_value,
                         context=context,
+                        emit=track_progress,
+                        cancel=cancel,
+                        speculative=True,
+                        utterance_id=utterance_id,
                     )
                     return epoch, target_raw_text, result
 
                 task = asyncio.create_task(runner())
                 incremental_state.task = task
+                incremental_state.task_cancel = cancel
+                incremental_state.task_started_at = time.monotonic()
+                incremental_state.task_utterance_id = utterance_id
 
                 def on_done(done_task: asyncio.Task[tuple[int, str, DictationPostprocessResult]]) -> None:
                     if incremental_state.task is done_task:
                         incremental_state.task = None
+                        incremental_state.task_cancel = None
 
                     queued_raw_text = incremental_state.queued_raw_text
                     queued_language = incremental_state.queued_language
@@ -1081,7 +1361,8 @@ async def serve_realtime_session(
                     postprocessor,
                     completed_raw_text=incremental_state.completed_raw_text,
                     completed_text=incremental_state.completed_text,
-                    context_snapshot=incremental_state.context_snapshot,
+                    stable_raw_text=incremental_state.stable_raw_text,
+                    memo=incremental_state.preview_memo,
                 )
                 reused_chars = (
                     len(incremental_state.completed_text)
@@ -1145,7 +1426,19 @@ async def serve_realtime_session(
                             await pending_context.task
                         pending_context = None
                     await clear_pending_context(wait=False)
-                    if pending_context is None:
+                    watched = context_watcher.latest() if context_watcher is not None else None
+                    if pending_context is None and watched is not None:
+                        pending_context = PendingContextCapture(
+                            task=asyncio.create_task(
+                                asyncio.to_thread(
+                                    refresh_dictation_context_snapshot,
+                                    effective_config,
+                                    watched,
+                                )
+                            ),
+                            started_at=time.monotonic(),
+                        )
+                    elif pending_context is None:
                         pending_context = PendingContextCapture(
                             task=asyncio.create_task(
                                 asyncio.to_thread(
@@ -1160,9 +1453,11 @@ async def serve_realtime_session(
                         partial=False,
                         utterance_id=payload.get('utterance_id'),
                     )
+                    incremental_job_state = await settle_incremental_task(transcript.utterance_id)
                     commit_mode = 'full_final'
                     reused_result: DictationPostprocessResult | None = None
                     reused_context_snapshot: DictationContextSnapshot | None = None
+                    suffix_candidate: IncrementalPostprocessCandidate | None = None
                     reused_chars = (
                         len(incremental_state.completed_text)
                         if incremental_state.completed_raw_text
@@ -1174,6 +1469,8 @@ async def serve_realtime_session(
                         and (reuse := _select_final_commit_reuse(transcript, postprocessor, incremental_state)) is not None
                     ):
                         commit_mode, reused_result, reused_context_snapshot, reused_chars = reuse
+                        if commit_mode == 'reuse_suffix':
+                            suffix_candidate = incremental_state.completed_candidate
                     _log_partial_pipeline(
                         transcript.utterance_id,
                         state='flush',
@@ -1181,10 +1478,11 @@ async def serve_realtime_session(
                         stable_chars=len(incremental_state.stable_raw_text),
                         completed_chars=len(incremental_state.completed_text),
                         commit_mode=commit_mode,
+                        job_state=incremental_job_state if incremental_llm_enabled else None,
                     )
                     context_snapshot_from_partial = incremental_state.context_snapshot
-                    reset_incremental_state(clear_context=True)
-                    if reused_result is not None:
+                    reset_incremental_state(clear_context=True, reason='flush')
+                    if reused_result is not None or suffix_candidate is not None:
                         await cancel_pending_context()
                         context_snapshot = reused_context_snapshot or context_snapshot_from_partial
                     else:
@@ -1194,17 +1492,32 @@ async def serve_realtime_session(
                         )
                         if context_snapshot is None:
                             context_snapshot = context_snapshot_from_partial
-                    await _send_transcript(
-                        websocket,
-                        _apply_dictation_postprocess(
+                    postprocess_kwargs: dict[str, Any] = {
+                        'context_snapshot': context_snapshot if context_capture_enabled else None,
+                        'reused_result': reused_result,
+                        'commit_mode': commit_mode,
+                        'commit_reused_chars': reused_chars,
+                        'suffix_candidate': suffix_candidate,
+                    }
+                    if (
+                        payload.get('final_progress')
+                        and postprocessor is not None
+                        and postprocessor.llm.enabled
+                        and reused_result is None
+                    ):
+                        final_transcript = await _apply_dictation_postprocess_with_progress(
+                            websocket,
                             transcript,
                             postprocessor,
-                            context_snapshot=context_snapshot if context_capture_enabled else None,
-                            reused_result=reused_result,
-                            commit_mode=commit_mode,
-                            commit_reused_chars=reused_chars,
-                        ),
-                    )
+                            **postprocess_kwargs,
+                        )
+                    else:
+                        final_transcript = _apply_dictation_postprocess(
+                            transcript,
+                            postprocessor,
+                            **postprocess_kwargs,
+                        )
+                    await _send_transcript(websocket, final_transcript)
                 elif action == 'warmup':
                     warmed = session.warmup(
                         force=bool(payload.get('force')),
@@ -1237,19 +1550,59 @@ async def serve_realtime_session(
                 with suppress(asyncio.CancelledError):
                     await pending_context.task
             if incremental_state.task is not None:
-                incremental_state.task.cancel()
+                task = incremental_state.task
+                cancel_incremental_task(reason='close')
                 with suppress(asyncio.CancelledError):
-                    await incremental_state.task
-
-        async with websockets.serve(
-            handler,
-            host,
-            port,
-            max_size=None,
-            ping_interval=None,
-            ping_timeout=None,
-        ):
-            await asyncio.Future()
+                    await task
+
+        with ExitStack() as helper_scope:
+            context_config = effective_config.dictation.context
+            if (
+                postprocessor is not None
+                and effective_config.dictation.llm.enabled
+                and context_config.enabled
+                and context_config.persistent_helper
+            ):
+                helper_timeout_sec = context_config.capture_budget_ms / 1000 if context_config.capture_budget_ms > 0 else 2.0
+                helper = helper_scope.enter_context(
+                    use_osascript_runner(PersistentOsascriptRunner(timeout_sec=helper_timeout_sec))
+                )
+                healthy = await asyncio.to_thread(helper.healthy)
+                _log_session('dictation_context_helper', state='ready' if healthy else 'unavailable')
+
+            if (
+                postprocessor is not None
+                and effective_config.dictation.llm.enabled
+                and context_config.enabled
+                and context_config.watch_enabled
+            ):
+                context_watcher = DictationContextWatcher(
+                    lambda: capture_dictation_context_snapshot(effective_config),
+                    interval_ms=context_config.watch_interval_ms,
+                    max_age_ms=context_config.watch_max_age_ms,
+                    on_focus_change=_log_context_watch,
+                )
+                context_watcher.start()
+                _log_session(
+                    'dictation_context_watch',
+                    state='started',
+                    interval_ms=context_config.watch_interval_ms,
+                    max_age_ms=context_config.watch_max_age_ms,
+                )
+
+            try:
+                async with websockets.serve(
+                    handler,
+                    host,
+                    port,
+                    max_size=None,
+                    ping_interval=None,
+                    ping_timeout=None,
+                ):
+                    await asyncio.Future()
+            finally:
+                if context_watcher is not None:
+                    await context_watcher.stop()
 
 
 def run_realtime_session_server(
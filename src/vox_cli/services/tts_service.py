@@ -13,7 +13,9 @@ import soundfile as sf
 from ..audio import combine_samples, stable_hash
 from ..config import VoxConfig, get_cache_dir, resolve_tts_model_id
 from ..db import list_profile_samples, resolve_profile
-from ..runtime import RuntimeExecutionOptions, acquire_runtime_lock, acquire_runtime_lock_pool, acquire_runtime_locks
+from ..cache import estimate_resident_mb
+from ..models import ModelSpec
+from ..runtime import RuntimeExecutionOptions, acquire_memory_budget, acquire_runtime_lock
 from ..services.model_service import ensure_model_downloaded, resolve_model
 
 
@@ -122,35 +124,20 @@ def _replace_output(temp_path: Path, output_path: Path) -> None:
         raise
 
 
-def _tts_infer_slot_resources(config: VoxConfig) -> list[str]:
-    capacity = max(1, config.runtime.tts_small_base_max_parallel)
-    return [f'tts_infer_slot:{slot}' for slot in range(capacity)]
-
-
 @contextmanager
 def _acquire_tts_infer_lock(
     config: VoxConfig,
-    model_id: str,
+    spec: ModelSpec,
+    model_path: Path,
     options: RuntimeExecutionOptions,
     metadata: dict[str, object],
 ):
-    resources = _tts_infer_slot_resources(config)
-    if model_id == 'qwen-tts-0.6b-base-8bit':
-        with acquire_runtime_lock_pool(
-            config,
-            resources,
-            options=options,
-            metadata=metadata,
-            display_resource='tts_infer',
-        ) as handle:
-            yield handle
-        return
-
-    with acquire_runtime_locks(
+    with acquire_memory_budget(
         config,
-        resources,
+        estimate_resident_mb(spec, model_path),
         options=options,
         metadata=metadata,
+        display_resource='tts_infer',
     ) as handles:
         yield handles
 
@@ -233,7 +220,8 @@ def clone_to_file(
     ):
         with _acquire_tts_infer_lock(
             config,
-            spec.model_id,
+            spec,
+            model_path,
             options,
             {'model_id': spec.model_id, 'profile': profile_id, 'out': str(output_abs)},
         ):
@@ -294,7 +282,8 @@ def custom_to_file(
     ):
         with _acquire_tts_infer_lock(
             config,
-            spec.model_id,
+            spec,
+            model_path,
             options,
             {'model_id': spec.model_id, 'speaker': speaker, 'out': str(output_abs)},
         ):
@@ -362,7 +351,8 @@ def design_to_file(
     ):
         with _acquire_tts_infer_lock(
             config,
-            spec.model_id,
+            spec,
+            model_path,
             options,
             {'model_id': spec.model_id, 'out': str(output_abs)},
         ):
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import sys
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+import weakref
+
+import pytest
+
+from vox_cli.config import RuntimeConfig, VoxConfig
+from vox_cli.runtime import RuntimeExecutionOptions, RuntimeLockTimeoutError
+from vox_cli.services import asr_service
+
+
+def _install_fake_stt(monkeypatch, loads: list[Path]) -> None:
+    class FakeModel:
+        def generate(self, audio: str, **kwargs):
+            return SimpleNamespace(text=f' {Path(audio).stem} ', segments=[])
+
+    def load(path: Path) -> FakeModel:
+        loads.append(path)
+        return FakeModel()
+
+    stt = ModuleType('mlx_audio.stt')
+    stt.load = load
+    package = ModuleType('mlx_audio')
+    package.stt = stt
+    monkeypatch.setitem(sys.modules, 'mlx_audio', package)
+    monkeypatch.setitem(sys.modules, 'mlx_audio.stt', stt)
+
+
+def _fake_snapshot(monkeypatch, tmp_path: Path) -> Path:
+    snapshot = tmp_path / 'snapshot'
+    snapshot.mkdir()
+    monkeypatch.setattr(
+        asr_service,
+        'ensure_model_downloaded',
+        lambda config, spec, allow_download=True, runtime_options=None: {
+            'snapshot_path': str(snapshot),
+            'endpoint': None,
+        },
+    )
+    return snapshot
+
+
+def test_transcribe_files_reuses_model_across_files(monkeypatch, tmp_path: Path) -> None:
+    loads: list[Path] = []
+    _install_fake_stt(monkeypatch, loads)
+    _fake_snapshot(monkeypatch, tmp_path)
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path / 'home'), memory_budget_gb=4))
+    options = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1)
+
+    results = asr_service.transcribe_files(
+        config,
+        [tmp_path / 'a.wav', tmp_path / 'b.wav'],
+        'qwen-asr-0.6b-4bit',
+        'zh',
+        runtime_options=options,
+    )
+
+    assert [item['text'] for item in results] == ['a', 'b']
+    assert len(loads) == 1
+
+
+def test_transcribe_files_batch_yields_between_files(monkeypatch, tmp_path: Path) -> None:
+    loads: list[Path] = []
+    logs: list[str] = []
+    _install_fake_stt(monkeypatch, loads)
+    _fake_snapshot(monkeypatch, tmp_path)
+    contended = iter([True, False])
+    monkeypatch.setattr(asr_service, 'memory_budget_contended', lambda config, options: next(contended))
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path / 'home'), memory_budget_gb=4))
+    options = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1, log=logs.append, priority='batch')
+
+    results = asr_service.transcribe_files(
+        config,
+        [tmp_path / 'a.wav', tmp_path / 'b.wav', tmp_path / 'c.wav'],
+        'qwen-asr-0.6b-4bit',
+        'zh',
+        runtime_options=options,
+    )
+
+    assert [item['text'] for item in results] == ['a', 'b', 'c']
+    # 第一个文件后让出一次预算，重新排队后再加载一次模型，剩下的文件连着转完。
+    assert len(loads) == 2
+    assert any('Yielding asr_infer' in line and '1/3 files done' in line for line in logs)
+
+
+def test_transcribe_files_frees_model_and_mlx_cache_before_yielding(monkeypatch, tmp_path: Path) -> None:
+    loads: list[Path] = []
+    _install_fake_stt(monkeypatch, loads)
+    _fake_snapshot(monkeypatch, tmp_path)
+    events: list[str] = []
+    models: list[weakref.ref] = []
+    original_load = sys.modules['mlx_audio.stt'].load
+
+    def load(path: Path):
+        model = original_load(path)
+        models.append(weakref.ref(model))
+        return model
+
+    sys.modules['mlx_audio.stt'].load = load
+    core = ModuleType('mlx.core')
+    # 清缓存时上一份模型必须已经没有引用了。
+    core.clear_cache = lambda: events.append('clear' if models[-1]() is None else 'clear-with-model')
+    mlx = ModuleType('mlx')
+    mlx.core = core
+    monkeypatch.setitem(sys.modules, 'mlx', mlx)
+    monkeypatch.setitem(sys.modules, 'mlx.core', core)
+
+    @contextmanager
+    def budget(*args, **kwargs):
+        events.append('acquire')
+        yield []
+        events.append('release')
+
+    monkeypatch.setattr(asr_service, 'acquire_memory_budget', budget)
+    contended = iter([True, False])
+    monkeypatch.setattr(asr_service, 'memory_budget_contended', lambda config, options: next(contended))
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path / 'home')))
+    options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=1, priority='batch')
+
+    results = asr_service.transcribe_files(
+        config,
+        [tmp_path / 'a.wav', tmp_path / 'b.wav', tmp_path / 'c.wav'],
+        'qwen-asr-0.6b-4bit',
+        'zh',
+        runtime_options=options,
+    )
+
+    assert [item['text'] for item in results] == ['a', 'b', 'c']
+    assert events == ['acquire', 'clear', 'release', 'acquire', 'clear', 'release']
+
+
+def test_transcribe_files_keeps_finished_files_when_requeue_times_out(monkeypatch, tmp_path: Path) -> None:
+    loads: list[Path] = []
+    logs: list[str] = []
+    _install_fake_stt(monkeypatch, loads)
+    _fake_snapshot(monkeypatch, tmp_path)
+    acquisitions = iter([None, RuntimeLockTimeoutError('Timed out waiting for lock pool asr_infer')])
+
+    @contextmanager
+    def budget(*args, **kwargs):
+        if (error := next(acquisitions)) is not None:
+            raise error
+        yield []
+
+    monkeypatch.setattr(asr_service, 'acquire_memory_budget', budget)
+    monkeypatch.setattr(asr_service, 'memory_budget_contended', lambda config, options: True)
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path / 'home')))
+    options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=1, log=logs.append, priority='batch')
+
+    results = asr_service.transcribe_files(
+        config,
+        [tmp_path / 'a.wav', tmp_path / 'b.wav', tmp_path / 'c.wav'],
+        'qwen-asr-0.6b-4bit',
+        'zh',
+        runtime_options=options,
+    )
+
+    assert [item['text'] for item in results] == ['a', '', '']
+    assert 'error' not in results[0]
+    assert [item['audio'] for item in results[1:]] == [str(tmp_path / 'b.wav'), str(tmp_path / 'c.wav')]
+    assert all('Timed out' in item['error'] for item in results[1:])
+    assert any('Stopped asr_infer' in line and '1/3 files done' in line for line in logs)
+
+
+def test_transcribe_files_records_per_file_errors_and_audio_paths(monkeypatch, tmp_path: Path) -> None:
+    loads: list[Path] = []
+    _install_fake_stt(monkeypatch, loads)
+    _fake_snapshot(monkeypatch, tmp_path)
+    original_load = sys.modules['mlx_audio.stt'].load
+
+    def load(path: Path):
+        model = original_load(path)
+        generate = model.generate
+
+        def flaky_generate(audio: str, **kwargs):
+            if Path(audio).stem == 'b':
+                raise RuntimeError('decode failed')
+            return generate(audio, **kwargs)
+
+        model.generate = flaky_generate
+        return model
+
+    sys.modules['mlx_audio.stt'].load = load
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path / 'home'), memory_budget_gb=4))
+    options = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1)
+    audio = [tmp_path / 'a.wav', tmp_path / 'b.wav', tmp_path / 'c.wav']
+
+    results = asr_service.transcribe_files(config, audio, 'qwen-asr-0.6b-4bit', 'zh', runtime_options=options)
+
+    assert [item['audio'] for item in results] == [str(path) for path in audio]
+    assert [item['text'] for item in results] == ['a', '', 'c']
+    assert results[1]['error'] == 'decode failed'
+    assert 'error' not in results[0] and 'error' not in results[2]
+    with pytest.raises(RuntimeError, match='decode failed'):
+        asr_service.transcribe_file(config, audio[1], 'qwen-asr-0.6b-4bit', 'zh', runtime_options=options)
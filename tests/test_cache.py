@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from vox_cli.cache import inspect_cache
+from vox_cli.cache import estimate_resident_mb, inspect_cache, snapshot_weights_bytes
 from vox_cli.models import MODEL_REGISTRY
 
 
@@ -37,3 +37,16 @@ def test_inspect_cache_deep_detects_incomplete_files(tmp_path: Path) -> None:
 
     assert status.verified is False
     assert status.has_incomplete is True
+
+
+def test_estimate_resident_mb_uses_snapshot_weight_sizes(tmp_path: Path) -> None:
+    spec = MODEL_REGISTRY['qwen-asr-0.6b-4bit']
+    snapshot_dir = tmp_path / 'snapshot'
+    (snapshot_dir / 'speech_tokenizer').mkdir(parents=True)
+    (snapshot_dir / 'model.safetensors').write_bytes(b'\0' * (3 * 1024 * 1024))
+    (snapshot_dir / 'speech_tokenizer' / 'model.safetensors').write_bytes(b'\0' * (1024 * 1024))
+    (snapshot_dir / 'config.json').write_bytes(b'\0' * (8 * 1024 * 1024))
+
+    assert snapshot_weights_bytes(snapshot_dir) == 4 * 1024 * 1024
+    assert estimate_resident_mb(spec, snapshot_dir) == 6
+    assert estimate_resident_mb(spec, tmp_path / 'missing') == estimate_resident_mb(spec) == 910
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 from vox_cli.config import (
     ASRConfig,
     VoxConfig,
@@ -39,10 +41,23 @@ def test_load_config_accepts_dictation_llm_env_overrides(monkeypatch, tmp_path)
     monkeypatch.setenv('VOX_DICTATION_LLM_STREAM', 'false')
     monkeypatch.setenv('VOX_DICTATION_CONTEXT_ENABLED', 'yes')
     monkeypatch.setenv('VOX_DICTATION_CONTEXT_MAX_CHARS', '2048')
+    monkeypatch.setenv('VOX_DICTATION_CONTEXT_MAX_TOKENS', '400')
     monkeypatch.setenv('VOX_DICTATION_CONTEXT_CAPTURE_BUDGET_MS', '900')
+    monkeypatch.setenv('VOX_DICTATION_CONTEXT_PERSISTENT_HELPER', 'on')
+    monkeypatch.setenv('VOX_DICTATION_CONTEXT_CACHE_TTL_MS', '0')
+    monkeypatch.setenv('VOX_DICTATION_CONTEXT_WATCH_ENABLED', 'true')
+    monkeypatch.setenv('VOX_DICTATION_CONTEXT_WATCH_INTERVAL_MS', '250')
     monkeypatch.setenv('VOX_DICTATION_HOTWORDS_ENABLED', 'true')
     monkeypatch.setenv('VOX_DICTATION_HINTS_ENABLED', 'true')
     monkeypatch.setenv('VOX_DICTATION_SPACE_BETWEEN_CJK', '1')
+    monkeypatch.setenv('VOX_DICTATION_INCREMENTAL_ENABLED', 'on')
+    monkeypatch.setenv('VOX_DICTATION_INCREMENTAL_FLUSH_GRACE_MS', '400')
+    monkeypatch.setenv('VOX_DICTATION_CACHE_ENABLED', 'true')
+    monkeypatch.setenv('VOX_DICTATION_CACHE_PERSIST', 'true')
+    monkeypatch.setenv('VOX_DICTATION_CIRCUIT_ENABLED', 'on')
+    monkeypatch.setenv('VOX_DICTATION_ADAPTIVE_TIMEOUT', '1')
+    monkeypatch.setenv('VOX_DICTATION_GATE_ENABLED', 'yes')
+    monkeypatch.setenv('VOX_DICTATION_GATE_MAX_UNITS', '6')
 
     config = load_config()
 
@@ -57,10 +72,23 @@ def test_load_config_accepts_dictation_llm_env_overrides(monkeypatch, tmp_path)
     assert config.dictation.llm_profiles['local-mlx'].provider == 'openrouter'
     assert config.dictation.context.enabled is True
     assert config.dictation.context.max_chars == 2048
+    assert config.dictation.context.max_tokens == 400
     assert config.dictation.context.capture_budget_ms == 900
+    assert config.dictation.context.persistent_helper is True
+    assert config.dictation.context.cache_ttl_ms == 0
+    assert config.dictation.context.watch_enabled is True
+    assert config.dictation.context.watch_interval_ms == 250
     assert config.dictation.hotwords.enabled is True
     assert config.dictation.hints.enabled is True
     assert config.dictation.transforms.space_between_cjk is True
+    assert config.dictation.incremental.enabled is True
+    assert config.dictation.incremental.flush_grace_ms == 400
+    assert config.dictation.cache.enabled is True
+    assert config.dictation.cache.persist is True
+    assert config.dictation.circuit.enabled is True
+    assert config.dictation.circuit.adaptive_timeout is True
+    assert config.dictation.gate.enabled is True
+    assert config.dictation.gate.max_units == 6
 
 
 def test_load_config_defaults_to_local_and_aliyun_profiles() -> None:
@@ -131,3 +159,15 @@ def test_resolve_dictation_prompt_selection_maps_builtin_prompt_pair_back_to_pre
     assert custom_prompt_enabled is False
     assert system_prompt == default_preset.system_prompt
     assert user_prompt_template == default_preset.user_prompt_template
+
+
+def test_load_config_warns_about_removed_tts_parallel_key(monkeypatch, tmp_path) -> None:
+    home_dir = tmp_path / 'vox-home'
+    home_dir.mkdir()
+    (home_dir / 'config.toml').write_text('[runtime]\ntts_small_base_max_parallel = 2\n', encoding='utf-8')
+    monkeypatch.setenv('VOX_HOME', str(home_dir))
+
+    with pytest.warns(UserWarning, match='tts_small_base_max_parallel is no longer used'):
+        config = load_config()
+
+    assert config.runtime.memory_budget_gb is None
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from vox_cli.config import VoxConfig
+from vox_cli.services.dictation_batch_service import run_dictation_batch_postprocess
+
+
+class _StandInServer:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts: list[str] = []
+        state = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+                prompt = body['messages'][-1]['content']
+                with state.lock:
+                    state.in_flight += 1
+                    state.max_in_flight = max(state.max_in_flight, state.in_flight)
+                    state.prompts.append(body['messages'][0]['content'])
+                text = prompt.rsplit('原文: ', 1)[-1].strip()
+                # 越靠前的句子返回越慢，用来确认输出仍按输入顺序写出。
+                time.sleep(0.05 if text.startswith('第0') else 0.01)
+                with state.lock:
+                    state.in_flight -= 1
+                payload = json.dumps(
+                    {'choices': [{'message': {'content': f'{text}。'}}]},
+                    ensure_ascii=False,
+                ).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: object) -> None:
+                return
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server.server_address[1]}/v1'
+
+    def __enter__(self) -> _StandInServer:
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _batch_config(base_url: str) -> VoxConfig:
+    config = VoxConfig()
+    llm = config.dictation.llm
+    llm.enabled = True
+    llm.provider = 'custom'
+    llm.base_url = base_url
+    llm.model = 'stand-in'
+    llm.api_key_env = ''
+    llm.stream = False
+    llm.user_prompt_template = '原文: {text}'
+    config.dictation.cache.enabled = False
+    return config
+
+
+def test_batch_postprocess_runs_concurrently_and_preserves_order(tmp_path: Path) -> None:
+    input_path = tmp_path / 'texts.jsonl'
+    lines = [json.dumps({'id': f'u{index}', 'text': f'第{index}句话'}, ensure_ascii=False) for index in range(8)]
+    lines.insert(3, '')
+    lines.append(json.dumps('纯字符串输入', ensure_ascii=False))
+    input_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    out_path = tmp_path / 'out' / 'cleaned.jsonl'
+
+    with _StandInServer() as server:
+        summary = run_dictation_batch_postprocess(
+            _batch_config(server.base_url),
+            input_path,
+            out_path,
+            concurrency=4,
+            language='Chinese',
+        )
+
+    records = [json.loads(line) for line in out_path.read_text(encoding='utf-8').splitlines()]
+    assert [record['index'] for record in records] == list(range(9))
+    assert [record.get('id') for record in records[:2]] == ['u0', 'u1']
+    assert records[0]['text'] == '第0句话。'
+    assert records[-1]['raw_text'] == '纯字符串输入'
+    assert all(record['llm_used'] for record in records)
+    assert 1 < server.max_in_flight <= 4
+    assert summary['items'] == 9
+    assert summary['llm_used'] == 9
+    assert summary['llm_errors'] == 0
+    assert summary['llm_skipped'] == 0
+    assert summary['concurrency'] == 4
+    assert summary['latency_ms']['n'] == 9
+    assert summary['llm_ms']['max'] >= summary['llm_ms']['p50']
+    assert summary['items_per_sec'] > 0
+
+
+def test_batch_postprocess_applies_preset_and_rules_only_mode(tmp_path: Path) -> None:
+    input_path = tmp_path / 'texts.jsonl'
+    input_path.write_text('{"text": "你好，world。"}\n', encoding='utf-8')
+    config = _batch_config('http://127.0.0.1:9/v1')
+    config.dictation.transforms.fullwidth_to_halfwidth = True
+
+    summary = run_dictation_batch_postprocess(config, input_path, tmp_path / 'rules.jsonl', use_llm=False)
+
+    record = json.loads((tmp_path / 'rules.jsonl').read_text(encoding='utf-8'))
+    assert record['text'] == '你好,world.'
+    assert record['llm_used'] is False
+    assert summary['llm_enabled'] is False
+    assert 'llm_ms' not in summary
+
+    with _StandInServer() as server:
+        summary = run_dictation_batch_postprocess(
+            _batch_config(server.base_url),
+            input_path,
+            tmp_path / 'preset.jsonl',
+            prompt_preset='literal',
+        )
+    assert summary['prompt_preset'] == 'literal'
+    assert summary['llm_used'] == 1
+    assert server.prompts and server.prompts[0]
+
+    with pytest.raises(RuntimeError, match='Unknown dictation prompt preset'):
+        run_dictation_batch_postprocess(config, input_path, tmp_path / 'x.jsonl', prompt_preset='nope')
+
+
+def test_batch_postprocess_keeps_calling_llm_after_failures(tmp_path: Path) -> None:
+    input_path = tmp_path / 'texts.jsonl'
+    input_path.write_text(''.join(f'"第{index}句话需要整理"\n' for index in range(4)), encoding='utf-8')
+    config = _batch_config('http://127.0.0.1:9/v1')
+    config.dictation.circuit.enabled = True
+    config.dictation.circuit.failure_threshold = 1
+
+    summary = run_dictation_batch_postprocess(config, input_path, tmp_path / 'out.jsonl', concurrency=1)
+
+    records = [json.loads(line) for line in (tmp_path / 'out.jsonl').read_text(encoding='utf-8').splitlines()]
+    assert all('llm_error' in record for record in records)
+    assert not any('llm_skipped_reason' in record for record in records)
+    assert summary['llm_errors'] == 4
+    assert summary['llm_skipped'] == 0
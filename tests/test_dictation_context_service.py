@@ -1,33 +1,72 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import shutil
+import subprocess
+import sys
+from dataclasses import replace
+
+import pytest
 
 from vox_cli.config import DictationConfig, DictationContextConfig, VoxConfig
 from vox_cli.services import dictation_context_service
-from vox_cli.services.dictation_context_service import DictationContext
+from vox_cli.services.dictation_context_service import (
+    DictationContext,
+    DictationContextSnapshot,
+    DictationContextWatcher,
+    estimate_context_tokens,
+    fit_dictation_context,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_context_cache(monkeypatch) -> None:
+    monkeypatch.setattr(dictation_context_service, '_CONTEXT_CACHE', dictation_context_service.DictationContextCache())
+
+
+class _FakeOsascriptRunner:
+    def __init__(self, outputs: list[str]) -> None:
+        self.outputs = list(outputs)
+        self.calls: list[tuple[list[str], str | None]] = []
+
+    def run(self, lines: list[str], *, language: str | None = None) -> str:
+        self.calls.append((list(lines), language))
+        return self.outputs.pop(0)
+
+
+def _ax_snapshot_output(app: str, **fields: str) -> str:
+    return json.dumps({'app': app, **fields}, ensure_ascii=False)
+
+
+def _chromium_output(title: str, url: str, page: dict[str, object]) -> str:
+    return f'{title}\n{url}\n' + json.dumps(page, ensure_ascii=False)
 
 
 def test_capture_dictation_context_returns_none_when_disabled(monkeypatch) -> None:
-    monkeypatch.setattr(dictation_context_service, '_frontmost_app_name', lambda: 'Ghostty')
+    runner = _FakeOsascriptRunner([_ax_snapshot_output('Ghostty')])
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
 
     config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=False)))
 
     assert dictation_context_service.capture_dictation_context(config) is None
+    assert runner.calls == []
 
 
 def test_capture_ghostty_context_truncates_tail(monkeypatch) -> None:
-    monkeypatch.setattr(dictation_context_service, '_read_window_title', lambda app: 'codex')
-
-    def fake_read_focused_attribute(app_name: str, attribute: str) -> str:
-        values = {
-            'AXRole': 'AXTextArea',
-            'AXTitle': '',
-            'AXSelectedText': '',
-            'AXValue': '0123456789abcdef',
-        }
-        return values[attribute]
-
-    monkeypatch.setattr(dictation_context_service, '_read_focused_attribute', fake_read_focused_attribute)
+    runner = _FakeOsascriptRunner(
+        [
+            _ax_snapshot_output(
+                'Ghostty',
+                window_title='codex',
+                role='AXTextArea',
+                title='',
+                selected_text='',
+                value='0123456789abcdef',
+            )
+        ]
+    )
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
 
     context = dictation_context_service._capture_ghostty_context('Ghostty', 6)
 
@@ -42,13 +81,15 @@ def test_capture_ghostty_context_truncates_tail(monkeypatch) -> None:
         focus_text='abcdef',
         context_text='abcdef',
     )
+    assert len(runner.calls) == 1
 
 
 def test_capture_chromium_context_prefers_page_context_for_chat_surfaces(monkeypatch) -> None:
-    outputs = iter(
+    runner = _FakeOsascriptRunner(
         [
-            'Codex Chat\nhttps://example.com/chat',
-            json.dumps(
+            _chromium_output(
+                'Codex Chat',
+                'https://example.com/chat',
                 {
                     'title': 'Codex Chat',
                     'selection': 'selected text',
@@ -58,11 +99,10 @@ def test_capture_chromium_context_prefers_page_context_for_chat_surfaces(monkeyp
                     'mainText': 'main page text',
                     'bodyText': 'page text',
                 },
-                ensure_ascii=False,
             ),
         ]
     )
-    monkeypatch.setattr(dictation_context_service, '_run_osascript', lambda lines, language=None: next(outputs))
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
 
     context = dictation_context_service._capture_chromium_context('Google Chrome', 20)
 
@@ -76,13 +116,15 @@ def test_capture_chromium_context_prefers_page_context_for_chat_surfaces(monkeyp
         focus_text='input text',
         context_text='nearby page text',
     )
+    assert len(runner.calls) == 1
 
 
 def test_capture_chromium_context_prefers_page_context_over_input_box(monkeypatch) -> None:
-    outputs = iter(
+    runner = _FakeOsascriptRunner(
         [
-            'Codex Chat\nhttps://example.com/chat',
-            json.dumps(
+            _chromium_output(
+                'Codex Chat',
+                'https://example.com/chat',
                 {
                     'title': 'Codex Chat',
                     'selection': '',
@@ -92,11 +134,10 @@ def test_capture_chromium_context_prefers_page_context_over_input_box(monkeypatc
                     'mainText': '',
                     'bodyText': '上一轮对话\n这个页面真正有用的上下文',
                 },
-                ensure_ascii=False,
             ),
         ]
     )
-    monkeypatch.setattr(dictation_context_service, '_run_osascript', lambda lines, language=None: next(outputs))
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
 
     context = dictation_context_service._capture_chromium_context('Google Chrome', 40)
 
@@ -113,15 +154,66 @@ def test_capture_chromium_context_prefers_page_context_over_input_box(monkeypatc
 
 
 def test_capture_dictation_context_uses_frontmost_app(monkeypatch) -> None:
-    monkeypatch.setattr(dictation_context_service, '_frontmost_app_name', lambda: 'ghostty')
+    runner = _FakeOsascriptRunner([_ax_snapshot_output('ghostty')])
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
     expected = DictationContext(source='ghostty', app_name='ghostty', context_text='context')
-    monkeypatch.setattr(dictation_context_service, '_capture_ghostty_context', lambda app, max_chars: expected)
+    monkeypatch.setattr(
+        dictation_context_service,
+        '_capture_ghostty_context',
+        lambda app, max_chars, snapshot=None: expected,
+    )
 
     config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=True, max_chars=1200)))
 
     assert dictation_context_service.capture_dictation_context(config) == expected
 
 
+def test_capture_dictation_context_reads_accessibility_in_one_launch(monkeypatch) -> None:
+    runner = _FakeOsascriptRunner(
+        [
+            _ax_snapshot_output(
+                'TextEdit',
+                window_title='notes.txt',
+                role='AXTextArea',
+                title='',
+                selected_text='选中的内容',
+                value='前面写好的一段草稿',
+            )
+        ]
+    )
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
+
+    config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=True, max_chars=1200)))
+    context = dictation_context_service.capture_dictation_context(config, force=True)
+
+    assert context is not None
+    assert context.app_name == 'TextEdit'
+    assert context.window_title == 'notes.txt'
+    assert context.selected_text == '选中的内容'
+    assert context.focus_text == '前面写好的一段草稿'
+    assert len(runner.calls) == 1
+    assert runner.calls[0][1] == 'JavaScript'
+
+
+def test_capture_dictation_context_chromium_falls_back_to_snapshot(monkeypatch) -> None:
+    runner = _FakeOsascriptRunner(
+        [
+            _ax_snapshot_output('Google Chrome', window_title='Docs', role='AXTextField', value='draft'),
+            'Docs\nhttps://example.com\nnot json',
+        ]
+    )
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
+
+    config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=True, max_chars=1200)))
+    context = dictation_context_service.capture_dictation_context(config, force=True)
+
+    assert context is not None
+    assert context.source == 'ax'
+    assert context.window_title == 'Docs'
+    assert context.focus_text == 'draft'
+    assert len(runner.calls) == 2
+
+
 def test_sanitize_terminal_context_prefers_natural_language_lines() -> None:
     raw = """
 Last login: Sat Mar 21 18:57:16 on ttys033
@@ -179,3 +271,710 @@ Vox Dictation 设置
         '热词词库\n'
         '维护标准写法与常见误识别，优先修正稳定错词。'
     )
+
+
+def test_estimate_context_tokens_handles_mixed_cjk_and_latin() -> None:
+    assert estimate_context_tokens('') == 0
+    assert estimate_context_tokens('你好，世界') == 5
+    assert estimate_context_tokens('Kubernetes rollout') == 3 + 2
+    assert estimate_context_tokens('部署 v2 到 Kubernetes 2025') == 2 + 1 + 1 + 1 + 3 + 2
+
+
+def test_fit_dictation_context_dedupes_overlapping_focus_and_selection() -> None:
+    focus = '请帮我检查一下 release 计划里的时间线'
+    context = DictationContext(
+        source='chromium',
+        selected_text='release 计划',
+        focus_text=focus,
+        context_text=f'上一条消息：今天先别发版\n{focus}',
+    )
+
+    fitted, budget = fit_dictation_context(context, 0)
+
+    assert fitted.selected_text == 'release 计划'
+    assert fitted.focus_text == '请帮我检查一下 … 里的时间线'
+    assert fitted.context_text == '上一条消息：今天先别发版'
+    assert fitted.source == 'chromium'
+    assert budget.max_tokens == 0
+    assert budget.deduped_chars > len(focus)
+    assert budget.dropped_chars == budget.deduped_chars
+    assert budget.tokens == sum(
+        estimate_context_tokens(text) for text in (fitted.selected_text, fitted.focus_text, fitted.context_text)
+    )
+
+
+def test_fit_dictation_context_keeps_text_nearest_caret_within_budget() -> None:
+    context = DictationContext(
+        source='ghostty',
+        focus_text='最新输入',
+        context_text='很早以前的输出' * 40 + '刚才的命令失败了',
+    )
+
+    fitted, budget = fit_dictation_context(context, 12)
+
+    assert fitted.focus_text == '最新输入'
+    assert fitted.context_text == '刚才的命令失败了'
+    assert budget.tokens == 12
+    assert budget.dropped_chars == len('很早以前的输出') * 40
+
+
+def test_fit_dictation_context_centers_window_on_elided_selection() -> None:
+    selected = 'deploy script'
+    context = DictationContext(
+        source='chromium',
+        selected_text=selected,
+        context_text='甲' * 50 + f'前文{selected}后文' + '乙' * 50,
+    )
+
+    fitted, budget = fit_dictation_context(context, 10)
+
+    assert fitted.selected_text == selected
+    assert fitted.context_text == '甲前文 … 后文'
+    assert budget.tokens == 10
+
+
+_STAND_IN_HELPER = '''
+import json, sys, time
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get('ping'):
+        result = 'pong'
+    elif request['source'] == 'sleep':
+        time.sleep(5)
+        result = 'late'
+    elif request['source'].startswith('wire'):
+        result = str(line.isascii())
+    else:
+        result = request['language'] + ':' + request['source']
+    sys.stdout.write(json.dumps({'id': request['id'], 'ok': True, 'result': result}) + '\\n')
+    sys.stdout.flush()
+'''
+
+
+def _stand_in_runner(**kwargs) -> dictation_context_service.PersistentOsascriptRunner:
+    return dictation_context_service.PersistentOsascriptRunner(
+        command=[sys.executable, '-c', _STAND_IN_HELPER],
+        **kwargs,
+    )
+
+
+def test_persistent_osascript_runner_reuses_one_process() -> None:
+    runner = _stand_in_runner()
+    try:
+        assert runner.healthy() is True
+        assert runner.run(['line 1', 'line 2']) == 'AppleScript:line 1\nline 2'
+        assert runner.run(['(() => 1)()'], language='JavaScript') == 'JavaScript:(() => 1)()'
+        assert runner.run(['wire "标题"']) == 'True'
+        assert runner.starts == 1
+        assert runner.helper_active is True
+    finally:
+        runner.close()
+    assert runner.helper_active is False
+
+
+def test_persistent_osascript_runner_restarts_after_exit_and_times_out() -> None:
+    runner = _stand_in_runner(timeout_sec=0.5)
+    try:
+        assert runner.healthy() is True
+        runner._process.kill()
+        runner._process.wait()
+
+        assert runner.run(['again']) == 'AppleScript:again'
+        assert runner.starts == 2
+        with pytest.raises(RuntimeError, match='timed out'):
+            runner.run(['sleep'])
+        assert runner.helper_active is False
+        assert runner.run(['after timeout']) == 'AppleScript:after timeout'
+    finally:
+        runner.close()
+
+
+def test_persistent_osascript_runner_falls_back_to_one_shot(monkeypatch) -> None:
+    monkeypatch.setattr(
+        dictation_context_service.OsascriptRunner,
+        'run',
+        lambda self, lines, language=None: 'one-shot',
+    )
+    runner = dictation_context_service.PersistentOsascriptRunner(command=['/nonexistent/vox-ax-helper'])
+
+    assert runner.run(['return 1']) == 'one-shot'
+    assert runner.helper_active is False
+
+
+def test_capture_snapshot_reports_helper_usage(monkeypatch) -> None:
+    config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=True, max_chars=1200)))
+    monkeypatch.setattr(dictation_context_service, '_capture_dictation_context', lambda config, force=False: (None, None, None))
+
+    assert dictation_context_service.capture_dictation_context_snapshot(config).helper is None
+    with dictation_context_service.use_osascript_runner(_stand_in_runner()) as runner:
+        assert runner.healthy() is True
+        assert dictation_context_service.capture_dictation_context_snapshot(config).helper is True
+    assert dictation_context_service._OSASCRIPT_RUNNER is not runner
+
+
+def _chat_page(active_value: str) -> dict[str, object]:
+    return {
+        'title': 'Codex Chat',
+        'selection': '',
+        'isEditable': True,
+        'activeValue': active_value,
+        'nearbyText': '',
+        'mainText': '',
+        'bodyText': '上一轮对话\n这个页面真正有用的上下文',
+    }
+
+
+def test_capture_snapshot_reuses_page_text_within_ttl(monkeypatch) -> None:
+    runner = _FakeOsascriptRunner(
+        [
+            _ax_snapshot_output('Google Chrome', window_title='Codex Chat', document='https://example.com/chat'),
+            _chromium_output('Codex Chat', 'https://example.com/chat', _chat_page('first draft')),
+            _ax_snapshot_output(
+                'Google Chrome',
+                window_title='Codex Chat',
+                document='https://example.com/chat',
+                selected_text='上下文',
+                value='second draft',
+            ),
+        ]
+    )
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
+    config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=True, max_chars=200)))
+
+    first = dictation_context_service.capture_dictation_context_snapshot(config)
+    second = dictation_context_service.capture_dictation_context_snapshot(config)
+
+    assert first.cache_hit is False
+    assert second.cache_hit is True
+    assert len(runner.calls) == 3
+    assert second.context is not None
+    assert second.context.context_text == first.context.context_text
+    assert second.context.page_url == 'https://example.com/chat'
+    assert second.context.selected_text == '上下文'
+    assert second.context.focus_text == 'second draft'
+
+
+def test_capture_snapshot_misses_cache_after_window_change_or_ttl(monkeypatch) -> None:
+    runner = _FakeOsascriptRunner(
+        [
+            _ax_snapshot_output('Google Chrome', window_title='Codex Chat'),
+            _chromium_output('Codex Chat', 'https://example.com/chat', _chat_page('draft')),
+            _ax_snapshot_output('Google Chrome', window_title='Other Tab'),
+            _chromium_output('Other Tab', 'https://example.com/other', _chat_page('draft')),
+        ]
+    )
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
+    config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=True, max_chars=200)))
+
+    assert dictation_context_service.capture_dictation_context_snapshot(config).cache_hit is False
+    assert dictation_context_service.capture_dictation_context_snapshot(config).cache_hit is False
+    assert len(runner.calls) == 4
+
+    config.dictation.context.cache_ttl_ms = 0
+    runner.outputs = [
+        _ax_snapshot_output('Google Chrome', window_title='Other Tab'),
+        _chromium_output('Other Tab', 'https://example.com/other', _chat_page('draft')),
+    ]
+    assert dictation_context_service.capture_dictation_context_snapshot(config).cache_hit is None
+    assert len(runner.calls) == 6
+
+
+def test_capture_snapshot_misses_cache_after_focus_moves_to_another_element(monkeypatch) -> None:
+    article = dict(_chat_page(''), isEditable=False, title='Page')
+    runner = _FakeOsascriptRunner(
+        [
+            _ax_snapshot_output('Google Chrome', window_title='Page', document='https://example.com/page', role='AXWebArea'),
+            _chromium_output('Page', 'https://example.com/page', article),
+            _ax_snapshot_output(
+                'Google Chrome',
+                window_title='Page',
+                document='https://example.com/page',
+                role='AXTextArea',
+                title='Comment',
+            ),
+            _chromium_output('Page', 'https://example.com/page', dict(article, isEditable=True, activeTag='TEXTAREA')),
+        ]
+    )
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
+    config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=True, max_chars=200)))
+
+    first = dictation_context_service.capture_dictation_context_snapshot(config)
+    second = dictation_context_service.capture_dictation_context_snapshot(config)
+
+    assert first.cache_hit is False
+    assert second.cache_hit is False
+    assert len(runner.calls) == 4
+    assert first.context is not None and second.context is not None
+    assert first.context.surface == 'browser_article'
+    assert second.context.surface == 'browser_form'
+
+
+def test_refresh_watched_snapshot_rereads_selection_only_on_the_same_page(monkeypatch) -> None:
+    runner = _FakeOsascriptRunner(
+        [
+            _ax_snapshot_output(
+                'Google Chrome',
+                window_title='Codex Chat',
+                document='https://example.com/chat',
+                selected_text='上下文',
+                value='new draft',
+            ),
+            _ax_snapshot_output('Notes', window_title='todo', value='shopping list'),
+        ]
+    )
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
+    config = VoxConfig(dictation=DictationConfig(context=DictationContextConfig(enabled=True, max_chars=200)))
+    watched = DictationContextSnapshot(
+        context=DictationContext(
+            source='chromium',
+            app_name='Google Chrome',
+            window_title='Codex Chat',
+            page_url='https://example.com/chat',
+            focus_text='old draft',
+            context_text='上一轮对话',
+        ),
+        capture_ms=180,
+        cache_hit=False,
+        age_ms=400,
+    )
+
+    same_page = dictation_context_service.refresh_dictation_context_snapshot(config, watched)
+    moved = dictation_context_service.refresh_dictation_context_snapshot(config, watched)
+
+    assert len(runner.calls) == 2
+    assert same_page.context is not None
+    assert same_page.context.context_text == '上一轮对话'
+    assert same_page.context.selected_text == '上下文'
+    assert same_page.context.focus_text == 'new draft'
+    assert same_page.age_ms == 400
+    assert moved.context is not None
+    assert moved.context.app_name == 'Notes'
+    assert moved.age_ms is None
+
+
+def test_context_cache_expires_entries(monkeypatch) -> None:
+    cache = dictation_context_service.DictationContextCache()
+    now = [100.0]
+    monkeypatch.setattr(dictation_context_service.time, 'monotonic', lambda: now[0])
+    context = DictationContext(source='chromium', context_text='page')
+
+    cache.put(('chrome', 'title'), context, ttl_sec=3.0)
+    now[0] += 2.0
+    assert cache.get(('chrome', 'title')) == context
+    assert cache.get_with_age(('chrome', 'title')) == (context, 2000)
+    now[0] += 1.5
+    assert cache.get(('chrome', 'title')) is None
+
+
+class _StubCapture:
+    def __init__(self, windows: list[str]) -> None:
+        self.windows = list(windows)
+        self.calls = 0
+
+    def __call__(self) -> DictationContextSnapshot:
+        window = self.windows[min(self.calls, len(self.windows) - 1)]
+        self.calls += 1
+        return DictationContextSnapshot(
+            context=DictationContext(source='ax', app_name='Notes', window_title=window),
+            capture_ms=5,
+        )
+
+
+def test_context_watcher_serves_fresh_snapshot_and_reports_focus_changes() -> None:
+    capture = _StubCapture(['draft', 'draft', 'draft', 'todo'])
+    changes: list[str | None] = []
+
+    async def scenario() -> tuple[DictationContextSnapshot | None, DictationContextSnapshot | None]:
+        watcher = DictationContextWatcher(
+            capture,
+            interval_ms=10,
+            max_age_ms=1000,
+            on_focus_change=lambda snapshot: changes.append(snapshot.context.window_title),
+        )
+        assert watcher.latest() is None
+        watcher.start()
+        while watcher.polls < 5:
+            await asyncio.sleep(0.005)
+        latest = watcher.latest()
+        await watcher.stop()
+        polls = watcher.polls
+        await asyncio.sleep(0.03)
+        assert watcher.polls == polls
+        return latest, watcher.latest()
+
+    latest, after_stop = asyncio.run(scenario())
+
+    assert latest is not None
+    assert latest.context.window_title == 'todo'
+    assert 0 <= latest.age_ms < 1000
+    assert after_stop is not None
+    assert changes == ['draft', 'todo']
+
+
+def test_context_watcher_drops_stale_or_failed_snapshots(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(dictation_context_service.time, 'monotonic', lambda: now[0])
+    watcher = DictationContextWatcher(_StubCapture(['draft']), interval_ms=500, max_age_ms=1500)
+
+    async def poll_once(watcher: DictationContextWatcher) -> None:
+        watcher.start()
+        while watcher.polls < 1:
+            await asyncio.sleep(0)
+        await watcher.stop()
+
+    asyncio.run(poll_once(watcher))
+    now[0] += 1.2
+    assert watcher.latest().age_ms == 1200
+    now[0] += 0.5
+    assert watcher.latest() is None
+
+    # 轮询命中页面缓存时，正文的年龄要算上缓存条目本身的年龄。
+    cached = DictationContextWatcher(
+        lambda: DictationContextSnapshot(
+            context=DictationContext(source='chromium', app_name='Google Chrome'),
+            capture_ms=2,
+            cache_hit=True,
+            age_ms=900,
+        ),
+        interval_ms=500,
+        max_age_ms=1500,
+    )
+    asyncio.run(poll_once(cached))
+    now[0] += 0.5
+    assert cached.latest().age_ms == 1400
+
+    failing = DictationContextWatcher(
+        lambda: DictationContextSnapshot(context=None, capture_ms=3, error='osascript failed'),
+        interval_ms=500,
+        max_age_ms=1500,
+    )
+    asyncio.run(poll_once(failing))
+    assert failing.polls == 1
+    assert failing.latest() is None
+
+
+# 最小 DOM：只实现页面抽取脚本用到的接口，用来在 node 里跑 TreeWalker 版脚本。
+_FAKE_DOM_JS = r'''
+const NodeFilter = { SHOW_ELEMENT: 1, SHOW_TEXT: 4, FILTER_ACCEPT: 1, FILTER_REJECT: 2, FILTER_SKIP: 3 };
+class FakeNode {
+  constructor(nodeType, parentNode) { this.nodeType = nodeType; this.parentNode = parentNode; this.childNodes = []; }
+  get parentElement() { return this.parentNode; }
+  get lastChild() { return this.childNodes.length ? this.childNodes[this.childNodes.length - 1] : null; }
+  get previousSibling() {
+    if (!this.parentNode) return null;
+    const index = this.parentNode.childNodes.indexOf(this);
+    return index > 0 ? this.parentNode.childNodes[index - 1] : null;
+  }
+  get textContent() { return this.nodeType === 3 ? this.nodeValue : this.childNodes.map((child) => child.textContent).join(''); }
+}
+const matchesOne = (node, selector) => {
+  const attr = selector.trim().match(/^\[([\w-]+)(?:="([^"]*)")?\]$/);
+  if (attr) return attr[2] === undefined ? attr[1] in node.attributes : node.attributes[attr[1]] === attr[2];
+  return node.tagName === selector.trim().toUpperCase();
+};
+class FakeElement extends FakeNode {
+  constructor(tag, attributes, parentNode) {
+    super(1, parentNode);
+    this.tagName = tag.toUpperCase();
+    this.attributes = attributes;
+    this.type = attributes.type || '';
+    this.isContentEditable = attributes.contenteditable === 'true';
+    if ('value' in attributes) this.value = attributes.value;
+  }
+  matches(selector) { return selector.split(',').some((part) => matchesOne(this, part)); }
+  closest(selector) {
+    for (let node = this; node; node = node.parentNode) if (node.matches(selector)) return node;
+    return null;
+  }
+  querySelectorAll(selector) {
+    const found = [];
+    const visit = (node) => node.childNodes.forEach((child) => {
+      if (child.nodeType !== 1) return;
+      if (child.matches(selector)) found.push(child);
+      visit(child);
+    });
+    visit(this);
+    return found;
+  }
+}
+class FakeTreeWalker {
+  constructor(root, filter) { this.root = root; this.filter = filter; this.currentNode = root; }
+  accepted(node) { return this.filter.acceptNode(node) === NodeFilter.FILTER_ACCEPT; }
+  lastAcceptedChild(node) {
+    let child = node.lastChild;
+    while (child && !this.accepted(child)) child = child.previousSibling;
+    return child;
+  }
+  lastChild() {
+    const child = this.lastAcceptedChild(this.currentNode);
+    if (child) this.currentNode = child;
+    return child;
+  }
+  previousNode() {
+    let node = this.currentNode;
+    while (node !== this.root) {
+      let sibling = node.previousSibling;
+      while (sibling && !this.accepted(sibling)) sibling = sibling.previousSibling;
+      if (sibling) {
+        node = sibling;
+        for (let child = this.lastAcceptedChild(node); child; child = this.lastAcceptedChild(node)) node = child;
+        this.currentNode = node;
+        return node;
+      }
+      node = node.parentNode;
+      if (!node || node === this.root) return null;
+      this.currentNode = node;
+      return node;
+    }
+    return null;
+  }
+}
+const build = (spec, parentNode) => {
+  if (typeof spec === 'string') {
+    const text = new FakeNode(3, parentNode);
+    text.nodeValue = spec;
+    return text;
+  }
+  const [tag, attributes, ...children] = spec;
+  const element = new FakeElement(tag, attributes, parentNode);
+  element.childNodes = children.map((child) => build(child, element));
+  return element;
+};
+const page = JSON.parse(process.argv[1]);
+const body = build(page.body, null);
+const focused = body.querySelectorAll('[data-focus]')[0] || body;
+const styleCalls = new Map();
+const inlineStyle = (element) => Object.fromEntries(
+  (element.attributes.style || '').split(';').filter((rule) => rule.includes(':')).map((rule) => rule.split(':').map((part) => part.trim()))
+);
+const computedStyle = (element) => {
+  const style = inlineStyle(element);
+  const inherited = element.parentNode ? computedStyle(element.parentNode).visibility : 'visible';
+  return { display: style.display || 'block', visibility: style.visibility || inherited };
+};
+global.getComputedStyle = (element) => {
+  styleCalls.set(element, (styleCalls.get(element) || 0) + 1);
+  return computedStyle(element);
+};
+global.NodeFilter = NodeFilter;
+global.window = { getSelection: () => ({ toString: () => page.selection || '' }) };
+global.document = {
+  title: page.title,
+  body,
+  activeElement: focused,
+  createTreeWalker: (root, whatToShow, filter) => new FakeTreeWalker(root, filter),
+  querySelectorAll: (selector) => body.querySelectorAll(selector),
+};
+process.stdout.write(eval(process.argv[2]));
+process.stderr.write(JSON.stringify({ maxStyleCalls: Math.max(0, ...styleCalls.values()) }));
+'''
+
+_CHAT_MESSAGES = [
+    '用户：帮我看一下这个接口为什么一直超时，日志里全是 502。',
+    '助手：先确认网关的超时配置，再看上游服务有没有在 30 秒内返回。',
+    '用户：网关配置是 60 秒，上游大概 40 秒才返回。',
+    '助手：那就是上游慢，可以先把慢查询拆出来，再看连接池有没有被占满。',
+]
+_DOC_PARAGRAPHS = [
+    '上下文采集会在按下快捷键时读取当前窗口的内容。',
+    '浏览器里优先读取正文区域，拿不到时再退回整页文本。',
+    '终端里只保留自然语言行，命令和日志会被过滤掉。',
+]
+_PAGE_FIXTURES = [
+    {
+        'name': 'chat',
+        'url': 'https://example.com/chat',
+        'page': {
+            'title': 'Codex Chat',
+            'body': [
+                'body',
+                {},
+                ['nav', {}, ['ul', {}, ['li', {}, '历史对话：周报整理'], ['li', {}, '历史对话：接口超时排查']]],
+                [
+                    'main',
+                    {},
+                    *[['div', {}, ['p', {}, message]] for message in _CHAT_MESSAGES],
+                    ['script', {}, 'window.__STATE__ = {"draft": true}'],
+                    ['form', {}, ['textarea', {'data-focus': 'true', 'value': '我觉得可以先'}]],
+                ],
+                ['footer', {'data-dictation-ignore': 'true'}, '发送 附件 语音'],
+            ],
+        },
+        # 浏览器里 innerText 的结果：段落之间空一行，script 与忽略节点不出现。
+        'legacy': {
+            'title': 'Codex Chat',
+            'selection': '',
+            'isEditable': True,
+            'activeTag': 'TEXTAREA',
+            'activeValue': '我觉得可以先',
+            'nearbyText': '\n\n'.join(_CHAT_MESSAGES) + '\n\n',
+            'mainText': '\n\n'.join(_CHAT_MESSAGES) + '\n\n',
+            'bodyText': '历史对话：周报整理\n历史对话：接口超时排查\n' + '\n\n'.join(_CHAT_MESSAGES) + '\n\n',
+        },
+    },
+    {
+        'name': 'article',
+        'url': 'https://example.com/docs/context',
+        'page': {
+            'title': 'Context - Docs',
+            'body': [
+                'body',
+                {},
+                ['header', {}, 'Docs 顶部导航'],
+                [
+                    'article',
+                    {},
+                    ['h1', {}, 'Dictation 上下文'],
+                    *[['p', {}, '\n      ' + paragraph + '\n    '] for paragraph in _DOC_PARAGRAPHS],
+                ],
+                ['aside', {'data-dictation-ignore': 'true'}, '本站使用 Cookie 改善体验'],
+                ['footer', {}, '版权所有'],
+            ],
+        },
+        'legacy': {
+            'title': 'Context - Docs',
+            'selection': '',
+            'isEditable': False,
+            'activeTag': 'BODY',
+            'activeValue': 'Docs 顶部导航\nDictation 上下文\n\n'
+            + '\n\n'.join(_DOC_PARAGRAPHS)
+            + '\n本站使用 Cookie 改善体验\n版权所有',
+            'nearbyText': '',
+            'mainText': 'Dictation 上下文\n\n' + '\n\n'.join(_DOC_PARAGRAPHS),
+            'bodyText': 'Docs 顶部导航\nDictation 上下文\n\n' + '\n\n'.join(_DOC_PARAGRAPHS) + '\n版权所有',
+        },
+    },
+]
+
+
+def _run_walker_script(page: dict[str, object], max_chars: int, *, stats: dict[str, object] | None = None) -> dict[str, object]:
+    node = shutil.which('node')
+    if node is None:
+        pytest.skip('node is not installed')
+    script = dictation_context_service._CHROMIUM_WALKER_SCRIPT.replace(
+        '__LIMIT__',
+        str(min(4000, max(400, max_chars * 2))),
+    )
+    result = subprocess.run(
+        [node, '-e', _FAKE_DOM_JS, json.dumps(page, ensure_ascii=False), script],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    if stats is not None:
+        stats.update(json.loads(result.stderr))
+    return json.loads(result.stdout)
+
+
+def _chromium_context_from_payload(monkeypatch, fixture: dict[str, object], payload: dict[str, object], **kwargs):
+    runner = _FakeOsascriptRunner([_chromium_output(fixture['page']['title'], fixture['url'], payload)])
+    monkeypatch.setattr(dictation_context_service, '_OSASCRIPT_RUNNER', runner)
+    context = dictation_context_service._capture_chromium_context('Google Chrome', 200, **kwargs)
+    return context, runner.calls[0][0]
+
+
+@pytest.mark.parametrize('fixture', _PAGE_FIXTURES, ids=[fixture['name'] for fixture in _PAGE_FIXTURES])
+def test_chromium_walker_extraction_matches_clone_extraction(monkeypatch, fixture) -> None:
+    walker_payload = _run_walker_script(fixture['page'], 200)
+
+    legacy_context, legacy_lines = _chromium_context_from_payload(
+        monkeypatch, fixture, fixture['legacy'], extractor='clone'
+    )
+    walker_context, walker_lines = _chromium_context_from_payload(monkeypatch, fixture, walker_payload)
+
+    assert legacy_context is not None and legacy_context.context_text
+    if fixture['legacy']['isEditable']:
+        assert walker_context == legacy_context
+    else:
+        # 焦点不在输入框时 activeValue 是整页文本：旧脚本读的是未清理的 innerText，新脚本会跳过忽略节点。
+        assert replace(walker_context, focus_text=None) == replace(legacy_context, focus_text=None)
+        assert '本站使用 Cookie' not in walker_context.focus_text
+    assert 'cloneNode' in legacy_lines[2]
+    assert 'cloneNode' not in walker_lines[2] and 'innerText' not in walker_lines[2]
+
+
+def test_chromium_walker_extraction_stops_at_limit() -> None:
+    paragraphs = [f'第 {index} 段：这里是一段足够长的正文内容，用来确认抽取在够用之后就停下。' for index in range(200)]
+    page = {'title': 'Long', 'body': ['body', {}, ['main', {}, *[['p', {}, text] for text in paragraphs]]]}
+
+    payload = _run_walker_script(page, 200)
+
+    assert len(payload['mainText']) <= 400
+    assert payload['mainText'].endswith(paragraphs[-1])
+    assert paragraphs[0] not in payload['bodyText']
+
+
+def test_chromium_walker_skips_elements_hidden_by_style_but_keeps_aria_hidden_text() -> None:
+    page = {
+        'title': 'Styles',
+        'body': [
+            'body',
+            {},
+            [
+                'main',
+                {},
+                ['p', {}, '第一段可见正文。'],
+                ['div', {'style': 'display: none'}, ['p', {}, '折叠起来的菜单']],
+                ['div', {'style': 'visibility: hidden'}, '占位但看不见', ['span', {'style': 'visibility: visible'}, '子元素重新可见']],
+                ['p', {'aria-hidden': 'true'}, '装饰性但可见的文字'],
+                ['p', {}, '最后一段可见正文。'],
+            ],
+        ],
+    }
+    stats: dict[str, object] = {}
+
+    payload = _run_walker_script(page, 200, stats=stats)
+
+    assert payload['mainText'] == '第一段可见正文。\n子元素重新可见\n装饰性但可见的文字\n最后一段可见正文。'
+    assert payload['bodyText'] == payload['mainText']
+    assert stats['maxStyleCalls'] == 1
+
+
+def test_chromium_walker_measures_nearby_text_without_script_content() -> None:
+    page = {
+        'title': 'Reply',
+        'body': [
+            'body',
+            {},
+            [
+                'div',
+                {},
+                ['div', {}, *[['p', {}, message] for message in _CHAT_MESSAGES]],
+                [
+                    'section',
+                    {},
+                    ['p', {}, '上一条回复：好的，我这边先看一下。'],
+                    ['script', {}, 'window.__STATE__ = ' + json.dumps({'draft': 'x' * 300})],
+                    ['form', {}, ['textarea', {'data-focus': 'true', 'value': ''}]],
+                ],
+            ],
+        ],
+    }
+
+    payload = _run_walker_script(page, 200)
+
+    # 旧的 textContent 量法会把 script 文本算进去，停在只有一句话的 section 上。
+    assert payload['nearbyText'].endswith('上一条回复：好的，我这边先看一下。')
+    assert all(message in payload['nearbyText'] for message in _CHAT_MESSAGES)
+
+
+def test_sanitize_terminal_context_keeps_tail_of_large_scrollback() -> None:
+    scrollback = ('❯ uv run pytest -q\nsrc/vox_cli/services/dictation_context_service.py | 42 +++++-----\n' * 12000) + (
+        '先把上下文采集的耗时降下来。\r\n先把上下文采集的耗时降下来。\r\n\r\n再看 LLM 的首包时间。\n❯ '
+    )
+
+    assert len(scrollback) > 1_000_000
+    assert dictation_context_service._sanitize_terminal_context(scrollback, 1200) == (
+        '先把上下文采集的耗时降下来。\n再看 LLM 的首包时间。'
+    )
+
+
+def test_sanitize_page_context_handles_line_breaks_and_placeholders() -> None:
+    page = 'Docs 顶部导航\r\n\r\n第一段\r第一段\n12:04:33 GET /api/state 200\n' + '正文\n' * 3 + '第二段\n结尾'
+
+    assert dictation_context_service._sanitize_page_context(' missing value ', 100) is None
+    assert dictation_context_service._sanitize_page_context('\r\n \n', 100) is None
+    assert dictation_context_service._sanitize_page_context(page, 100) == 'Docs 顶部导航\n第一段\n正文\n第二段\n结尾'
+    assert dictation_context_service._sanitize_page_context(page, 100, prefer_tail=True) == (
+        'Docs 顶部导航\n第一段\n正文\n第二段\n结尾'
+    )
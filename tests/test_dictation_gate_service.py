@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from vox_cli.config import DictationGateConfig, DictationHotwordEntry, DictationHotwordsConfig
+from vox_cli.services.dictation_gate_service import DictationLLMGate
+
+
+def _gate(**overrides) -> DictationLLMGate:
+    hotwords = DictationHotwordsConfig(
+        enabled=True,
+        entries=[DictationHotwordEntry(value='Kubernetes'), DictationHotwordEntry(value='潮汕牛肉火锅')],
+    )
+    return DictationLLMGate(DictationGateConfig(enabled=True, **overrides), hotwords)
+
+
+def test_gate_skips_short_numeric_and_empty_utterances() -> None:
+    gate = _gate()
+
+    assert gate.evaluate('好的。') == ('short', None)
+    assert gate.evaluate('ok thanks') == ('short', None)
+    assert gate.evaluate('3.14, 2026') == ('numeric', None)
+    assert gate.evaluate('。。') == ('no_content', None)
+    assert gate.evaluate('今天下午三点开会讨论发布计划') == (None, None)
+
+
+def test_gate_keeps_llm_for_fillers_and_hotword_near_misses() -> None:
+    gate = _gate()
+
+    assert gate.evaluate('嗯好的') == (None, None)
+    assert gate.evaluate('um yes') == (None, None)
+    assert gate.evaluate('cubernetes') == (None, None)
+    assert gate.evaluate('潮汕牛') == (None, None)
+    assert gate.evaluate('Kubernetes') == ('short', None)
+
+
+def test_gate_reuses_last_output_when_only_punctuation_differs() -> None:
+    gate = _gate()
+    gate.remember('今天下午三点开会，讨论发布计划。', scope=1)
+
+    assert gate.evaluate('今天下午三点开会 讨论发布计划', scope=1) == (
+        'matches_last_output',
+        '今天下午三点开会，讨论发布计划。',
+    )
+    assert gate.evaluate('今天下午三点开会 讨论发布计划', scope=2) == (None, None)
+    assert gate.evaluate('今天下午三点开会 讨论发布计划') == (None, None)
+
+    gate.remember('另一句话，不该被记住。', scope=None)
+    assert gate.evaluate('今天下午三点开会 讨论发布计划', scope=1)[0] == 'matches_last_output'
+
+    disabled = _gate(reuse_last_output=False)
+    disabled.remember('今天下午三点开会，讨论发布计划。', scope=1)
+    assert disabled.evaluate('今天下午三点开会 讨论发布计划', scope=1) == (None, None)
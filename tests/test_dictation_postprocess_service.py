@@ -2,16 +2,20 @@ from __future__ import annotations
 
 import io
 import json
+import threading
 import urllib.error
+import urllib.parse
 
 from vox_cli.config import (
     DictationConfig,
+    DictationContextConfig,
     DictationHintsConfig,
     DictationHotwordEntry,
     DictationHotwordsConfig,
     DictationLLMConfig,
     DictationTransformConfig,
     VoxConfig,
+    resolve_dictation_llm_prompts,
 )
 from vox_cli.services.dictation_postprocess_service import (
     DictationTextPostprocessor,
@@ -20,6 +24,7 @@ from vox_cli.services.dictation_postprocess_service import (
     build_text_diff,
 )
 from vox_cli.services.dictation_context_service import DictationContext
+from vox_cli.services.llm_http_service import LLMCancelToken
 
 
 class _FakeHTTPResponse:
@@ -62,6 +67,18 @@ def test_apply_dictation_transforms_normalizes_spacing_and_punctuation() -> None
     assert result == '你好, world'
 
 
+def test_apply_dictation_transforms_keeps_decimals_and_non_bmp_spacing() -> None:
+    config = DictationTransformConfig(
+        fullwidth_to_halfwidth=True,
+        space_around_punct=True,
+        space_between_cjk=True,
+    )
+
+    assert apply_dictation_transforms('版本３.１４发布，见《说明》（附录）', config) == '版本 3.14 发布, 见 <说明>(附录)'
+    assert apply_dictation_transforms('好的😀(ok)!next\n行', config) == '好的😀 (ok)! next\n行'
+    assert apply_dictation_transforms('「引用」与‘单引号’　结束', config) == '"引用"与\'单引号\' 结束'
+
+
 def test_build_text_diff_marks_replacements() -> None:
     diff = build_text_diff('语音输入法的转换，还有AI的检测能力。', '语音输入法的转换, 以及 AI 的检测能力')
 
@@ -107,7 +124,7 @@ def test_postprocessor_calls_custom_openai_compatible_provider(monkeypatch) -> N
 
     monkeypatch.setenv('OPENROUTER_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -178,7 +195,7 @@ def test_postprocessor_uses_prompt_preset_when_no_custom_override(monkeypatch) -
 
     monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -222,7 +239,7 @@ def test_postprocessor_uses_deep_clean_preset(monkeypatch) -> None:
 
     monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -266,7 +283,7 @@ def test_postprocessor_uses_spoken_clean_preset(monkeypatch) -> None:
 
     monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -311,7 +328,7 @@ def test_postprocessor_default_preset_is_dictation_safe(monkeypatch) -> None:
 
     monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -352,7 +369,7 @@ def test_postprocessor_supports_api_key_from_config(monkeypatch) -> None:
         )
 
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -396,7 +413,7 @@ def test_postprocessor_allows_missing_api_key_for_loopback_base_url(monkeypatch)
 
     monkeypatch.delenv('OPENAI_API_KEY', raising=False)
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -438,7 +455,7 @@ def test_postprocessor_allows_missing_api_key_for_local_mlx_provider(monkeypatch
 
     monkeypatch.delenv('OPENAI_API_KEY', raising=False)
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -503,7 +520,7 @@ def test_postprocessor_feeds_raw_asr_text_to_llm_then_applies_rules(monkeypatch)
 
     monkeypatch.setenv('TEST_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -544,7 +561,7 @@ def test_postprocessor_can_skip_llm_for_partial_preview(monkeypatch) -> None:
         raise AssertionError('LLM should not be called when allow_llm=False')
 
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fail_urlopen,
     )
 
@@ -599,7 +616,7 @@ def test_postprocessor_injects_context_block_when_template_has_no_placeholder(mo
 
     monkeypatch.setenv('TEST_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -638,6 +655,57 @@ def test_postprocessor_injects_context_block_when_template_has_no_placeholder(mo
     assert result.metadata['context_source'] == 'ghostty'
 
 
+def test_postprocessor_fits_context_into_token_budget(monkeypatch) -> None:
+    captured: dict[str, object] = {}
+
+    def fake_urlopen(request, timeout):
+        captured['body'] = json.loads(request.data.decode('utf-8'))
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '原始文本。'}}]})
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+                user_prompt_template='TEXT={text}',
+            ),
+            context=DictationContextConfig(max_tokens=20),
+        )
+    )
+    focus = '正在输入的回复草稿'
+    emitted: list[tuple[str, dict]] = []
+
+    result = DictationTextPostprocessor(config).process(
+        '原始文本',
+        context=DictationContext(
+            source='chromium',
+            focus_text=focus,
+            context_text='旧消息' * 100 + '最新一条消息' + focus,
+        ),
+        emit=lambda stage, fields: emitted.append((stage, fields)),
+    )
+
+    prompt = captured['body']['messages'][1]['content']
+    assert '最近内容:\n<<<\n' in prompt
+    assert f'当前选中/焦点文本:\n<<<\n{focus}\n>>>' in prompt
+    assert prompt.count(focus) == 1
+    assert '旧消息' * 5 not in prompt
+    assert result.metadata['context_budget_tokens'] == 20
+    assert result.metadata['context_tokens'] == 20
+    assert result.metadata['context_dropped_chars'] == 300 + 6 + len(focus) - 11
+    assert result.metadata['context_chars'] == 300 + 6 + len(focus)
+    llm_start = next(fields for stage, fields in emitted if stage == 'llm_start')
+    assert llm_start['context_tokens'] == 20
+
 def test_postprocessor_applies_hotwords_before_llm_and_injects_hints(monkeypatch) -> None:
     captured: dict[str, object] = {}
 
@@ -657,7 +725,7 @@ def test_postprocessor_applies_hotwords_before_llm_and_injects_hints(monkeypatch
 
     monkeypatch.setenv('TEST_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -715,7 +783,7 @@ def test_postprocessor_streams_llm_chunks_and_emits_progress(monkeypatch) -> Non
 
     monkeypatch.setenv('TEST_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -746,6 +814,61 @@ def test_postprocessor_streams_llm_chunks_and_emits_progress(monkeypatch) -> Non
     assert 'llm_stream' in stages
 
 
+def test_postprocessor_reports_cleaned_stream_progress(monkeypatch) -> None:
+    stages: list[str] = []
+    progress: list[str] = []
+
+    def fake_urlopen(request, timeout):
+        return _FakeHTTPResponse(
+            content_type='text/event-stream',
+            raw_lines=[
+                'data: {"choices":[{"delta":{"content":"<think>嗯"}}]}\n\n',
+                'data: {"choices":[{"delta":{"content":"</think>你好，"}}]}\n\n',
+                'data: {"choices":[{"delta":{"content":"world。"}}]}\n\n',
+                'data: [DONE]\n\n',
+            ],
+        )
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+    monkeypatch.setattr('vox_cli.services.dictation_postprocess_service._LLM_PROGRESS_INTERVAL_MS', 0)
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            transforms=DictationTransformConfig(
+                fullwidth_to_halfwidth=True,
+                space_around_punct=True,
+                strip_trailing_punctuation=True,
+            ),
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+                user_prompt_template='TEXT={text}',
+            ),
+        )
+    )
+    postprocessor = DictationTextPostprocessor(config)
+
+    result = postprocessor.process(
+        '你好 world',
+        emit=lambda stage, fields: stages.append(stage),
+        on_progress=progress.append,
+    )
+
+    assert progress == ['你好,', '你好, world.']
+    assert result.text == '你好, world'
+    assert 'llm_delta' not in stages
+
+    progress.clear()
+    postprocessor.process('你好 world 呀', on_progress=progress.append, progress_prefix='前文。')
+    assert progress == ['前文. 你好,', '前文. 你好, world.']
+
 def test_postprocessor_strips_think_blocks_from_llm_output(monkeypatch) -> None:
     def fake_urlopen(request, timeout):
         return _FakeHTTPResponse(
@@ -762,7 +885,7 @@ def test_postprocessor_strips_think_blocks_from_llm_output(monkeypatch) -> None:
 
     monkeypatch.delenv('OPENAI_API_KEY', raising=False)
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -803,7 +926,7 @@ def test_postprocessor_strips_prompt_echo_wrappers_from_llm_output(monkeypatch)
 
     monkeypatch.delenv('OPENAI_API_KEY', raising=False)
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -834,7 +957,7 @@ def test_postprocessor_falls_back_to_rules_when_llm_fails(monkeypatch) -> None:
 
     monkeypatch.setenv('TEST_API_KEY', 'sk-test')
     monkeypatch.setattr(
-        'vox_cli.services.dictation_postprocess_service.urllib.request.urlopen',
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
         fake_urlopen,
     )
 
@@ -863,3 +986,622 @@ def test_postprocessor_falls_back_to_rules_when_llm_fails(monkeypatch) -> None:
     assert result.metadata['original_text'] == '你好，world。'
     assert result.metadata['final_text'] == '你好, world'
     assert result.metadata['llm_ms'] >= 0
+
+
+def test_postprocessor_records_llm_connect_and_ttfb_timings(monkeypatch) -> None:
+    stages: list[tuple[str, dict]] = []
+
+    def fake_urlopen(request, timeout):
+        response = _FakeHTTPResponse(
+            content_type='text/event-stream',
+            raw_lines=[
+                'data: {"choices":[{"delta":{"content":"你好"}}]}\n\n',
+                'data: [DONE]\n\n',
+            ],
+        )
+        response.connect_ms = 0
+        response.ttfb_ms = 85
+        response.reused = True
+        return response
+
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key='sk-inline',
+            ),
+        )
+    )
+
+    result = DictationTextPostprocessor(config).process(
+        '你好',
+        emit=lambda stage, fields: stages.append((stage, fields)),
+    )
+
+    assert result.metadata['llm_connect_ms'] == 0
+    assert result.metadata['llm_ttfb_ms'] == 85
+    assert result.metadata['llm_connection_reused'] is True
+    llm_done = next(fields for stage, fields in stages if stage == 'llm_done')
+    assert llm_done['connect_ms'] == 0
+    assert llm_done['ttfb_ms'] == 85
+
+
+def test_postprocessor_marks_cancelled_llm_call_and_falls_back(monkeypatch) -> None:
+    cancel = LLMCancelToken()
+
+    def fake_urlopen(request, timeout):
+        cancel.cancel()
+        return _FakeHTTPResponse(
+            content_type='text/event-stream',
+            raw_lines=['data: {"choices":[{"delta":{"content":"不该出现"}}]}\n\n'],
+        )
+
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key='sk-inline',
+            ),
+        )
+    )
+
+    result = DictationTextPostprocessor(config).process('你好', cancel=cancel)
+
+    assert result.text == '你好'
+    assert result.metadata['llm_used'] is False
+    assert result.metadata['llm_cancelled'] is True
+
+
+def test_postprocessor_injects_read_only_prefix_for_suffix_commit(monkeypatch) -> None:
+    captured: dict[str, object] = {}
+
+    def fake_urlopen(request, timeout):
+        captured['body'] = json.loads(request.data.decode('utf-8'))
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '说话测试。'}}]})
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+                user_prompt_template='TEXT={text}',
+            ),
+        )
+    )
+
+    result = DictationTextPostprocessor(config).process('说话测试', prefix_text='我在 Codex CLI 里')
+
+    prompt = captured['body']['messages'][1]['content']
+    assert prompt.startswith('本句已定稿的前文（只读）:\n<<<\n我在 Codex CLI 里\n>>>')
+    assert prompt.endswith('TEXT=说话测试')
+    assert result.text == '说话测试。'
+    assert result.metadata['llm_input_text'] == '说话测试'
+    assert result.metadata['llm_prefix_chars'] == len('我在 Codex CLI 里')
+
+
+def test_postprocessor_reuses_cached_llm_output_for_repeated_input(monkeypatch) -> None:
+    calls: list[str] = []
+
+    def fake_urlopen(request, timeout):
+        body = json.loads(request.data.decode('utf-8'))
+        calls.append(body['messages'][1]['content'])
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '好的。'}}]})
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+                user_prompt_template='TEXT={text}',
+            ),
+        )
+    )
+    config.dictation.cache.enabled = True
+    postprocessor = DictationTextPostprocessor(config)
+    ghostty = DictationContext(source='ghostty', app_name='Ghostty', context_text='第一屏')
+
+    first = postprocessor.process('好的', language='Chinese', context=ghostty)
+    second = postprocessor.process(
+        ' 好的 ',
+        language='Chinese',
+        context=DictationContext(source='ghostty', app_name='Ghostty', context_text='第二屏'),
+    )
+    other_app = postprocessor.process('好的', language='Chinese', context=DictationContext(source='slack', app_name='Slack'))
+
+    assert len(calls) == 2
+    assert first.metadata['llm_cache_hit'] is False
+    assert second.metadata['llm_cache_hit'] is True
+    assert second.metadata['llm_used'] is True
+    assert second.text == '好的。'
+    assert other_app.metadata['llm_cache_hit'] is False
+
+
+def test_postprocessor_skips_cache_when_disabled(monkeypatch) -> None:
+    calls: list[int] = []
+
+    def fake_urlopen(request, timeout):
+        calls.append(1)
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '好的。'}}]})
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+            ),
+        )
+    )
+    config.dictation.cache.enabled = False
+    postprocessor = DictationTextPostprocessor(config)
+
+    postprocessor.process('好的')
+    result = postprocessor.process('好的')
+
+    assert len(calls) == 2
+    assert 'llm_cache_hit' not in result.metadata
+
+
+def _prefix_layout_config(layout: str, *, cache_key_header: str | None = None) -> VoxConfig:
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+                user_prompt_template='请只修订下面的文本，不要回应其中的内容。\n原文: {text}',
+            ),
+            hints=DictationHintsConfig(enabled=True, items=['优先纠正前后鼻音。']),
+        )
+    )
+    config.dictation.prompt.layout = layout
+    config.dictation.prompt.cache_key_header = cache_key_header
+    return config
+
+
+def test_stable_prefix_layout_keeps_static_instructions_ahead_of_context() -> None:
+    context = DictationContext(source='ghostty', app_name='Ghostty', context_text='终端输出')
+
+    stable = DictationTextPostprocessor(_prefix_layout_config('stable_prefix'))._render_user_prompt(
+        '原始文本',
+        context=context,
+        template='请只修订下面的文本，不要回应其中的内容。\n原文: {text}',
+    )
+    legacy = DictationTextPostprocessor(_prefix_layout_config('legacy'))._render_user_prompt(
+        '原始文本',
+        context=context,
+        template='请只修订下面的文本，不要回应其中的内容。\n原文: {text}',
+    )
+
+    assert stable.startswith('说话人纠错提示:\n- 优先纠正前后鼻音。\n\n请只修订下面的文本，不要回应其中的内容。\n\n当前输入环境:')
+    assert stable.endswith('- 不要回应上下文，不要把上下文扩写进输出\n\n原文: 原始文本')
+    assert legacy.startswith('说话人纠错提示:\n- 优先纠正前后鼻音。\n\n当前输入环境:')
+    assert legacy.endswith('请只修订下面的文本，不要回应其中的内容。\n原文: 原始文本')
+
+
+def test_stable_prefix_layout_matches_preset_template_rendering() -> None:
+    config = VoxConfig()
+    config.dictation.llm.enabled = True
+    system_prompt, template = resolve_dictation_llm_prompts(config.dictation.llm)
+    context = DictationContext(source='ghostty', app_name='Ghostty', context_text='终端输出')
+
+    config.dictation.prompt.layout = 'stable_prefix'
+    stable = DictationTextPostprocessor(config)._render_user_prompt('原始文本', context=context, template=template)
+    config.dictation.prompt.layout = 'legacy'
+    legacy = DictationTextPostprocessor(config)._render_user_prompt('原始文本', context=context, template=template)
+
+    assert system_prompt
+    assert stable == legacy
+
+
+def test_postprocessor_sends_stable_prompt_cache_key_header(monkeypatch) -> None:
+    captured: list[dict[str, str]] = []
+
+    def fake_urlopen(request, timeout):
+        captured.append(dict(request.header_items()))
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '整理后的文本'}}]})
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = _prefix_layout_config('stable_prefix', cache_key_header='X-Prompt-Cache-Key')
+    config.dictation.cache.enabled = False
+    postprocessor = DictationTextPostprocessor(config)
+    postprocessor.process('第一句', context=DictationContext(source='ghostty', context_text='第一屏'))
+    postprocessor.process('第二句', context=DictationContext(source='slack', context_text='第二屏'))
+    config.dictation.hints.items = ['换一条提示。']
+    postprocessor.process('第三句')
+
+    keys = [headers['X-prompt-cache-key'] for headers in captured]
+    assert len(keys[0]) == 16
+    assert keys[0] == keys[1]
+    assert keys[2] != keys[0]
+
+
+def _hedged_config(*, delay_ms: int = 50) -> VoxConfig:
+    local = DictationLLMConfig(
+        enabled=True,
+        provider='local-mlx',
+        base_url='http://127.0.0.1:18080/v1',
+        model='local-model',
+        api_key_env='',
+        stream=False,
+    )
+    cloud = DictationLLMConfig(
+        enabled=True,
+        provider='aliyun',
+        base_url='https://cloud.example.com/v1',
+        model='cloud-model',
+        api_key='sk-test',
+        stream=False,
+    )
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm_active_profile='local-mlx',
+            llm_profiles={'local-mlx': local, 'aliyun': cloud},
+            llm=local.model_copy(deep=True),
+        )
+    )
+    config.dictation.hedge.enabled = True
+    config.dictation.hedge.delay_ms = delay_ms
+    config.dictation.cache.enabled = False
+    return config
+
+
+def _hedged_urlopen(*, stall_local: threading.Event | None = None, fail_local: bool = False):
+    hosts: list[str] = []
+
+    def fake_urlopen(request, timeout):
+        host = urllib.parse.urlsplit(request.full_url).hostname or ''
+        hosts.append(host)
+        if host == '127.0.0.1':
+            if fail_local:
+                raise urllib.error.URLError('connection refused')
+            if stall_local is not None:
+                stall_local.wait(5)
+            return _FakeHTTPResponse({'choices': [{'message': {'content': '本地结果'}}]})
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '云端结果'}}]})
+
+    return hosts, fake_urlopen
+
+
+def test_postprocessor_hedges_to_secondary_profile_when_primary_stalls(monkeypatch) -> None:
+    stall_local = threading.Event()
+    hosts, fake_urlopen = _hedged_urlopen(stall_local=stall_local)
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    try:
+        result = DictationTextPostprocessor(_hedged_config()).process('原始文本')
+    finally:
+        stall_local.set()
+
+    assert hosts == ['127.0.0.1', 'cloud.example.com']
+    assert result.text == '云端结果'
+    assert result.metadata['llm_hedged'] is True
+    assert result.metadata['llm_hedge_winner'] == 'aliyun'
+    assert result.metadata['provider'] == 'aliyun'
+    assert result.metadata['model'] == 'cloud-model'
+
+
+def test_postprocessor_skips_hedge_when_primary_answers_within_delay(monkeypatch) -> None:
+    hosts, fake_urlopen = _hedged_urlopen()
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    result = DictationTextPostprocessor(_hedged_config(delay_ms=2000)).process('原始文本')
+
+    assert hosts == ['127.0.0.1']
+    assert result.text == '本地结果'
+    assert result.metadata['llm_hedged'] is False
+    assert result.metadata['llm_hedge_winner'] == 'local-mlx'
+    assert result.metadata['provider'] == 'local-mlx'
+
+
+def test_postprocessor_fails_over_to_secondary_when_primary_errors(monkeypatch) -> None:
+    hosts, fake_urlopen = _hedged_urlopen(fail_local=True)
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    result = DictationTextPostprocessor(_hedged_config(delay_ms=2000)).process('原始文本')
+
+    assert hosts == ['127.0.0.1', 'cloud.example.com']
+    assert result.text == '云端结果'
+    assert result.metadata['llm_hedged'] is True
+    assert result.metadata['llm_hedge_winner'] == 'aliyun'
+
+
+def test_postprocessor_hedge_progress_follows_surviving_profile(monkeypatch) -> None:
+    local_failed = threading.Event()
+
+    def fake_urlopen(request, timeout):
+        host = urllib.parse.urlsplit(request.full_url).hostname or ''
+        if host == '127.0.0.1':
+            return _FakeHTTPResponse(
+                content_type='text/event-stream',
+                raw_lines=[
+                    'data: {"choices":[{"delta":{"content":"本地半句"}}]}\n\n',
+                    'data: {broken\n\n',
+                ],
+            )
+        local_failed.wait(5)
+        return _FakeHTTPResponse(
+            content_type='text/event-stream',
+            raw_lines=[
+                'data: {"choices":[{"delta":{"content":"云端"}}]}\n\n',
+                'data: {"choices":[{"delta":{"content":"结果"}}]}\n\n',
+                'data: [DONE]\n\n',
+            ],
+        )
+
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+    monkeypatch.setattr('vox_cli.services.dictation_postprocess_service._LLM_PROGRESS_INTERVAL_MS', 0)
+    config = _hedged_config(delay_ms=2000)
+    for llm in (config.dictation.llm, *config.dictation.llm_profiles.values()):
+        llm.stream = True
+    progress: list[str] = []
+
+    def on_progress(text: str) -> None:
+        progress.append(text)
+        if text == '本地半句':
+            local_failed.set()
+
+    result = DictationTextPostprocessor(config).process('原始文本', on_progress=on_progress)
+
+    assert result.text == '云端结果'
+    assert result.metadata['llm_hedge_winner'] == 'aliyun'
+    assert progress[0] == '本地半句'
+    assert progress[-1] == '云端结果'
+
+
+def test_postprocessor_skips_llm_while_circuit_is_open(monkeypatch) -> None:
+    calls: list[float] = []
+
+    def fake_urlopen(request, timeout):
+        calls.append(timeout)
+        raise urllib.error.URLError('timed out')
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+            ),
+        )
+    )
+    config.dictation.circuit.enabled = True
+    config.dictation.circuit.failure_threshold = 2
+    config.dictation.cache.enabled = False
+    postprocessor = DictationTextPostprocessor(config)
+    stages: list[str] = []
+
+    postprocessor.process('第一句')
+    postprocessor.process('第二句')
+    result = postprocessor.process('第三句', emit=lambda stage, fields: stages.append(stage))
+
+    assert len(calls) == 2
+    assert result.text == '第三句'
+    assert result.metadata['llm_used'] is False
+    assert result.metadata['llm_circuit_skipped'] is True
+    assert result.metadata['llm_circuit_state'] == 'open'
+    assert 'llm_error' not in result.metadata
+    assert 'llm_skipped' in stages
+
+
+def test_postprocessor_shrinks_llm_timeout_from_observed_latency(monkeypatch) -> None:
+    timeouts: list[float] = []
+
+    def fake_urlopen(request, timeout):
+        timeouts.append(timeout)
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '好的'}}]})
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+                timeout_sec=8.0,
+            ),
+        )
+    )
+    config.dictation.circuit.enabled = True
+    config.dictation.circuit.adaptive_timeout = True
+    config.dictation.circuit.min_samples = 2
+    config.dictation.cache.enabled = False
+    postprocessor = DictationTextPostprocessor(config)
+
+    for index in range(3):
+        result = postprocessor.process(f'好的{index}')
+
+    assert timeouts[:2] == [8.0, 8.0]
+    assert timeouts[2] == config.dictation.circuit.min_timeout_sec
+    assert result.metadata['llm_timeout_sec'] == config.dictation.circuit.min_timeout_sec
+    assert result.metadata['llm_circuit_state'] == 'closed'
+
+
+def test_postprocessor_keeps_speculative_calls_out_of_latency_samples(monkeypatch) -> None:
+    timeouts: list[float] = []
+
+    def fake_urlopen(request, timeout):
+        timeouts.append(timeout)
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '好的'}}]})
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+                timeout_sec=8.0,
+            ),
+        )
+    )
+    config.dictation.circuit.enabled = True
+    config.dictation.circuit.adaptive_timeout = True
+    config.dictation.circuit.min_samples = 2
+    postprocessor = DictationTextPostprocessor(config)
+
+    for index in range(3):
+        postprocessor.process(f'好的{index}', speculative=True)
+    result = postprocessor.process('好的')
+
+    assert timeouts == [8.0, 8.0, 8.0, 8.0]
+    assert result.metadata['llm_timeout_sec'] == 8.0
+    assert list(postprocessor.circuits) == [postprocessor.llm_profile]
+
+
+def test_postprocessor_gate_skips_llm_for_utterances_rules_can_finalize(monkeypatch) -> None:
+    calls: list[str] = []
+
+    def fake_urlopen(request, timeout):
+        calls.append(json.loads(request.data.decode('utf-8'))['messages'][-1]['content'])
+        return _FakeHTTPResponse({'choices': [{'message': {'content': '今天下午三点开会，讨论发布计划。'}}]})
+
+    monkeypatch.setenv('TEST_API_KEY', 'sk-test')
+    monkeypatch.setattr(
+        'vox_cli.services.dictation_postprocess_service._LLM_CONNECTION_POOL.urlopen',
+        fake_urlopen,
+    )
+
+    config = VoxConfig(
+        dictation=DictationConfig(
+            llm=DictationLLMConfig(
+                enabled=True,
+                provider='custom',
+                base_url='https://llm.example.com/v1',
+                model='demo-model',
+                api_key_env='TEST_API_KEY',
+            ),
+        )
+    )
+    config.dictation.gate.enabled = True
+    config.dictation.cache.enabled = False
+    postprocessor = DictationTextPostprocessor(config)
+    stages: list[tuple[str, dict]] = []
+
+    short = postprocessor.process('好的', emit=lambda stage, fields: stages.append((stage, fields)))
+    full = postprocessor.process('今天下午三点开会讨论发布计划', utterance_id=7)
+    repeat = postprocessor.process('今天下午三点开会 讨论发布计划', utterance_id=7)
+    next_utterance = postprocessor.process('今天下午三点开会 讨论发布计划', utterance_id=8)
+    suffix = postprocessor.process('好的', prefix_text='今天下午三点开会，讨论发布计划。', utterance_id=8)
+
+    assert len(calls) == 3
+    assert short.text == '好的'
+    assert short.metadata['llm_used'] is False
+    assert short.metadata['llm_skipped_reason'] == 'short'
+    assert [stage for stage, _ in stages] == ['llm_skipped', 'rules_done', 'final_ready']
+    assert stages[0][1]['reason'] == 'short'
+    assert full.metadata['llm_used'] is True
+    assert 'llm_skipped_reason' not in full.metadata
+    assert repeat.text == '今天下午三点开会，讨论发布计划。'
+    assert repeat.metadata['llm_skipped_reason'] == 'matches_last_output'
+    assert next_utterance.metadata['llm_used'] is True
+    assert suffix.metadata['llm_used'] is True
+    assert 'llm_gate_checked' not in suffix.metadata
+
+
+def test_postprocessor_builds_stage_diffs_only_for_emitters(monkeypatch) -> None:
+    diffs: list[tuple[str, str]] = []
+
+    def counting_diff(before: str, after: str) -> str:
+        diffs.append((before, after))
+        return build_text_diff(before, after)
+
+    monkeypatch.setattr('vox_cli.services.dictation_postprocess_service.build_text_diff', counting_diff)
+    config = VoxConfig(
+        dictation=DictationConfig(
+            transforms=DictationTransformConfig(fullwidth_to_halfwidth=True),
+        )
+    )
+    postprocessor = DictationTextPostprocessor(config)
+
+    result = postprocessor.process('你好，world。')
+    assert result.text == '你好,world.'
+    assert diffs == []
+
+    stages: dict[str, dict] = {}
+    postprocessor.process('你好，world。', emit=lambda stage, fields: stages.update({stage: fields}))
+    assert len(diffs) == 2
+    assert stages['rules_done']['diff'] == '你好[-，-][+,+]world[-。-][+.+]'
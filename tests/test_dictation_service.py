@@ -4,12 +4,17 @@ import io
 import json
 import os
 from pathlib import Path
+import sys
+import threading
+import time
+from types import ModuleType, SimpleNamespace
 
 import pytest
 
 from vox_cli.config import RuntimeConfig, VoxConfig
 from vox_cli.services import dictation_service
-from vox_cli.runtime import RuntimeLockState
+from vox_cli.runtime import RuntimeExecutionOptions, RuntimeLockState, acquire_memory_budget
+from vox_cli.services import asr_service
 
 
 class _FakeProc:
@@ -1035,7 +1040,7 @@ def test_launch_dictation_prepares_model_before_start(monkeypatch, tmp_path: Pat
         lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
     )
     monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
-    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr'})())
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
     monkeypatch.setattr(
         dictation_service,
         'ensure_model_downloaded',
@@ -1079,7 +1084,7 @@ def test_launch_dictation_prepares_model_before_start(monkeypatch, tmp_path: Pat
 def test_launch_dictation_fails_fast_when_asr_runtime_is_busy(monkeypatch, tmp_path: Path) -> None:
     config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
     state = RuntimeLockState(
-        resource='asr_infer',
+        resource='asr_session_server',
         pid=4321,
         task_type='asr_session_server',
         command_summary='asr session-server --model qwen-asr-0.6b-4bit',
@@ -1108,8 +1113,110 @@ def test_launch_dictation_fails_fast_when_asr_runtime_is_busy(monkeypatch, tmp_p
     assert 'kill 4321' in message
 
 
+def test_launch_dictation_queues_until_batch_job_yields(monkeypatch, tmp_path: Path, capsys) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path / 'home'), memory_budget_gb=0.5))
+    snapshot = tmp_path / 'snapshot'
+    snapshot.mkdir()
+
+    class _SlowModel:
+        def generate(self, audio: str, **kwargs):
+            time.sleep(0.05)
+            return SimpleNamespace(text=Path(audio).stem, segments=[])
+
+    stt = ModuleType('mlx_audio.stt')
+    stt.load = lambda path: _SlowModel()
+    package = ModuleType('mlx_audio')
+    package.stt = stt
+    monkeypatch.setitem(sys.modules, 'mlx_audio', package)
+    monkeypatch.setitem(sys.modules, 'mlx_audio.stt', stt)
+    monkeypatch.setattr(
+        asr_service,
+        'ensure_model_downloaded',
+        lambda config, spec, allow_download=True, runtime_options=None: {'snapshot_path': str(snapshot), 'endpoint': None},
+    )
+    batch_logs: list[str] = []
+    batch_results: list[dict] = []
+    audio = [tmp_path / f'{index}.wav' for index in range(20)]
+    batch = threading.Thread(
+        target=lambda: batch_results.extend(
+            asr_service.transcribe_files(
+                config,
+                audio,
+                'qwen-asr-0.6b-4bit',
+                'zh',
+                runtime_options=RuntimeExecutionOptions(
+                    wait_for_lock=True,
+                    wait_timeout_sec=30,
+                    log=batch_logs.append,
+                    priority='batch',
+                ),
+            )
+        )
+    )
+    batch.start()
+    deadline = time.monotonic() + 5
+    while dictation_service.probe_memory_budget(config, 700)[0] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    monkeypatch.setattr(
+        dictation_service,
+        'ensure_native_binary',
+        lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
+    )
+    monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
+    monkeypatch.setattr(
+        dictation_service,
+        'ensure_model_downloaded',
+        lambda config, spec, allow_download=True: {'snapshot_path': str(snapshot)},
+    )
+    server_ready = threading.Event()
+    server_stop = threading.Event()
+    server_cmds: list[list[str]] = []
+
+    def serve(wait_timeout: int) -> None:
+        # 代替 session-server 进程：以 interactive 优先级排队拿预算。
+        options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=wait_timeout, priority='interactive')
+        with acquire_memory_budget(config, 910, options=options, display_resource='asr_infer'):
+            server_ready.set()
+            server_stop.wait(10)
+
+    class _PipeProc(_FakeProc):
+        def __init__(self) -> None:
+            super().__init__(returncode=0)
+            self.stdout = io.StringIO('')
+
+    def fake_popen(cmd, cwd, stdout, stderr, text=None, bufsize=None):
+        if 'session-server' in cmd:
+            server_cmds.append(cmd)
+            threading.Thread(target=serve, args=(int(cmd[cmd.index('--wait-timeout') + 1]),), daemon=True).start()
+        return _PipeProc()
+
+    def fake_wait_for_session_server(host, port, timeout=60.0, server_proc=None):
+        if not server_ready.wait(timeout):
+            raise RuntimeError('session server never became ready')
+
+    monkeypatch.setattr(dictation_service.subprocess, 'Popen', fake_popen)
+    monkeypatch.setattr(dictation_service, 'wait_for_session_server', fake_wait_for_session_server)
+
+    try:
+        exit_code = dictation_service.launch_dictation(config=config, lang='zh', model='auto')
+    finally:
+        server_stop.set()
+        batch.join(timeout=30)
+
+    assert exit_code == 0
+    assert server_ready.is_set()
+    assert '--wait' in server_cmds[0]
+    assert any('Yielding asr_infer' in line for line in batch_logs)
+    assert [item['text'] for item in batch_results] == [path.stem for path in audio]
+    err = capsys.readouterr().err
+    assert 'Memory budget busy; waiting for memory_unit:0' in err
+    assert 'position 1' in err
+
+
 def test_build_dictation_runtime_busy_message_falls_back_to_process_scan(monkeypatch) -> None:
-    state = RuntimeLockState(resource='asr_infer')
+    state = RuntimeLockState(resource='asr_session_server')
 
     monkeypatch.setattr(
         dictation_service,
@@ -1138,7 +1245,7 @@ def test_launch_dictation_enables_partial_streaming_in_verbose(monkeypatch, tmp_
         lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
     )
     monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
-    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr'})())
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
     monkeypatch.setattr(
         dictation_service,
         'ensure_model_downloaded',
@@ -1187,7 +1294,7 @@ def test_launch_dictation_keeps_background_partial_streaming_disabled_when_llm_e
         lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
     )
     monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
-    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr'})())
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
     monkeypatch.setattr(
         dictation_service,
         'ensure_model_downloaded',
@@ -1230,7 +1337,7 @@ def test_launch_dictation_enables_partial_streaming_by_default_when_subtitle_ove
         lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
     )
     monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
-    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr'})())
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
     monkeypatch.setattr(
         dictation_service,
         'ensure_model_downloaded',
@@ -1275,7 +1382,7 @@ def test_launch_dictation_passes_llm_timeout_override_to_server(monkeypatch, tmp
         lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
     )
     monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
-    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr'})())
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
     monkeypatch.setattr(
         dictation_service,
         'ensure_model_downloaded',
@@ -1322,7 +1429,7 @@ def test_launch_dictation_passes_type_partial_to_helper(monkeypatch, tmp_path: P
         lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
     )
     monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
-    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr'})())
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
     monkeypatch.setattr(
         dictation_service,
         'ensure_model_downloaded',
@@ -1365,7 +1472,7 @@ def test_launch_dictation_passes_subtitle_overlay_to_helper_when_enabled(monkeyp
         lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
     )
     monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
-    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr'})())
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
     monkeypatch.setattr(
         dictation_service,
         'ensure_model_downloaded',
@@ -1513,3 +1620,261 @@ def test_native_target_dir_uses_runtime_cache_for_packaged_install(monkeypatch,
     result = dictation_service.native_target_dir(config)
 
     assert result == tmp_path / '.vox' / 'cache' / 'native' / 'vox-dictation' / 'target'
+
+
+def _write_agent_events(config: VoxConfig, events: list[dict[str, object]]) -> None:
+    log_path = dictation_service.dictation_agent_log_path(config)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    log_path.write_text(
+        ''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in events),
+        encoding='utf-8',
+    )
+
+
+def test_build_dictation_agent_digest_separates_llm_connect_and_ttfb(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
+    _write_agent_events(
+        config,
+        [
+            {'e': 'u', 'u': 1, 'cap': 3000, 'lu': 1, 'llm': 900, 'lcn': 180, 'ltb': 420, 'bot': 'balanced'},
+            {'e': 'u', 'u': 2, 'cap': 2800, 'lu': 1, 'llm': 700, 'lcn': 0, 'ltb': 400, 'bot': 'balanced'},
+            {'e': 'u', 'u': 3, 'cap': 2500, 'lu': 0, 'llm': 0, 'bot': 'balanced'},
+        ],
+    )
+
+    digest = dictation_service.build_dictation_agent_digest(config, utterances=3, slowest=1, errors=0)
+
+    assert digest['metrics']['llm_connect_ms'] == {'n': 2, 'avg': 90, 'p50': 0, 'p95': 180, 'max': 180}
+    assert digest['metrics']['llm_ttfb_ms']['n'] == 2
+    assert digest['slowest_utterances'][0]['llm_connect_ms'] == 180
+    assert digest['slowest_utterances'][0]['llm_ttfb_ms'] == 420
+
+
+def test_dictation_log_formatter_tracks_cancelled_partial_jobs() -> None:
+    formatter = dictation_service._DictationLogFormatter(_FakeStream())
+
+    formatter.format(
+        'server',
+        '[session-server] dictation_partial_pipeline | utterance_id=6 | state="job_started" | stable_chars=18 | completed_chars=0 | context_ready=false',
+    )
+    cancelled = formatter.format(
+        'server',
+        '[session-server] dictation_partial_pipeline | utterance_id=6 | state="job_cancelled" | reason="flush" | stable_chars=18 | wasted_ms=340',
+    )
+    lines = formatter.format(
+        'helper',
+        '[vox-dictation] timings utterance_id=6 capture_ms=4200 flush_roundtrip_ms=720 audio_ms=3800 warmup_ms=0 infer_ms=280 postprocess_ms=640 llm_ms=630 llm_used=true backend_total_ms=910 type_ms=28 warmup_reason=-',
+    )
+
+    assert '预跑取消' in _lines(cancelled)[0]
+    assert 'wasted 340ms' in _lines(cancelled)[0]
+    assert lines.log_events[0].fields['partial_jobs_cancelled'] == 1
+    assert lines.log_events[0].fields['partial_cancelled_wasted_ms'] == 340
+
+
+def test_build_dictation_agent_digest_summarizes_commit_modes(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
+    _write_agent_events(
+        config,
+        [
+            {'e': 'u', 'u': 1, 'cap': 3000, 'fl': 900, 'cm': 'full_final', 'bot': 'balanced'},
+            {'e': 'u', 'u': 2, 'cap': 2800, 'fl': 120, 'cm': 'reuse_exact', 'bot': 'balanced'},
+            {'e': 'u', 'u': 3, 'cap': 2500, 'fl': 160, 'cm': 'reuse_punct', 'bot': 'balanced'},
+            {'e': 'u', 'u': 4, 'cap': 2400, 'fl': 800, 'cm': 'full_final', 'bot': 'balanced'},
+        ],
+    )
+
+    digest = dictation_service.build_dictation_agent_digest(config, utterances=4, slowest=0, errors=0)
+
+    assert digest['commit'] == {
+        'instrumented': True,
+        'modes': {'full_final': 2, 'reuse_exact': 1, 'reuse_punct': 1},
+        'reuse_rate': 50,
+        'flush_ms_reuse': {'n': 2, 'avg': 140, 'p50': 120, 'p95': 160, 'max': 160},
+        'flush_ms_full': {'n': 2, 'avg': 850, 'p50': 800, 'p95': 900, 'max': 900},
+    }
+
+
+def test_launch_dictation_streams_partials_when_incremental_llm_enabled(
+    monkeypatch,
+    tmp_path: Path,
+) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
+    config.dictation.llm.enabled = True
+    config.dictation.incremental.enabled = True
+
+    monkeypatch.setattr(
+        dictation_service,
+        'ensure_native_binary',
+        lambda config=None, rebuild=False, required_flags=(): tmp_path / 'vox-dictation',
+    )
+    monkeypatch.setattr(dictation_service, 'pick_free_port', lambda host='127.0.0.1': 8765)
+    monkeypatch.setattr(dictation_service, 'resolve_model', lambda config, model_id, kind=None: type('Spec', (), {'model_id': model_id, 'repo_id': 'repo', 'kind': 'asr', 'weights_mb': 700})())
+    monkeypatch.setattr(
+        dictation_service,
+        'ensure_model_downloaded',
+        lambda config, spec, allow_download=True: {'snapshot_path': str(tmp_path / 'snapshots' / 'rev')},
+    )
+
+    popen_calls: list[list[str]] = []
+
+    class _PipeProc(_FakeProc):
+        def __init__(self) -> None:
+            super().__init__(returncode=0)
+            self.stdout = io.StringIO('')
+
+    monkeypatch.setattr(
+        dictation_service.subprocess,
+        'Popen',
+        lambda cmd, cwd, stdout, stderr, text=None, bufsize=None: popen_calls.append(cmd) or _PipeProc(),
+    )
+    monkeypatch.setattr(dictation_service, 'wait_for_session_server', lambda host, port, timeout=60.0, server_proc=None: None)
+
+    exit_code = dictation_service.launch_dictation(
+        config=config,
+        lang='zh',
+        model='auto',
+        verbose=False,
+    )
+
+    assert exit_code == 0
+    helper_cmd = popen_calls[1]
+    interval_index = helper_cmd.index('--partial-interval-ms')
+    assert helper_cmd[interval_index + 1] != '0'
+
+
+def test_build_dictation_agent_digest_summarizes_llm_cache_hits(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
+    _write_agent_events(
+        config,
+        [
+            {'e': 'u', 'u': 1, 'cap': 3000, 'lu': 1, 'llm': 900, 'lch': 0, 'bot': 'balanced'},
+            {'e': 'u', 'u': 2, 'cap': 1200, 'lu': 1, 'llm': 1, 'lch': 1, 'bot': 'balanced'},
+            {'e': 'u', 'u': 3, 'cap': 2500, 'lu': 0, 'llm': 0, 'bot': 'balanced'},
+        ],
+    )
+
+    digest = dictation_service.build_dictation_agent_digest(config, utterances=3, slowest=3, errors=0)
+
+    assert digest['llm_cache'] == {
+        'instrumented': True,
+        'lookups': 2,
+        'hits': 1,
+        'hit_rate': 50,
+        'llm_ms_hit': {'n': 1, 'avg': 1, 'p50': 1, 'p95': 1, 'max': 1},
+        'llm_ms_miss': {'n': 1, 'avg': 900, 'p50': 900, 'p95': 900, 'max': 900},
+    }
+    assert [item.get('llm_cache_hit') for item in digest['slowest_utterances']] == [False, None, True]
+
+
+def test_build_dictation_agent_digest_reports_llm_hedge_win_rates(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
+    _write_agent_events(
+        config,
+        [
+            {'e': 'u', 'u': 1, 'cap': 3000, 'lu': 1, 'llm': 900, 'lhg': 0, 'lhw': 'local-mlx', 'bot': 'balanced'},
+            {'e': 'u', 'u': 2, 'cap': 2800, 'lu': 1, 'llm': 700, 'lhg': 1, 'lhw': 'aliyun', 'bot': 'balanced'},
+            {'e': 'u', 'u': 3, 'cap': 2500, 'lu': 1, 'llm': 650, 'lhg': 1, 'lhw': 'aliyun', 'bot': 'balanced'},
+            {'e': 'u', 'u': 4, 'cap': 2400, 'lu': 1, 'llm': 640, 'lhg': 1, 'lhw': 'local-mlx', 'bot': 'balanced'},
+        ],
+    )
+
+    digest = dictation_service.build_dictation_agent_digest(config, utterances=4, slowest=1, errors=0)
+
+    assert digest['llm_hedge'] == {
+        'instrumented': True,
+        'calls': 4,
+        'hedged': 3,
+        'hedge_rate': 75,
+        'wins': {'aliyun': 2, 'local-mlx': 1},
+        'win_rates': {'aliyun': 67, 'local-mlx': 33},
+    }
+    assert digest['slowest_utterances'][0]['llm_hedged'] is False
+    assert digest['slowest_utterances'][0]['llm_hedge_winner'] == 'local-mlx'
+
+
+def test_build_dictation_agent_digest_reports_llm_circuit_states(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
+    _write_agent_events(
+        config,
+        [
+            {'e': 'u', 'u': 1, 'cap': 3000, 'lu': 1, 'llm': 900, 'lcs': 'closed', 'lt': 8.0, 'bot': 'balanced'},
+            {'e': 'u', 'u': 2, 'cap': 2800, 'lu': 0, 'llm': 0, 'lcs': 'open', 'lt': 8.0, 'bot': 'balanced'},
+            {'e': 'u', 'u': 3, 'cap': 2500, 'lu': 1, 'llm': 650, 'lcs': 'half_open', 'lt': 1.6, 'bot': 'balanced'},
+            {'e': 'u', 'u': 4, 'cap': 2400, 'lu': 1, 'llm': 640, 'bot': 'balanced'},
+        ],
+    )
+
+    digest = dictation_service.build_dictation_agent_digest(config, utterances=4, slowest=1, errors=0)
+
+    circuit = digest['llm_circuit']
+    assert circuit['instrumented'] is True
+    assert circuit['states'] == {'closed': 1, 'half_open': 1, 'open': 1}
+    assert circuit['skipped'] == 1
+    assert circuit['last_state'] == 'half_open'
+    assert circuit['timeout_ms']['max'] == 8000
+    assert digest['slowest_utterances'][0]['llm_circuit_state'] == 'closed'
+
+
+def test_build_dictation_agent_digest_reports_llm_gate_skip_rate(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
+    _write_agent_events(
+        config,
+        [
+            {'e': 'u', 'u': 1, 'cap': 3000, 'fl': 900, 'lu': 1, 'llm': 700, 'lg': 1, 'bot': 'balanced'},
+            {'e': 'u', 'u': 2, 'cap': 1200, 'fl': 120, 'lu': 0, 'llm': 0, 'lg': 1, 'lsr': 'short', 'bot': 'balanced'},
+            {'e': 'u', 'u': 3, 'cap': 1500, 'fl': 140, 'lu': 0, 'llm': 0, 'lg': 1, 'lsr': 'numeric', 'bot': 'balanced'},
+            {'e': 'u', 'u': 4, 'cap': 2400, 'fl': 300, 'lu': 0, 'llm': 0, 'lg': 1, 'lsr': 'circuit_open', 'bot': 'balanced'},
+        ],
+    )
+
+    digest = dictation_service.build_dictation_agent_digest(config, utterances=4, slowest=4, errors=0)
+
+    gate = digest['llm_gate']
+    assert gate['instrumented'] is True
+    assert gate['checked'] == 4
+    assert gate['skipped'] == 2
+    assert gate['skip_rate'] == 50
+    assert gate['reasons'] == {'circuit_open': 1, 'numeric': 1, 'short': 1}
+    assert gate['flush_ms_skipped']['avg'] == 130
+    assert gate['flush_ms_llm']['avg'] == 900
+    reasons = {item['utterance_id']: item.get('llm_skipped_reason') for item in digest['slowest_utterances']}
+    assert reasons[2] == 'short'
+    assert reasons[1] is None
+
+
+def test_build_dictation_agent_digest_splits_context_capture_by_helper(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path)))
+    _write_agent_events(
+        config,
+        [
+            {'e': 'u', 'u': 1, 'cap': 3000, 'ctxc': 420, 'bot': 'balanced'},
+            {'e': 'u', 'u': 2, 'cap': 2800, 'ctxc': 60, 'ctxh': 1, 'bot': 'balanced'},
+            {'e': 'u', 'u': 3, 'cap': 2500, 'ctxc': 40, 'ctxh': 1, 'bot': 'balanced'},
+            {'e': 'u', 'u': 4, 'cap': 2400, 'ctxc': 380, 'ctxh': 0, 'bot': 'balanced'},
+        ],
+    )
+
+    digest = dictation_service.build_dictation_agent_digest(config, utterances=4, slowest=1, errors=0)
+
+    assert digest['metrics']['context_capture_helper_ms'] == {'n': 2, 'avg': 50, 'p50': 40, 'p95': 60, 'max': 60}
+    assert digest['metrics']['context_capture_oneshot_ms']['n'] == 2
+    assert digest['metrics']['context_capture_oneshot_ms']['max'] == 420
+    assert digest['metrics']['context_capture_ms']['n'] == 4
+    assert 'context_helper' not in digest['slowest_utterances'][0]
+
+
+def test_dictation_log_formatter_records_context_helper() -> None:
+    formatter = dictation_service._DictationLogFormatter(_FakeStream())
+
+    formatter.format(
+        'server',
+        '[session-server] dictation_context | utterance_id=4 | state="ready" | source="ax" | app="TextEdit" | capture_ms=35 | helper=true | context_chars=0',
+    )
+    lines = formatter.format(
+        'helper',
+        '[vox-dictation] timings utterance_id=4 capture_ms=4200 flush_roundtrip_ms=720 audio_ms=3800 warmup_ms=0 infer_ms=280 postprocess_ms=640 llm_ms=630 llm_used=true backend_total_ms=910 type_ms=28 warmup_reason=-',
+    )
+
+    assert lines.log_events[0].fields['context_helper'] is True
+    assert lines.log_events[0].fields['context_capture_ms'] == 35
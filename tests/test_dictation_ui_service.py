@@ -103,7 +103,16 @@ def test_render_dictation_ui_sections_outputs_expected_toml() -> None:
                     'api_key_present': True,
                 },
             },
-            'context': {'enabled': True, 'max_chars': 1400, 'capture_budget_ms': 900},
+            'context': {
+                'enabled': True,
+                'max_chars': 1400,
+                'max_tokens': 500,
+                'capture_budget_ms': 900,
+                'persistent_helper': True,
+                'cache_ttl_ms': 5000,
+                'watch_enabled': True,
+                'watch_interval_ms': 400,
+            },
             'hotwords': {
                 'enabled': True,
                 'rewrite_aliases': True,
@@ -137,7 +146,13 @@ def test_render_dictation_ui_sections_outputs_expected_toml() -> None:
     assert 'user_prompt_template = ' in rendered
     assert '[dictation.context]' in rendered
     assert 'max_chars = 1400' in rendered
+    assert 'max_tokens = 500' in rendered
     assert 'capture_budget_ms = 900' in rendered
+    assert 'persistent_helper = true' in rendered
+    assert 'cache_ttl_ms = 5000' in rendered
+    assert 'watch_enabled = true' in rendered
+    assert 'watch_interval_ms = 400' in rendered
+    assert 'watch_max_age_ms = 1500' in rendered
     assert '[[dictation.hotwords.entries]]' in rendered
     assert 'value = "潮汕"' in rendered
     assert 'aliases = ["潮上"]' in rendered
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+import time
+
+from vox_cli.services import llm_cache_service
+from vox_cli.services.llm_cache_service import LLMResultCache, fingerprint
+
+
+def test_llm_result_cache_evicts_least_recently_used_entry() -> None:
+    cache = LLMResultCache(max_entries=2)
+    cache.put('a', '好的')
+    cache.put('b', 'OK')
+
+    assert cache.get('a') == '好的'
+    cache.put('c', '提交')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == '好的'
+    assert cache.get('c') == '提交'
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_llm_result_cache_persists_entries_to_disk(tmp_path: Path) -> None:
+    path = tmp_path / 'cache' / 'dictation-llm-cache.json'
+    cache = LLMResultCache(max_entries=4, path=path)
+    cache.put(fingerprint('好的', 'zh'), '好的。')
+    cache.flush()
+
+    reloaded = LLMResultCache(max_entries=4, path=path)
+
+    assert reloaded.get(fingerprint('好的', 'zh')) == '好的。'
+    assert len(reloaded) == 1
+
+
+def test_llm_result_cache_ignores_corrupt_cache_file(tmp_path: Path) -> None:
+    path = tmp_path / 'dictation-llm-cache.json'
+    path.write_text('{not json', encoding='utf-8')
+
+    cache = LLMResultCache(path=path)
+
+    assert cache.get('missing') is None
+    cache.put('k', 'v')
+    cache.flush()
+    assert LLMResultCache(path=path).get('k') == 'v'
+
+
+def test_llm_result_cache_batches_disk_writes(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / 'dictation-llm-cache.json'
+    cache = LLMResultCache(path=path, flush_delay_sec=60)
+    writes: list[int] = []
+    save = cache._save_locked
+    monkeypatch.setattr(cache, '_save_locked', lambda: (writes.append(len(cache._entries)), save()))
+
+    for index in range(5):
+        cache.put(f'k{index}', f'v{index}')
+
+    assert writes == []
+    assert not path.exists()
+    cache.flush()
+    cache.flush()
+    assert writes == [5]
+    assert LLMResultCache(path=path).get('k4') == 'v4'
+
+
+def test_llm_result_cache_flushes_after_delay(tmp_path: Path) -> None:
+    path = tmp_path / 'dictation-llm-cache.json'
+    cache = LLMResultCache(path=path, flush_delay_sec=0.05)
+    cache.put('k', 'v')
+
+    deadline = time.monotonic() + 2
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert LLMResultCache(path=path).get('k') == 'v'
+
+
+def test_llm_result_cache_flushes_only_latest_instance_per_path_at_exit(tmp_path: Path) -> None:
+    path = tmp_path / 'llm-cache.json'
+    stale = LLMResultCache(path=path, flush_delay_sec=60)
+    stale.put('k', 'stale')
+    current = LLMResultCache(path=path, flush_delay_sec=60)
+    current.put('k', 'current')
+    other = LLMResultCache(path=tmp_path / 'other.json', flush_delay_sec=60)
+    other.put('k', 'other')
+
+    llm_cache_service._flush_persistent_caches()
+
+    assert LLMResultCache(path=path).get('k') == 'current'
+    assert LLMResultCache(path=tmp_path / 'other.json').get('k') == 'other'
+    stale.flush()
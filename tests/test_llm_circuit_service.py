@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from vox_cli.services.llm_circuit_service import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    LLMCircuitBreaker,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_opens_after_consecutive_failures_and_probes_after_cooldown() -> None:
+    clock = _FakeClock()
+    breaker = LLMCircuitBreaker(failure_threshold=2, cooldown_sec=10.0, clock=clock)
+
+    assert breaker.acquire() == (True, CIRCUIT_CLOSED)
+    breaker.record_failure()
+    assert breaker.acquire() == (True, CIRCUIT_CLOSED)
+    breaker.record_failure()
+
+    assert breaker.acquire() == (False, CIRCUIT_OPEN)
+
+    clock.now += 10.0
+    assert breaker.acquire() == (True, CIRCUIT_HALF_OPEN)
+    assert breaker.acquire() == (False, CIRCUIT_HALF_OPEN)
+
+    breaker.record_failure()
+    assert breaker.acquire() == (False, CIRCUIT_OPEN)
+
+    clock.now += 10.0
+    assert breaker.acquire() == (True, CIRCUIT_HALF_OPEN)
+    breaker.record_success(420)
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_circuit_success_resets_failure_streak() -> None:
+    breaker = LLMCircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success(300)
+    breaker.record_failure()
+
+    assert breaker.acquire() == (True, CIRCUIT_CLOSED)
+
+
+def test_effective_timeout_tracks_p95_latency_within_bounds() -> None:
+    breaker = LLMCircuitBreaker(min_samples=4, timeout_factor=2.0, min_timeout_sec=1.0)
+
+    for latency_ms in (400, 500, 600):
+        breaker.record_success(latency_ms)
+    assert breaker.effective_timeout(8.0) == 8.0
+
+    breaker.record_success(900)
+    assert breaker.effective_timeout(8.0) == 1.8
+    assert breaker.effective_timeout(1.5) == 1.5
+
+    fast = LLMCircuitBreaker(min_samples=2, timeout_factor=2.0, min_timeout_sec=1.0)
+    fast.record_success(100)
+    fast.record_success(120)
+    assert fast.effective_timeout(8.0) == 1.0
+
+
+def test_effective_timeout_scales_with_input_length() -> None:
+    breaker = LLMCircuitBreaker(min_samples=3, timeout_factor=2.0, min_timeout_sec=0.5)
+    for latency_ms in (400, 450, 500):
+        breaker.record_success(latency_ms, input_chars=20)
+
+    assert breaker.effective_timeout(8.0, input_chars=10) == 1.0
+    assert breaker.effective_timeout(8.0, input_chars=80) == 4.0
+    assert breaker.effective_timeout(3.0, input_chars=200) == 3.0
+
+
+def test_success_without_latency_closes_circuit_but_adds_no_sample() -> None:
+    breaker = LLMCircuitBreaker(failure_threshold=1, min_samples=1)
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+
+    breaker.record_success(None)
+
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.effective_timeout(8.0) == 8.0
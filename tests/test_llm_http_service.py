@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+
+import pytest
+
+from vox_cli.services.llm_http_service import LLMCallCancelledError, LLMCancelToken, LLMConnectionPool
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length).decode('utf-8'))
+        self.server.client_ports.append(self.client_address[1])
+        # 写响应前读取标志：客户端一读完响应就可能改掉它。
+        close_after_response = self.server.close_after_response
+        if body.get('stall'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            self.wfile.write(b'data: {"choices":[{"delta":{"content":"hi"}}]}\n\n')
+            self.wfile.flush()
+            time.sleep(float(body['stall']))
+            self.close_connection = True
+            return
+        if body.get('fail'):
+            payload = b'{"error":"bad request"}'
+            self.send_response(400)
+        else:
+            payload = json.dumps({'echo': body.get('text')}).encode('utf-8')
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        if close_after_response:
+            self.close_connection = True
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+@pytest.fixture
+def chat_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ChatHandler)
+    server.client_ports = []
+    server.close_after_response = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _request(server: ThreadingHTTPServer, payload: dict) -> urllib.request.Request:
+    host, port = server.server_address[:2]
+    return urllib.request.Request(
+        f'http://{host}:{port}/v1/chat/completions',
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+
+
+def test_connection_pool_reuses_keep_alive_connection(chat_server) -> None:
+    pool = LLMConnectionPool()
+    try:
+        with pool.urlopen(_request(chat_server, {'text': 'one'}), timeout=5) as first:
+            assert json.loads(first.read()) == {'echo': 'one'}
+        with pool.urlopen(_request(chat_server, {'text': 'two'}), timeout=5) as second:
+            assert json.loads(second.read()) == {'echo': 'two'}
+
+        assert first.reused is False
+        assert second.reused is True
+        assert second.connect_ms == 0
+        assert second.ttfb_ms >= 0
+        assert len(set(chat_server.client_ports)) == 1
+        assert pool.idle_count() == 1
+    finally:
+        pool.close()
+
+
+def test_connection_pool_reconnects_when_server_dropped_idle_connection(chat_server) -> None:
+    pool = LLMConnectionPool()
+    try:
+        chat_server.close_after_response = True
+        with pool.urlopen(_request(chat_server, {'text': 'one'}), timeout=5) as first:
+            first.read()
+        chat_server.close_after_response = False
+        with pool.urlopen(_request(chat_server, {'text': 'two'}), timeout=5) as second:
+            assert json.loads(second.read()) == {'echo': 'two'}
+
+        assert len(set(chat_server.client_ports)) == 2
+    finally:
+        pool.close()
+
+
+def test_connection_pool_evicts_idle_connections(chat_server) -> None:
+    pool = LLMConnectionPool(idle_timeout_sec=0)
+    try:
+        with pool.urlopen(_request(chat_server, {'text': 'one'}), timeout=5) as first:
+            first.read()
+        with pool.urlopen(_request(chat_server, {'text': 'two'}), timeout=5) as second:
+            second.read()
+
+        assert second.reused is False
+        assert len(set(chat_server.client_ports)) == 2
+    finally:
+        pool.close()
+
+
+def test_connection_pool_raises_http_error_and_keeps_connection(chat_server) -> None:
+    pool = LLMConnectionPool()
+    try:
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            pool.urlopen(_request(chat_server, {'fail': True}), timeout=5)
+
+        assert exc_info.value.code == 400
+        assert 'bad request' in exc_info.value.read().decode('utf-8')
+        assert pool.idle_count() == 1
+    finally:
+        pool.close()
+
+
+def test_cancel_token_aborts_blocked_stream_read(chat_server) -> None:
+    pool = LLMConnectionPool()
+    cancel = LLMCancelToken()
+    try:
+        with pool.urlopen(_request(chat_server, {'stall': 3}), timeout=10) as response:
+            cancel.attach(response)
+            assert response.readline().startswith(b'data:')
+            timer = threading.Timer(0.1, cancel.cancel)
+            timer.start()
+            started_at = time.perf_counter()
+            try:
+                while response.readline():
+                    pass
+            except OSError:
+                pass
+            elapsed = time.perf_counter() - started_at
+            timer.join()
+
+        assert cancel.cancelled is True
+        assert elapsed < 1.5
+        assert pool.idle_count() == 0
+        with pytest.raises(LLMCallCancelledError):
+            cancel.raise_if_cancelled()
+    finally:
+        pool.close()
+
+
+def test_cancel_token_aborts_response_attached_after_cancel() -> None:
+    aborted: list[bool] = []
+
+    class _Response:
+        def abort(self) -> None:
+            aborted.append(True)
+
+    cancel = LLMCancelToken()
+    cancel.cancel()
+
+    with pytest.raises(LLMCallCancelledError):
+        cancel.attach(_Response())
+    assert aborted == [True]
+
+
+def test_cancel_token_runs_callbacks_once() -> None:
+    calls: list[str] = []
+    cancel = LLMCancelToken()
+    cancel.add_callback(lambda: calls.append('first'))
+
+    cancel.cancel()
+    cancel.cancel()
+    cancel.add_callback(lambda: calls.append('late'))
+
+    assert calls == ['first', 'late']
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self) -> None:
+        self.server.proxied.append(self.path)
+        target = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        upstream = http.client.HTTPConnection(target.hostname, target.port, timeout=10)
+        try:
+            upstream.request('POST', target.path, body=body, headers={'Content-Type': 'application/json'})
+            response = upstream.getresponse()
+            self.send_response(response.status)
+            for name, value in response.getheaders():
+                if name.lower() not in {'connection', 'transfer-encoding'}:
+                    self.send_header(name, value)
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            while line := response.readline():
+                self.wfile.write(line)
+                self.wfile.flush()
+        finally:
+            upstream.close()
+        self.close_connection = True
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+@pytest.fixture
+def proxy_server(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ProxyHandler)
+    server.proxied = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    monkeypatch.setattr(urllib.request, 'getproxies', lambda: {'http': f'http://{host}:{port}'})
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_connection_pool_falls_back_to_urllib_when_proxy_applies(monkeypatch, chat_server, proxy_server) -> None:
+    host = chat_server.server_address[0]
+    monkeypatch.setattr(urllib.request, 'proxy_bypass', lambda candidate: False)
+    pool = LLMConnectionPool()
+    try:
+        with pool.urlopen(_request(chat_server, {'text': 'one'}), timeout=5) as response:
+            assert json.loads(response.read()) == {'echo': 'one'}
+            assert response.reused is False
+            assert response.connect_ms >= 0
+            assert response.ttfb_ms >= 0
+        assert len(proxy_server.proxied) == 1
+        assert pool.idle_count() == 0
+
+        with pytest.raises(urllib.error.HTTPError) as raised:
+            pool.urlopen(_request(chat_server, {'fail': True}), timeout=5)
+        assert raised.value.code == 400
+        assert len(proxy_server.proxied) == 2
+
+        monkeypatch.setattr(urllib.request, 'proxy_bypass', lambda candidate: candidate == host)
+        with pool.urlopen(_request(chat_server, {'text': 'two'}), timeout=5) as response:
+            assert json.loads(response.read()) == {'echo': 'two'}
+        assert len(proxy_server.proxied) == 2
+        assert pool.idle_count() == 1
+    finally:
+        pool.close()
+
+
+def test_cancel_token_aborts_blocked_stream_read_through_proxy(monkeypatch, chat_server, proxy_server) -> None:
+    monkeypatch.setattr(urllib.request, 'proxy_bypass', lambda candidate: False)
+    pool = LLMConnectionPool()
+    cancel = LLMCancelToken()
+    try:
+        with pool.urlopen(_request(chat_server, {'stall': 3}), timeout=10) as response:
+            cancel.attach(response)
+            assert response.readline().startswith(b'data:')
+            timer = threading.Timer(0.1, cancel.cancel)
+            timer.start()
+            started_at = time.perf_counter()
+            try:
+                while response.readline():
+                    pass
+            except OSError:
+                pass
+            elapsed = time.perf_counter() - started_at
+            timer.join()
+
+        assert proxy_server.proxied
+        assert elapsed < 1.5
+        with pytest.raises(LLMCallCancelledError):
+            cancel.raise_if_cancelled()
+    finally:
+        pool.close()
@@ -7,6 +7,7 @@ from typer.testing import CliRunner
 
 from vox_cli.config import RuntimeConfig, VoxConfig
 from vox_cli import main
+from vox_cli.db import init_db
 
 
 runner = CliRunner()
@@ -251,3 +252,91 @@ def test_dictation_digest_command_outputs_json(monkeypatch, tmp_path: Path) -> N
     assert payload['window']['requested_utterances'] == 4
     assert payload['metrics']['capture_ms']['avg'] == 6123
     assert payload['bottlenecks'][0]['name'] == 'llm_stream_tail'
+
+
+def test_dictation_postprocess_command_passes_batch_options(monkeypatch, tmp_path: Path) -> None:
+    _stub_runtime(monkeypatch, tmp_path)
+    input_path = tmp_path / 'texts.jsonl'
+    input_path.write_text('"你好"\n', encoding='utf-8')
+    calls: list[dict] = []
+
+    def fake_run_dictation_batch_postprocess(config, input_path, output_path, **kwargs) -> dict:
+        calls.append({'input': input_path, 'output': output_path, **kwargs})
+        return {'items': 1, 'concurrency': kwargs['concurrency'], 'items_per_sec': 12.5}
+
+    monkeypatch.setattr(main, 'run_dictation_batch_postprocess', fake_run_dictation_batch_postprocess)
+
+    result = runner.invoke(
+        main.app,
+        [
+            'dictation',
+            'postprocess',
+            '--input',
+            str(input_path),
+            '--out',
+            str(tmp_path / 'cleaned.jsonl'),
+            '--concurrency',
+            '8',
+            '--preset',
+            'literal',
+            '--no-llm',
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)['concurrency'] == 8
+    assert calls[0]['input'] == input_path
+    assert calls[0]['output'] == tmp_path / 'cleaned.jsonl'
+    assert calls[0]['prompt_preset'] == 'literal'
+    assert calls[0]['use_llm'] is False
+    assert calls[0]['llm_profile'] is None
+
+
+def test_asr_transcribe_priority_is_a_choice(monkeypatch, tmp_path: Path) -> None:
+    _stub_runtime(monkeypatch, tmp_path)
+    monkeypatch.setattr(main, 'init_db', init_db)
+    calls: list[object] = []
+
+    def fake_transcribe_files(config, audio, model_id, lang, runtime_options=None):
+        calls.append(runtime_options)
+        return [{'text': 'ok'}]
+
+    monkeypatch.setattr(main, 'transcribe_files', fake_transcribe_files)
+    audio = tmp_path / 'a.wav'
+    audio.write_bytes(b'')
+
+    result = runner.invoke(main.app, ['asr', 'transcribe', '--audio', str(audio), '--priority', 'batch'])
+
+    assert result.exit_code == 0, result.output
+    assert calls[0].priority == 'batch'
+
+    rejected = runner.invoke(main.app, ['asr', 'transcribe', '--audio', str(audio), '--priority', 'urgent'])
+
+    assert rejected.exit_code == 2
+    assert len(calls) == 1
+
+
+def test_asr_transcribe_marks_task_failed_when_a_file_fails(monkeypatch, tmp_path: Path) -> None:
+    _stub_runtime(monkeypatch, tmp_path)
+    monkeypatch.setattr(main, 'init_db', init_db)
+    monkeypatch.setattr(
+        main,
+        'transcribe_files',
+        lambda config, audio, model_id, lang, runtime_options=None: [
+            {'audio': str(audio[0]), 'text': 'ok'},
+            {'audio': str(audio[1]), 'text': '', 'error': 'decode failed'},
+        ],
+    )
+    audio = [tmp_path / 'a.wav', tmp_path / 'b.wav']
+    for path in audio:
+        path.write_bytes(b'')
+
+    result = runner.invoke(main.app, ['asr', 'transcribe', '--audio', str(audio[0]), '--audio', str(audio[1]), '--json'])
+
+    assert result.exit_code == 1
+    payload = json.loads(result.stdout)
+    assert [item['audio'] for item in payload['results']] == [str(path) for path in audio]
+    with main.connect(tmp_path / 'vox.db') as conn:
+        task = main.get_task(conn, payload['task_id'])
+    assert task['status'] == 'failed'
+    assert '1/2 files failed' in task['error_message']
@@ -1,16 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import nullcontext, suppress
+import json
+import socket
+import sys
+import threading
+from types import ModuleType
+
 import numpy as np
+import websockets
 
+from vox_cli.config import DictationHotwordEntry, VoxConfig
 from vox_cli.services.dictation_context_service import DictationContext, DictationContextSnapshot
-from vox_cli.services.dictation_postprocess_service import DictationPostprocessResult
+from vox_cli.services.dictation_postprocess_service import DictationPostprocessResult, DictationTextPostprocessor
+from vox_cli.services.llm_http_service import LLMCallCancelledError
 from vox_cli.services.realtime_asr_service import (
+    IncrementalDictationState,
+    IncrementalPostprocessCandidate,
     RealtimeASRSession,
     RealtimeTranscript,
     _apply_local_partial_preview,
     _apply_dictation_postprocess,
+    _apply_dictation_postprocess_with_progress,
     _compute_incremental_stable_prefix,
     _remaining_context_budget_ms,
+    _select_final_commit_reuse,
+    serve_realtime_session,
 )
 
 
@@ -123,8 +139,13 @@ class _FakePostprocessor:
         language: str | None = None,
         context=None,
         emit=None,
+        on_progress=None,
+        utterance_id=None,
     ) -> DictationPostprocessResult:
         self.context = context
+        if on_progress is not None:
+            for progress in ('pol', 'pol', 'polish'):
+                on_progress(progress)
         return DictationPostprocessResult(
             text='polished',
             metadata={
@@ -177,6 +198,31 @@ def test_apply_dictation_postprocess_updates_text_and_timings() -> None:
     assert postprocessor.context.app_name == 'Ghostty'
 
 
+
+class _RecordingWebSocket:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def send(self, message: str) -> None:
+        self.messages.append(json.loads(message))
+
+
+def test_apply_dictation_postprocess_with_progress_streams_before_final() -> None:
+    websocket = _RecordingWebSocket()
+    transcript = RealtimeTranscript(text='raw', is_partial=False, language='Chinese', utterance_id=7, timings={'total_ms': 20})
+
+    result = asyncio.run(
+        _apply_dictation_postprocess_with_progress(websocket, transcript, _FakePostprocessor())
+    )
+
+    assert result.text == 'polished'
+    assert websocket.messages
+    assert all(message['type'] == 'final_progress' for message in websocket.messages)
+    assert all(message['utterance_id'] == 7 for message in websocket.messages)
+    assert websocket.messages[-1]['text'] == 'polish'
+    texts = [message['text'] for message in websocket.messages]
+    assert len(texts) == len(set(texts))
+
 def test_remaining_context_budget_ms_uses_elapsed_capture_window() -> None:
     now = [10.0]
 
@@ -209,29 +255,16 @@ def test_compute_incremental_stable_prefix_keeps_trailing_guard_window() -> None
 
 class _PreviewPostprocessor:
     def __init__(self) -> None:
-        self.calls: list[dict[str, object]] = []
+        self.calls: list[str] = []
+        self.stable_prefixes: list[str] = []
 
-    def process(
-        self,
-        text: str,
-        *,
-        language: str | None = None,
-        context=None,
-        emit=None,
-        allow_llm: bool = True,
-    ) -> DictationPostprocessResult:
-        self.calls.append(
-            {
-                'text': text,
-                'language': language,
-                'context': context,
-                'allow_llm': allow_llm,
-            }
-        )
-        return DictationPostprocessResult(
-            text=f'preview::{text}',
-            metadata={'postprocess_ms': 3, 'changed': True},
-        )
+    def preview(self, text: str, *, memo=None, stable_prefix: str = '') -> str:
+        self.calls.append(text)
+        self.stable_prefixes.append(stable_prefix)
+        return f'preview::{text}'
+
+    def process(self, text: str, **kwargs) -> DictationPostprocessResult:
+        raise AssertionError('partial preview should use the preview fast path')
 
 
 def test_apply_local_partial_preview_merges_completed_prefix_without_llm() -> None:
@@ -248,22 +281,471 @@ def test_apply_local_partial_preview_merges_completed_prefix_without_llm() -> No
         postprocessor,
         completed_raw_text='我在 ColdX CLI ',
         completed_text='我在 Codex CLI ',
-        context_snapshot=DictationContextSnapshot(
-            context=DictationContext(
-                source='ghostty',
-                app_name='Ghostty',
-                window_title='codex',
-                element_role='AXTextArea',
-                context_text='context text',
-            ),
-            capture_ms=18,
-        ),
     )
 
     assert result.text == 'preview::我在 Codex CLI 里说话'
     assert result.timings is not None
-    assert result.timings['preview_postprocess_ms'] == 3
+    assert result.timings['total_ms'] == 20
+    assert isinstance(result.timings['preview_postprocess_ms'], int)
     assert result.timings['preview_changed'] is True
     assert result.timings['preview_completed_chars'] == len('我在 Codex CLI ')
-    assert postprocessor.calls[0]['text'] == '我在 Codex CLI 里说话'
-    assert postprocessor.calls[0]['allow_llm'] is False
+    assert postprocessor.calls == ['我在 Codex CLI 里说话']
+    assert postprocessor.stable_prefixes == ['我在 Codex CLI ']
+
+
+def test_apply_local_partial_preview_reuses_stable_prefix_memo() -> None:
+    config = VoxConfig()
+    config.dictation.transforms.fullwidth_to_halfwidth = True
+    config.dictation.transforms.space_around_punct = True
+    config.dictation.transforms.space_between_cjk = True
+    config.dictation.hotwords.enabled = True
+    config.dictation.hotwords.entries = [DictationHotwordEntry(value='Codex', aliases=['ColdX'])]
+    postprocessor = DictationTextPostprocessor(config)
+    state = IncrementalDictationState()
+    partials = [
+        ('我在Cold', ''),
+        ('我在ColdX里说话，', '我在Cold'),
+        ('我在ColdX里说话，然后提交3.14版', '我在ColdX里说话，'),
+        ('我在ColdX里说话，然后提交3.14版本。', '我在ColdX里说话，然后提交3.'),
+    ]
+
+    memo_prefixes: list[str] = []
+    for raw_text, stable in partials:
+        result = _apply_local_partial_preview(
+            RealtimeTranscript(text=raw_text, is_partial=True, language='Chinese'),
+            postprocessor,
+            stable_raw_text=stable,
+            memo=state.preview_memo,
+        )
+        assert result.text == postprocessor.preview(raw_text)
+        memo_prefixes.append(state.preview_memo.raw_text)
+
+    assert result.text == '我在 Codex 里说话, 然后提交 3.14 版本.'
+    # “我在Cold” 可能是别名 ColdX 的前半段，所以 memo 只推进到 “我在”。
+    assert memo_prefixes == ['', '我在', '我在ColdX里说话，', '我在ColdX里说话，然后提交3.']
+
+
+def test_postprocessor_preview_matches_rules_only_process() -> None:
+    config = VoxConfig()
+    config.dictation.llm.enabled = True
+    config.dictation.transforms.fullwidth_to_halfwidth = True
+    config.dictation.transforms.space_around_punct = True
+    config.dictation.hotwords.enabled = True
+    config.dictation.hotwords.entries = [DictationHotwordEntry(value='Codex', aliases=['ColdX'])]
+    postprocessor = DictationTextPostprocessor(config)
+
+    for text in ('  我在 ColdX CLI 里说话，好的。 ', '', 'plain'):
+        assert postprocessor.preview(text) == postprocessor.process(text, allow_llm=False).text
+
+
+def _llm_postprocessor() -> DictationTextPostprocessor:
+    config = VoxConfig()
+    config.dictation.llm.enabled = True
+    return DictationTextPostprocessor(config)
+
+
+def _completed_state(raw_text: str, cleaned_text: str, *, llm_used: bool = True) -> IncrementalDictationState:
+    return IncrementalDictationState(
+        completed_raw_text=raw_text,
+        completed_text=cleaned_text,
+        completed_candidate=IncrementalPostprocessCandidate(
+            raw_text=raw_text,
+            result=DictationPostprocessResult(
+                text=cleaned_text,
+                metadata={'llm_used': llm_used, 'rules_input_text': cleaned_text},
+            ),
+        ),
+    )
+
+
+def test_select_final_commit_reuse_sends_only_new_suffix_after_llm_prefix() -> None:
+    state = _completed_state('我在 ColdX CLI 里', '我在 Codex CLI 里')
+
+    reuse = _select_final_commit_reuse(
+        RealtimeTranscript(text='我在 ColdX CLI 里说话测试', is_partial=False, language='Chinese'),
+        _llm_postprocessor(),
+        state,
+    )
+
+    assert reuse is not None
+    commit_mode, result, _snapshot, reused_chars = reuse
+    assert commit_mode == 'reuse_suffix'
+    assert result is None
+    assert reused_chars == len('我在 ColdX CLI 里')
+
+
+def test_select_final_commit_reuse_falls_back_when_asr_revised_prefix() -> None:
+    state = _completed_state('我在 ColdX CLI 里', '我在 Codex CLI 里')
+
+    reuse = _select_final_commit_reuse(
+        RealtimeTranscript(text='我在 Codex CLI 里说话测试', is_partial=False, language='Chinese'),
+        _llm_postprocessor(),
+        state,
+    )
+
+    assert reuse is None
+
+
+def test_select_final_commit_reuse_skips_suffix_mode_when_prefix_missed_llm() -> None:
+    state = _completed_state('我在 ColdX CLI 里', '我在 ColdX CLI 里', llm_used=False)
+
+    reuse = _select_final_commit_reuse(
+        RealtimeTranscript(text='我在 ColdX CLI 里说话测试', is_partial=False, language='Chinese'),
+        _llm_postprocessor(),
+        state,
+    )
+
+    assert reuse is None
+
+
+class _SuffixPostprocessor:
+    def __init__(self, config: VoxConfig | None = None, *, output: str | None = '说话测试。') -> None:
+        config = config or VoxConfig()
+        self.transforms = config.dictation.transforms
+        self.hotwords = config.dictation.hotwords
+        self.output = output
+        self.calls: list[dict[str, object]] = []
+
+    def process(
+        self,
+        text: str,
+        *,
+        language: str | None = None,
+        context=None,
+        emit=None,
+        prefix_text: str | None = None,
+        on_progress=None,
+        progress_prefix: str = '',
+    ) -> DictationPostprocessResult:
+        self.calls.append({'text': text, 'prefix_text': prefix_text})
+        output = text if self.output is None else self.output
+        return DictationPostprocessResult(
+            text=output,
+            metadata={
+                'postprocess_ms': 7,
+                'llm_used': True,
+                'llm_ms': 5,
+                'rules_input_text': output,
+            },
+        )
+
+
+def test_apply_dictation_postprocess_merges_suffix_with_cleaned_prefix() -> None:
+    postprocessor = _SuffixPostprocessor()
+    state = _completed_state('我在 ColdX CLI 里', '我在 Codex CLI 里')
+
+    result = _apply_dictation_postprocess(
+        RealtimeTranscript(text='我在 ColdX CLI 里说话测试', is_partial=False, language='Chinese', timings={'total_ms': 20}),
+        postprocessor,
+        commit_mode='reuse_suffix',
+        commit_reused_chars=len('我在 ColdX CLI 里'),
+        suffix_candidate=state.completed_candidate,
+    )
+
+    assert postprocessor.calls == [{'text': '说话测试', 'prefix_text': '我在 Codex CLI 里'}]
+    assert result.text == '我在 Codex CLI 里说话测试。'
+    assert result.timings is not None
+    assert result.timings['commit_mode'] == 'reuse_suffix'
+    assert result.timings['postprocess_ms'] == 7
+    assert result.timings['final_chars'] == len('我在 Codex CLI 里说话测试。')
+
+
+def test_apply_dictation_postprocess_drops_sentence_end_the_llm_added_to_prefix() -> None:
+    postprocessor = _SuffixPostprocessor()
+    state = _completed_state('我在 ColdX CLI 里', '我在 Codex CLI 里。')
+
+    result = _apply_dictation_postprocess(
+        RealtimeTranscript(text='我在 ColdX CLI 里说话测试', is_partial=False, language='Chinese'),
+        postprocessor,
+        commit_mode='reuse_suffix',
+        commit_reused_chars=len('我在 ColdX CLI 里'),
+        suffix_candidate=state.completed_candidate,
+    )
+
+    assert postprocessor.calls == [{'text': '说话测试', 'prefix_text': '我在 Codex CLI 里'}]
+    assert result.text == '我在 Codex CLI 里说话测试。'
+
+
+def test_apply_dictation_postprocess_keeps_sentence_end_present_in_raw_prefix() -> None:
+    postprocessor = _SuffixPostprocessor(output='说话测试。')
+    state = _completed_state('我在 ColdX CLI 里。', '我在 Codex CLI 里。')
+
+    result = _apply_dictation_postprocess(
+        RealtimeTranscript(text='我在 ColdX CLI 里。说话测试', is_partial=False, language='Chinese'),
+        postprocessor,
+        commit_mode='reuse_suffix',
+        commit_reused_chars=len('我在 ColdX CLI 里。'),
+        suffix_candidate=state.completed_candidate,
+    )
+
+    assert result.text == '我在 Codex CLI 里。说话测试。'
+
+
+def test_apply_dictation_postprocess_rewrites_hotword_alias_across_suffix_cut() -> None:
+    config = VoxConfig()
+    config.dictation.hotwords.enabled = True
+    config.dictation.hotwords.entries = [DictationHotwordEntry(value='Codex', aliases=['ColdX'])]
+    postprocessor = _SuffixPostprocessor(config, output=None)
+    state = _completed_state('我在 Cold', '我在 Cold')
+
+    result = _apply_dictation_postprocess(
+        RealtimeTranscript(text='我在 ColdX CLI 里说话', is_partial=False, language='Chinese', timings={'total_ms': 20}),
+        postprocessor,
+        commit_mode='reuse_suffix',
+        commit_reused_chars=len('我在 Cold'),
+        suffix_candidate=state.completed_candidate,
+    )
+
+    assert postprocessor.calls == [{'text': 'X CLI 里说话', 'prefix_text': '我在 Cold'}]
+    assert result.text == '我在 Codex CLI 里说话'
+
+
+class _ScriptedModel:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def generate(self, audio, **kwargs):
+        return _FakeResult(text=self.text, language=kwargs.get('language'))
+
+
+class _ServerPostprocessor(DictationTextPostprocessor):
+    def __init__(
+        self,
+        config: VoxConfig,
+        *,
+        job_progress: float,
+        job_delay_sec: float,
+        job_error: str | None = None,
+    ) -> None:
+        super().__init__(config)
+        self.job_progress = job_progress
+        self.job_delay_sec = job_delay_sec
+        self.job_error = job_error
+        self.job_cancelled = threading.Event()
+        self.calls: list[str] = []
+
+    def process(self, text: str, *, emit=None, cancel=None, **kwargs) -> DictationPostprocessResult:
+        self.calls.append(text)
+        if cancel is not None:
+            cancel.add_callback(self.job_cancelled.set)
+            if emit is not None:
+                emit('llm_stream', {'chars': int(len(text) * self.job_progress)})
+            if self.job_cancelled.wait(self.job_delay_sec):
+                raise LLMCallCancelledError('LLM request cancelled')
+            if self.job_error:
+                raise RuntimeError(self.job_error)
+        cleaned = text.replace('ColdX', 'Codex')
+        return DictationPostprocessResult(
+            text=cleaned,
+            metadata={'llm_used': True, 'changed': cleaned != text, 'rules_input_text': cleaned},
+        )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _serve_scripted_session(monkeypatch, tmp_path, config: VoxConfig, model, postprocessor) -> int:
+    import vox_cli.services.realtime_asr_service as realtime_module
+
+    stt = ModuleType('mlx_audio.stt')
+    stt.load = lambda path: model
+    package = ModuleType('mlx_audio')
+    package.stt = stt
+    monkeypatch.setitem(sys.modules, 'mlx_audio', package)
+    monkeypatch.setitem(sys.modules, 'mlx_audio.stt', stt)
+    monkeypatch.setattr(realtime_module, 'ensure_model_downloaded', lambda *args, **kwargs: {'snapshot_path': str(tmp_path)})
+    monkeypatch.setattr(realtime_module, 'estimate_resident_mb', lambda *args: 0)
+    monkeypatch.setattr(realtime_module, 'acquire_runtime_lock', lambda *args, **kwargs: nullcontext())
+    monkeypatch.setattr(realtime_module, 'acquire_memory_budget', lambda *args, **kwargs: nullcontext())
+    monkeypatch.setattr(realtime_module, 'build_dictation_postprocessor', lambda config: postprocessor)
+    return _free_port()
+
+
+async def _run_flush_after_incremental_job(config: VoxConfig, port: int) -> dict:
+    server = asyncio.create_task(
+        serve_realtime_session(config, None, None, '127.0.0.1', port, apply_dictation_postprocess=True)
+    )
+    try:
+        for _ in range(100):
+            try:
+                websocket = await websockets.connect(f'ws://127.0.0.1:{port}')
+                break
+            except OSError:
+                await asyncio.sleep(0.02)
+        else:
+            raise AssertionError('session server did not start')
+        async with websocket:
+            assert json.loads(await websocket.recv())['status'] == 'ready'
+            await websocket.send(_pcm16([0] * 160))
+            for _ in range(2):
+                await websocket.send(json.dumps({'action': 'partial', 'utterance_id': 1}))
+                assert json.loads(await websocket.recv())['is_partial'] is True
+            await websocket.send(json.dumps({'action': 'flush', 'utterance_id': 1}))
+            final = json.loads(await websocket.recv())
+            assert final['is_partial'] is False
+            return final
+    finally:
+        server.cancel()
+        with suppress(asyncio.CancelledError):
+            await server
+
+
+def _incremental_server_config(*, flush_grace_ms: int) -> VoxConfig:
+    config = VoxConfig()
+    config.dictation.llm.enabled = True
+    config.dictation.context.enabled = False
+    config.dictation.incremental.enabled = True
+    config.dictation.incremental.flush_grace_ms = flush_grace_ms
+    return config
+
+
+_SERVER_TEXT = '我在 ColdX CLI 里面说话，然后继续测试一下'
+
+
+def test_session_server_preempts_in_flight_incremental_job_on_flush(monkeypatch, tmp_path, capsys) -> None:
+    config = _incremental_server_config(flush_grace_ms=250)
+    postprocessor = _ServerPostprocessor(config, job_progress=0.1, job_delay_sec=5.0)
+    port = _serve_scripted_session(monkeypatch, tmp_path, config, _ScriptedModel(_SERVER_TEXT), postprocessor)
+
+    final = asyncio.run(_run_flush_after_incremental_job(config, port))
+
+    assert postprocessor.job_cancelled.is_set()
+    assert final['text'] == _SERVER_TEXT.replace('ColdX', 'Codex')
+    assert final['timings']['commit_mode'] == 'full_final'
+    assert postprocessor.calls[-1] == _SERVER_TEXT
+    output = capsys.readouterr().out
+    assert 'state="job_cancelled" | reason="preempt"' in output
+    assert 'job_state="preempted"' in output
+
+
+def test_session_server_awaits_nearly_done_job_within_grace(monkeypatch, tmp_path, capsys) -> None:
+    config = _incremental_server_config(flush_grace_ms=2000)
+    postprocessor = _ServerPostprocessor(config, job_progress=1.0, job_delay_sec=0.05)
+    port = _serve_scripted_session(monkeypatch, tmp_path, config, _ScriptedModel(_SERVER_TEXT), postprocessor)
+
+    final = asyncio.run(_run_flush_after_incremental_job(config, port))
+
+    assert not postprocessor.job_cancelled.is_set()
+    assert final['text'] == _SERVER_TEXT.replace('ColdX', 'Codex')
+    assert final['timings']['commit_mode'] != 'full_final'
+    assert _SERVER_TEXT not in postprocessor.calls
+    output = capsys.readouterr().out
+    assert 'state="job_awaited"' in output
+    assert 'job_state="awaited"' in output
+
+
+def test_session_server_preempts_nearly_done_job_after_grace(monkeypatch, tmp_path, capsys) -> None:
+    config = _incremental_server_config(flush_grace_ms=50)
+    postprocessor = _ServerPostprocessor(config, job_progress=1.0, job_delay_sec=5.0)
+    port = _serve_scripted_session(monkeypatch, tmp_path, config, _ScriptedModel(_SERVER_TEXT), postprocessor)
+
+    final = asyncio.run(_run_flush_after_incremental_job(config, port))
+
+    assert postprocessor.job_cancelled.is_set()
+    assert final['timings']['commit_mode'] == 'full_final'
+    assert postprocessor.calls[-1] == _SERVER_TEXT
+    output = capsys.readouterr().out
+    assert 'state="job_awaited"' not in output
+    assert 'job_state="preempted"' in output
+
+
+def test_session_server_logs_incremental_job_failure_during_grace(monkeypatch, tmp_path, capsys) -> None:
+    config = _incremental_server_config(flush_grace_ms=2000)
+    postprocessor = _ServerPostprocessor(config, job_progress=1.0, job_delay_sec=0.05, job_error='LLM API 500: boom')
+    port = _serve_scripted_session(monkeypatch, tmp_path, config, _ScriptedModel(_SERVER_TEXT), postprocessor)
+
+    final = asyncio.run(_run_flush_after_incremental_job(config, port))
+
+    assert final['text'] == _SERVER_TEXT.replace('ColdX', 'Codex')
+    assert final['timings']['commit_mode'] == 'full_final'
+    output = capsys.readouterr().out
+    assert 'state="job_await_failed"' in output
+    assert 'error="LLM API 500: boom"' in output
+    assert 'job_state="failed"' in output
+
+
+def test_session_server_capture_context_refreshes_the_watched_snapshot(monkeypatch, tmp_path, capsys) -> None:
+    import vox_cli.services.realtime_asr_service as realtime_module
+
+    config = VoxConfig()
+    config.dictation.llm.enabled = True
+    config.dictation.context.enabled = True
+    config.dictation.context.watch_enabled = True
+    config.dictation.context.watch_interval_ms = 50
+    config.dictation.context.watch_max_age_ms = 5000
+    postprocessor = _ServerPostprocessor(config, job_progress=1.0, job_delay_sec=0.0)
+    contexts: list[DictationContext | None] = []
+    original_process = postprocessor.process
+
+    def process(text: str, **kwargs) -> DictationPostprocessResult:
+        contexts.append(kwargs.get('context'))
+        return original_process(text, **kwargs)
+
+    postprocessor.process = process
+    port = _serve_scripted_session(monkeypatch, tmp_path, config, _ScriptedModel(_SERVER_TEXT), postprocessor)
+    page = DictationContext(
+        source='chromium',
+        app_name='Google Chrome',
+        window_title='Codex Chat',
+        page_url='https://example.com/chat',
+        context_text='上一轮对话',
+    )
+    captures: list[str] = []
+    refreshed: list[DictationContextSnapshot] = []
+
+    def capture(config: VoxConfig) -> DictationContextSnapshot:
+        captures.append('full')
+        return DictationContextSnapshot(context=page, capture_ms=180, cache_hit=False)
+
+    def refresh(config: VoxConfig, watched: DictationContextSnapshot) -> DictationContextSnapshot:
+        refreshed.append(watched)
+        return DictationContextSnapshot(
+            context=DictationContext(**{**page.to_dict(), 'selected_text': '刚选中的'}),
+            capture_ms=4,
+            age_ms=watched.age_ms,
+        )
+
+    monkeypatch.setattr(realtime_module, 'capture_dictation_context_snapshot', capture)
+    monkeypatch.setattr(realtime_module, 'refresh_dictation_context_snapshot', refresh)
+
+    async def scenario() -> dict:
+        server = asyncio.create_task(
+            serve_realtime_session(config, None, None, '127.0.0.1', port, apply_dictation_postprocess=True)
+        )
+        try:
+            for _ in range(100):
+                try:
+                    websocket = await websockets.connect(f'ws://127.0.0.1:{port}')
+                    break
+                except OSError:
+                    await asyncio.sleep(0.02)
+            else:
+                raise AssertionError('session server did not start')
+            async with websocket:
+                assert json.loads(await websocket.recv())['status'] == 'ready'
+                while not captures:
+                    await asyncio.sleep(0.01)
+                await websocket.send(json.dumps({'action': 'capture_context', 'reason': 'start'}))
+                await websocket.send(_pcm16([0] * 160))
+                await websocket.send(json.dumps({'action': 'flush', 'utterance_id': 1}))
+                return json.loads(await websocket.recv())
+        finally:
+            server.cancel()
+            with suppress(asyncio.CancelledError):
+                await server
+
+    final = asyncio.run(scenario())
+
+    assert final['is_partial'] is False
+    assert len(refreshed) == 1
+    assert refreshed[0].context == page
+    assert refreshed[0].age_ms is not None
+    assert contexts[-1] is not None
+    assert contexts[-1].selected_text == '刚选中的'
+    assert contexts[-1].context_text == '上一轮对话'
+    output = capsys.readouterr().out
+    assert 'dictation_context | utterance_id=1 | state="ready"' in output
+    assert 'capture_ms=4' in output
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from multiprocessing import get_context
 from pathlib import Path
+import threading
 import time
 
 import pytest
 
-from vox_cli.config import RuntimeConfig, VoxConfig
+from vox_cli import config as config_module
+from vox_cli.cache import estimate_resident_mb
+from vox_cli.config import RuntimeConfig, VoxConfig, get_memory_budget_mb
+from vox_cli.models import MODEL_REGISTRY
 from vox_cli.runtime import (
     RuntimeExecutionOptions,
     RuntimeLockBusyError,
+    RuntimeLockTimeoutError,
+    _LockWaitQueue,
+    acquire_memory_budget,
     acquire_runtime_lock,
-    acquire_runtime_lock_pool,
-    acquire_runtime_locks,
+    format_lock_state,
+    memory_budget_contended,
+    memory_units_for,
+    probe_memory_budget,
+    probe_runtime_lock,
     read_runtime_lock_state,
 )
 
@@ -64,6 +75,11 @@ def test_runtime_lock_busy_attempt_does_not_clear_owner_state(tmp_path: Path) ->
             proc.terminate()
 
 
+def _two_unit_config(home_dir: Path) -> VoxConfig:
+    # 1GB 预算正好两个单元：512MB 的小任务可以两个并行，1024MB 的任务要占满。
+    return VoxConfig(runtime=RuntimeConfig(home_dir=str(home_dir), memory_budget_gb=1))
+
+
 def _hold_lock_slot(home_dir: str, resource: str) -> None:
     config = VoxConfig(runtime=RuntimeConfig(home_dir=home_dir, wait_for_lock=True, lock_wait_timeout_sec=5))
     options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=5)
@@ -72,22 +88,22 @@ def _hold_lock_slot(home_dir: str, resource: str) -> None:
 
 
 @pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
-def test_runtime_lock_pool_uses_second_slot_when_first_busy(tmp_path: Path) -> None:
+def test_memory_budget_uses_second_unit_when_first_busy(tmp_path: Path) -> None:
     ctx = get_context('spawn')
-    proc = ctx.Process(target=_hold_lock_slot, args=(str(tmp_path), 'tts_infer:small:0'))
+    proc = ctx.Process(target=_hold_lock_slot, args=(str(tmp_path), 'memory_unit:0'))
     proc.start()
     try:
         time.sleep(0.5)
-        config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path), wait_for_lock=True, lock_wait_timeout_sec=5))
+        config = _two_unit_config(tmp_path)
         options = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1)
-        with acquire_runtime_lock_pool(
+        with acquire_memory_budget(
             config,
-            ['tts_infer:small:0', 'tts_infer:small:1'],
+            512,
             options=options,
             metadata={'model_id': 'qwen-tts-0.6b-base-8bit'},
             display_resource='tts_infer',
-        ) as handle:
-            assert handle.resource == 'tts_infer:small:1'
+        ) as handles:
+            assert [handle.resource for handle in handles] == ['memory_unit:1']
     finally:
         proc.join(timeout=5)
         if proc.is_alive():
@@ -95,18 +111,18 @@ def test_runtime_lock_pool_uses_second_slot_when_first_busy(tmp_path: Path) -> N
 
 
 @pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
-def test_runtime_multi_lock_no_wait_fails_when_any_slot_busy(tmp_path: Path) -> None:
+def test_memory_budget_no_wait_fails_when_any_needed_unit_busy(tmp_path: Path) -> None:
     ctx = get_context('spawn')
-    proc = ctx.Process(target=_hold_lock_slot, args=(str(tmp_path), 'tts_infer_slot:0'))
+    proc = ctx.Process(target=_hold_lock_slot, args=(str(tmp_path), 'memory_unit:0'))
     proc.start()
     try:
         time.sleep(0.5)
-        config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path), wait_for_lock=True, lock_wait_timeout_sec=5))
+        config = _two_unit_config(tmp_path)
         options = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1)
         with pytest.raises(RuntimeLockBusyError):
-            with acquire_runtime_locks(
+            with acquire_memory_budget(
                 config,
-                ['tts_infer_slot:0', 'tts_infer_slot:1'],
+                1024,
                 options=options,
                 metadata={'model_id': 'qwen-tts-1.7b-base-8bit'},
             ):
@@ -115,3 +131,332 @@ def test_runtime_multi_lock_no_wait_fails_when_any_slot_busy(tmp_path: Path) ->
         proc.join(timeout=5)
         if proc.is_alive():
             proc.terminate()
+
+
+def _churn_small_jobs(home_dir: str, stop, started) -> None:
+    config = _two_unit_config(Path(home_dir))
+    options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=30, task_type='tts_small')
+    while not stop.is_set():
+        with acquire_memory_budget(config, 512, options=options, display_resource='tts_infer'):
+            started.set()
+            time.sleep(0.3)
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_large_memory_job_is_not_starved_by_small_jobs(tmp_path: Path) -> None:
+    ctx = get_context('spawn')
+    stop = ctx.Event()
+    started = ctx.Event()
+    procs = [ctx.Process(target=_churn_small_jobs, args=(str(tmp_path), stop, started)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    try:
+        assert started.wait(timeout=10)
+        time.sleep(1.0)
+        config = _two_unit_config(tmp_path)
+        options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=8, task_type='tts_large')
+        wait_started = time.monotonic()
+        with acquire_memory_budget(config, 1024, options=options, display_resource='tts_infer') as handles:
+            waited = time.monotonic() - wait_started
+            assert [handle.resource for handle in handles] == ['memory_unit:0', 'memory_unit:1']
+            assert read_runtime_lock_state(config, 'memory_unit:1').task_type == 'tts_large'
+        # 四个小任务在排队，要占满预算的任务最多等完它前面的几轮。
+        assert waited < 5.0
+    finally:
+        stop.set()
+        for proc in procs:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.terminate()
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_memory_budget_waits_behind_earlier_ticket(tmp_path: Path) -> None:
+    config = _two_unit_config(tmp_path)
+    queue = _LockWaitQueue(config, ['memory_unit:0', 'memory_unit:1'])
+    ticket = queue.enqueue(need=2, options=RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=5))
+    logs: list[str] = []
+    options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=1, log=logs.append)
+
+    with pytest.raises(RuntimeLockTimeoutError, match='queue position 2/2'):
+        with acquire_memory_budget(config, 512, options=options, display_resource='tts_infer'):
+            pass
+    assert any('queue position 2/2' in line for line in logs)
+
+    queue.remove(ticket)
+    with acquire_memory_budget(config, 512, options=options, display_resource='tts_infer') as handles:
+        assert [handle.resource for handle in handles] == ['memory_unit:0']
+    ticket = queue.enqueue(need=1, options=options)
+    assert queue.position(ticket) == (0, 1)
+    queue.remove(ticket)
+    assert not queue.ticket_path(ticket).exists()
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_lock_queue_skips_unchanged_writes_and_requeues_lost_ticket(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path), memory_budget_gb=2))
+    queue = _LockWaitQueue(config, [f'memory_unit:{unit}' for unit in range(4)])
+    options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=5)
+    ticket = queue.enqueue(need=1, options=options)
+    written = queue.path.stat()
+    assert queue.position(ticket) == (0, 1)
+    assert queue.waiters()[0]['ticket'] == ticket
+    assert queue.path.stat().st_ino == written.st_ino
+    assert queue.path.stat().st_mtime_ns == written.st_mtime_ns
+    queue.remove(ticket)
+
+    # 等待期间排队文件被删，醒来后重新排队，照常拿到预算。
+    acquired = threading.Event()
+    errors: list[BaseException] = []
+
+    def wait_for_budget() -> None:
+        try:
+            with acquire_memory_budget(config, 512, options=options, display_resource='asr_infer'):
+                acquired.set()
+        except BaseException as error:
+            errors.append(error)
+
+    with acquire_memory_budget(config, 2048, options=options, display_resource='tts_infer'):
+        waiter = threading.Thread(target=wait_for_budget)
+        waiter.start()
+        deadline = time.monotonic() + 5
+        while not queue.waiters() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        queue.path.unlink()
+    waiter.join(timeout=10)
+
+    assert errors == []
+    assert acquired.is_set()
+    assert queue.waiters() == []
+
+
+def _hand_off_lock(home_dir: str, rounds: int, holding, released) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=home_dir, wait_for_lock=True, lock_wait_timeout_sec=10))
+    options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=10)
+    for _ in range(rounds):
+        with acquire_runtime_lock(config, 'tts_infer', options=options):
+            holding.set()
+            time.sleep(0.3)
+            released.put(time.time())
+        time.sleep(0.3)
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_runtime_lock_wakes_waiter_right_after_release(tmp_path: Path) -> None:
+    ctx = get_context('spawn')
+    holding = ctx.Event()
+    released = ctx.Queue()
+    rounds = 3
+    proc = ctx.Process(target=_hand_off_lock, args=(str(tmp_path), rounds, holding, released))
+    proc.start()
+    try:
+        config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path), wait_for_lock=True, lock_wait_timeout_sec=10))
+        options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=10)
+        latencies: list[float] = []
+        for _ in range(rounds):
+            assert holding.wait(timeout=10)
+            holding.clear()
+            with acquire_runtime_lock(config, 'tts_infer', options=options):
+                acquired_at = time.time()
+            latencies.append(acquired_at - released.get(timeout=5))
+        # 以前每 0.5s 轮询一次，平均要多等 250ms；现在释放后应该几乎立刻拿到。
+        assert max(latencies) < 0.15, latencies
+    finally:
+        proc.join(timeout=10)
+        if proc.is_alive():
+            proc.terminate()
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_waiters_do_not_touch_the_lock_or_leak_watchers(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path), memory_budget_gb=2))
+    options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=5)
+    wake_dir = tmp_path / 'locks' / 'wake'
+    acquired = threading.Event()
+    threads_before = threading.active_count()
+
+    def wait_for_budget() -> None:
+        with acquire_memory_budget(config, 512, options=options, display_resource='asr_infer'):
+            acquired.set()
+
+    with acquire_memory_budget(config, 2048, options=options, display_resource='tts_infer'):
+        waiters = [threading.Thread(target=wait_for_budget) for _ in range(3)]
+        for waiter in waiters:
+            waiter.start()
+        deadline = time.monotonic() + 5
+        while len(list(wake_dir.glob('*.fifo'))) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # 每个等待方一个 FIFO，不再为每个内存单元起一个阻塞在 flock 上的线程。
+        assert len(list(wake_dir.glob('*.fifo'))) == 3
+        assert threading.active_count() == threads_before + 3
+    for waiter in waiters:
+        waiter.join(timeout=5)
+
+    assert acquired.is_set()
+    assert list(wake_dir.glob('*.fifo')) == []
+    # 释放后没有观察线程去抢真正的锁，探测看到的是空闲。
+    assert probe_runtime_lock(config, 'memory_unit:0')[0] is False
+
+    busy = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=1)
+    with acquire_memory_budget(config, 2048, options=options):
+        with pytest.raises(RuntimeLockTimeoutError):
+            with acquire_memory_budget(config, 512, options=busy):
+                pass
+    assert list(wake_dir.glob('*.fifo')) == []
+
+
+def _hold_slot_and_report(home_dir: str, resource: str, hold_sec: float, holding, released) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=home_dir, wait_for_lock=True, lock_wait_timeout_sec=10))
+    options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=10)
+    with acquire_runtime_lock(config, resource, options=options):
+        holding.release()
+        time.sleep(hold_sec)
+        released.put(time.time())
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_memory_budget_wakes_waiter_right_after_unit_release(tmp_path: Path) -> None:
+    ctx = get_context('spawn')
+    holding = ctx.Semaphore(0)
+    released = ctx.Queue()
+    procs = [
+        ctx.Process(target=_hold_slot_and_report, args=(str(tmp_path), 'memory_unit:0', 1.0, holding, released)),
+        ctx.Process(target=_hold_slot_and_report, args=(str(tmp_path), 'memory_unit:1', 2.0, holding, released)),
+    ]
+    for proc in procs:
+        proc.start()
+    try:
+        for _ in procs:
+            assert holding.acquire(timeout=10)
+        config = _two_unit_config(tmp_path)
+        options = RuntimeExecutionOptions(wait_for_lock=True, wait_timeout_sec=10)
+        with acquire_memory_budget(config, 512, options=options, display_resource='tts_infer') as handles:
+            acquired_at = time.time()
+            assert [handle.resource for handle in handles] == ['memory_unit:0']
+        assert acquired_at - released.get(timeout=5) < 0.15
+    finally:
+        for proc in procs:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.terminate()
+
+
+def test_memory_units_cover_cost_and_cap_at_budget() -> None:
+    assert memory_units_for(900, 8192) == (2, 16)
+    assert memory_units_for(1024, 8192) == (2, 16)
+    assert memory_units_for(1, 8192) == (1, 16)
+    assert memory_units_for(20_000, 8192) == (16, 16)
+    assert memory_units_for(900, 100) == (1, 1)
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_memory_budget_admits_jobs_while_they_fit(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path), memory_budget_gb=4))
+    options = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1)
+
+    with acquire_memory_budget(
+        config,
+        910,
+        options=options,
+        metadata={'model_id': 'qwen-asr-0.6b-4bit'},
+        display_resource='asr_infer',
+    ) as asr_units:
+        # 小 ASR 和小 TTS 加起来放得下，可以同时跑。
+        with acquire_memory_budget(
+            config,
+            1690,
+            options=options,
+            metadata={'model_id': 'qwen-tts-0.6b-base-8bit'},
+            display_resource='tts_infer',
+        ) as tts_units:
+            assert len(asr_units) == 2
+            assert len(tts_units) == 4
+            state = read_runtime_lock_state(config, tts_units[0].resource)
+            assert state.metadata == {
+                'model_id': 'qwen-tts-0.6b-base-8bit',
+                'memory_mb': '1690',
+                'queue_position': '1/1',
+            }
+
+            with pytest.raises(RuntimeLockBusyError, match=r'tts_infer \(4/8 x 512MB\).*memory_mb=1690, queue_position=1/1 x4'):
+                with acquire_memory_budget(config, 1690, options=options, display_resource='tts_infer'):
+                    pass
+
+        with acquire_memory_budget(config, 3000, options=options, display_resource='tts_infer') as large_units:
+            assert len(large_units) == 6
+
+
+def test_default_memory_budget_fits_large_asr_and_tts_on_16gb(monkeypatch) -> None:
+    monkeypatch.setattr(config_module, 'get_total_memory_gb', lambda: 16.0)
+    budget_mb = get_memory_budget_mb(VoxConfig())
+    asr_need, total_units = memory_units_for(estimate_resident_mb(MODEL_REGISTRY['qwen-asr-1.7b-8bit']), budget_mb)
+    tts_need, _ = memory_units_for(estimate_resident_mb(MODEL_REGISTRY['qwen-tts-1.7b']), budget_mb)
+
+    assert (asr_need, tts_need) == (6, 11)
+    assert asr_need + tts_need <= total_units
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_probe_memory_budget_reads_holders_without_locking(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path), memory_budget_gb=4))
+    options = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1, task_type='tts_infer')
+
+    assert probe_memory_budget(config, 3000)[0] is True
+    with acquire_memory_budget(config, 1690, options=options, display_resource='tts_infer'):
+        fits, holders, position = probe_memory_budget(config, 3000)
+        assert fits is False
+        assert 'task=tts_infer' in holders and holders.endswith('x4')
+        assert position == 1
+        assert probe_memory_budget(config, 1690)[0] is True
+
+        queue = _LockWaitQueue(config, [f'memory_unit:{unit}' for unit in range(8)])
+        ticket = queue.enqueue(need=6, options=replace(options, priority='batch'))
+        try:
+            assert probe_memory_budget(config, 3000, priority='interactive')[2] == 1
+            assert probe_memory_budget(config, 3000, priority='batch')[2] == 2
+        finally:
+            queue.remove(ticket)
+    assert probe_memory_budget(config, 3000)[0] is True
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_interactive_waiter_jumps_ahead_of_queued_batch_job(tmp_path: Path) -> None:
+    config = _two_unit_config(tmp_path)
+    queue = _LockWaitQueue(config, ['memory_unit:0', 'memory_unit:1'])
+    batch = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1, priority='batch')
+    interactive = RuntimeExecutionOptions(
+        wait_for_lock=False,
+        wait_timeout_sec=1,
+        task_type='asr_session_server',
+        priority='interactive',
+    )
+    ticket = queue.enqueue(need=2, options=batch)
+    try:
+        with pytest.raises(RuntimeLockBusyError, match='queue position 2/2'):
+            with acquire_memory_budget(config, 512, options=batch, display_resource='asr_infer'):
+                pass
+
+        with acquire_memory_budget(config, 512, options=interactive, display_resource='asr_infer') as handles:
+            state = read_runtime_lock_state(config, handles[0].resource)
+            assert state.priority == 'interactive'
+            assert state.metadata['queue_position'] == '1/2'
+            assert 'priority=interactive' in format_lock_state(state)
+    finally:
+        queue.remove(ticket)
+
+
+@pytest.mark.skipif(not hasattr(__import__('fcntl'), 'flock'), reason='requires fcntl/flock')
+def test_memory_budget_contended_only_for_lower_priority_holders(tmp_path: Path) -> None:
+    config = VoxConfig(runtime=RuntimeConfig(home_dir=str(tmp_path), memory_budget_gb=4))
+    batch = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1, priority='batch')
+    interactive = RuntimeExecutionOptions(wait_for_lock=False, wait_timeout_sec=1, priority='interactive')
+    assert memory_budget_contended(config, batch) is False
+
+    queue = _LockWaitQueue(config, [f'memory_unit:{unit}' for unit in range(8)])
+    ticket = queue.enqueue(need=2, options=interactive)
+    try:
+        assert memory_budget_contended(config, batch) is True
+        assert memory_budget_contended(config, interactive) is False
+    finally:
+        queue.remove(ticket)
+    assert memory_budget_contended(config, batch) is False